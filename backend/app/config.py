@@ -31,6 +31,8 @@ class Config:
     SCRAPER_USER_AGENT = os.getenv("SCRAPER_USER_AGENT", "DefaultAgent/1.0")
     MAX_RETRIES = int(os.getenv("MAX_RETRIES", 3))
     RETRY_BACKOFF = float(os.getenv("RETRY_BACKOFF", 2.5))
+    # Processes parsing scraped pages off the event loop, 0 extracts in a thread instead
+    EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", 2))
     # Secret key for Flask sessions and other security features
 
     # JWT configuration
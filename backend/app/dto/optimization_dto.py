@@ -143,7 +143,7 @@ class OptimizationConfigDTO(BaseModel):
     strategy: str = Field(
         default="auto",
         description="Optimization algorithm to use",
-        pattern=r"^(auto|milp|nsga2|nsga-ii|nsga3|nsga-iii|moead|hybrid|hybrid_milp_nsga3)$",
+        pattern=r"^(auto|race|milp|nsga2|nsga-ii|nsga3|nsga-iii|moead|hybrid|hybrid_milp_nsga3)$",
     )
     min_store: int = Field(..., gt=0)
     max_store: int = 0
@@ -206,7 +206,18 @@ class OptimizationConfigDTO(BaseModel):
             normalized = strategy_mapping.get(v, v)
 
             # Validate against allowed strategies
-            allowed = ["auto", "milp", "nsga2", "nsga-ii", "nsga3", "nsga-iii", "moead", "hybrid", "hybrid_milp_nsga3"]
+            allowed = [
+                "auto",
+                "race",
+                "milp",
+                "nsga2",
+                "nsga-ii",
+                "nsga3",
+                "nsga-iii",
+                "moead",
+                "hybrid",
+                "hybrid_milp_nsga3",
+            ]
             if normalized not in allowed:
                 # For backward compatibility, map unsupported to supported
                 fallback_mapping = {
@@ -1,4 +1,5 @@
 from .optimization_results import OptimizationResult
+from .optimization_run_metrics import OptimizationRunMetrics
 from .scan import Scan, ScanResult
 from .settings import Settings
 from .site import Site
@@ -0,0 +1,58 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Boolean, Column, DateTime, Float, Integer, JSON, String
+from app import Base
+
+
+class OptimizationRunMetrics(Base):
+    """One optimization run: the problem it solved, the algorithm used and how well it did"""
+
+    __tablename__ = "optimization_run_metrics"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True)
+
+    algorithm = Column(String(50), nullable=False, index=True)
+    auto_selected = Column(Boolean, nullable=False, default=False)
+
+    # Problem characteristics
+    num_cards = Column(Integer, nullable=False)
+    num_stores = Column(Integer, nullable=False)
+    total_listings = Column(Integer, nullable=False)
+    avg_stores_per_card = Column(Float, nullable=True)
+    card_coverage = Column(Float, nullable=True)
+    price_variance = Column(Float, nullable=True)
+    complexity_score = Column(Float, nullable=True)
+    cost_lower_bound = Column(Float, nullable=True)
+    time_limit = Column(Float, nullable=True)
+
+    # Outcome
+    execution_time = Column(Float, nullable=False)
+    phase_timings = Column(JSON, nullable=True)
+    total_cost = Column(Float, nullable=True)
+    completeness = Column(Float, nullable=True)
+    number_store = Column(Integer, nullable=True)
+    solution_quality = Column(Float, nullable=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "algorithm": self.algorithm,
+            "auto_selected": self.auto_selected,
+            "num_cards": self.num_cards,
+            "num_stores": self.num_stores,
+            "total_listings": self.total_listings,
+            "avg_stores_per_card": self.avg_stores_per_card,
+            "card_coverage": self.card_coverage,
+            "price_variance": self.price_variance,
+            "complexity_score": self.complexity_score,
+            "cost_lower_bound": self.cost_lower_bound,
+            "time_limit": self.time_limit,
+            "execution_time": self.execution_time,
+            "phase_timings": self.phase_timings,
+            "total_cost": self.total_cost,
+            "completeness": self.completeness,
+            "number_store": self.number_store,
+            "solution_quality": self.solution_quality,
+        }
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean
+from sqlalchemy import Column, String, Integer, Boolean, Float
 from app import Base
 
 
@@ -14,6 +14,9 @@ class Site(Base):
     type = Column(String(50), nullable=False)
     country = Column(String(50), nullable=False)
     currency = Column(String(3), nullable=False, default="CAD")
+    # Scraping limits, NULL uses the network driver defaults
+    rate_limit = Column(Float)  # max requests per second, shared by all workers
+    max_concurrency = Column(Integer)  # max in-flight requests per worker
 
     # No need to define relationship here as it's defined in ScanResult
 
@@ -28,4 +31,6 @@ class Site(Base):
             "type": self.type,
             "country": self.country,
             "currency": self.currency,
+            "rate_limit": self.rate_limit,
+            "max_concurrency": self.max_concurrency,
         }
@@ -1,17 +1,20 @@
 # backend/app/optimization/algorithms/evolutionary/moead_optimizer.py
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import logging
 import random
 import numpy as np
 import pandas as pd
-from collections import defaultdict
 from functools import partial
 import math
 import uuid
 
-from deap import base, creator, tools
+from deap import base, creator
 
 from ...core.base_optimizer import BaseOptimizer, OptimizationResult
+from ...core.candidate_index import CandidateIndex
+from ...core.parallel_evaluator import register_population_evaluation
+from ...core.pareto import ParetoArchive
+from ...core.population_evaluator import PopulationEvaluator, map_distinct
 from ...preprocessing.penalty_calculator import PenaltyCalculator
 from ...postprocessing.result_formatter import ResultFormatter
 from app.constants import CardLanguage, CardQuality, CardVersion
@@ -230,6 +233,7 @@ class MOEADOptimizer(BaseOptimizer):
                     iterations=len(standardized_iterations),
                     convergence_metric=0.0,  # Successful convergence
                     performance_stats=self.execution_stats,
+                    pareto_front=self._pareto_front(standardized_iterations),
                 )
             else:
                 logger.warning("MOEA/D produced no valid solutions")
@@ -245,130 +249,65 @@ class MOEADOptimizer(BaseOptimizer):
         if not solutions:
             return None
 
-        # CLEAR INITIALIZATION: Get required card quantities from wishlist
-        cards_required_total = int(self.user_wishlist_df["quantity"].sum())
-        cards_required_by_name = {row["name"]: int(row["quantity"]) for _, row in self.user_wishlist_df.iterrows()}
-
-        # Evaluate each solution and select best
-        best_solution = None
-        best_score = float("-inf")
-
-        for solution in solutions:
-            try:
-                # CLEAR TRACKING: Calculate solution metrics consistently
-                stores_used = set()
-                total_cost = 0
-                cards_found_by_name = defaultdict(int)
-                cards_found_total = 0
-
-                for idx in solution:
-                    if idx in filtered_df.index:
-                        card = filtered_df.loc[idx]
-                        card_name = card["name"]
-
-                        # Check if we need more of this card
-                        required_qty = cards_required_by_name.get(card_name, 0)
-                        found_qty = cards_found_by_name[card_name]
-
-                        if found_qty < required_qty:
-                            stores_used.add(card["site_name"])
-                            total_cost += card.get("weighted_price", card.get("price", 0))
-                            cards_found_by_name[card_name] += 1
-                            cards_found_total += 1
-
-                # CLEAR CALCULATION: Calculate completeness
-                completeness_by_quantity = cards_found_total / cards_required_total if cards_required_total > 0 else 0.0
-                cards_found_unique = len(cards_found_by_name)
-
-                # Score: prioritize completeness, then minimize cost and stores
-                score = completeness_by_quantity * 1000 - total_cost * 0.1 - len(stores_used) * 10
-
-                if score > best_score:
-                    best_score = score
-                    best_solution = solution
-
-            except Exception as e:
-                logger.warning(f"Failed to evaluate solution: {str(e)}")
-                continue
-
-        return best_solution if best_solution is not None else solutions[0]
-
-    def _evaluate_solution_moead(
-        self, individual, filtered_listings_df: pd.DataFrame, user_wishlist_df: pd.DataFrame
-    ) -> Tuple[float, float, float, float]:
-        """Evaluate solution for MOEA/D with consistent card quantity tracking"""
         try:
-            # CLEAR INITIALIZATION: Get required card quantities from wishlist
-            cards_required_total = int(user_wishlist_df["quantity"].sum())
-            cards_required_by_name = {row["name"]: int(row["quantity"]) for _, row in user_wishlist_df.iterrows()}
-
-            # CLEAR TRACKING: Initialize counters
-            stores_used = set()
-            total_cost = 0
-            quality_scores = []
-            cards_found_total = 0
-            cards_found_by_name = defaultdict(int)
-
-            for idx in individual:
-                if idx not in filtered_listings_df.index:
-                    continue
-
-                card = filtered_listings_df.loc[idx]
-                card_name = card["name"]
-
-                # Check if we need more of this card
-                required_qty = cards_required_by_name.get(card_name, 0)
-                found_qty = cards_found_by_name[card_name]
-
-                if found_qty >= required_qty:
-                    continue  # Already have enough of this card
+            scores = self._build_population_evaluator(filtered_df, self.user_wishlist_df).evaluate(solutions)
+        except Exception as e:
+            logger.warning(f"Failed to evaluate solutions: {str(e)}")
+            return solutions[0]
 
-                # Count this card
-                cards_found_total += 1
-                cards_found_by_name[card_name] += 1
+        # Score: prioritize completeness, then minimize cost and stores
+        score = scores.completeness * 1000 - scores.cost * 0.1 - scores.store_count * 10
+        best_solution = solutions[int(np.nanargmax(score))] if not np.isnan(score).all() else None
 
-                # Use weighted price if available, otherwise use base price
-                price = card.get("weighted_price", card.get("price", 1000))
-                total_cost += price
-                stores_used.add(card["site_name"])
+        return best_solution if best_solution is not None else solutions[0]
 
-                # Compute quality score
-                quality = card.get("quality", "DMG")
-                try:
-                    normalized_quality = CardQuality.normalize(quality)
-                    quality_weight = CardQuality.get_weight(normalized_quality)
-                    quality_score = 1 - (quality_weight - 1) / 4  # Normalize to 0-1
-                except:
-                    quality_score = 0.5  # Default quality score
-
-                quality_scores.append(quality_score)
-
-            # CLEAR CALCULATION: Calculate metrics
-            completeness_by_quantity = cards_found_total / cards_required_total if cards_required_total > 0 else 0.0
-            avg_quality = sum(quality_scores) / len(quality_scores) if quality_scores else 0.0
-            store_count = len(stores_used)
-
-            # Apply penalties for constraint violations
-            if completeness_by_quantity < 1.0:
-                incompleteness_penalty = (1 - completeness_by_quantity) * cards_required_total * 100
-                total_cost += incompleteness_penalty
-
-            if store_count > self.optimization_config.max_unique_store:
-                store_penalty = (store_count - self.optimization_config.max_unique_store) * 1000
-                total_cost += store_penalty
-
-            # Return all objectives as minimization (negative for maximization objectives)
-            return (
-                float(total_cost),  # Minimize cost
-                float(-avg_quality),  # Minimize negative quality (maximize quality)
-                float(-completeness_by_quantity),  # Minimize negative completeness (maximize completeness)
-                float(store_count),  # Minimize store count
+    def _build_population_evaluator(
+        self, filtered_listings_df: pd.DataFrame, user_wishlist_df: pd.DataFrame
+    ) -> PopulationEvaluator:
+        """Evaluator charging weighted prices (base price if missing) with a quality-only score"""
+        if "weighted_price" in filtered_listings_df.columns:
+            unit_cost = filtered_listings_df["weighted_price"].to_numpy(dtype=np.float64)
+        elif "price" in filtered_listings_df.columns:
+            unit_cost = filtered_listings_df["price"].to_numpy(dtype=np.float64)
+        else:
+            unit_cost = np.full(len(filtered_listings_df), 1000.0)
+
+        def quality_score(combination):
+            try:
+                quality_weight = CardQuality.get_weight(CardQuality.normalize(combination.get("quality", "DMG")))
+                return 1 - (quality_weight - 1) / 4  # Normalize to 0-1
+            except:
+                return 0.5  # Default quality score
+
+        quality_scores = map_distinct(filtered_listings_df, ("quality",), quality_score).astype(np.float64)
+        return PopulationEvaluator(filtered_listings_df, user_wishlist_df, unit_cost, quality_scores)
+
+    def _evaluate_population_moead(
+        self, population, evaluator: PopulationEvaluator, score: Optional[Callable] = None
+    ) -> List[Tuple[float, ...]]:
+        """
+        Evaluate a whole population for MOEA/D, all objectives as minimization. ``score`` replaces
+        ``evaluator.evaluate``, e.g. with a parallel scorer.
+        """
+        scores = (score or evaluator.evaluate)(population)
+        completeness = scores.completeness
+
+        # Apply penalties for constraint violations
+        total_cost = scores.cost.copy()
+        incomplete = completeness < 1.0
+        total_cost[incomplete] += (1 - completeness[incomplete]) * evaluator.required_total * 100
+
+        max_unique_store = self.optimization_config.max_unique_store
+        over_store_limit = scores.store_count > max_unique_store
+        total_cost[over_store_limit] += (scores.store_count[over_store_limit] - max_unique_store) * 1000
+
+        # Negate the objectives to maximize (quality, completeness)
+        return [
+            (cost, -quality, -complete, float(stores))
+            for cost, quality, complete, stores in zip(
+                total_cost.tolist(), scores.quality.tolist(), completeness.tolist(), scores.store_count.tolist()
             )
-
-        except Exception as e:
-            logger.warning(f"Evaluation failed: {str(e)}")
-            # Return worst possible values
-            return (float("inf"), 0.0, -1.0, float("inf"))
+        ]
 
     def _run_moead_optimization(
         self, filtered_listings_df: pd.DataFrame, user_wishlist_df: pd.DataFrame
@@ -393,24 +332,20 @@ class MOEADOptimizer(BaseOptimizer):
 
             for i in range(len(self.weight_vectors)):
                 try:
-                    individual = toolbox.individual()
-                    fitness_values = toolbox.evaluate(individual)
-                    if not fitness_values or len(fitness_values) != 4:
-                        fitness_values = (float("inf"), 0.0, 0.0, float("inf"))
-                    individual.fitness.values = fitness_values
-                    population.append(individual)
+                    population.append(toolbox.individual())
                 except Exception as e:
                     logger.warning(f"Failed to create individual {i}: {str(e)}")
                     # Create a fallback individual
-                    individual = self._create_fallback_individual(filtered_listings_df, user_wishlist_df)
-                    individual.fitness.values = toolbox.evaluate(individual)
-                    population.append(individual)
+                    population.append(self._create_fallback_individual(filtered_listings_df, user_wishlist_df))
+
+            for individual, fitness_values in zip(population, toolbox.map(toolbox.evaluate, population)):
+                individual.fitness.values = fitness_values
 
             # Initialize reference point (ideal point)
             reference_point = np.array([float("inf")] * self.n_objectives)
 
             # External Pareto archive for non-dominated solutions
-            pareto_archive = tools.ParetoFront()
+            pareto_archive = ParetoArchive()
             pareto_archive.update(population)
 
             # Update reference point
@@ -494,11 +429,17 @@ class MOEADOptimizer(BaseOptimizer):
                     generations_without_improvement += 1
                     if generations_without_improvement >= 30:
                         logger.info(f"Converged after {generation} generations without improvement")
+                        self.stopping_policy.stop("no_improvement")
+                        break
+                    if self.stopping_policy.should_stop(pareto_archive.objectives):
+                        logger.info(f"Stopping after generation {generation}: {self.stopping_policy.reason}")
                         break
 
                 except Exception as e:
                     logger.warning(f"Error in generation {generation}: {str(e)}")
                     continue
+            # No-op when the loop was cut short, the first reason is kept
+            self.stopping_policy.stop("max_generations")
 
             # Extract results
             try:
@@ -593,10 +534,24 @@ class MOEADOptimizer(BaseOptimizer):
 
         toolbox.register("individual", create_individual)
 
-        # Evaluation function
+        # Evaluation functions
+        evaluator = self._build_population_evaluator(filtered_listings_df, user_wishlist_df)
+        score = self._population_scorer(evaluator)
+
+        def evaluate_population(population):
+            return self._evaluate_population_moead(population, evaluator, score)
+
+        evaluate_population = self._cached_population_evaluation(evaluator, evaluate_population)
+
         def evaluate_individual(individual):
-            return self._evaluate_solution_moead(individual, filtered_listings_df, user_wishlist_df)
+            try:
+                return evaluate_population([individual])[0]
+            except Exception as e:
+                logger.warning(f"Evaluation failed: {str(e)}")
+                # Return worst possible values
+                return (float("inf"), 0.0, -1.0, float("inf"))
 
+        register_population_evaluation(toolbox, evaluate_population)
         toolbox.register("evaluate", evaluate_individual)
 
         # Genetic operators
@@ -614,47 +569,15 @@ class MOEADOptimizer(BaseOptimizer):
         return toolbox
 
     def _initialize_individual_smart(self, filtered_listings_df: pd.DataFrame, user_wishlist_df: pd.DataFrame):
-        """Smart individual initialization for MOEA/D"""
-        individual = []
-        expected_length = sum(user_wishlist_df["quantity"])
+        """Smart individual initialization for MOEA/D, biased towards cheaper options"""
         individual_class = getattr(creator, self.individual_class_name)
 
         try:
-            for _, card in user_wishlist_df.iterrows():
-                card_name = card["name"]
-                required_quantity = int(card.get("quantity", 1))
-
-                # Find available options for this card
-                available_options = filtered_listings_df[filtered_listings_df["name"] == card_name]
-
-                if not available_options.empty:
-                    # Simple weighted selection
-                    for _ in range(required_quantity):
-                        # Weight by inverse price for bias towards cheaper options
-                        prices = available_options["price"].values
-                        weights = 1.0 / (prices + 0.1)  # Add small value to avoid division by zero
-                        weights = weights / weights.sum()  # Normalize
-
-                        selected_idx = np.random.choice(available_options.index, p=weights)
-                        individual.append(selected_idx)
-                else:
-                    # Fallback: random selection
-                    for _ in range(required_quantity):
-                        individual.append(random.randint(0, len(filtered_listings_df) - 1))
-
-            # Ensure correct length
-            if len(individual) != expected_length:
-                if len(individual) < expected_length:
-                    individual.extend(
-                        [
-                            random.randint(0, len(filtered_listings_df) - 1)
-                            for _ in range(expected_length - len(individual))
-                        ]
-                    )
-                else:
-                    individual = individual[:expected_length]
-
-            return individual_class(individual)
+            candidate_index = getattr(self, "candidate_index", None)
+            if candidate_index is None or not candidate_index.built_for(filtered_listings_df, user_wishlist_df):
+                candidate_index = CandidateIndex.by_price(filtered_listings_df, user_wishlist_df)
+                self.candidate_index = candidate_index
+            return individual_class(candidate_index.draw_individual())
 
         except Exception as e:
             logger.warning(f"Smart initialization failed: {str(e)}, using fallback")
@@ -3,7 +3,6 @@ from typing import Dict, List, Optional, Tuple, Any, Union
 import logging
 import random
 import pandas as pd
-from collections import defaultdict
 from functools import partial
 
 from deap import algorithms, base, creator, tools
@@ -11,9 +10,13 @@ import numpy as np
 import copy
 
 from ...core.base_optimizer import BaseOptimizer, OptimizationResult
+from ...core.candidate_index import CandidateIndex
+from ...core.parallel_evaluator import register_population_evaluation
+from ...core.pareto import ParetoArchive
+from ...core.population_evaluator import PopulationEvaluator
 from ...preprocessing.penalty_calculator import PenaltyCalculator
 from ...postprocessing.result_formatter import ResultFormatter
-from app.constants import CardLanguage, CardQuality, CardVersion
+from app.constants import CardVersion
 
 logger = logging.getLogger(__name__)
 
@@ -178,6 +181,7 @@ class NSGA2Optimizer(BaseOptimizer):
                     iterations=len(standardized_iterations),
                     convergence_metric=0.0,  # Successful convergence
                     performance_stats=self.execution_stats,
+                    pareto_front=self._pareto_front(standardized_iterations),
                 )
             else:
                 return self._create_failed_result()
@@ -187,232 +191,70 @@ class NSGA2Optimizer(BaseOptimizer):
             self._end_timing()
             return self._create_failed_result()
 
-    def _evaluate_solution_wrapper(self, filtered_listings_df: pd.DataFrame, user_wishlist_df: pd.DataFrame):
-        """Create evaluation function for NSGA-II with detailed debugging"""
-
-        def evaluate_solution(individual):
-            # CLEAR INITIALIZATION: Get required card quantities from wishlist
-            cards_required_total = int(user_wishlist_df["quantity"].sum())
-            cards_required_by_name = {row["name"]: int(row["quantity"]) for _, row in user_wishlist_df.iterrows()}
-
-            # DEBUGGING: Track what's happening in detail
-            debug_info = {
-                "individual_length": len(individual),
-                "cards_required_total": cards_required_total,
-                "invalid_indices": 0,
-                "strict_filtered": 0,
-                "cards_processed": 0,
-                "cards_accepted": 0,
-                "duplicate_cards": 0,
-                "cards_by_name": defaultdict(int),
-            }
-
-            # CLEAR TRACKING: Initialize counters
-            cards_found_total = 0
-            cards_found_by_name = defaultdict(int)
-            stores_used = set()
-            total_cost = 0
-            quality_scores = []
-
-            for idx in individual:
-                debug_info["cards_processed"] += 1
-
-                if idx not in filtered_listings_df.index:
-                    debug_info["invalid_indices"] += 1
-                    continue
-
-                card = filtered_listings_df.loc[idx]
-                card_name = card["name"]
-                debug_info["cards_by_name"][card_name] += 1
-
-                # Check if we need more of this card
-                required_qty = cards_required_by_name.get(card_name, 0)
-                found_qty = cards_found_by_name[card_name]
-
-                if found_qty >= required_qty:
-                    debug_info["duplicate_cards"] += 1
-                    continue  # Already have enough of this card
-
-                # Count this card
-                cards_found_total += 1
-                cards_found_by_name[card_name] += 1
-
-                # Calculate cost with penalties - IMPROVED ERROR HANDLING
-                try:
-                    final_price, total_multiplier, reason = self.penalty_calculator.compute_single_penalty(
-                        card_data=card,
-                        preferences=self.card_preferences.get(card["name"], {}),
-                        config=self.optimization_config,
-                    )
-
-                    if reason == "strict_filter":
-                        debug_info["strict_filtered"] += 1
-                        # MODIFIED: Don't completely exclude, but heavily penalize
-                        cards_found_total -= 1
-                        cards_found_by_name[card_name] -= 1
-                        continue
-
-                    debug_info["cards_accepted"] += 1
-                    total_cost += final_price
-                    stores_used.add(card["site_name"])
-
-                    # Compute quality score
-                    normalized_quality = CardQuality.normalize(card.get("quality", "DMG"))
-                    max_weight = max(CardQuality.get_weight(q.value) for q in CardQuality)
-                    quality_score = 1 - (CardQuality.get_weight(normalized_quality) - 1) / (max_weight - 1)
-
-                    language = CardLanguage.normalize(card.get("language", "Unknown"))
-                    quality_score /= CardLanguage.get_weight(language)
-
-                    quality_scores.append(quality_score)
-
-                except Exception as e:
-                    logger.warning(f"Penalty calculation failed for card {card_name}: {str(e)}")
-                    # Use base price as fallback
-                    base_price = float(card.get("price", 1000))
-                    total_cost += base_price
-                    stores_used.add(card["site_name"])
-                    quality_scores.append(0.5)  # Default quality
-                    debug_info["cards_accepted"] += 1
-
-            # CLEAR CALCULATION: Calculate completeness metrics
-            completeness_by_quantity = cards_found_total / cards_required_total if cards_required_total > 0 else 0.0
-            avg_quality = sum(quality_scores) / len(quality_scores) if quality_scores else 0.0
-            store_count = len(stores_used)
-
-            # DEBUGGING: Log detailed info for first few evaluations
-            if not hasattr(self, "_eval_count"):
-                self._eval_count = 0
-            self._eval_count += 1
-
-            if self._eval_count <= 3:  # Log first 3 evaluations in detail
-                logger.info(f"🔍 Evaluation #{self._eval_count} Debug:")
-                logger.info(f"  Individual length: {debug_info['individual_length']}")
-                logger.info(f"  Cards required total: {debug_info['cards_required_total']}")
-                logger.info(f"  Cards processed: {debug_info['cards_processed']}")
-                logger.info(f"  Invalid indices: {debug_info['invalid_indices']}")
-                logger.info(f"  Strict filtered: {debug_info['strict_filtered']}")
-                logger.info(f"  Duplicate cards: {debug_info['duplicate_cards']}")
-                logger.info(f"  Cards accepted: {debug_info['cards_accepted']}")
-                logger.info(f"  Cards found total: {cards_found_total}")
-                logger.info(f"  Completeness: {completeness_by_quantity:.2%}")
-                logger.info(f"  Total cost: ${total_cost:.2f}")
-                logger.info(f"  Stores used: {store_count}")
-                # logger.info(f"  Cards by name: {dict(debug_info['cards_by_name'])}")
-                # logger.info(f"  Found by name: {dict(cards_found_by_name)}")
-
-            # Apply penalties for constraint violations with more forgiving approach
-            if store_count > self.optimization_config.max_unique_store:
-                store_penalty = (store_count - self.optimization_config.max_unique_store) * 500  # Reduced from 1000
-                total_cost += store_penalty
-
-            # MODIFIED: More forgiving incompleteness penalty
-            if completeness_by_quantity < 1.0:
-                # Scale penalty based on how close we are to completion
-                incompleteness_factor = 1 - completeness_by_quantity
-                base_penalty = cards_required_total * 50  # Reduced from 100
-                scaled_penalty = base_penalty * (incompleteness_factor**2)  # Quadratic scaling
-                total_cost += scaled_penalty
-
-            return (
-                total_cost,  # Cost objective (minimize)
-                avg_quality,  # Quality objective (maximize)
-                completeness_by_quantity,  # Completeness objective (maximize)
-                float(store_count),  # Store count (minimize - handled by weights)
-            )
-
-        return evaluate_solution
-
-    def _initialize_individual_smart(self, filtered_listings_df: pd.DataFrame, user_wishlist_df: pd.DataFrame):
-        """Smart individual initialization with extensive validation and debugging"""
-        individual = []
-        expected_length = sum(user_wishlist_df["quantity"])
-
-        # logger.info(f"🔧 Initializing individual with expected length: {expected_length}")
-
-        cards_added = 0
-        initialization_stats = {
-            "cards_with_options": 0,
-            "cards_without_options": 0,
-            "total_options_found": 0,
-            "errors": 0,
-        }
-
-        for _, card in user_wishlist_df.iterrows():
-            card_name = card["name"]
-            required_quantity = int(card.get("quantity", 1))
-
-            # Find available options for this card
-            available_options = filtered_listings_df[filtered_listings_df["name"] == card_name]
-
-            initialization_stats["total_options_found"] += len(available_options)
-
-            if not available_options.empty:
-                initialization_stats["cards_with_options"] += 1
-                # logger.info(f"  ✓ '{card_name}': need {required_quantity}, found {len(available_options)} options")
-
-                # Add required quantity of this card
-                for copy_num in range(required_quantity):
-                    try:
-                        # Use weighted selection for quality/price ratio
-                        weights = []
-                        for _, row in available_options.iterrows():
-                            try:
-                                quality_weight = CardQuality.get_weight(
-                                    CardQuality.normalize(row.get("quality", "DMG"))
-                                )
-                                price = float(row.get("price", 1000))
-                                # Higher weight = better choice
-                                weight = quality_weight / (price + 0.1)
-                                weights.append(weight)
-                            except:
-                                weights.append(1.0)  # Default weight
-
-                        if len(weights) == len(available_options):
-                            selected_option = available_options.sample(n=1, weights=weights)
-                            individual.append(selected_option.index.item())
-                        else:
-                            # Fallback to simple random selection
-                            individual.append(random.choice(available_options.index))
-
-                        cards_added += 1
-
-                    except Exception as e:
-                        logger.warning(f"Error selecting copy {copy_num+1} for {card_name}: {str(e)}")
-                        initialization_stats["errors"] += 1
-                        # Fallback to first available option
-                        individual.append(available_options.index[0])
-                        cards_added += 1
-            else:
-                initialization_stats["cards_without_options"] += 1
-                logger.warning(f"  ❌ '{card_name}': need {required_quantity}, found 0 options")
-                logger.warning(f"     Using random fallback for {required_quantity} copies")
-
-                # Fallback: random selection from all listings
-                for _ in range(required_quantity):
-                    individual.append(random.randint(0, len(filtered_listings_df) - 1))
-                    cards_added += 1
-
-        # Final validation and adjustment
-        # logger.info(f"🔧 Initialization complete:")
-        # logger.info(f"  Cards with options: {initialization_stats['cards_with_options']}")
-        # logger.info(f"  Cards without options: {initialization_stats['cards_without_options']}")
-        # logger.info(f"  Total options found: {initialization_stats['total_options_found']}")
-        # logger.info(f"  Errors encountered: {initialization_stats['errors']}")
-        # logger.info(f"  Cards added: {cards_added}, expected: {expected_length}")
-
-        if len(individual) != expected_length:
-            logger.warning(f"⚠️ Individual length mismatch: {len(individual)} != {expected_length}")
-            if len(individual) < expected_length:
-                shortage = expected_length - len(individual)
-                logger.info(f"  Adding {shortage} random cards to reach expected length")
-                individual.extend([random.randint(0, len(filtered_listings_df) - 1) for _ in range(shortage)])
-            else:
-                logger.info(f"  Trimming to expected length")
-                individual = individual[:expected_length]
+    def _evaluate_population_wrapper(
+        self,
+        filtered_listings_df: pd.DataFrame,
+        user_wishlist_df: pd.DataFrame,
+        parallel: bool = False,
+        cached: bool = False,
+    ):
+        """
+        Create evaluation function scoring a whole population at once, through the configured
+        evaluation backend when ``parallel`` is set and behind the fitness cache when ``cached`` is
+        """
+        evaluator = PopulationEvaluator.from_penalties(
+            filtered_listings_df,
+            user_wishlist_df,
+            self.penalty_calculator,
+            self.card_preferences,
+            self.optimization_config,
+        )
+        cards_required_total = evaluator.required_total
+        max_unique_store = self.optimization_config.max_unique_store
+        score = self._population_scorer(evaluator) if parallel else evaluator.evaluate
+
+        def evaluate_population(population):
+            scores = score(population)
+            self._log_evaluations(population, scores, cards_required_total)
+
+            # Apply penalties for constraint violations with store count penalty
+            total_cost = scores.cost.copy()
+            over_store_limit = scores.store_count > max_unique_store
+            total_cost[over_store_limit] += (scores.store_count[over_store_limit] - max_unique_store) * 500
+
+            # Forgiving incompleteness penalty, scaled by how close we are to completion
+            incomplete = scores.completeness < 1.0
+            total_cost[incomplete] += cards_required_total * 50 * (1 - scores.completeness[incomplete]) ** 2
+
+            return [
+                (cost, quality, completeness, float(stores))
+                for cost, quality, completeness, stores in zip(
+                    total_cost.tolist(),
+                    scores.quality.tolist(),
+                    scores.completeness.tolist(),
+                    scores.store_count.tolist(),
+                )
+            ]
 
-        # logger.info(f"✓ Final individual length: {len(individual)}")
-        return creator.IndividualNSGA2(individual)
+        return self._cached_population_evaluation(evaluator, evaluate_population) if cached else evaluate_population
+
+    def _log_evaluations(self, population, scores, cards_required_total: int):
+        """Log the first few evaluations in detail"""
+        if not hasattr(self, "_eval_count"):
+            self._eval_count = 0
+
+        for row in range(min(max(3 - self._eval_count, 0), len(scores))):
+            logger.info(f"🔍 Evaluation #{self._eval_count + row + 1} Debug:")
+            logger.info(f"  Individual length: {len(population[row])}")
+            logger.info(f"  Cards required total: {cards_required_total}")
+            logger.info(f"  Invalid indices: {scores.invalid[row]}")
+            logger.info(f"  Strict filtered: {scores.filtered[row]}")
+            logger.info(f"  Duplicate cards: {scores.duplicates[row]}")
+            logger.info(f"  Cards found total: {scores.cards_found[row]}")
+            logger.info(f"  Completeness: {scores.completeness[row]:.2%}")
+            logger.info(f"  Total cost: ${scores.cost[row]:.2f}")
+            logger.info(f"  Stores used: {scores.store_count[row]}")
+        self._eval_count += len(scores)
 
     def _run_nsga_ii_optimization(
         self, filtered_listings_df: pd.DataFrame, user_wishlist_df: pd.DataFrame, milp_solution: Optional[List] = None
@@ -426,7 +268,7 @@ class NSGA2Optimizer(BaseOptimizer):
         logger.info(f"NSGA-II starting with {cards_required_total} total cards needed ({cards_required_unique} unique)")
 
         # RELAXED PARAMETERS: More forgiving thresholds
-        NGEN = 100
+        NGEN = self.config.get("max_generations", 100)
         POP_SIZE = 300  # Increased population size
         TOURNAMENT_SIZE = 3
         CXPB = 0.85
@@ -458,11 +300,11 @@ class NSGA2Optimizer(BaseOptimizer):
         best_fitness_cost = float("inf")
         best_completeness = 0.0
         generations_without_improvement = 0
-        archive = tools.ParetoFront()
+        archive = ParetoArchive()
 
         # Evaluate initial population with detailed logging
         logger.info("Evaluating initial population...")
-        fitnesses = [toolbox.evaluate(ind) for ind in pop]
+        fitnesses = toolbox.map(toolbox.evaluate, pop)
 
         initial_completeness_stats = []
         for ind, fit in zip(pop, fitnesses):
@@ -597,7 +439,14 @@ class NSGA2Optimizer(BaseOptimizer):
                 # Trim offspring to exact size needed
                 offspring = offspring[: (POP_SIZE - len(elite))]
 
-                # Evaluate offspring
+                # Evaluate offspring, all new individuals in one batch
+                try:
+                    unevaluated = [ind for ind in offspring if not ind.fitness.valid]
+                    for ind, fitness in zip(unevaluated, toolbox.map(toolbox.evaluate, unevaluated)):
+                        ind.fitness.values = fitness
+                except Exception as e:
+                    logger.warning(f"Batch evaluation failed, evaluating offspring one by one: {str(e)}")
+
                 for ind in offspring:
                     try:
                         if not hasattr(ind.fitness, "values") or not ind.fitness.valid:
@@ -662,6 +511,10 @@ class NSGA2Optimizer(BaseOptimizer):
                     generations_without_improvement += 1
                     if generations_without_improvement >= 30:  # Increased from 20
                         logger.info(f"Converged after {gen} generations without improvement")
+                        self.stopping_policy.stop("no_improvement")
+                        break
+                    if self.stopping_policy.should_stop(archive.objectives):
+                        logger.info(f"Stopping after generation {gen}: {self.stopping_policy.reason}")
                         break
 
                 except Exception as e:
@@ -670,6 +523,8 @@ class NSGA2Optimizer(BaseOptimizer):
             except Exception as e:
                 logger.error(f"Error in generation {gen}: {str(e)}")
                 continue
+        # No-op when the loop was cut short, the first reason is kept
+        self.stopping_policy.stop("max_generations")
 
         # Extract final results with relaxed threshold
         try:
@@ -688,7 +543,7 @@ class NSGA2Optimizer(BaseOptimizer):
                     logger.info(f"  Stores: {stores}")
 
                     # Extract solutions using relaxed threshold
-                    all_solutions = []
+                    good_individuals = []
                     for ind in archive:
                         try:
                             if (
@@ -697,19 +552,14 @@ class NSGA2Optimizer(BaseOptimizer):
                                 and len(ind.fitness.values) >= 3
                                 and ind.fitness.values[2] >= COMPLETENESS_THRESHOLD  # Using relaxed threshold
                             ):
-                                all_solutions.append(list(ind))
+                                good_individuals.append(ind)
                         except Exception as e:
                             logger.warning(f"Error processing archive individual: {str(e)}")
                             continue
 
-                    # Sort by cost
-                    try:
-                        all_solutions = sorted(
-                            all_solutions,
-                            key=lambda x: self._safe_get_fitness_cost(x, filtered_listings_df, user_wishlist_df),
-                        )
-                    except Exception as e:
-                        logger.warning(f"Error sorting solutions: {str(e)}")
+                    # Sort by cost, archived individuals keep their fitness
+                    good_individuals.sort(key=lambda ind: ind.fitness.values[0])
+                    all_solutions = [list(ind) for ind in good_individuals]
 
                     logger.info(f"Found {len(all_solutions)} good solutions (≥{COMPLETENESS_THRESHOLD:.0%}) in archive")
                     return list(best_solution), all_solutions
@@ -720,20 +570,6 @@ class NSGA2Optimizer(BaseOptimizer):
         logger.warning(f"No solutions found meeting {COMPLETENESS_THRESHOLD:.0%} completeness threshold")
         return None, None
 
-    def _safe_get_fitness_cost(self, individual, filtered_listings_df, user_wishlist_df):
-        """Safely get fitness cost for sorting with consistent evaluation"""
-        try:
-            if hasattr(individual, "fitness") and hasattr(individual.fitness, "values"):
-                return individual.fitness.values[0]
-            else:
-                # Evaluate if no fitness available
-                eval_func = self._evaluate_solution_wrapper(filtered_listings_df, user_wishlist_df)
-                fitness = eval_func(individual)
-                return fitness[0] if len(fitness) > 0 else float("inf")
-        except Exception as e:
-            logger.warning(f"Error getting fitness cost: {str(e)}")
-            return float("inf")
-
     def _safe_clone_individual(self, toolbox, individual):
         """Safely clone an individual preserving fitness values"""
         try:
@@ -771,7 +607,10 @@ class NSGA2Optimizer(BaseOptimizer):
         toolbox.register("population", tools.initRepeat, list, toolbox.individual)
 
         # Genetic operators
-        toolbox.register("evaluate", self._evaluate_solution_wrapper(filtered_listings_df, user_wishlist_df))
+        evaluate_population = self._evaluate_population_wrapper(
+            filtered_listings_df, user_wishlist_df, parallel=True, cached=True
+        )
+        register_population_evaluation(toolbox, evaluate_population)
         toolbox.register("mate", self._smart_crossover)
         toolbox.register(
             "mutate",
@@ -787,46 +626,28 @@ class NSGA2Optimizer(BaseOptimizer):
         return toolbox
 
     def _initialize_individual_smart(self, filtered_listings_df: pd.DataFrame, user_wishlist_df: pd.DataFrame):
-        """Smart individual initialization with bias towards quality"""
-        individual = []
-        expected_length = sum(user_wishlist_df["quantity"])
-
-        for _, card in user_wishlist_df.iterrows():
-            card_name = card["name"]
-            required_quantity = int(card.get("quantity", 1))
-
-            # Find available options for this card
-            available_options = filtered_listings_df[filtered_listings_df["name"] == card_name]
-
-            if not available_options.empty:
-                # Bias selection towards better quality/price ratio
-                for _ in range(required_quantity):
-                    weights = []
-                    for _, row in available_options.iterrows():
-                        quality_weight = CardQuality.get_weight(CardQuality.normalize(row.get("quality", "DMG")))
-                        price = float(row.get("price", 1000))
-                        # Higher weight = better choice (inverse of price, higher quality weight)
-                        weight = quality_weight / (price + 0.1)
-                        weights.append(weight)
-
-                    selected_option = available_options.sample(n=1, weights=weights)
-                    individual.append(selected_option.index.item())
-            else:
-                # Fallback: random selection from all cards
-                for _ in range(required_quantity):
-                    individual.append(random.randint(0, len(filtered_listings_df) - 1))
-
-        # Ensure correct length
-        if len(individual) != expected_length:
-            # Pad or trim to correct length
-            if len(individual) < expected_length:
-                individual.extend(
-                    [random.randint(0, len(filtered_listings_df) - 1) for _ in range(expected_length - len(individual))]
-                )
-            else:
-                individual = individual[:expected_length]
-
-        return creator.IndividualNSGA2(individual)
+        """Smart individual initialization, biased towards a good quality/price ratio"""
+        candidate_index = self._get_candidate_index(filtered_listings_df, user_wishlist_df)
+        return creator.IndividualNSGA2(candidate_index.draw_individual())
+
+    def _get_candidate_index(
+        self, filtered_listings_df: pd.DataFrame, user_wishlist_df: pd.DataFrame, preferred_stores: Optional[set] = None
+    ) -> CandidateIndex:
+        """Per-card candidate tables of the run, built once per listings and preferred stores"""
+        key = frozenset(preferred_stores) if preferred_stores is not None else None
+        if not hasattr(self, "_candidate_indexes"):
+            self._candidate_indexes = {}
+
+        candidate_index = self._candidate_indexes.get(key)
+        if candidate_index is None or not candidate_index.built_for(filtered_listings_df, user_wishlist_df):
+            candidate_index = CandidateIndex.by_quality_price(
+                filtered_listings_df, user_wishlist_df, preferred_stores=preferred_stores
+            )
+            self._candidate_indexes[key] = candidate_index
+            if key is None and not candidate_index.covers_all_cards:
+                missing = list(candidate_index.card_names[~candidate_index.has_candidates])
+                logger.warning(f"❌ No listings for {missing}, using random fallback for their copies")
+        return candidate_index
 
     def _smart_crossover(self, ind1, ind2):
         """Enhanced crossover that preserves card structure"""
@@ -843,44 +664,8 @@ class NSGA2Optimizer(BaseOptimizer):
     def _smart_mutation(
         self, individual, filtered_listings_df: pd.DataFrame, user_wishlist_df: pd.DataFrame, indpb: float = 0.05
     ):
-        """Smart mutation that considers card requirements"""
-        card_positions = {}
-        position = 0
-
-        # Map positions to cards
-        for _, card in user_wishlist_df.iterrows():
-            card_name = card["name"]
-            quantity = int(card.get("quantity", 1))
-            card_positions[card_name] = list(range(position, position + quantity))
-            position += quantity
-
-        for i in range(len(individual)):
-            if random.random() < indpb:
-                # Find which card this position corresponds to
-                card_name = None
-                for name, positions in card_positions.items():
-                    if i in positions:
-                        card_name = name
-                        break
-
-                if card_name:
-                    # Get available options for this card
-                    available_options = filtered_listings_df[filtered_listings_df["name"] == card_name]
-                    if not available_options.empty:
-                        # Weight by quality/price ratio
-                        weights = []
-                        for _, row in available_options.iterrows():
-                            quality_weight = CardQuality.get_weight(CardQuality.normalize(row.get("quality", "DMG")))
-                            price = float(row.get("price", 1000))
-                            weight = quality_weight / (price + 0.1)
-                            weights.append(weight)
-
-                        new_option = available_options.sample(n=1, weights=weights)
-                        individual[i] = new_option.index.item()
-                    else:
-                        # Fallback to random
-                        individual[i] = random.randint(0, len(filtered_listings_df) - 1)
-
+        """Smart mutation that redraws genes among the listings of their card"""
+        self._get_candidate_index(filtered_listings_df, user_wishlist_df).mutate(individual, indpb)
         return (individual,)
 
     def _initialize_population_with_milp(
@@ -973,42 +758,13 @@ class NSGA2Optimizer(BaseOptimizer):
         self, filtered_listings_df: pd.DataFrame, user_wishlist_df: pd.DataFrame, preferred_stores: set
     ) -> Optional[Any]:
         """Initialize individual with bias towards preferred stores"""
-        individual = []
-        expected_length = sum(user_wishlist_df["quantity"])
-
-        for _, card in user_wishlist_df.iterrows():
-            card_name = card["name"]
-            required_quantity = int(card.get("quantity", 1))
-
-            # First try preferred stores
-            preferred_options = filtered_listings_df[
-                (filtered_listings_df["name"] == card_name) & (filtered_listings_df["site_name"].isin(preferred_stores))
-            ]
-
-            # Fallback to all stores if no preferred options
-            if preferred_options.empty:
-                available_options = filtered_listings_df[filtered_listings_df["name"] == card_name]
-            else:
-                available_options = preferred_options
-
-            if not available_options.empty:
-                for _ in range(required_quantity):
-                    # Weight by quality/price ratio
-                    weights = []
-                    for _, row in available_options.iterrows():
-                        quality_weight = CardQuality.get_weight(CardQuality.normalize(row.get("quality", "DMG")))
-                        price = float(row.get("price", 1000))
-                        weight = quality_weight / (price + 0.1)
-                        weights.append(weight)
-
-                    selected_option = available_options.sample(n=1, weights=weights)
-                    individual.append(selected_option.index.item())
-
-        if len(individual) != expected_length:
-            logger.warning(f"Individual length mismatch: {len(individual)} != {expected_length}")
+        candidate_index = self._get_candidate_index(filtered_listings_df, user_wishlist_df, preferred_stores)
+        if not candidate_index.covers_all_cards:
+            missing = list(candidate_index.card_names[~candidate_index.has_candidates])
+            logger.warning(f"Individual length mismatch: no listings for {missing}")
             return None
 
-        return creator.IndividualNSGA2(individual)
+        return creator.IndividualNSGA2(candidate_index.draw_individual())
 
     def _create_failed_result(self) -> OptimizationResult:
         """Create a failed optimization result"""
@@ -0,0 +1,101 @@
+# backend/app/optimization/algorithms/evolutionary/nsga3_selection.py
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from ...core.pareto import minimization_objectives, non_dominated_ranks
+
+# Off-axis weight of the achievement scalarizing function used to find extreme points
+ASF_EPSILON = 1e-6
+
+
+def normalize_objectives(objectives: np.ndarray) -> np.ndarray:
+    """
+    Translate objectives to the ideal point and scale them by the intercepts of the hyperplane
+    through the extreme points, falling back to the nadir point when the hyperplane is degenerate.
+    """
+    if len(objectives) == 0:
+        return objectives
+    translated = objectives - objectives.min(axis=0)
+    n_objectives = objectives.shape[1]
+
+    weights = np.full((n_objectives, n_objectives), ASF_EPSILON)
+    np.fill_diagonal(weights, 1.0)
+    # Achievement scalarizing value of every point along every axis: (axes x points)
+    asf = (translated[None, :, :] / weights[:, None, :]).max(axis=2)
+    extremes = translated[asf.argmin(axis=1)]
+
+    nadir = translated.max(axis=0)
+    try:
+        intercepts = 1.0 / np.linalg.solve(extremes, np.ones(n_objectives))
+        if not np.isfinite(intercepts).all() or (intercepts <= ASF_EPSILON).any():
+            intercepts = nadir
+    except np.linalg.LinAlgError:
+        intercepts = nadir
+    intercepts = np.where(intercepts > ASF_EPSILON, intercepts, 1.0)
+    return translated / intercepts
+
+
+def associate(normalized: np.ndarray, ref_points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Closest reference line of every point and the perpendicular distance to it"""
+    directions = ref_points / np.linalg.norm(ref_points, axis=1, keepdims=True)
+    projections = normalized @ directions.T
+    squared = (normalized**2).sum(axis=1, keepdims=True) - projections**2
+    distances = np.sqrt(np.maximum(squared, 0.0))
+    niches = distances.argmin(axis=1)
+    return niches, distances[np.arange(len(normalized)), niches]
+
+
+def niche_select(
+    niches: np.ndarray, distances: np.ndarray, niche_counts: np.ndarray, k: int, rng=np.random
+) -> np.ndarray:
+    """
+    Pick ``k`` of the candidate points (given by their niche and distance), always from a least
+    crowded niche that still has candidates. The first pick of an empty niche is its closest
+    candidate; later picks are random. ``niche_counts`` counts the points already selected.
+    """
+    niche_counts = niche_counts.copy()
+    n_niches = len(niche_counts)
+    # Candidates grouped by niche; random order inside a niche, except closest first for empty niches
+    order_key = rng.random(len(niches))
+    closest = np.lexsort((distances, niches))
+    first_of_niche = np.ones(len(closest), dtype=bool)
+    first_of_niche[1:] = niches[closest][1:] != niches[closest][:-1]
+    heads = closest[first_of_niche]
+    order_key[heads[niche_counts[niches[heads]] == 0]] = -1.0
+    grouped = np.lexsort((order_key, niches))
+
+    available = np.bincount(niches, minlength=n_niches)
+    starts = np.concatenate(([0], np.cumsum(available)[:-1]))
+    taken = np.zeros(n_niches, dtype=np.int64)
+
+    picks = np.empty(min(k, len(niches)), dtype=np.int64)
+    for i in range(len(picks)):
+        crowding = np.where(taken < available, niche_counts, np.iinfo(np.int64).max)
+        niche = rng.choice(np.flatnonzero(crowding == crowding.min()))
+        picks[i] = grouped[starts[niche] + taken[niche]]
+        taken[niche] += 1
+        niche_counts[niche] += 1
+    return picks
+
+
+def select_nsga3(individuals: Sequence, k: int, ref_points: np.ndarray) -> List:
+    """
+    NSGA-III environmental selection: whole non-dominated fronts while they fit, then the last
+    front is niched around ``ref_points``.
+    """
+    if len(individuals) <= k:
+        return list(individuals)
+    objectives = minimization_objectives(individuals)
+    ranks = non_dominated_ranks(objectives, k)
+    last_front = ranks.max()
+    chosen = np.flatnonzero((ranks >= 0) & (ranks < last_front))
+    last = np.flatnonzero(ranks == last_front)
+    if len(chosen) + len(last) == k:
+        return [individuals[i] for i in np.concatenate((chosen, last))]
+
+    considered = np.concatenate((chosen, last))
+    niches, distances = associate(normalize_objectives(objectives[considered]), ref_points)
+    niche_counts = np.bincount(niches[: len(chosen)], minlength=len(ref_points))
+    picks = niche_select(niches[len(chosen) :], distances[len(chosen) :], niche_counts, k - len(chosen))
+    return [individuals[i] for i in np.concatenate((chosen, last[picks]))]
@@ -0,0 +1,142 @@
+# backend/app/optimization/algorithms/hybrid/local_search.py
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ...core.solution_state import SolutionState
+from ...postprocessing.result_formatter import ResultFormatter
+from ...preprocessing.penalty_calculator import PenaltyCalculator
+
+# Largest relative cost increase accepted to drop a store
+CONSOLIDATION_MAX_COST_INCREASE = 0.05
+# Largest relative price increase accepted for a better quality copy
+QUALITY_UPGRADE_MAX_PRICE_INCREASE = 0.05
+
+
+def _expired(deadline: Optional[float]) -> bool:
+    return deadline is not None and time.time() >= deadline
+
+
+def improve_prices(state: SolutionState, deadline: Optional[float] = None) -> int:
+    """
+    Move copies to cheaper listings of at least the same quality without adding a store, until no
+    move helps; returns the number of moves made
+    """
+    moves = 0
+    improved = True
+    while improved and not _expired(deadline):
+        improved = False
+        for slot in range(len(state.slots)):
+            current_price = state.price[state.slots[slot]]
+            for position in state.listings_of(state.card_of(slot)):
+                if state.price[position] >= current_price:
+                    break
+                cost, stores, quality = state.move_delta(slot, position)
+                if cost < 0 and stores <= 0 and quality >= 0 and state.can_move(slot, position):
+                    state.move(slot, position)
+                    moves += 1
+                    improved = True
+                    break
+    return moves
+
+
+def consolidate_stores(
+    state: SolutionState,
+    max_cost_increase: float = CONSOLIDATION_MAX_COST_INCREASE,
+    deadline: Optional[float] = None,
+) -> int:
+    """
+    Drop stores one at a time, smallest first, moving their copies to the cheapest listing in
+    another store already used. A store is only dropped if all its copies find one and the plan
+    stays within ``max_cost_increase`` of its starting cost. Returns the number of stores dropped.
+    """
+    budget = state.cost * (1 + max_cost_increase)
+    dropped = 0
+    tried = set()
+    while state.store_count > 1 and not _expired(deadline):
+        used = [store for store in range(len(state.store_units)) if state.store_units[store] > 0]
+        candidates = sorted((store for store in used if store not in tried), key=lambda s: state.store_units[s])
+        if not candidates:
+            break
+        store = candidates[0]
+        tried.add(store)
+
+        undo = []
+        for slot in state.slots_in_store(store).tolist():
+            target = next(
+                (
+                    position
+                    for position in state.listings_of(state.card_of(slot))
+                    if state.store_ids[position] != store
+                    and state.store_units[state.store_ids[position]] > 0
+                    and state.can_move(slot, position)
+                ),
+                None,
+            )
+            if target is None:
+                break
+            undo.append((slot, state.move(slot, target)))
+
+        if state.store_units[store] == 0 and state.cost <= budget:
+            dropped += 1
+            tried.clear()
+        else:
+            for slot, position in reversed(undo):
+                state.move(slot, position)
+    return dropped
+
+
+def upgrade_quality(
+    state: SolutionState,
+    max_price_increase: float = QUALITY_UPGRADE_MAX_PRICE_INCREASE,
+    deadline: Optional[float] = None,
+) -> int:
+    """Move copies to the best quality listing of a store already used within ``max_price_increase``"""
+    moves = 0
+    for slot in range(len(state.slots)):
+        if _expired(deadline):
+            break
+        current = state.slots[slot]
+        price_cap = state.price[current] * (1 + max_price_increase)
+        best, best_gain = None, 0.0
+        for position in state.listings_of(state.card_of(slot)):
+            if state.price[position] > price_cap:
+                break
+            _, stores, quality = state.move_delta(slot, position)
+            if stores <= 0 and quality > best_gain and state.can_move(slot, position):
+                best, best_gain = position, quality
+        if best is not None:
+            state.move(slot, best)
+            moves += 1
+    return moves
+
+
+def search_listings(
+    listings_df: pd.DataFrame, user_wishlist_df: pd.DataFrame, config: Dict[str, Any]
+) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Listings penalized for the wishlist preferences, as the optimizers price them, and which of
+    them local search may move copies to: not those strict preferences reject
+    """
+    if listings_df.empty:
+        return listings_df, np.zeros(0, dtype=bool)
+    penalty_calculator = PenaltyCalculator(config)
+    card_preferences = {
+        row["name"]: {
+            "language": row.get("language", "English"),
+            "quality": row.get("quality", "NM"),
+            "version": row.get("version", "Standard"),
+            "set_name": row.get("set_name", ""),
+            "foil": row.get("foil", False),
+        }
+        for _, row in user_wishlist_df.iterrows()
+    }
+    penalized = penalty_calculator.apply_penalties(listings_df, card_preferences)
+    return penalized, ~penalty_calculator.strict_rejections(penalized)
+
+
+def format_state(state: SolutionState, user_wishlist_df: pd.DataFrame) -> Dict:
+    """Solution dict of a refined plan"""
+    return ResultFormatter().format_solution(state.to_cards(), user_wishlist_df, state.listings_df)
@@ -3,6 +3,14 @@ from typing import Dict, List, Optional
 import logging
 import time
 from ...core.base_optimizer import BaseOptimizer, OptimizationResult
+from ...core.solution_state import SolutionState
+from .local_search import (
+    consolidate_stores,
+    format_state,
+    improve_prices,
+    search_listings,
+    upgrade_quality,
+)
 from ..milp.milp_optimizer import MILPOptimizer
 from ..evolutionary.moead_optimizer import MOEADOptimizer
 from ..evolutionary.nsga2_optimizer import NSGA2Optimizer
@@ -22,6 +30,8 @@ class HybridMILPMOEADOptimizer(BaseOptimizer):
         super().__init__(problem_data, config)
         self.filtered_listings_df = problem_data["filtered_listings_df"]
         self.user_wishlist_df = problem_data["user_wishlist_df"]
+        # Penalized listings local search moves copies between, and which of them are usable
+        self._search_listings = None
 
         # Determine which evolutionary algorithm to use
         self.use_moead = config.get("use_moead", True)
@@ -43,7 +53,7 @@ class HybridMILPMOEADOptimizer(BaseOptimizer):
 
             # Configure MILP for quick solution
             milp_config = self.config.copy()
-            milp_config["time_limit"] = self.milp_time_limit
+            milp_config["time_limit"] = self._phase_time_limit(self.milp_time_limit)
             milp_config["find_min_store"] = True  # Focus on finding feasible solution quickly
 
             milp_optimizer = MILPOptimizer(self.problem_data, milp_config)
@@ -78,6 +88,7 @@ class HybridMILPMOEADOptimizer(BaseOptimizer):
 
             # Configure evolutionary algorithm
             evolutionary_config = self.config.copy()
+            evolutionary_config["time_limit"] = self._phase_time_limit(self.evolutionary_time_limit)
             evolutionary_config["max_generations"] = 100
             evolutionary_config["population_size"] = 200
 
@@ -119,7 +130,9 @@ class HybridMILPMOEADOptimizer(BaseOptimizer):
             best_solution = self._select_best_solution(milp_result, evolutionary_result)
 
             if best_solution:
-                refined_solution = self._local_search_refinement(best_solution, time_limit=self.local_search_time_limit)
+                refined_solution = self._local_search_refinement(
+                    best_solution, time_limit=self._phase_time_limit(self.local_search_time_limit)
+                )
 
                 local_search_time = time.time() - local_search_start
                 logger.info(f"Local search completed in {local_search_time:.2f} seconds")
@@ -148,7 +161,10 @@ class HybridMILPMOEADOptimizer(BaseOptimizer):
                         "evolutionary_time": evolutionary_time,
                         "local_search_time": local_search_time,
                         "phases_completed": 3,
+                        "milp_stop_reason": milp_result.performance_stats.get("stop_reason"),
+                        "evolutionary_stop_reason": evolutionary_result.performance_stats.get("stop_reason"),
                     },
+                    pareto_front=self._pareto_front(all_solutions),
                 )
             else:
                 # No good solution found
@@ -282,6 +298,7 @@ class HybridMILPMOEADOptimizer(BaseOptimizer):
 
         improved_solution = solution.copy()
         improvements_made = 0
+        deadline = start_time + time_limit
 
         def get_store_count(sol: Dict) -> int:
             """Get store count with consistent field access"""
@@ -298,7 +315,7 @@ class HybridMILPMOEADOptimizer(BaseOptimizer):
 
         # Strategy 1: Store consolidation
         if time.time() - start_time < time_limit:
-            consolidated = self._try_store_consolidation(improved_solution)
+            consolidated = self._try_store_consolidation(improved_solution, deadline)
             if consolidated:
                 original_price = get_total_price(improved_solution)
                 consolidated_price = get_total_price(consolidated)
@@ -316,7 +333,7 @@ class HybridMILPMOEADOptimizer(BaseOptimizer):
 
         # Strategy 2: Price improvement within stores
         if time.time() - start_time < time_limit:
-            price_improved = self._try_price_improvement(improved_solution)
+            price_improved = self._try_price_improvement(improved_solution, deadline)
             if price_improved:
                 original_price = get_total_price(improved_solution)
                 improved_price = get_total_price(price_improved)
@@ -328,7 +345,7 @@ class HybridMILPMOEADOptimizer(BaseOptimizer):
 
         # Strategy 3: Quality upgrade for minimal cost
         if time.time() - start_time < time_limit:
-            quality_improved = self._try_quality_upgrade(improved_solution)
+            quality_improved = self._try_quality_upgrade(improved_solution, deadline)
             if quality_improved:
                 improved_solution = quality_improved
                 improvements_made += 1
@@ -339,20 +356,39 @@ class HybridMILPMOEADOptimizer(BaseOptimizer):
 
         return improved_solution
 
-    def _try_store_consolidation(self, solution: Dict) -> Optional[Dict]:
+    def _try_store_consolidation(self, solution: Dict, deadline: Optional[float] = None) -> Optional[Dict]:
         """Try to reduce the number of stores while maintaining cost efficiency"""
-        # This is a placeholder - implement actual store consolidation logic
-        return None
+        state = self._local_search_state(solution)
+        if state is None or not consolidate_stores(state, deadline=deadline):
+            return None
+        self._count_local_search_moves(state)
+        return format_state(state, self.user_wishlist_df)
 
-    def _try_price_improvement(self, solution: Dict) -> Optional[Dict]:
+    def _try_price_improvement(self, solution: Dict, deadline: Optional[float] = None) -> Optional[Dict]:
         """Find cheaper alternatives within the same stores"""
-        # This is a placeholder - implement actual price improvement logic
-        return None
+        state = self._local_search_state(solution)
+        if state is None or not improve_prices(state, deadline):
+            return None
+        self._count_local_search_moves(state)
+        return format_state(state, self.user_wishlist_df)
 
-    def _try_quality_upgrade(self, solution: Dict) -> Optional[Dict]:
+    def _try_quality_upgrade(self, solution: Dict, deadline: Optional[float] = None) -> Optional[Dict]:
         """Upgrade card quality where the price difference is minimal"""
-        # This is a placeholder - implement actual quality upgrade logic
-        return None
+        state = self._local_search_state(solution)
+        if state is None or not upgrade_quality(state, deadline=deadline):
+            return None
+        self._count_local_search_moves(state)
+        return format_state(state, self.user_wishlist_df)
+
+    def _local_search_state(self, solution: Dict) -> Optional[SolutionState]:
+        """State of a solution over the penalized listings, which are built once per run"""
+        if self._search_listings is None:
+            self._search_listings = search_listings(self.filtered_listings_df, self.user_wishlist_df, self.config)
+        listings_df, usable = self._search_listings
+        return SolutionState.from_solution(solution, listings_df, self.user_wishlist_df, usable)
+
+    def _count_local_search_moves(self, state: SolutionState):
+        self.execution_stats["local_search_moves"] = self.execution_stats.get("local_search_moves", 0) + state.moves
 
     def _create_failed_result(self) -> OptimizationResult:
         """Create a failed optimization result"""
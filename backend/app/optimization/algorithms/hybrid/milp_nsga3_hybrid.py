@@ -3,6 +3,14 @@ from typing import Dict, List, Optional
 import logging
 import time
 from ...core.base_optimizer import BaseOptimizer, OptimizationResult
+from ...core.solution_state import SolutionState
+from .local_search import (
+    consolidate_stores,
+    format_state,
+    improve_prices,
+    search_listings,
+    upgrade_quality,
+)
 from ..milp.milp_optimizer import MILPOptimizer
 from ..evolutionary.nsga3_optimizer import NSGA3Optimizer
 
@@ -26,6 +34,8 @@ class HybridMILPNSGA3Optimizer(BaseOptimizer):
         super().__init__(problem_data, config)
         self.filtered_listings_df = problem_data["filtered_listings_df"]
         self.user_wishlist_df = problem_data["user_wishlist_df"]
+        # Penalized listings local search moves copies between, and which of them are usable
+        self._search_listings = None
 
         # Phase timing configuration - optimized for NSGA-III
         self.milp_time_limit = config.get("milp_time_limit", 30)  # seconds
@@ -47,7 +57,7 @@ class HybridMILPNSGA3Optimizer(BaseOptimizer):
 
             # Configure MILP for quick solution
             milp_config = self.config.copy()
-            milp_config["time_limit"] = self.milp_time_limit
+            milp_config["time_limit"] = self._phase_time_limit(self.milp_time_limit)
             milp_config["find_min_store"] = True  # Focus on finding feasible solution quickly
 
             milp_optimizer = MILPOptimizer(self.problem_data, milp_config)
@@ -76,7 +86,7 @@ class HybridMILPNSGA3Optimizer(BaseOptimizer):
 
             # Configure NSGA-III for enhanced diversity
             nsga3_config = self.config.copy()
-            nsga3_config["time_limit"] = self.nsga3_time_limit
+            nsga3_config["time_limit"] = self._phase_time_limit(self.nsga3_time_limit)
             nsga3_config["max_generations"] = 100
             nsga3_config["population_size"] = self.population_size
             nsga3_config["reference_point_divisions"] = self.reference_point_divisions
@@ -101,7 +111,9 @@ class HybridMILPNSGA3Optimizer(BaseOptimizer):
             best_solution = self._select_best_solution(milp_result, nsga3_result)
 
             if best_solution:
-                refined_solution = self._local_search_refinement(best_solution, time_limit=self.local_search_time_limit)
+                refined_solution = self._local_search_refinement(
+                    best_solution, time_limit=self._phase_time_limit(self.local_search_time_limit)
+                )
 
                 local_search_time = time.time() - local_search_start
                 logger.info(f"Local search completed in {local_search_time:.2f} seconds")
@@ -124,9 +136,12 @@ class HybridMILPNSGA3Optimizer(BaseOptimizer):
                         "nsga3_time": nsga3_time,
                         "local_search_time": local_search_time,
                         "phases_completed": 3,
+                        "milp_stop_reason": milp_result.performance_stats.get("stop_reason"),
+                        "nsga3_stop_reason": nsga3_result.performance_stats.get("stop_reason"),
                         "reference_points_used": len(nsga3_optimizer.ref_points) if hasattr(nsga3_optimizer, 'ref_points') else 0,
                         "diversity_metric": self._calculate_solution_diversity(all_solutions),
                     },
+                    pareto_front=self._pareto_front(all_solutions),
                 )
             else:
                 # No good solution found
@@ -276,10 +291,11 @@ class HybridMILPNSGA3Optimizer(BaseOptimizer):
 
         improved_solution = solution.copy()
         improvements_made = 0
+        deadline = start_time + time_limit
 
         # Strategy 1: Cost optimization while preserving solution structure
         if time.time() - start_time < time_limit / 3:
-            cost_optimized = self._optimize_cost_structure(improved_solution)
+            cost_optimized = self._optimize_cost_structure(improved_solution, deadline)
             if cost_optimized and self._get_total_price(cost_optimized) < self._get_total_price(improved_solution):
                 improved_solution = cost_optimized
                 improvements_made += 1
@@ -287,7 +303,7 @@ class HybridMILPNSGA3Optimizer(BaseOptimizer):
 
         # Strategy 2: Quality improvements where cost-neutral
         if time.time() - start_time < time_limit * 2/3:
-            quality_improved = self._improve_quality_cost_neutral(improved_solution)
+            quality_improved = self._improve_quality_cost_neutral(improved_solution, deadline)
             if quality_improved:
                 improved_solution = quality_improved
                 improvements_made += 1
@@ -295,7 +311,7 @@ class HybridMILPNSGA3Optimizer(BaseOptimizer):
 
         # Strategy 3: Store consolidation if beneficial
         if time.time() - start_time < time_limit:
-            consolidated = self._try_beneficial_consolidation(improved_solution)
+            consolidated = self._try_beneficial_consolidation(improved_solution, deadline)
             if consolidated:
                 improved_solution = consolidated
                 improvements_made += 1
@@ -306,20 +322,39 @@ class HybridMILPNSGA3Optimizer(BaseOptimizer):
 
         return improved_solution
 
-    def _optimize_cost_structure(self, solution: Dict) -> Optional[Dict]:
+    def _optimize_cost_structure(self, solution: Dict, deadline: Optional[float] = None) -> Optional[Dict]:
         """Optimize cost while preserving solution structure"""
-        # Placeholder for cost structure optimization
-        return None
+        state = self._local_search_state(solution)
+        if state is None or not improve_prices(state, deadline):
+            return None
+        self._count_local_search_moves(state)
+        return format_state(state, self.user_wishlist_df)
 
-    def _improve_quality_cost_neutral(self, solution: Dict) -> Optional[Dict]:
+    def _improve_quality_cost_neutral(self, solution: Dict, deadline: Optional[float] = None) -> Optional[Dict]:
         """Improve quality where cost impact is neutral or minimal"""
-        # Placeholder for quality improvement
-        return None
+        state = self._local_search_state(solution)
+        if state is None or not upgrade_quality(state, deadline=deadline):
+            return None
+        self._count_local_search_moves(state)
+        return format_state(state, self.user_wishlist_df)
 
-    def _try_beneficial_consolidation(self, solution: Dict) -> Optional[Dict]:
+    def _try_beneficial_consolidation(self, solution: Dict, deadline: Optional[float] = None) -> Optional[Dict]:
         """Try store consolidation only if clearly beneficial"""
-        # Placeholder for beneficial consolidation
-        return None
+        state = self._local_search_state(solution)
+        if state is None or not consolidate_stores(state, deadline=deadline):
+            return None
+        self._count_local_search_moves(state)
+        return format_state(state, self.user_wishlist_df)
+
+    def _local_search_state(self, solution: Dict) -> Optional[SolutionState]:
+        """State of a solution over the penalized listings, which are built once per run"""
+        if self._search_listings is None:
+            self._search_listings = search_listings(self.filtered_listings_df, self.user_wishlist_df, self.config)
+        listings_df, usable = self._search_listings
+        return SolutionState.from_solution(solution, listings_df, self.user_wishlist_df, usable)
+
+    def _count_local_search_moves(self, state: SolutionState):
+        self.execution_stats["local_search_moves"] = self.execution_stats.get("local_search_moves", 0) + state.moves
 
     # Helper methods for consistent field access
     def _get_missing_cards_count(self, solution: Dict) -> int:
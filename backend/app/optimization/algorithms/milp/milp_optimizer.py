@@ -1,18 +1,209 @@
 # backend/app/optimization/algorithms/milp/milp_optimizer.py
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any
 import logging
+import numpy as np
 import pandas as pd
 import pulp
 from pulp import PULP_CBC_CMD
 from collections import defaultdict
 
 from ...core.base_optimizer import BaseOptimizer, OptimizationResult
+from ...preprocessing.listing_pruner import undominated_listings
 from ...preprocessing.penalty_calculator import PenaltyCalculator
 from ...postprocessing.result_formatter import ResultFormatter
 from app.constants import CardQuality
 
 logger = logging.getLogger(__name__)
 
+MAX_QUALITY_WEIGHT = max(CardQuality.get_weight(q.value) for q in CardQuality)
+# Score in [0, 1] of each quality, NM being 1
+QUALITY_SCORES = {q.value: 1 - (CardQuality.get_weight(q.value) - 1) / (MAX_QUALITY_WEIGHT - 1) for q in CardQuality}
+
+
+def quality_score(quality: str) -> float:
+    return QUALITY_SCORES.get(CardQuality.normalize(quality), QUALITY_SCORES[CardQuality.DMG.value])
+
+
+class MILPModel:
+    """
+    PuLP model of one purchase problem, built once and re-solved.
+
+    Variables, objective terms and constraints are created a single time; between solves only the
+    store cap right-hand side and the objective weights change, and the previous solution is
+    handed to CBC as a warm start.
+
+    Each listing offered for a card in a store is an integer variable: the copies bought from it,
+    up to its stock and the required quantity, so several copies can come from one listing. A
+    store is opened by one aggregated constraint bounding all its purchases by its capacity.
+    ``offers`` lists the listings of every (card, store) pair; without it, the listing of
+    ``costs_enriched`` is the only offer of its pair. The ``listing_row`` of each offer, its row
+    position in the listings frame, is kept aligned with ``purchase_vars`` in ``listing_rows`` so
+    that a solution decodes to listing rows directly.
+    """
+
+    def __init__(
+        self,
+        costs_enriched: Dict,
+        unique_cards: List[str],
+        unique_stores: List[str],
+        required_quantities: Dict[str, int],
+        min_store: int,
+        store_cap: int,
+        find_min_store: bool = False,
+        offers: Optional[Dict] = None,
+    ):
+        self.costs_enriched = costs_enriched
+        self.unique_cards = unique_cards
+        self.unique_stores = unique_stores
+        self.prob = pulp.LpProblem("MTGCardOptimization", pulp.LpMinimize)
+        self.solve_count = 0
+
+        # Decision variables: copies bought per offer, and their total per (card, store)
+        self.offer_vars = {}
+        self.buy_vars = {}
+        self.purchase_vars = []
+        listing_rows, offer_prices = [], []
+        store_capacity = defaultdict(int)
+        for i, card in enumerate(unique_cards):
+            required = int(required_quantities[card])
+            self.offer_vars[card] = {}
+            self.buy_vars[card] = {}
+            for j, (store, cheapest) in enumerate(costs_enriched.get(card, {}).items()):
+                pair_offers = offers[card][store] if offers else [cheapest]
+                pair_vars = []
+                for k, offer in enumerate(pair_offers):
+                    cap = min(required, self._stock(offer, required))
+                    if cap <= 0:
+                        continue
+                    variable = pulp.LpVariable(f"Buy_{i}_{j}_{k}", 0, cap, pulp.LpInteger)
+                    pair_vars.append((offer, variable))
+                    self.purchase_vars.append(variable)
+                    listing_rows.append(offer.get("listing_row", -1))
+                    offer_prices.append(offer["weighted_price"])
+                if pair_vars:
+                    self.offer_vars[card][store] = pair_vars
+                    self.buy_vars[card][store] = pulp.lpSum(variable for _, variable in pair_vars)
+                    store_capacity[store] += min(required, sum(int(var.upBound) for _, var in pair_vars))
+
+        self.store_vars = {}
+        for store in unique_stores:
+            self.store_vars[store] = pulp.LpVariable(f"Store_{store}", 0, 1, pulp.LpBinary)
+        self.listing_rows = np.array(listing_rows, dtype=np.int64)
+        self.offer_prices = np.array(offer_prices, dtype=np.float64)
+        self.n_variables = len(self.purchase_vars) + len(self.store_vars)
+
+        # Objective components, weighted in set_weights
+        self.total_possible_cost = sum(
+            min(costs_enriched[card][store]["weighted_price"] for store in costs_enriched[card])
+            for card in unique_cards
+            if costs_enriched.get(card)
+        )
+        self.cost_term = pulp.lpSum(
+            variable * offer["weighted_price"]
+            for card in unique_cards
+            for pair_vars in self.offer_vars[card].values()
+            for offer, variable in pair_vars
+        )
+        self.store_term = pulp.lpSum(self.store_vars[store] for store in unique_stores)
+        self.quality_slots = sum(len(self.buy_vars[card]) for card in unique_cards)
+        self.quality_penalty_term = pulp.lpSum(
+            (1 - offer.get("quality_score", 0)) * variable
+            for card in unique_cards
+            for pair_vars in self.offer_vars[card].values()
+            for offer, variable in pair_vars
+        )
+
+        # Quantity constraints
+        for i, card in enumerate(unique_cards):
+            if self.buy_vars[card]:
+                self.prob += (
+                    pulp.lpSum(self.buy_vars[card].values()) == required_quantities[card],
+                    f"Required_quantity_{i}",
+                )
+
+        # Store activation: everything bought in a store, bounded by what it can supply
+        for store in unique_stores:
+            used_vars = [self.buy_vars[card][store] for card in unique_cards if store in self.buy_vars[card]]
+            if used_vars:
+                self.prob += (
+                    pulp.lpSum(used_vars) <= store_capacity[store] * self.store_vars[store],
+                    f"Store_usage_{store}",
+                )
+                self.prob += (pulp.lpSum(used_vars) >= self.store_vars[store], f"Store_usage_min_{store}")
+
+        # Store count constraints
+        min_store = min(min_store, len(unique_stores))
+        used_store_vars = [self.store_vars[store] for store in unique_stores]
+        if find_min_store:
+            self.prob += (pulp.lpSum(used_store_vars) >= min_store, "Min_stores")
+            self.cap_constraint_name = "Max_store_cap_for_find_min"
+        else:
+            self.prob += (pulp.lpSum(used_store_vars) >= min_store, "Min_stores_required")
+            self.cap_constraint_name = "Max_stores_allowed"
+        self.prob += (pulp.lpSum(used_store_vars) <= store_cap, self.cap_constraint_name)
+
+    @staticmethod
+    def _stock(offer: Dict, default: int) -> int:
+        """Copies a listing has in stock, ``default`` when unknown"""
+        stock = offer.get("available_quantity")
+        try:
+            return default if stock is None or np.isnan(stock) else int(stock)
+        except TypeError:
+            return default
+
+    def set_store_cap(self, store_count: int):
+        self.prob.constraints[self.cap_constraint_name].changeRHS(store_count)
+
+    def set_weights(self, weights: Dict):
+        """Rebuild the objective from the prebuilt terms"""
+        objective_terms = []
+
+        cost_weight = weights.get("cost", 1.0)
+        if cost_weight > 0 and self.total_possible_cost > 0:
+            objective_terms.append(cost_weight * (self.cost_term / self.total_possible_cost))
+
+        store_weight = weights.get("store_count", 0.0)
+        if store_weight > 0:
+            objective_terms.append(store_weight * (self.store_term / len(self.unique_stores)))
+
+        quality_weight = weights.get("quality", 0.0)
+        if quality_weight > 0 and self.quality_slots > 0:
+            objective_terms.append(quality_weight * (1 - self.quality_penalty_term / self.quality_slots))
+
+        if not objective_terms:
+            # Feasibility solves minimize the store count; an empty objective would also leave
+            # PuLP's dummy column in the model and break later warm starts
+            objective_terms.append(self.store_term)
+        self.prob.setObjective(pulp.lpSum(objective_terms))
+
+    def solve(self, time_limit: float = 120, gap: float = 0.01) -> str:
+        """Solve, warm starting from the previous solution when there is one"""
+        solver = PULP_CBC_CMD(
+            msg=False,
+            threads=4,
+            timeLimit=time_limit,
+            gapRel=gap,
+            presolve=True,
+            cuts=True,
+            warmStart=self.solve_count > 0,
+        )
+        self.prob.solve(solver)
+        self.solve_count += 1
+        status = pulp.LpStatus[self.prob.status]
+        logger.info(f"Solver status: {status}")
+        return status
+
+    @property
+    def stopped_on_time(self) -> bool:
+        """Whether the last solve hit its time limit with a feasible but unproven solution"""
+        return self.prob.sol_status == pulp.LpSolutionIntegerFeasible
+
+    def purchased(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Positions in ``purchase_vars`` bought in the last solution, and the copies bought"""
+        quantities = np.rint([variable.varValue or 0 for variable in self.purchase_vars]).astype(np.int64)
+        bought = np.flatnonzero(quantities > 0)
+        return bought, quantities[bought]
+
 
 class MILPOptimizer(BaseOptimizer):
     """Enhanced MILP optimization algorithm using PuLP"""
@@ -26,6 +217,7 @@ class MILPOptimizer(BaseOptimizer):
 
         # Initialize components
         self.penalty_calculator = PenaltyCalculator(config)
+        self.card_preferences = {}
         self.result_formatter = ResultFormatter()
         self.result_formatter.set_filtered_listings_df(self.filtered_listings_df)
 
@@ -122,7 +314,7 @@ class MILPOptimizer(BaseOptimizer):
             unique_stores = filtered_df["site_name"].unique()
 
             # Create card preferences from wishlist
-            card_preferences = {
+            self.card_preferences = card_preferences = {
                 row["name"]: {
                     "language": row.get("language", "English"),
                     "quality": row.get("quality", "NM"),
@@ -139,7 +331,8 @@ class MILPOptimizer(BaseOptimizer):
             )
 
             # Create enriched cost matrix
-            enriched_costs = self._create_enriched_costs(filtered_df, unique_cards, unique_stores)
+            required_quantities = self.user_wishlist_df.groupby("name", sort=False)["quantity"].sum().to_dict()
+            enriched_costs = self._create_enriched_costs(filtered_df, unique_cards, unique_stores, required_quantities)
 
             return filtered_df, unique_cards, unique_stores, enriched_costs
 
@@ -148,28 +341,85 @@ class MILPOptimizer(BaseOptimizer):
             return None, None, None, None, None
 
     def _create_enriched_costs(
-        self, filtered_df: pd.DataFrame, unique_cards: List[str], unique_stores: List[str]
+        self,
+        filtered_df: pd.DataFrame,
+        unique_cards: List[str],
+        unique_stores: List[str],
+        required_quantities: Optional[Dict[str, int]] = None,
     ) -> Dict:
-        """Create enriched cost matrix with additional card information"""
+        """
+        Create enriched cost matrix with additional card information.
+
+        Every (card, store) pair keeps the listings not dominated within the pair, cheapest first, in
+        ``self.offers``; those are the purchase variables of the model. A listing is dominated once
+        cheaper, better ones hold the ``required_quantities`` of its card (1 by default). The cheapest
+        offer is the pair's entry in the returned dict, its weighted price lands in ``self.cost_matrix``
+        (cards x stores, inf when the store has no listing) and its row position in ``filtered_df`` in
+        ``self.listing_index_matrix`` (-1 when missing).
+        """
         enriched_costs = defaultdict(dict)
-
-        for card in unique_cards:
-            for store in unique_stores:
-                rows = filtered_df[(filtered_df["name"] == card) & (filtered_df["site_name"] == store)]
-                if rows.empty:
-                    continue
-
-                best = rows.sort_values("weighted_price").iloc[0]
-                enriched = best.to_dict()
-                enriched["weighted_price"] = best.get("weighted_price", best.get("price", 10000))
-                enriched["available_quantity"] = best.get("quantity", 1.0)
-
-                # Calculate quality score
-                norm_quality = CardQuality.normalize(best.get("quality", "DMG"))
-                max_q = max(CardQuality.get_weight(q.value) for q in CardQuality)
-                enriched["quality_score"] = 1 - (CardQuality.get_weight(norm_quality) - 1) / (max_q - 1)
-
-                enriched_costs[card][store] = enriched
+        self.offers = defaultdict(dict)
+        card_positions = {card: i for i, card in enumerate(unique_cards)}
+        store_positions = {store: j for j, store in enumerate(unique_stores)}
+        self.cost_matrix = np.full((len(card_positions), len(store_positions)), np.inf)
+        self.listing_index_matrix = np.full((len(card_positions), len(store_positions)), -1, dtype=np.int64)
+
+        candidate_rows = np.flatnonzero(
+            filtered_df["name"].isin(card_positions).to_numpy()
+            & filtered_df["site_name"].isin(store_positions).to_numpy()
+        )
+        if not len(candidate_rows):
+            return enriched_costs
+        candidates = filtered_df.iloc[candidate_rows]
+
+        price_column = "weighted_price" if "weighted_price" in candidates.columns else "price"
+        prices = candidates[price_column].fillna(np.inf).to_numpy(dtype=np.float64)
+        qualities = (
+            candidates["quality"].fillna("DMG")
+            if "quality" in candidates.columns
+            else pd.Series("DMG", candidates.index)
+        )
+        quality_scores = qualities.map({q: quality_score(q) for q in qualities.unique()}).to_numpy(dtype=np.float64)
+        quantities = (
+            candidates["quantity"].to_numpy(dtype=np.float64)
+            if "quantity" in candidates.columns
+            else np.ones(len(candidates))
+        )
+        card_ids = candidates["name"].map(card_positions).to_numpy(dtype=np.int64)
+        store_codes = candidates["site_name"].map(store_positions).to_numpy(dtype=np.int64)
+        required_quantities = required_quantities or {}
+        needed = np.array([required_quantities.get(card, 1) for card in unique_cards], dtype=np.float64)[card_ids]
+
+        # Listings beaten by cheaper, better ones holding the whole quantity are never worth buying
+        keep = undominated_listings(
+            card_ids, store_codes, prices, quality_scores, np.nan_to_num(quantities, nan=np.inf), needed
+        )
+        order = np.lexsort((-quality_scores, prices, store_codes, card_ids))
+        order = order[keep[order]]
+        offered = candidates.iloc[order]
+
+        for position, label, enriched, weighted_price, quantity, score in zip(
+            order,
+            offered.index,
+            offered.to_dict("records"),
+            prices[order].tolist(),
+            quantities[order].tolist(),
+            quality_scores[order].tolist(),
+        ):
+            card, store = enriched["name"], enriched["site_name"]
+            enriched["weighted_price"] = weighted_price
+            enriched["available_quantity"] = quantity
+            enriched["quality_score"] = score
+            enriched["listing_index"] = label
+            enriched["listing_row"] = int(candidate_rows[position])
+            self.offers[card].setdefault(store, []).append(enriched)
+            if store in enriched_costs[card]:
+                continue
+            enriched_costs[card][store] = enriched
+
+            i, j = card_positions[card], store_positions[store]
+            self.cost_matrix[i, j] = weighted_price
+            self.listing_index_matrix[i, j] = candidate_rows[position]
 
         return enriched_costs
 
@@ -201,31 +451,49 @@ class MILPOptimizer(BaseOptimizer):
             )
             logger.info(f"Strategy: {strategy_msg}")
 
+            # The model is built once and re-solved for every store count
+            find_min_store = self.optimization_config.find_min_store
+            required_quantities = self.user_wishlist_df.groupby("name", sort=False)["quantity"].sum().to_dict()
+            model = MILPModel(
+                enriched_costs,
+                unique_cards,
+                unique_stores,
+                required_quantities,
+                self.optimization_config.min_store,
+                len(unique_stores) if find_min_store else self.optimization_config.max_store,
+                find_min_store=find_min_store,
+                offers=self.offers,
+            )
+            self.milp_model = model
+            unweighted_df = filtered_df.copy()
+            unweighted_df["weighted_price"] = unweighted_df["price"]
+
             # Evaluation function for different strategies
             def evaluate_solution(store_count, zero_weights=False):
                 weights = (self.optimization_config.weights or {}).copy()
                 if zero_weights:
                     weights = {k: 0.0 for k in weights}
 
-                filtered = filtered_df.copy()
-                if zero_weights:
-                    filtered["weighted_price"] = filtered["price"]
-
-                prob, buy_vars, total_possible_cost = self._setup_pulp_problem(
-                    enriched_costs, unique_cards, unique_stores, store_count, weights
-                )
-
-                if pulp.LpStatus[prob.status] != "Optimal":
+                filtered = unweighted_df if zero_weights else filtered_df
+
+                if find_min_store:
+                    model.set_store_cap(store_count)
+                model.set_weights(weights)
+                time_limit, gap = self.stopping_policy.milp_limits(model.n_variables)
+                self.execution_stats["milp_time_limit"] = time_limit
+                self.execution_stats["milp_gap"] = gap
+                status = model.solve(time_limit, gap)
+                if model.stopped_on_time:
+                    self.stopping_policy.stop("solver_time_limit")
+                if status != "Optimal":
                     logger.info(f"No feasible solution found with {store_count} store(s)")
                     return None
 
                 # FIXED: Pass required card counts to processing
-                result = self._process_milp_result(
-                    buy_vars, enriched_costs, filtered, cards_required_total, cards_required_unique
-                )
+                result = self._process_milp_result(model, filtered, cards_required_total, cards_required_unique)
 
                 # Calculate normalized metrics
-                normalized_cost = result.get("total_price", 0) / total_possible_cost
+                normalized_cost = result.get("total_price", 0) / model.total_possible_cost
                 normalized_store_count = result.get("number_store", 0) / len(unique_stores)
                 normalized_quality = result.get("normalized_quality", 0)
 
@@ -253,42 +521,48 @@ class MILPOptimizer(BaseOptimizer):
                 all_iterations_results.append(result)
                 return result
 
+            def is_complete(result):
+                return bool(result) and result.get("cards_found_total") == cards_required_total
+
             # Strategy 1: Minimize store count
-            if self.optimization_config.find_min_store:
+            if find_min_store:
                 logger.info("Starting optimization to find minimum stores needed")
 
+                # A complete solution with k stores stays feasible with more stores, so the smallest
+                # complete store count is found by bisection, starting from the uncapped problem
                 complete_solutions = []
-                best_store_count = None
-
-                for store_count in range(1, len(unique_stores) + 1):
+                low, high = 1, len(unique_stores)
+                logger.info(f"[Feasibility] Trying solution with {high} store(s)")
+                result = evaluate_solution(high, zero_weights=True)
+                if not is_complete(result):
+                    logger.warning("No complete solution found during store count minimization")
+                    return None, all_iterations_results
+                complete_solutions.append(result)
+                best_store_count = min(high, max(1, result["number_store"]))
+
+                high = best_store_count - 1
+                while low <= high:
+                    if self.stopping_policy.expired():
+                        logger.warning(f"Deadline reached, keeping the best store count found: {best_store_count}")
+                        self.stopping_policy.stop("deadline")
+                        break
+                    store_count = (low + high) // 2
                     logger.info(f"[Feasibility] Trying solution with {store_count} store(s)")
-
                     result = evaluate_solution(store_count, zero_weights=True)
-                    if not result:
-                        continue
-
-                    # FIXED: Use consistent field name for completeness check
-                    if result.get("cards_found_total") == cards_required_total:
+                    if is_complete(result):
                         complete_solutions.append(result)
-                        if best_store_count is None:
-                            best_store_count = store_count
+                        best_store_count = min(store_count, max(1, result["number_store"]))
+                        high = best_store_count - 1
+                    else:
+                        low = store_count + 1
 
-                        if len(complete_solutions) > 1:
-                            prev = complete_solutions[-2]["total_price"]
-                            curr = complete_solutions[-1]["total_price"]
-                            if (prev - curr) < (curr * 0.1):
-                                logger.info("Stopping search — minimal cost improvement")
-                                break
-
-                if not complete_solutions:
-                    logger.warning("No complete solution found during store count minimization")
-                    return None, all_iterations_results
+                logger.info(f"Minimum store count {best_store_count} found in {model.solve_count} solves")
 
                 # Re-optimize with weights
                 logger.info(f"Re-optimizing with weights at best store count = {best_store_count}")
                 weighted_result = evaluate_solution(best_store_count, zero_weights=False)
 
-                if weighted_result and weighted_result["cards_found_total"] == cards_required_total:
+                if is_complete(weighted_result):
                     best_solution = weighted_result
                 else:
                     best_price = min(sol["total_price"] for sol in complete_solutions)
@@ -318,80 +592,61 @@ class MILPOptimizer(BaseOptimizer):
 
     def _process_milp_result(
         self,
-        buy_vars: Dict,
-        costs: Dict,
+        model: MILPModel,
         filtered_listings_df: pd.DataFrame,
         cards_required_total: int,
         cards_required_unique: int,
     ) -> Dict:
-        """Process MILP solution with consistent card quantity tracking"""
+        """
+        Process MILP solution with consistent card quantity tracking.
+
+        Bought variables are decoded through the listing row each one carries, ``filtered_listings_df``
+        being the frame (or a row-aligned copy of it) the model was built from.
+        """
 
         # CLEAR INITIALIZATION: Use descriptive names
-        total_price = 0.0
         results = []
-        cards_found_total = 0  # Total quantity of cards found
         cards_found_unique_names = set()  # Unique card names found
         store_usage = defaultdict(int)
 
         # Get all required card names for completeness checking
-        all_required_card_names = set(card for card, _ in buy_vars.items())
-
-        for card, store_dict in buy_vars.items():
-            for store, var in store_dict.items():
-                quantity = int(var.value() or 0)
-                if quantity > 0:
-                    try:
-                        weighted_price = round(costs[card][store]["weighted_price"], 2)
-                    except KeyError:
-                        logger.error(f"[ERROR] No cost info for {card} at {store}")
-                        continue
-
-                    if weighted_price != 10000:  # Only include valid cards
-                        # Find matching cards using weighted_price
-                        matching_cards = filtered_listings_df[
-                            (filtered_listings_df["name"] == card)
-                            & (filtered_listings_df["site_name"] == store)
-                            & (abs(filtered_listings_df["weighted_price"] - weighted_price) < 0.01)
-                        ]
-
-                        if matching_cards.empty:
-                            # Try finding closest match
-                            potential_matches = filtered_listings_df[
-                                (filtered_listings_df["name"] == card) & (filtered_listings_df["site_name"] == store)
-                            ]
-
-                            if not potential_matches.empty:
-                                closest_match_idx = (
-                                    (potential_matches["weighted_price"] - weighted_price).abs().idxmin()
-                                )
-                                matching_cards = filtered_listings_df.loc[[closest_match_idx]]
-
-                        if not matching_cards.empty:
-                            card_data = matching_cards.iloc[0]
-                            actual_price = float(card_data["price"])
-
-                            # CLEAR TRACKING: Update all counters consistently
-                            cards_found_unique_names.add(card)
-                            total_price += quantity * actual_price
-                            cards_found_total += quantity  # Only count once here
-                            store_usage[store] += 1
-
-                            results.append(
-                                {
-                                    "site_name": store,
-                                    "site_id": card_data.get("site_id"),
-                                    "name": card,
-                                    "set_name": card_data["set_name"],
-                                    "set_code": card_data["set_code"],
-                                    "language": card_data.get("language", "English"),
-                                    "version": card_data.get("version", "Standard"),
-                                    "foil": bool(card_data.get("foil", False)),
-                                    "quality": card_data["quality"],
-                                    "quantity": int(quantity),
-                                    "price": actual_price,
-                                    "variant_id": card_data.get("variant_id"),
-                                }
-                            )
+        all_required_card_names = set(model.unique_cards)
+
+        bought, quantities = model.purchased()
+        rows = model.listing_rows[bought]
+        # Only include valid cards
+        valid = (rows >= 0) & (np.round(model.offer_prices[bought], 2) != 10000)
+        if not (rows >= 0).all():
+            logger.error(f"[ERROR] {int((rows < 0).sum())} bought variable(s) without a listing row")
+        rows, quantities = rows[valid], quantities[valid]
+
+        chosen = filtered_listings_df.iloc[rows]
+        prices = chosen["price"].to_numpy(dtype=np.float64)
+        # CLEAR TRACKING: Update all counters consistently
+        total_price = float(prices @ quantities)
+        cards_found_total = int(quantities.sum())
+
+        for card_data, quantity, actual_price in zip(chosen.to_dict("records"), quantities.tolist(), prices.tolist()):
+            card, store = card_data["name"], card_data["site_name"]
+            cards_found_unique_names.add(card)
+            store_usage[store] += 1
+
+            results.append(
+                {
+                    "site_name": store,
+                    "site_id": card_data.get("site_id"),
+                    "name": card,
+                    "set_name": card_data["set_name"],
+                    "set_code": card_data["set_code"],
+                    "language": card_data.get("language", "English"),
+                    "version": card_data.get("version", "Standard"),
+                    "foil": bool(card_data.get("foil", False)),
+                    "quality": card_data["quality"],
+                    "quantity": int(quantity),
+                    "price": actual_price,
+                    "variant_id": card_data.get("variant_id"),
+                }
+            )
 
         # Create result structure
         results_df = pd.DataFrame(results)
@@ -416,7 +671,11 @@ class MILPOptimizer(BaseOptimizer):
         ]
 
         # Add penalty information
-        results = self.result_formatter.add_penalty_info_to_results(results, filtered_listings_df)
+        # Explanations are only built for the listings bought
+        penalty_info = chosen.assign(
+            penalty_explanation=self.penalty_calculator.explain_penalties(chosen, self.card_preferences)
+        )
+        results = self.result_formatter.add_penalty_info_to_results(results, penalty_info, np.arange(len(chosen)))
 
         store_usage_str = ", ".join(f"{store}: {count}" for store, count in store_usage.items())
 
@@ -446,134 +705,6 @@ class MILPOptimizer(BaseOptimizer):
             "sorted_results_df": sorted_results_df,
         }
 
-    def _setup_pulp_problem(
-        self,
-        costs_enriched: Dict,
-        unique_cards: List[str],
-        unique_stores: List[str],
-        store_count: int = None,
-        weights: Dict = None,
-    ):
-        """Setup PuLP optimization problem"""
-        prob = pulp.LpProblem("MTGCardOptimization", pulp.LpMinimize)
-
-        if weights is None:
-            weights = self.optimization_config.weights or {}
-
-        # Decision variables
-        buy_vars = {}
-        for card in unique_cards:
-            buy_vars[card] = {}
-            for store in costs_enriched[card]:
-                buy_vars[card][store] = pulp.LpVariable(f"Buy_{card}_{store}", 0, 1, pulp.LpBinary)
-
-        store_vars = {}
-        for store in unique_stores:
-            store_vars[store] = pulp.LpVariable(f"Store_{store}", 0, 1, pulp.LpBinary)
-
-        # Objective function
-        objective_terms = []
-
-        # Cost component
-        total_possible_cost = sum(
-            min(costs_enriched[card][store]["weighted_price"] for store in costs_enriched[card])
-            for card in unique_cards
-            if costs_enriched[card]
-        )
-
-        cost_weight = weights.get("cost", 1.0)
-        if cost_weight > 0 and total_possible_cost > 0:
-            normalized_cost_term = (
-                pulp.lpSum(
-                    buy_vars[card][store] * costs_enriched[card][store]["weighted_price"]
-                    for card in unique_cards
-                    for store in costs_enriched.get(card, {})
-                )
-                / total_possible_cost
-            )
-            objective_terms.append(cost_weight * normalized_cost_term)
-
-        # Store count component
-        store_weight = weights.get("store_count", 0.0)
-        if store_weight > 0:
-            normalized_store_term = pulp.lpSum(store_vars[store] for store in unique_stores) / len(unique_stores)
-            objective_terms.append(store_weight * normalized_store_term)
-
-        # Quality component
-        quality_weight = weights.get("quality", 0.0)
-        if quality_weight > 0:
-            quality_penalties = []
-            total_quality_slots = 0
-
-            for card in unique_cards:
-                for store in unique_stores:
-                    listing = costs_enriched.get(card, {}).get(store)
-                    if not listing:
-                        continue
-
-                    quality_score = listing.get("quality_score", 0)
-                    q_penalty = 1 - quality_score
-                    quality_penalties.append(q_penalty * buy_vars[card][store])
-                    total_quality_slots += 1
-
-            if total_quality_slots > 0:
-                normalized_quality_term = 1 - (pulp.lpSum(quality_penalties) / total_quality_slots)
-                objective_terms.append(quality_weight * normalized_quality_term)
-
-        if objective_terms:
-            prob += pulp.lpSum(objective_terms), "WeightedObjective"
-
-        # Constraints
-        # Quantity constraints
-        for card in unique_cards:
-            required_quantity = self.user_wishlist_df[self.user_wishlist_df["name"] == card]["quantity"].iloc[0]
-            available_stores = list(costs_enriched.get(card, {}).keys())
-
-            if available_stores:
-                prob += (
-                    pulp.lpSum([buy_vars[card][store] for store in available_stores]) == required_quantity,
-                    f"Required_quantity_{card}",
-                )
-
-        # Store activation constraints
-        M = len(unique_cards)
-        for store in unique_stores:
-            used_vars = [buy_vars[card][store] for card in unique_cards if store in costs_enriched.get(card, {})]
-
-            if used_vars:
-                prob += (
-                    pulp.lpSum(used_vars) <= M * store_vars[store],
-                    f"Store_usage_{store}",
-                )
-                prob += (
-                    pulp.lpSum(used_vars) >= store_vars[store],
-                    f"Store_usage_min_{store}",
-                )
-
-        # Store count constraints
-        min_store = self.optimization_config.min_store
-        max_store = self.optimization_config.max_store
-
-        if len(unique_stores) < min_store:
-            min_store = len(unique_stores)
-
-        used_store_vars = [store_vars[store] for store in unique_stores]
-
-        if self.optimization_config.find_min_store and store_count:
-            prob += (pulp.lpSum(used_store_vars) >= min_store, "Min_stores")
-            prob += (pulp.lpSum(used_store_vars) <= store_count, "Max_store_cap_for_find_min")
-        else:
-            prob += (pulp.lpSum(used_store_vars) >= min_store, "Min_stores_required")
-            prob += (pulp.lpSum(used_store_vars) <= max_store, "Max_stores_allowed")
-
-        # Solve
-        solver = PULP_CBC_CMD(msg=False, threads=4, timeLimit=120, gapRel=0.01, presolve=True, cuts=True)
-
-        prob.solve(solver)
-        logger.info(f"Solver status: {pulp.LpStatus[prob.status]}")
-
-        return prob, buy_vars, total_possible_cost
-
     def _create_failed_result(self) -> OptimizationResult:
         """Create a failed optimization result"""
         return OptimizationResult(
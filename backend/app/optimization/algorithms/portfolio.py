@@ -0,0 +1,260 @@
+# backend/app/optimization/algorithms/portfolio.py
+import logging
+import multiprocessing
+import queue
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import billiard
+
+from ..core.base_optimizer import OptimizationResult
+from .factory import OptimizerFactory
+
+logger = logging.getLogger(__name__)
+
+RACE_PORTFOLIO = ("milp", "nsga2", "hybrid_milp_moead")
+# A complete purchase within this share of the cost lower bound ends the race
+RACE_GOOD_ENOUGH_GAP = 0.05
+# Seconds racers get past the shared deadline to report what they found
+RACE_GRACE_PERIOD = 5.0
+# Racers whose optimality is proven when they run to completion
+EXACT_ALGORITHMS = ("milp",)
+
+
+def run_racer(algorithm: str, problem_data: Dict[str, Any], config: Dict[str, Any], results):
+    """Body of a racer process: run one optimizer and report its result, or why it failed"""
+    try:
+        optimizer = OptimizerFactory.create_optimizer(algorithm, problem_data, config)
+        results.put((algorithm, optimizer.optimize(), None))
+    except Exception as e:
+        results.put((algorithm, None, str(e)))
+
+
+@dataclass
+class RaceOutcome:
+    """Which racer won a portfolio race, when and why"""
+
+    winner: Optional[str] = None
+    won_at: Optional[float] = None  # Seconds after the start of the race
+    reason: str = "no_solution"
+    mode: str = "process"
+    finished: List[str] = field(default_factory=list)
+    cancelled: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    elapsed_time: float = 0.0
+    result: Optional[OptimizationResult] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        outcome = asdict(self)
+        del outcome["result"]
+        return outcome
+
+
+class PortfolioRace:
+    """
+    Run several algorithms on the same problem at once and keep the first good result.
+
+    Every racer runs in its own process against the shared deadline of ``time_limit``. The
+    incumbent, the best result reported so far, is kept here: complete purchases beat incomplete
+    ones, then fewer stores when minimizing the store count, then the lower cost. The race ends as
+    soon as a complete result is proven optimal (an exact algorithm that ran to completion with no
+    gap) or costs at most ``good_enough_gap`` above ``cost_lower_bound``; the remaining racers are
+    terminated. Otherwise the incumbent wins once every racer reported or the deadline passed.
+
+    Inside a daemonic process, such as a Celery prefork worker, the standard library refuses to
+    start children, so the racers are started with billiard there. Racers run one after the other,
+    in portfolio order, when processes can't be started at all, which keeps the deadline and the
+    early win but not the concurrency.
+    """
+
+    def __init__(
+        self,
+        algorithms: Sequence[str],
+        problem_data: Dict[str, Any],
+        config: Dict[str, Any],
+        cost_lower_bound: Optional[float] = None,
+        good_enough_gap: float = RACE_GOOD_ENOUGH_GAP,
+        grace_period: float = RACE_GRACE_PERIOD,
+    ):
+        self.algorithms = list(dict.fromkeys(algorithm.lower() for algorithm in algorithms))
+        self.problem_data = problem_data
+        self.config = config
+        self.time_limit = config.get("time_limit", 300)
+        self.find_min_store = config.get("find_min_store", False)
+        self.cost_lower_bound = cost_lower_bound
+        self.good_enough_gap = good_enough_gap
+        self.grace_period = grace_period
+
+        self.outcome = RaceOutcome()
+        self._start = None
+
+    def run(self) -> RaceOutcome:
+        if not self.algorithms:
+            raise ValueError("The race portfolio is empty")
+        self._start = time.time()
+        self.outcome = RaceOutcome()
+
+        if len(self.algorithms) == 1:
+            self._run_serially()
+        else:
+            self._run_processes()
+
+        self.outcome.elapsed_time = self._elapsed()
+        if self.outcome.result is not None:
+            logger.info(
+                f"Race won by {self.outcome.winner} after {self.outcome.won_at:.2f}s ({self.outcome.reason}), "
+                f"cancelled: {self.outcome.cancelled or 'none'}"
+            )
+        else:
+            logger.warning(f"No racer returned a solution: {self.outcome.failed}")
+        return self.outcome
+
+    def _run_processes(self):
+        self.outcome.mode = "process"
+        if multiprocessing.current_process().daemon:
+            context = billiard.get_context("spawn")
+        else:
+            context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        racers = {}
+        try:
+            for algorithm in self.algorithms:
+                racer = context.Process(
+                    target=run_racer,
+                    args=(algorithm, self.problem_data, self._racer_config(self.time_limit), results),
+                    name=f"race-{algorithm}",
+                    daemon=True,
+                )
+                racer.start()
+                racers[algorithm] = racer
+        except Exception as e:
+            logger.warning(f"Racer processes unavailable, racing the portfolio serially: {str(e)}")
+            self._stop(racers.values())
+            results.close()
+            self._run_serially()
+            return
+
+        logger.info(f"Racing {', '.join(self.algorithms)} in parallel")
+        pending = set(self.algorithms)
+        deadline = self._start + self.time_limit + self.grace_period
+        try:
+            while pending:
+                timeout = deadline - time.time()
+                if timeout <= 0:
+                    logger.warning(f"Race deadline reached, cancelling {sorted(pending)}")
+                    break
+                try:
+                    algorithm, result, error = results.get(timeout=min(timeout, 1.0))
+                except queue.Empty:
+                    # A racer exits cleanly only after reporting, a crashed one never will
+                    for algorithm in list(pending):
+                        exitcode = racers[algorithm].exitcode
+                        if exitcode not in (None, 0):
+                            pending.discard(algorithm)
+                            self.outcome.failed[algorithm] = f"exited with code {exitcode}"
+                    continue
+
+                pending.discard(algorithm)
+                if self._report(algorithm, result, error):
+                    break
+        finally:
+            self.outcome.cancelled = sorted(pending)
+            self._stop(racers.values())
+            results.close()
+        self._settle()
+
+    def _run_serially(self):
+        self.outcome.mode = "serial"
+        for position, algorithm in enumerate(self.algorithms):
+            remaining = self.time_limit - self._elapsed()
+            if remaining <= 0:
+                self.outcome.cancelled = self.algorithms[position:]
+                break
+            try:
+                optimizer = OptimizerFactory.create_optimizer(
+                    algorithm, self.problem_data, self._racer_config(remaining)
+                )
+                result, error = optimizer.optimize(), None
+            except Exception as e:
+                result, error = None, str(e)
+            if self._report(algorithm, result, error):
+                self.outcome.cancelled = self.algorithms[position + 1 :]
+                break
+        self._settle()
+
+    def _report(self, algorithm: str, result: Optional[OptimizationResult], error: Optional[str]) -> bool:
+        """Take a racer's result into account, True when it ends the race"""
+        if error is not None or result is None:
+            logger.warning(f"Racer {algorithm} failed: {error}")
+            self.outcome.failed[algorithm] = error or "no result"
+            return False
+
+        self.outcome.finished.append(algorithm)
+        if not result.best_solution:
+            logger.info(f"Racer {algorithm} finished without a solution")
+            return False
+        if self.outcome.result is None or self._rank(result) < self._rank(self.outcome.result):
+            self.outcome.winner = algorithm
+            self.outcome.won_at = round(self._elapsed(), 3)
+            self.outcome.result = result
+
+        if self.outcome.winner != algorithm:
+            return False
+        if self._proven_optimal(algorithm, result):
+            self.outcome.reason = "proven_optimal"
+            return True
+        if self._good_enough(result):
+            self.outcome.reason = "good_enough"
+            return True
+        return False
+
+    def _settle(self):
+        """Reason for a race that no racer ended early"""
+        if self.outcome.result is not None and self.outcome.reason == "no_solution":
+            self.outcome.reason = "deadline" if self.outcome.cancelled else "best_of_portfolio"
+
+    def _rank(self, result: OptimizationResult) -> tuple:
+        solution = result.best_solution
+        return (
+            not self.is_complete(result),
+            solution.get("number_store", 0) if self.find_min_store else 0,
+            solution.get("total_price", float("inf")),
+        )
+
+    @staticmethod
+    def is_complete(result: OptimizationResult) -> bool:
+        solution = result.best_solution or {}
+        required = solution.get("cards_required_total")
+        return bool(solution) and required is not None and solution.get("nbr_card_in_solution", 0) >= required
+
+    def _proven_optimal(self, algorithm: str, result: OptimizationResult) -> bool:
+        # Larger models are solved to a relative gap, their optimum is not proven
+        stats = result.performance_stats or {}
+        return (
+            algorithm in EXACT_ALGORITHMS
+            and stats.get("stop_reason") == "completed"
+            and stats.get("milp_gap") == 0
+            and self.is_complete(result)
+        )
+
+    def _good_enough(self, result: OptimizationResult) -> bool:
+        if not self.cost_lower_bound or self.cost_lower_bound <= 0 or not self.is_complete(result):
+            return False
+        return result.best_solution.get("total_price", float("inf")) <= self.cost_lower_bound * (
+            1 + self.good_enough_gap
+        )
+
+    def _racer_config(self, time_limit: float) -> Dict[str, Any]:
+        return {**self.config, "time_limit": time_limit}
+
+    def _elapsed(self) -> float:
+        return time.time() - self._start
+
+    @staticmethod
+    def _stop(racers):
+        for racer in racers:
+            if racer.is_alive():
+                racer.terminate()
+        for racer in racers:
+            racer.join(timeout=1.0)
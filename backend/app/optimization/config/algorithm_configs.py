@@ -1,5 +1,5 @@
 # backend/app/optimization/config/algorithm_configs.py
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, field
 
 
@@ -25,6 +25,8 @@ class AlgorithmConfig:
     max_iterations: int = 1000
     early_stopping: bool = True
     convergence_threshold: float = 0.001
+    stagnation_window: int = 10  # Generations the Pareto front must improve over, for evolutionary algorithms
+    prune_listings: bool = True  # Drop dominated listings and stores before optimizing
 
     # Algorithm-specific parameters
     population_size: int = 200  # For evolutionary algorithms
@@ -33,9 +35,13 @@ class AlgorithmConfig:
     milp_gap_tolerance: float = 0.01  # For MILP
     hybrid_milp_time_fraction: float = 0.3  # For hybrid algorithms
     reference_point_divisions: int = 12  # For NSGA-III
+    fitness_cache_size: int = 0  # Genotype fitness cache of evolutionary algorithms, 0 disables it
+    race_portfolio: List[str] = field(default_factory=lambda: ["milp", "nsga2", "hybrid_milp_moead"])  # For "race"
+    race_good_enough_gap: float = 0.05  # For "race": share above the cost lower bound that ends the race
 
     # Parallelization
-    n_jobs: int = -1  # Use all available cores
+    n_jobs: int = -1  # Use all available cores, per task: Celery workers each start their own evaluation pool
+    evaluation_backend: str = "serial"  # Fitness evaluation of evolutionary algorithms: "serial" or "process"
 
     @classmethod
     def from_optimization_config(cls, opt_config) -> "AlgorithmConfig":
@@ -63,13 +69,21 @@ class AlgorithmConfig:
             max_iterations=config_dict.get("max_iterations", 1000),
             early_stopping=config_dict.get("early_stopping", True),
             convergence_threshold=config_dict.get("convergence_threshold", 0.001),
+            stagnation_window=config_dict.get("stagnation_window", 10),
+            prune_listings=config_dict.get("prune_listings", True),
             population_size=config_dict.get("population_size", 200),
             neighborhood_size=config_dict.get("neighborhood_size", 20),
             decomposition_method=config_dict.get("decomposition_method", "tchebycheff"),
             milp_gap_tolerance=config_dict.get("milp_gap_tolerance", 0.01),
             hybrid_milp_time_fraction=config_dict.get("hybrid_milp_time_fraction", 0.3),
             reference_point_divisions=config_dict.get("reference_point_divisions", 12),
+            fitness_cache_size=config_dict.get("fitness_cache_size", 0),
+            race_portfolio=config_dict.get(
+                "race_portfolio", cls.__dataclass_fields__["race_portfolio"].default_factory()
+            ),
+            race_good_enough_gap=config_dict.get("race_good_enough_gap", 0.05),
             n_jobs=config_dict.get("n_jobs", -1),
+            evaluation_backend=config_dict.get("evaluation_backend", "serial"),
         )
 
     def to_dict(self) -> Dict[str, Any]:
@@ -86,13 +100,19 @@ class AlgorithmConfig:
             "max_iterations": self.max_iterations,
             "early_stopping": self.early_stopping,
             "convergence_threshold": self.convergence_threshold,
+            "stagnation_window": self.stagnation_window,
+            "prune_listings": self.prune_listings,
             "population_size": self.population_size,
             "neighborhood_size": self.neighborhood_size,
             "decomposition_method": self.decomposition_method,
             "milp_gap_tolerance": self.milp_gap_tolerance,
             "hybrid_milp_time_fraction": self.hybrid_milp_time_fraction,
             "reference_point_divisions": self.reference_point_divisions,
+            "fitness_cache_size": self.fitness_cache_size,
+            "race_portfolio": self.race_portfolio,
+            "race_good_enough_gap": self.race_good_enough_gap,
             "n_jobs": self.n_jobs,
+            "evaluation_backend": self.evaluation_backend,
         }
 
     def get_algorithm_specific_params(self, algorithm: str) -> Dict[str, Any]:
@@ -107,6 +127,12 @@ class AlgorithmConfig:
         if algorithm in ["nsga2", "nsga3", "moead"]:
             params["population_size"] = self.population_size
 
+        if algorithm in ["nsga2", "nsga3", "moead"] or algorithm.startswith("hybrid"):
+            params["evaluation_backend"] = self.evaluation_backend
+            params["n_jobs"] = self.n_jobs
+            params["fitness_cache_size"] = self.fitness_cache_size
+            params["stagnation_window"] = self.stagnation_window
+
         if algorithm in ["nsga3"]:
             params["reference_point_divisions"] = self.reference_point_divisions
 
@@ -1,4 +1,6 @@
 # backend/app/optimization/core/__init__.py
 from .base_optimizer import BaseOptimizer, OptimizationResult
+from .listings_table import ListingsTable
+from .pareto import ParetoArchive
 
-__all__ = ["BaseOptimizer", "OptimizationResult"]
+__all__ = ["BaseOptimizer", "OptimizationResult", "ListingsTable", "ParetoArchive"]
@@ -0,0 +1,131 @@
+# backend/app/optimization/core/algorithm_selector.py
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Problem characteristics past runs are compared on; counts are compared on a log scale
+SELECTOR_FEATURES = ("num_cards", "num_stores", "total_listings", "avg_stores_per_card", "card_coverage")
+LOG_FEATURES = ("num_cards", "num_stores", "total_listings")
+# Past runs looked at for a new problem
+SELECTOR_NEIGHBOURS = 25
+# Runs of an algorithm among the neighbours needed to trust its estimates
+MIN_RUNS_PER_ALGORITHM = 3
+# Share of the neighbouring runs an algorithm must have completed
+MIN_COMPLETION_RATE = 0.9
+# Algorithms within this share of the best expected cost are as good as the best
+COST_TOLERANCE = 0.02
+
+
+class AlgorithmSelector:
+    """
+    Pick the algorithm for a problem from past runs on similar ones.
+
+    Runs are compared on SELECTOR_FEATURES, standardized over the history. The nearest runs, weighted
+    by inverse distance, give each algorithm an expected cost ratio (cost over the problem's cost lower
+    bound, so that costs compare across problems), completion rate and wall time. Among the algorithms
+    expected to complete the purchase within the time limit, the fastest one within COST_TOLERANCE of
+    the best expected cost is picked. Without enough history ``select`` returns None, and the caller
+    falls back to its fixed rules.
+    """
+
+    def __init__(
+        self,
+        history: List[Dict[str, Any]],
+        n_neighbours: int = SELECTOR_NEIGHBOURS,
+        min_runs: int = MIN_RUNS_PER_ALGORITHM,
+    ):
+        self.n_neighbours = n_neighbours
+        self.min_runs = min_runs
+
+        runs = [run for run in history if self._usable(run)]
+        self.algorithms = np.array([run["algorithm"] for run in runs], dtype=object)
+        self.cost_ratios = np.array([run["total_cost"] / run["cost_lower_bound"] for run in runs], dtype=np.float64)
+        self.completed = np.array([run["completeness"] >= 0.999 for run in runs], dtype=bool)
+        self.execution_times = np.array([run["execution_time"] for run in runs], dtype=np.float64)
+
+        features = np.array([self._features(run) for run in runs], dtype=np.float64).reshape(-1, len(SELECTOR_FEATURES))
+        self._mean = features.mean(axis=0) if len(runs) else np.zeros(len(SELECTOR_FEATURES))
+        spread = features.std(axis=0) if len(runs) else np.ones(len(SELECTOR_FEATURES))
+        self._scale = np.where(spread > 0, spread, 1.0)
+        self._points = (features - self._mean) / self._scale
+
+    def __len__(self) -> int:
+        return len(self.algorithms)
+
+    def estimate(self, characteristics: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+        """Expected outcome of every algorithm with enough runs near the problem"""
+        if not len(self) or not self._usable_features(characteristics):
+            return {}
+
+        point = (self._features(characteristics) - self._mean) / self._scale
+        distances = np.linalg.norm(self._points - point, axis=1)
+        nearest = np.argsort(distances, kind="stable")[: self.n_neighbours]
+        weights = 1.0 / (distances[nearest] + 1e-6)
+
+        estimates = {}
+        for algorithm in dict.fromkeys(self.algorithms[nearest]):
+            runs = self.algorithms[nearest] == algorithm
+            if runs.sum() < self.min_runs:
+                continue
+            run_weights = weights[runs]
+            estimates[algorithm] = {
+                "runs": int(runs.sum()),
+                "cost_ratio": float(np.average(self.cost_ratios[nearest][runs], weights=run_weights)),
+                "completion_rate": float(np.average(self.completed[nearest][runs], weights=run_weights)),
+                "execution_time": float(np.average(self.execution_times[nearest][runs], weights=run_weights)),
+            }
+        return estimates
+
+    def select(self, characteristics: Dict[str, Any], time_limit: Optional[float] = None) -> Optional[str]:
+        """Fastest adequate algorithm for the problem, None without enough history"""
+        estimates = self.estimate(characteristics)
+        candidates = {
+            algorithm: estimate
+            for algorithm, estimate in estimates.items()
+            if estimate["completion_rate"] >= MIN_COMPLETION_RATE
+            and (time_limit is None or estimate["execution_time"] <= time_limit)
+        }
+        if not candidates:
+            return None
+
+        best_cost = min(estimate["cost_ratio"] for estimate in candidates.values())
+        adequate = [
+            algorithm
+            for algorithm, estimate in candidates.items()
+            if estimate["cost_ratio"] <= best_cost * (1 + COST_TOLERANCE)
+        ]
+        selected = min(adequate, key=lambda algorithm: candidates[algorithm]["execution_time"])
+        logger.info(f"Learned selection: {selected} among {candidates}")
+        return selected
+
+    @staticmethod
+    def _features(run: Dict[str, Any]) -> np.ndarray:
+        return np.array(
+            [np.log1p(run[name]) if name in LOG_FEATURES else run[name] for name in SELECTOR_FEATURES],
+            dtype=np.float64,
+        )
+
+    @staticmethod
+    def _usable_features(run: Dict[str, Any]) -> bool:
+        try:
+            return all(np.isfinite(float(run[name])) for name in SELECTOR_FEATURES)
+        except (KeyError, TypeError, ValueError):
+            return False
+
+    @classmethod
+    def _usable(cls, run: Dict[str, Any]) -> bool:
+        """Whether a past run can be learned from"""
+        try:
+            return (
+                cls._usable_features(run)
+                and bool(run["algorithm"])
+                and run["cost_lower_bound"] > 0
+                and np.isfinite(run["total_cost"])
+                and run["completeness"] is not None
+                and run["execution_time"] is not None
+            )
+        except (KeyError, TypeError):
+            return False
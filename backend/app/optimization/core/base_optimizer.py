@@ -5,6 +5,11 @@ import time
 import logging
 from dataclasses import dataclass
 
+from .fitness_cache import FitnessCache
+from .parallel_evaluator import ParallelPopulationEvaluator
+from .pareto import ParetoArchive, solution_objectives
+from .stopping import StoppingPolicy
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,6 +25,8 @@ class OptimizationResult:
     convergence_metric: float
     performance_stats: Dict[str, Any]
     errors: Optional[Dict[str, list[str]]] = None
+    # Non-dominated solutions on price, store count and completeness
+    pareto_front: Optional[list[Dict[str, Any]]] = None
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
@@ -32,6 +39,7 @@ class OptimizationResult:
             "convergence_metric": self.convergence_metric,
             "performance_stats": self.performance_stats,
             "errors": self.errors or {"unreachable_stores": [], "unknown_languages": [], "unknown_qualities": []},
+            "pareto_front": self.pareto_front or [],
         }
 
 
@@ -62,6 +70,8 @@ class BaseOptimizer(ABC):
         self.max_iterations = config.get("max_iterations", 1000)
         self.early_stopping = config.get("early_stopping", True)
         self.convergence_threshold = config.get("convergence_threshold", 0.001)
+        # Deadline, front stagnation and MILP limits, honored by every algorithm
+        self.stopping_policy = StoppingPolicy.from_config(config)
 
         # Store constraints
         self.min_stores = config.get("min_store", 1)
@@ -71,6 +81,14 @@ class BaseOptimizer(ABC):
         # Weights
         self.weights = config.get("weights", {"cost": 1.0, "quality": 1.0, "store_count": 0.3})
 
+        # Fitness evaluation of population-based algorithms: "serial" or "process"
+        self.evaluation_backend = config.get("evaluation_backend", "serial")
+        self.n_jobs = config.get("n_jobs", -1)
+        self._evaluation_pools: list[ParallelPopulationEvaluator] = []
+        # Opt-in: number of genotype fitnesses kept across generations, 0 disables the cache
+        self.fitness_cache_size = config.get("fitness_cache_size", 0)
+        self._fitness_caches: list[FitnessCache] = []
+
         # Progress tracking
         self.progress_callback: Optional[Callable[[float, str], None]] = None
         self.start_time = None
@@ -92,12 +110,65 @@ class BaseOptimizer(ABC):
         """Start timing the optimization"""
         self.start_time = time.time()
         self.execution_stats["start_time"] = self.start_time
+        self.stopping_policy.start()
 
     def _end_timing(self):
         """End timing and calculate execution time"""
         self.end_time = time.time()
         self.execution_stats["end_time"] = self.end_time
         self.execution_stats["execution_time"] = self.end_time - self.start_time
+        if self.stopping_policy.expired():
+            self.stopping_policy.stop("deadline")
+        self.execution_stats.update(self.stopping_policy.stats())
+        # Evaluation workers only live for the run
+        self._close_evaluation_pools()
+        self._record_fitness_cache_stats()
+
+    def _phase_time_limit(self, time_limit: float) -> float:
+        """Time limit of a sub-run, cut to what is left before this run's deadline"""
+        remaining = self.stopping_policy.remaining()
+        return time_limit if remaining is None else min(time_limit, remaining)
+
+    def _population_scorer(self, evaluator):
+        """Scoring function of a PopulationEvaluator for the configured evaluation backend"""
+        self.execution_stats["evaluation_backend"] = "serial"
+        if self.evaluation_backend == "process":
+            pool = ParallelPopulationEvaluator(evaluator, self.n_jobs)
+            if pool.start():
+                self._evaluation_pools.append(pool)
+                self.execution_stats["evaluation_backend"] = "process"
+                self.execution_stats["evaluation_workers"] = pool.n_jobs
+                return pool.evaluate
+        return evaluator.evaluate
+
+    def _close_evaluation_pools(self):
+        for pool in self._evaluation_pools:
+            pool.close()
+        self._evaluation_pools = []
+
+    def _cached_population_evaluation(self, evaluator, evaluate_population: Callable) -> Callable:
+        """``evaluate_population`` behind a fitness cache when ``fitness_cache_size`` is set"""
+        if not self.fitness_cache_size or self.fitness_cache_size <= 0:
+            return evaluate_population
+        cache = FitnessCache(evaluator, self.fitness_cache_size)
+        self._fitness_caches.append(cache)
+        return cache.wrap(evaluate_population)
+
+    def _record_fitness_cache_stats(self):
+        if not self._fitness_caches:
+            return
+        hits = sum(cache.hits for cache in self._fitness_caches)
+        misses = sum(cache.misses for cache in self._fitness_caches)
+        self.execution_stats["fitness_cache_hits"] = hits
+        self.execution_stats["fitness_cache_misses"] = misses
+        self.execution_stats["fitness_cache_hit_rate"] = hits / (hits + misses) if hits + misses else 0.0
+
+    def _pareto_front(self, solutions: list[Dict[str, Any]]) -> list[Dict[str, Any]]:
+        """Non-dominated formatted solutions on price, store count and completeness, cheapest first"""
+        solutions = [solution for solution in solutions if solution and solution.get("stores")]
+        archive = ParetoArchive(copy_items=False)
+        archive.update(solutions, [solution_objectives(solution) for solution in solutions])
+        return sorted(archive, key=lambda solution: solution.get("total_price", float("inf")))
 
     def get_execution_time(self) -> float:
         """Get execution time"""
@@ -169,4 +240,9 @@ class BaseOptimizer(ABC):
                 "default": 0.001,
                 "description": "Relative change threshold for convergence",
             },
+            "stagnation_window": {
+                "type": "int",
+                "default": 10,
+                "description": "Generations over which the Pareto front must improve to keep going",
+            },
         }
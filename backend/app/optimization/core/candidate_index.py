@@ -0,0 +1,128 @@
+# backend/app/optimization/core/candidate_index.py
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from app.constants import CardQuality
+from .population_evaluator import map_distinct
+
+
+def _listing_prices(listings_df: pd.DataFrame) -> np.ndarray:
+    if "price" not in listings_df.columns:
+        return np.full(len(listings_df), 1000.0)
+    return listings_df["price"].to_numpy(dtype=np.float64)
+
+
+class CandidateIndex:
+    """
+    Listing candidates of every wishlist card, built once per optimization run.
+
+    Genes are laid out card by card in wishlist order, ``quantity`` genes per card. The index keeps
+    the card of every gene, the listings of every card as one flat array of row positions and the
+    running total of their sampling weights, so drawing a listing for any number of genes is a
+    single ``searchsorted`` instead of filtering the listings and rebuilding weights.
+    """
+
+    def __init__(
+        self,
+        listings_df: pd.DataFrame,
+        wishlist_df: pd.DataFrame,
+        weights: np.ndarray,
+        preferred_stores: Optional[set] = None,
+    ):
+        self.listings_df = listings_df
+        self.wishlist_df = wishlist_df
+        self.labels = listings_df.index.to_numpy()
+
+        card_codes, self.card_names = pd.factorize(wishlist_df["name"])
+        quantities = (
+            wishlist_df["quantity"].astype(int).clip(lower=0).to_numpy()
+            if "quantity" in wishlist_df.columns
+            else np.ones(len(wishlist_df), dtype=int)
+        )
+        self.gene_cards = np.repeat(card_codes, quantities)
+        n_cards = len(self.card_names)
+
+        listing_cards = pd.Index(self.card_names).get_indexer(listings_df["name"])
+        keep = listing_cards >= 0
+        if preferred_stores is not None:
+            # Cards sold by a preferred store only draw from those stores
+            preferred = keep & listings_df["site_name"].isin(preferred_stores).to_numpy()
+            has_preferred = np.bincount(listing_cards[preferred], minlength=n_cards) > 0
+            keep &= preferred | ~has_preferred[np.where(keep, listing_cards, 0)]
+
+        positions = np.flatnonzero(keep)
+        order = np.argsort(listing_cards[positions], kind="stable")
+        self.candidates = positions[order]
+        counts = np.bincount(listing_cards[self.candidates], minlength=n_cards)
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+        self.has_candidates = counts > 0
+
+        weights = np.asarray(weights, dtype=np.float64)[self.candidates]
+        self.cumulative = np.cumsum(np.where(np.isfinite(weights) & (weights > 0), weights, 0.0))
+
+    @classmethod
+    def by_quality_price(cls, listings_df: pd.DataFrame, wishlist_df: pd.DataFrame, **kwargs) -> "CandidateIndex":
+        """Candidates weighted by quality weight over price"""
+
+        def quality_weight(combination):
+            try:
+                return CardQuality.get_weight(CardQuality.normalize(combination.get("quality", "DMG")))
+            except Exception:
+                return np.nan
+
+        quality_weights = map_distinct(listings_df, ("quality",), quality_weight).astype(np.float64)
+        weights = quality_weights / (_listing_prices(listings_df) + 0.1)
+        # Listings whose quality can't be weighted get the default weight
+        return cls(listings_df, wishlist_df, np.where(np.isnan(quality_weights), 1.0, weights), **kwargs)
+
+    @classmethod
+    def by_price(cls, listings_df: pd.DataFrame, wishlist_df: pd.DataFrame, **kwargs) -> "CandidateIndex":
+        """Candidates weighted by inverse price"""
+        return cls(listings_df, wishlist_df, 1.0 / (_listing_prices(listings_df) + 0.1), **kwargs)
+
+    def built_for(self, listings_df: pd.DataFrame, wishlist_df: pd.DataFrame) -> bool:
+        return listings_df is self.listings_df and wishlist_df is self.wishlist_df
+
+    @property
+    def covers_all_cards(self) -> bool:
+        return bool(self.has_candidates.all())
+
+    def draw(self, cards: np.ndarray) -> List:
+        """
+        Draw one listing label per entry of ``cards``, proportionally to the listing weights.
+
+        Cards without candidates get a random row number, as before the index existed.
+        """
+        cards = np.asarray(cards, dtype=np.int64)
+        start, end = self.offsets[cards], self.offsets[cards + 1]
+        missing = end == start
+        random = np.random.random(len(cards))
+        if missing.all():
+            return np.random.randint(0, max(len(self.labels), 1), size=len(cards)).tolist()
+
+        base = np.where(start > 0, self.cumulative[np.maximum(start - 1, 0)], 0.0)
+        total = np.where(missing, 0.0, self.cumulative[np.maximum(end - 1, 0)] - base)
+        picks = np.searchsorted(self.cumulative, base + random * total, side="right")
+        # All-zero weights fall back to a uniform draw
+        uniform = start + (random * (end - start)).astype(np.int64)
+        picks = np.where(total > 0, np.clip(picks, start, end - 1), uniform)
+
+        labels = self.labels[self.candidates[np.where(missing, 0, picks)]].tolist()
+        for i in np.flatnonzero(missing):
+            labels[i] = int(np.random.randint(0, max(len(self.labels), 1)))
+        return labels
+
+    def draw_individual(self) -> List:
+        """One weighted draw for every gene"""
+        return self.draw(self.gene_cards)
+
+    def mutate(self, individual: Sequence, indpb: float) -> Sequence:
+        """Redraw each gene of ``individual`` in place with probability ``indpb``"""
+        length = min(len(individual), len(self.gene_cards))
+        genes = np.flatnonzero(np.random.random(length) < indpb)
+        if len(genes):
+            for gene, label in zip(genes.tolist(), self.draw(self.gene_cards[genes])):
+                individual[gene] = label
+        return individual
@@ -0,0 +1,88 @@
+# backend/app/optimization/core/fitness_cache.py
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .population_evaluator import PopulationEvaluator
+
+DEFAULT_FITNESS_CACHE_SIZE = 100_000
+
+
+class FitnessCache:
+    """
+    Bounded LRU cache of fitness tuples keyed by genotype.
+
+    Crossover and low-rate mutation keep producing offspring identical to their parents or to
+    earlier individuals; those are served from the cache and only new genotypes reach the scorer.
+    Genes of the slots of one card are interchangeable as long as every gene of the individual is
+    a listing of its slot's card, since every gene then counts towards its card. Such individuals
+    are keyed with the genes of each card sorted, so reordering within a card is a hit too; any
+    other individual is keyed on its genes as they are.
+    """
+
+    def __init__(self, evaluator: PopulationEvaluator, max_size: int = DEFAULT_FITNESS_CACHE_SIZE):
+        self.evaluator = evaluator
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._fitness: "OrderedDict[bytes, Tuple[float, ...]]" = OrderedDict()
+
+        self._slot_cards = np.asarray(evaluator.gene_cards, dtype=np.int64)
+        # A card with more slots than its required quantity (repeated wishlist names) keeps its first genes
+        slots_per_card = np.bincount(self._slot_cards, minlength=evaluator.n_cards)
+        self._canonical_slots = len(self._slot_cards) > 0 and bool((slots_per_card <= evaluator.required).all())
+
+    def __len__(self) -> int:
+        return len(self._fitness)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def keys(self, population: Sequence[Sequence]) -> List[bytes]:
+        positions, lengths = self.evaluator.gene_positions(population)
+        n_slots = len(self._slot_cards)
+        if self._canonical_slots and positions.shape[1] == n_slots:
+            slot_cards = np.broadcast_to(self._slot_cards, positions.shape)
+            canonical = (lengths == n_slots) & (positions >= 0).all(axis=1)
+            canonical &= (self.evaluator.card_ids[np.maximum(positions, 0)] == slot_cards).all(axis=1)
+            if canonical.any():
+                # Sorting by (card, listing) leaves the listings chosen for each card, in a fixed order
+                rows = positions[canonical]
+                order = np.lexsort((rows, slot_cards[: len(rows)]), axis=1)
+                positions = positions.copy()
+                positions[canonical] = np.take_along_axis(rows, order, axis=1)
+        return [row.tobytes() + length.tobytes() for row, length in zip(positions, lengths)]
+
+    def wrap(self, evaluate_population: Callable[[Sequence], List[Tuple[float, ...]]]) -> Callable:
+        """``evaluate_population`` answering repeated genotypes from the cache"""
+
+        def cached_evaluate_population(population):
+            keys = self.keys(population)
+            fitnesses: List[Any] = [None] * len(population)
+            pending: Dict[bytes, List[int]] = {}
+            for i, key in enumerate(keys):
+                fitness = self._fitness.get(key)
+                if fitness is not None:
+                    self._fitness.move_to_end(key)
+                    fitnesses[i] = fitness
+                    self.hits += 1
+                else:
+                    # Copies within the batch are scored once
+                    pending.setdefault(key, []).append(i)
+            self.misses += len(pending)
+            self.hits += sum(len(indices) - 1 for indices in pending.values())
+
+            if pending:
+                computed = evaluate_population([population[indices[0]] for indices in pending.values()])
+                for (key, indices), fitness in zip(pending.items(), computed):
+                    for i in indices:
+                        fitnesses[i] = fitness
+                    self._fitness[key] = fitness
+                while len(self._fitness) > self.max_size:
+                    self._fitness.popitem(last=False)
+            return fitnesses
+
+        return cached_evaluate_population
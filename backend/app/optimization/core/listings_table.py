@@ -0,0 +1,208 @@
+# backend/app/optimization/core/listings_table.py
+import logging
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+import numpy as np
+import pandas as pd
+
+from app.constants.card_mappings import CardQuality
+from app.constants.currency_constants import CURRENCY_TO_CAD_RATES
+
+logger = logging.getLogger(__name__)
+
+# Column order of the rows accepted by ListingsTable.from_rows
+LISTING_COLUMNS = (
+    "name",
+    "site_id",
+    "set_name",
+    "set_code",
+    "price",
+    "quality",
+    "quantity",
+    "version",
+    "foil",
+    "language",
+    "variant_id",
+)
+CATEGORICAL_COLUMNS = ("site_name", "name", "set_name", "set_code", "quality", "language", "version")
+LISTING_DTYPES = {
+    "site_id": "int32",
+    "price": "float32",
+    "quantity": "int32",
+    "foil": "bool",
+    "variant_id": "object",
+}
+# Columns of the DataFrame handed to the optimizers
+FRAME_COLUMNS = (
+    "site_name",
+    "name",
+    "set_name",
+    "set_code",
+    "price",
+    "quality",
+    "quantity",
+    "version",
+    "foil",
+    "language",
+    "site_id",
+    "variant_id",
+    "original_currency",
+    "original_price",
+)
+LISTING_DEFAULTS = {"version": "Standard", "foil": False, "language": "English", "variant_id": None}
+
+
+class ListingsTable:
+    """
+    Typed, columnar store of a scan's card listings.
+
+    Strings with few distinct values are categoricals and prices are float32, as scraped. Listings
+    stay in this table from the database to the optimizer, which gets a plain DataFrame through
+    ``to_frame()`` with prices converted to CAD.
+    """
+
+    def __init__(self, frame: Optional[pd.DataFrame] = None):
+        self.frame = self._typed(frame if frame is not None else pd.DataFrame(columns=LISTING_COLUMNS))
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence]) -> "ListingsTable":
+        """Build from tuples ordered like LISTING_COLUMNS, e.g. the rows of a column select"""
+        if not rows:
+            return cls()
+        columns = {name: np.asarray(values, dtype=object) for name, values in zip(LISTING_COLUMNS, zip(*rows))}
+        return cls(pd.DataFrame(columns))
+
+    @classmethod
+    def from_records(cls, records: List[Dict]) -> "ListingsTable":
+        """Build from scraped card dicts"""
+        if not records:
+            return cls()
+        return cls(pd.DataFrame.from_records(records, columns=list(LISTING_COLUMNS)))
+
+    @classmethod
+    def concat(cls, tables: Iterable["ListingsTable"]) -> "ListingsTable":
+        frames = [table.frame for table in tables if not table.empty]
+        if not frames:
+            return cls()
+        if len(frames) == 1:
+            return cls(frames[0])
+        # Categories differ between tables, union them instead of falling back to object columns
+        combined = {}
+        for column in frames[0].columns:
+            if column in CATEGORICAL_COLUMNS:
+                combined[column] = pd.api.types.union_categoricals(
+                    [frame[column] for frame in frames], ignore_order=True
+                )
+            else:
+                combined[column] = np.concatenate([frame[column].to_numpy() for frame in frames])
+        return cls(pd.DataFrame(combined))
+
+    @staticmethod
+    def _typed(frame: pd.DataFrame) -> pd.DataFrame:
+        frame = frame.copy()
+        for column, default in LISTING_DEFAULTS.items():
+            if column not in frame.columns:
+                frame[column] = default
+            elif default is not None and frame[column].dtype == object:
+                frame[column] = frame[column].where(frame[column].notna(), default)
+        for column in CATEGORICAL_COLUMNS:
+            if column in frame.columns and not isinstance(frame[column].dtype, pd.CategoricalDtype):
+                frame[column] = frame[column].astype("category")
+        for column, dtype in LISTING_DTYPES.items():
+            if column in frame.columns and frame[column].dtype != dtype:
+                if dtype.startswith("int"):
+                    frame[column] = pd.to_numeric(frame[column], errors="coerce").fillna(0)
+                frame[column] = frame[column].astype(dtype)
+        return frame.reset_index(drop=True)
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    @property
+    def empty(self) -> bool:
+        return self.frame.empty
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.frame.memory_usage(deep=True).sum())
+
+    def filter_pairs(self, pairs: Dict[str, Set[int]]) -> "ListingsTable":
+        """Keep the listings whose (card name, site id) is in ``pairs``"""
+        if self.empty or not pairs:
+            return ListingsTable()
+        wanted = pd.MultiIndex.from_tuples(
+            [(name, site_id) for name, site_ids in pairs.items() for site_id in site_ids]
+        )
+        keys = pd.MultiIndex.from_arrays([self.frame["name"].astype(str).str.strip(), self.frame["site_id"]])
+        return ListingsTable(self.frame[keys.isin(wanted)])
+
+    def prepare(self, site_names: Dict[int, str], site_currency_map: Dict[int, str]) -> "ListingsTable":
+        """
+        Keep the listings the optimizer can use and attach site name and currency.
+
+        Drops listings from unknown sites, with an unknown set code or out of stock, and
+        normalizes qualities once per distinct value.
+        """
+        frame = self.frame
+        site_name = frame["site_id"].map(site_names)
+        unknown_site = site_name.isna()
+        if unknown_site.any():
+            logger.warning(
+                f"[SITE INFO] No site info found for site_ids: {sorted(frame.loc[unknown_site, 'site_id'].unique())}, "
+                f"skipping {int(unknown_site.sum())} results."
+            )
+
+        set_code = frame["set_code"].astype(str)
+        unknown_set = frame["set_code"].isna() | set_code.isin(["", "unknown"])
+        if unknown_set.any():
+            logger.warning(
+                f"[SET CODE] Unknown set code for {int(unknown_set.sum())} results at final processing stage "
+                f"({', '.join(map(str, frame.loc[unknown_set, 'set_name'].unique()[:5]))}), skipping."
+            )
+
+        keep = ~unknown_site & ~unknown_set & frame["price"].notna() & (frame["quantity"] > 0)
+        frame = frame[keep].copy()
+        frame["site_name"] = site_name[keep].astype("category")
+        frame["original_currency"] = frame["site_id"].map(site_currency_map).fillna("CAD").astype("category")
+
+        qualities = frame["quality"].cat.categories
+        normalized = {}
+        for quality in qualities:
+            try:
+                normalized[quality] = CardQuality.validate_and_normalize(str(quality))
+            except ValueError:
+                normalized[quality] = "DMG"
+        frame["quality"] = frame["quality"].map(normalized).astype("category")
+
+        missing_variants = frame["variant_id"].isna()
+        if missing_variants.any():
+            logger.warning(f"{int(missing_variants.sum())} listings are missing a variant_id")
+        return ListingsTable(frame)
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Plain DataFrame for the optimizers, sorted by name and price.
+
+        Prices are widened back to two-decimal float64 and converted to CAD; the price as listed is
+        kept in ``original_price``.
+        """
+        frame = pd.DataFrame(
+            {
+                column: (
+                    self.frame[column].astype(object).where(self.frame[column].notna(), None)
+                    if column in CATEGORICAL_COLUMNS or column == "original_currency"
+                    else self.frame[column]
+                )
+                for column in self.frame.columns
+            }
+        )
+        frame["site_id"] = frame["site_id"].astype("int64")
+        frame["quantity"] = frame["quantity"].astype("int64")
+        frame["original_price"] = frame["price"].astype("float64").round(2)
+        if "original_currency" in frame.columns:
+            rates = frame["original_currency"].map(CURRENCY_TO_CAD_RATES).fillna(1.0)
+            frame["price"] = frame["original_price"] * rates
+        else:
+            frame["price"] = frame["original_price"]
+        ordered = [column for column in FRAME_COLUMNS if column in frame.columns]
+        return frame[ordered].sort_values(["name", "price"])
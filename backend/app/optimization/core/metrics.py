@@ -1,5 +1,10 @@
 # backend/app/optimization/core/metrics.py
+import math
 import time
+from typing import Any, Dict, List, Optional
+
+# Timings in performance_stats that are not phases of the run
+NON_PHASE_TIMINGS = ("start_time", "end_time", "execution_time")
 
 
 class OptimizationMetrics:
@@ -8,8 +13,10 @@ class OptimizationMetrics:
     def __init__(self):
         self.metrics = {}
 
-    def record_optimization(self, algorithm, execution_time, solution_quality, problem_size, problem_characteristics):
-        """Record optimization metrics"""
+    def record_optimization(
+        self, algorithm, execution_time, solution_quality, problem_size, problem_characteristics, run=None
+    ):
+        """Record optimization metrics, ``run`` being the flat record built by build_run"""
         if algorithm not in self.metrics:
             self.metrics[algorithm] = []
 
@@ -19,10 +26,68 @@ class OptimizationMetrics:
                 "solution_quality": solution_quality,
                 "problem_size": problem_size,
                 "problem_characteristics": problem_characteristics,
+                "run": run,
                 "timestamp": time.time(),
             }
         )
 
+    def get_runs(self) -> List[Dict[str, Any]]:
+        """Flat records of the runs recorded with one, as stored in optimization_run_metrics"""
+        return [entry["run"] for entries in self.metrics.values() for entry in entries if entry.get("run")]
+
+    @staticmethod
+    def build_run(
+        algorithm: str,
+        result,
+        problem_characteristics: Dict[str, Any],
+        solution_quality: float,
+        time_limit: Optional[float] = None,
+        auto_selected: bool = False,
+    ) -> Dict[str, Any]:
+        """Flat record of a run: problem characteristics, algorithm key, phase timings and outcome"""
+
+        def number(value, cast=float):
+            try:
+                value = cast(value)
+            except (TypeError, ValueError):
+                return None
+            return value if math.isfinite(value) else None
+
+        stats = result.performance_stats or {}
+        phase_timings = {
+            name: round(float(value), 4)
+            for name, value in stats.items()
+            if name.endswith("_time") and name not in NON_PHASE_TIMINGS and isinstance(value, (int, float))
+        }
+        reduction = stats.get("problem_reduction")
+        if isinstance(reduction, dict) and "elapsed_time" in reduction:
+            phase_timings["pruning_time"] = round(float(reduction["elapsed_time"]), 4)
+
+        solution = result.best_solution or {}
+        completeness = solution.get("completeness_by_quantity")
+        if completeness is None and solution.get("cards_required_total"):
+            completeness = solution.get("nbr_card_in_solution", 0) / solution["cards_required_total"]
+
+        return {
+            "algorithm": algorithm,
+            "auto_selected": auto_selected,
+            "num_cards": int(problem_characteristics["num_cards"]),
+            "num_stores": int(problem_characteristics["num_stores"]),
+            "total_listings": int(problem_characteristics["total_listings"]),
+            "avg_stores_per_card": number(problem_characteristics.get("avg_stores_per_card")),
+            "card_coverage": number(problem_characteristics.get("card_coverage")),
+            "price_variance": number(problem_characteristics.get("price_variance")),
+            "complexity_score": number(problem_characteristics.get("complexity_score")),
+            "cost_lower_bound": number(problem_characteristics.get("cost_lower_bound")),
+            "time_limit": number(time_limit),
+            "execution_time": float(result.execution_time or 0.0),
+            "phase_timings": phase_timings,
+            "total_cost": number(solution.get("total_price")) if solution else None,
+            "completeness": number(completeness),
+            "number_store": number(solution.get("number_store"), int) if solution else None,
+            "solution_quality": number(solution_quality),
+        }
+
     def get_recent_runs(self, algorithm, limit=5):
         return self.metrics.get(algorithm, [])[-limit:]
 
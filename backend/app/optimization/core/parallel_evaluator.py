@@ -0,0 +1,161 @@
+# backend/app/optimization/core/parallel_evaluator.py
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import billiard
+import numpy as np
+
+from .population_evaluator import SCORING_ARRAYS, PopulationEvaluator, PopulationScores
+
+logger = logging.getLogger(__name__)
+
+EVALUATION_BACKENDS = ("serial", "process")
+# Smaller chunks cost more to ship to a worker than to score in place
+MIN_CHUNK_SIZE = 32
+
+# Evaluator of a worker process, mapped onto the shared listing arrays by its initializer
+_worker_evaluator: Optional[PopulationEvaluator] = None
+_worker_memory: List[shared_memory.SharedMemory] = []
+
+
+def init_evaluation_worker(
+    descriptors: Dict[str, Tuple[str, tuple, str]], required_total: int, n_stores: int, untrack: bool = False
+):
+    global _worker_evaluator
+    arrays = {}
+    for name, (memory_name, shape, dtype) in descriptors.items():
+        memory = shared_memory.SharedMemory(name=memory_name)
+        if untrack:
+            # A worker with a resource tracker of its own would unlink the memory when it exits
+            resource_tracker.unregister(memory._name, "shared_memory")
+        _worker_memory.append(memory)
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+    _worker_evaluator = PopulationEvaluator.from_arrays(arrays, required_total, n_stores)
+
+
+def score_chunk(positions: np.ndarray, lengths: np.ndarray) -> PopulationScores:
+    return _worker_evaluator.score_positions(positions, lengths)
+
+
+def resolve_n_jobs(n_jobs: int) -> int:
+    """Worker count for an ``n_jobs`` setting, -1 meaning every core"""
+    cores = os.cpu_count() or 1
+    return cores if n_jobs is None or n_jobs < 0 else min(n_jobs, cores)
+
+
+class ParallelPopulationEvaluator:
+    """
+    Scores populations across a pool of worker processes.
+
+    The scoring arrays of a PopulationEvaluator are copied into shared memory once and mapped by the
+    workers when they start, so each task only ships the gene positions of its chunk of the
+    population. Genes are turned into positions in the calling process. Populations too small to
+    split are scored in place, as is everything when the pool cannot be started or breaks.
+
+    Inside a daemonic process, such as a Celery prefork worker, the standard library refuses to
+    start children, so the workers are started with billiard, Celery's fork of multiprocessing,
+    which allows it. Every task of the worker then starts its own pool: size ``n_jobs`` with the
+    worker concurrency in mind.
+    """
+
+    def __init__(self, evaluator: PopulationEvaluator, n_jobs: int = -1):
+        self.evaluator = evaluator
+        self.n_jobs = resolve_n_jobs(n_jobs)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._daemonic_pool = None
+        self._memory: List[shared_memory.SharedMemory] = []
+
+    @property
+    def started(self) -> bool:
+        return self._executor is not None or self._daemonic_pool is not None
+
+    def start(self) -> bool:
+        if self.started:
+            return True
+        if self.n_jobs <= 1:
+            return False
+        try:
+            descriptors = {}
+            for name in SCORING_ARRAYS:
+                array = np.ascontiguousarray(getattr(self.evaluator, name))
+                memory = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                self._memory.append(memory)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=memory.buf)[...] = array
+                descriptors[name] = (memory.name, array.shape, array.dtype.str)
+
+            initargs = (descriptors, self.evaluator.required_total, self.evaluator.n_stores)
+            if multiprocessing.current_process().daemon:
+                self._daemonic_pool = billiard.get_context("spawn").Pool(
+                    processes=self.n_jobs, initializer=init_evaluation_worker, initargs=(*initargs, True)
+                )
+            else:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.n_jobs,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=init_evaluation_worker,
+                    initargs=initargs,
+                )
+            logger.info(f"Started {self.n_jobs} fitness evaluation workers")
+            return True
+        except Exception as e:
+            logger.warning(f"Process pool unavailable, evaluating fitness serially: {str(e)}")
+            self.close()
+            return False
+
+    def evaluate(self, population: Sequence[Sequence]) -> PopulationScores:
+        positions, lengths = self.evaluator.gene_positions(population)
+        n_chunks = min(self.n_jobs, len(lengths) // MIN_CHUNK_SIZE)
+        if not self.started or n_chunks <= 1:
+            return self.evaluator.score_positions(positions, lengths)
+
+        bounds = np.linspace(0, len(lengths), n_chunks + 1).astype(int)
+        chunks = [(positions[start:end], lengths[start:end]) for start, end in zip(bounds[:-1], bounds[1:])]
+        try:
+            if self._daemonic_pool is not None:
+                return PopulationScores.concat(self._daemonic_pool.starmap(score_chunk, chunks))
+            futures = [self._executor.submit(score_chunk, *chunk) for chunk in chunks]
+            return PopulationScores.concat([future.result() for future in futures])
+        except Exception as e:
+            logger.warning(f"Process pool failed, evaluating fitness serially from now on: {str(e)}")
+            self.close()
+            return self.evaluator.score_positions(positions, lengths)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        if self._daemonic_pool is not None:
+            self._daemonic_pool.terminate()
+            self._daemonic_pool.join()
+            self._daemonic_pool = None
+        for memory in self._memory:
+            memory.close()
+            memory.unlink()
+        self._memory = []
+
+    def __enter__(self) -> "ParallelPopulationEvaluator":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def register_population_evaluation(toolbox, evaluate_population: Callable[[Sequence], List[Tuple[float, ...]]]):
+    """
+    Register ``evaluate`` and a ``map`` scoring ``toolbox.map(toolbox.evaluate, individuals)`` as one
+    population, so DEAP-style evaluation loops go through the batch (and possibly parallel) scorer.
+    """
+    toolbox.register("evaluate", lambda individual: evaluate_population([individual])[0])
+
+    def map_evaluations(func: Callable, iterable: Iterable) -> List:
+        items = list(iterable)
+        if func is toolbox.evaluate:
+            return evaluate_population(items) if items else []
+        return list(map(func, items))
+
+    toolbox.register("map", map_evaluations)
@@ -0,0 +1,229 @@
+# backend/app/optimization/core/pareto.py
+import copy
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Rows of the pairwise dominance matrix computed at once, bounding memory on large populations
+DOMINANCE_CHUNK_SIZE = 1024
+DEFAULT_ARCHIVE_SIZE = 100
+
+
+def minimization_objectives(population: Sequence) -> np.ndarray:
+    """
+    Objectives of DEAP individuals as an (individuals x objectives) matrix to minimize.
+
+    Weighted values are negated so every objective is minimized whatever its fitness weight sign.
+    Non-finite values (failed evaluations) are replaced by one more than the worst finite value.
+    """
+    objectives = -np.array([individual.fitness.wvalues for individual in population], dtype=np.float64)
+    if objectives.size == 0:
+        return objectives.reshape(len(population), 0)
+    finite = np.isfinite(objectives)
+    if not finite.all():
+        worst = np.where(finite, objectives, -np.inf).max(axis=0)
+        worst = np.where(np.isfinite(worst), worst + 1.0, 0.0)
+        objectives = np.where(finite, objectives, worst)
+    return objectives
+
+
+def dominance_matrix(objectives: np.ndarray) -> np.ndarray:
+    """``dominates[i, j]`` is True when row ``i`` Pareto-dominates row ``j`` (minimization)"""
+    n = len(objectives)
+    dominates = np.zeros((n, n), dtype=bool)
+    for start in range(0, n, DOMINANCE_CHUNK_SIZE):
+        block = objectives[start : start + DOMINANCE_CHUNK_SIZE, None, :]
+        dominates[start : start + DOMINANCE_CHUNK_SIZE] = (block <= objectives[None]).all(axis=2) & (
+            block < objectives[None]
+        ).any(axis=2)
+    return dominates
+
+
+def non_dominated_ranks(objectives: np.ndarray, k: Optional[int] = None) -> np.ndarray:
+    """
+    Front of every row, 0 being the non-dominated one, by peeling fronts off the dominance matrix.
+
+    With ``k``, sorting stops once the fronts hold at least ``k`` rows; the other rows get -1.
+    """
+    n = len(objectives)
+    ranks = np.full(n, -1, dtype=np.int64)
+    if n == 0:
+        return ranks
+    dominates = dominance_matrix(objectives)
+    dominated_by = dominates.sum(axis=0)
+    remaining = np.ones(n, dtype=bool)
+    limit = n if k is None else min(k, n)
+    ranked, front = 0, 0
+    while ranked < limit:
+        current = remaining & (dominated_by == 0)
+        if not current.any():
+            break
+        ranks[current] = front
+        remaining &= ~current
+        dominated_by -= dominates[current].sum(axis=0)
+        ranked += int(current.sum())
+        front += 1
+    return ranks
+
+
+def non_dominated_mask(objectives: np.ndarray) -> np.ndarray:
+    """
+    Rows no other row dominates (minimization), without building the dominance matrix.
+
+    Rows are visited in lexicographic order, so a row can only be dominated by one visited
+    before it, and only needs comparing to the non-dominated rows found so far (ENS sequential
+    search). With two objectives that reduces to a running minimum of the second one, O(N log N).
+    Identical rows share the outcome.
+    """
+    n = len(objectives)
+    if n == 0:
+        return np.zeros(0, dtype=bool)
+    unique, inverse = np.unique(objectives, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    # np.unique sorts rows lexicographically
+    if unique.shape[1] == 1:
+        kept = np.arange(len(unique)) == 0
+    elif unique.shape[1] == 2:
+        earlier_best = np.concatenate(([np.inf], np.minimum.accumulate(unique[:-1, 1])))
+        kept = earlier_best > unique[:, 1]
+    else:
+        kept = np.zeros(len(unique), dtype=bool)
+        front = np.empty_like(unique)
+        size = 0
+        for i, row in enumerate(unique):
+            # Earlier distinct rows that are no worse anywhere dominate this one
+            if size and (front[:size] <= row).all(axis=1).any():
+                continue
+            front[size] = row
+            size += 1
+            kept[i] = True
+    return kept[inverse]
+
+
+def crowding_distances(objectives: np.ndarray) -> np.ndarray:
+    """NSGA-II crowding distance of every row, infinite for the extremes of each objective"""
+    n, m = objectives.shape
+    distances = np.zeros(n)
+    if n <= 2:
+        return np.full(n, np.inf)
+    for j in range(m):
+        order = np.argsort(objectives[:, j], kind="stable")
+        values = objectives[order, j]
+        span = values[-1] - values[0]
+        distances[order[[0, -1]]] = np.inf
+        if span > 0:
+            distances[order[1:-1]] += (values[2:] - values[:-2]) / span
+    return distances
+
+
+def hypervolume_contributions(objectives: np.ndarray) -> np.ndarray:
+    """Exclusive hypervolume of every point of a two-objective front, infinite for its extremes"""
+    order = np.argsort(objectives[:, 0], kind="stable")
+    f1, f2 = objectives[order, 0], objectives[order, 1]
+    contributions = np.full(len(objectives), np.inf)
+    if len(objectives) > 2:
+        contributions[order[1:-1]] = (f1[2:] - f1[1:-1]) * (f2[:-2] - f2[1:-1])
+    return contributions
+
+
+def hypervolume(objectives: np.ndarray, samples: np.ndarray) -> float:
+    """
+    Monte Carlo hypervolume: share of ``samples`` (points of the reference box) dominated by
+    some row of ``objectives``, both already normalized (minimization).
+    """
+    if len(objectives) == 0 or len(samples) == 0:
+        return 0.0
+    dominated = np.zeros(len(samples), dtype=bool)
+    for start in range(0, len(samples), DOMINANCE_CHUNK_SIZE):
+        block = samples[start : start + DOMINANCE_CHUNK_SIZE, None, :]
+        dominated[start : start + DOMINANCE_CHUNK_SIZE] = (objectives[None] <= block).all(axis=2).any(axis=1)
+    return float(dominated.mean())
+
+
+def inverted_generational_distance(objectives: np.ndarray, reference_front: np.ndarray) -> float:
+    """Mean distance of every ``reference_front`` row to its closest row of ``objectives``"""
+    if len(objectives) == 0 or len(reference_front) == 0:
+        return np.inf
+    distances = np.linalg.norm(reference_front[:, None, :] - objectives[None, :, :], axis=2)
+    return float(distances.min(axis=1).mean())
+
+
+class ParetoArchive:
+    """
+    Bounded archive of mutually non-dominated solutions, with incremental insertion.
+
+    ``update`` merges a batch into the archive with one non-dominated filter over both. When the
+    archive outgrows ``max_size``, the most crowded member is dropped one at a time: smallest
+    hypervolume contribution with two objectives, smallest crowding distance otherwise. Members
+    with identical objectives are kept once, the earliest one winning. Items are copied on
+    admission when ``copy_items`` is set, as DEAP individuals keep being modified.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_ARCHIVE_SIZE, copy_items: bool = True):
+        self.max_size = max_size
+        self.copy_items = copy_items
+        self.items: list = []
+        self.objectives: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, i):
+        return self.items[i]
+
+    def update(self, items: Sequence, objectives: Optional[np.ndarray] = None) -> int:
+        """
+        Insert ``items`` whose ``objectives`` (minimized) aren't dominated; DEAP individuals default
+        to their fitness. Returns the number of items admitted.
+        """
+        if len(items) == 0:
+            return 0
+        if objectives is None:
+            objectives = minimization_objectives(items)
+        objectives = np.asarray(objectives, dtype=np.float64).reshape(len(items), -1)
+
+        current = self.objectives if self.objectives is not None else objectives[:0]
+        combined = np.vstack((current, objectives))
+        _, first = np.unique(combined, axis=0, return_index=True)
+        kept = np.zeros(len(combined), dtype=bool)
+        kept[first] = True
+        kept &= non_dominated_mask(combined)
+        kept = np.flatnonzero(kept)
+
+        while len(kept) > self.max_size:
+            if combined.shape[1] == 2:
+                crowding = hypervolume_contributions(combined[kept])
+            else:
+                crowding = crowding_distances(combined[kept])
+            kept = np.delete(kept, int(np.argmin(crowding)))
+
+        n_current = len(current)
+        admitted = 0
+        members = []
+        for i in kept.tolist():
+            if i < n_current:
+                members.append(self.items[i])
+            else:
+                item = items[i - n_current]
+                members.append(copy.deepcopy(item) if self.copy_items else item)
+                admitted += 1
+        self.items = members
+        self.objectives = combined[kept]
+        return admitted
+
+
+def solution_objectives(solution: Dict[str, Any]) -> Tuple[float, float, float]:
+    """Price, store count and incompleteness of a formatted solution, all to minimize"""
+    completeness = solution.get("completeness_by_quantity")
+    if completeness is None:
+        required = solution.get("cards_required_total", 0)
+        found = solution.get("cards_found_total", solution.get("nbr_card_in_solution", 0))
+        completeness = found / required if required else 0.0
+    return (
+        float(solution.get("total_price", np.inf)),
+        float(solution.get("number_store", len(solution.get("stores", [])))),
+        -float(completeness),
+    )
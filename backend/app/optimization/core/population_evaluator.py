@@ -0,0 +1,261 @@
+# backend/app/optimization/core/population_evaluator.py
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.constants import CardLanguage, CardQuality
+
+logger = logging.getLogger(__name__)
+
+# Listing attributes a card's penalty depends on, besides its price
+PENALTY_COLUMNS = ("name", "quality", "language", "version", "foil", "set_name")
+DEFAULT_QUALITY_SCORE = 0.5
+# Arrays scoring depends on, everything else is only needed to map genes to listing rows
+SCORING_ARRAYS = ("card_ids", "store_ids", "required", "unit_cost", "quality_score", "usable")
+# Label lookups use a dense array while the largest label stays within this many slots per listing
+DENSE_LOOKUP_RATIO = 8
+
+
+def quality_language_score(quality: Any, language: Any) -> float:
+    """Quality score of a listing (1.0 for NM) divided by its language weight"""
+    max_weight = max(CardQuality.get_weight(q.value) for q in CardQuality)
+    score = 1 - (CardQuality.get_weight(CardQuality.normalize(quality)) - 1) / (max_weight - 1)
+    return score / CardLanguage.get_weight(CardLanguage.normalize(language))
+
+
+def map_distinct(frame: pd.DataFrame, columns: Sequence[str], func: Callable[[Dict[str, Any]], Any]) -> np.ndarray:
+    """
+    Apply ``func`` once per distinct combination of ``columns`` and broadcast the results to every row.
+
+    ``func`` receives the combination as a dict; missing columns are left out of it.
+    """
+    present = [column for column in columns if column in frame.columns]
+    if frame.empty:
+        return np.empty(0, dtype=object)
+    if not present:
+        return np.full(len(frame), func({}), dtype=object)
+    codes = frame.groupby(present, dropna=False, sort=False).ngroup().to_numpy()
+    _, first_rows = np.unique(codes, return_index=True)
+    combinations = frame[present].iloc[first_rows].to_dict("records")
+    results = np.empty(len(combinations), dtype=object)
+    results[:] = [func(combination) for combination in combinations]
+    return results[codes]
+
+
+@dataclass
+class PopulationScores:
+    """Totals of an evaluated population, one entry per individual"""
+
+    cost: np.ndarray
+    quality: np.ndarray
+    cards_found: np.ndarray
+    completeness: np.ndarray
+    store_count: np.ndarray
+    invalid: np.ndarray
+    filtered: np.ndarray
+    duplicates: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.cost)
+
+    @classmethod
+    def concat(cls, parts: Sequence["PopulationScores"]) -> "PopulationScores":
+        return cls(
+            **{name: np.concatenate([getattr(part, name) for part in parts]) for name in cls.__dataclass_fields__}
+        )
+
+
+class PopulationEvaluator:
+    """
+    Scores whole populations of listing-index individuals with array operations.
+
+    Listings are turned into arrays once: unit cost, quality score, store id and card id. A gene
+    counts towards its card until the wishlist quantity is reached, in gene order, exactly like
+    walking the individual card by card. Genes that are not listing labels are invalid, and
+    listings marked unusable (strict preference mismatches) are skipped.
+    """
+
+    def __init__(
+        self,
+        listings_df: pd.DataFrame,
+        wishlist_df: pd.DataFrame,
+        unit_cost: np.ndarray,
+        quality_score: np.ndarray,
+        usable: Optional[np.ndarray] = None,
+    ):
+        required_by_name = {name: int(quantity) for name, quantity in zip(wishlist_df["name"], wishlist_df["quantity"])}
+        self.required_total = int(wishlist_df["quantity"].sum())
+        # Cards missing from the wishlist share a last slot that requires nothing
+        self.required = np.array(list(required_by_name.values()) + [0], dtype=np.int64)
+        self.n_cards = len(self.required)
+        # Card of every gene slot, individuals being laid out card by card in wishlist order
+        quantities = wishlist_df["quantity"].astype(int).clip(lower=0).to_numpy()
+        self.gene_cards = np.repeat(pd.Index(list(required_by_name)).get_indexer(wishlist_df["name"]), quantities)
+
+        card_ids = pd.Index(list(required_by_name)).get_indexer(listings_df["name"])
+        self.card_ids = np.where(card_ids < 0, self.n_cards - 1, card_ids).astype(np.int64)
+        store_ids, self.stores = pd.factorize(listings_df["site_name"])
+        self.store_ids = store_ids.astype(np.int64)
+        self.n_stores = max(len(self.stores), 1)
+
+        self.unit_cost = np.asarray(unit_cost, dtype=np.float64)
+        self.quality_score = np.asarray(quality_score, dtype=np.float64)
+        self.usable = np.ones(len(listings_df), dtype=bool) if usable is None else np.asarray(usable, dtype=bool)
+
+        self.index = listings_df.index
+        self._dense_lookup = self._build_dense_lookup(self.index)
+
+    @classmethod
+    def from_penalties(
+        cls,
+        listings_df: pd.DataFrame,
+        wishlist_df: pd.DataFrame,
+        penalty_calculator,
+        card_preferences: Dict[str, Dict[str, Any]],
+        config,
+    ) -> "PopulationEvaluator":
+        """
+        Evaluator charging each listing its preference-penalized price.
+
+        Penalties and quality scores only depend on a few listing attributes, so they are computed
+        once per distinct combination rather than once per listing.
+        """
+
+        def penalty(combination):
+            try:
+                _, multiplier, reason = penalty_calculator.compute_single_penalty(
+                    card_data={**combination, "price": 1.0},
+                    preferences=card_preferences.get(combination.get("name"), {}),
+                    config=config,
+                )
+                return multiplier, reason == "strict_filter"
+            except Exception as e:
+                logger.warning(f"Penalty calculation failed for card {combination.get('name')}: {str(e)}")
+                return None, False
+
+        def quality(combination):
+            try:
+                return quality_language_score(combination.get("quality", "DMG"), combination.get("language", "Unknown"))
+            except Exception as e:
+                logger.warning(f"Quality score failed for {combination}: {str(e)}")
+                return None
+
+        price = (
+            listings_df["price"].to_numpy(dtype=np.float64)
+            if "price" in listings_df.columns
+            else np.full(len(listings_df), 1000.0)
+        )
+        penalties = map_distinct(listings_df, PENALTY_COLUMNS, penalty)
+        multiplier = np.array([np.nan if p is None else p[0] for p in penalties], dtype=np.float64)
+        strict = np.array([p[1] for p in penalties], dtype=bool)
+        scores = map_distinct(listings_df, ("quality", "language"), quality)
+        score = np.array([np.nan if s is None else s for s in scores], dtype=np.float64)
+
+        # A strict mismatch on a free listing divides by zero and falls back to the listed price
+        failed = np.isnan(multiplier) | (strict & (price == 0))
+        strict &= ~failed
+        penalized = price * np.where(failed, 1.0, multiplier)
+        # A failed quality score charges the listed price on top of the penalized one
+        unit_cost = np.where(failed, price, np.where(np.isnan(score), penalized + price, penalized))
+        quality_score = np.where(failed | np.isnan(score), DEFAULT_QUALITY_SCORE, score)
+        return cls(listings_df, wishlist_df, unit_cost, quality_score, usable=~strict)
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], required_total: int, n_stores: int) -> "PopulationEvaluator":
+        """Evaluator that can only ``score_positions``, built from the SCORING_ARRAYS of another one"""
+        evaluator = cls.__new__(cls)
+        for name in SCORING_ARRAYS:
+            setattr(evaluator, name, arrays[name])
+        evaluator.n_cards = len(evaluator.required)
+        evaluator.required_total = required_total
+        evaluator.n_stores = n_stores
+        evaluator.index = None
+        evaluator._dense_lookup = None
+        return evaluator
+
+    @staticmethod
+    def _build_dense_lookup(index: pd.Index) -> Optional[np.ndarray]:
+        if len(index) == 0 or not pd.api.types.is_integer_dtype(index) or not index.is_unique:
+            return None
+        low, high = int(index.min()), int(index.max())
+        if low < 0 or high >= DENSE_LOOKUP_RATIO * len(index) + 1024:
+            return None
+        lookup = np.full(high + 1, -1, dtype=np.int64)
+        lookup[index.to_numpy()] = np.arange(len(index))
+        return lookup
+
+    def gene_positions(self, population: Sequence[Sequence]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Row position of every gene as an (individuals x genes) matrix, -1 for invalid genes or
+        padding, and the length of every individual.
+        """
+        lengths = np.fromiter((len(individual) for individual in population), dtype=np.int64, count=len(population))
+        width = int(lengths.max()) if len(lengths) else 0
+        present = np.arange(width) < lengths[:, None]
+        genes = [gene for individual in population for gene in individual]
+
+        positions = np.full(present.shape, -1, dtype=np.int64)
+        if not genes:
+            return positions, lengths
+        if self._dense_lookup is not None:
+            try:
+                labels = np.asarray(genes, dtype=np.int64)
+                in_range = (labels >= 0) & (labels < len(self._dense_lookup))
+                positions[present] = np.where(in_range, self._dense_lookup[np.where(in_range, labels, 0)], -1)
+                return positions, lengths
+            except (TypeError, ValueError, OverflowError):
+                pass
+        positions[present] = self.index.get_indexer(pd.Index(genes, dtype=object))
+        return positions, lengths
+
+    def evaluate(self, population: Sequence[Sequence]) -> PopulationScores:
+        """Score every individual of ``population`` at once"""
+        return self.score_positions(*self.gene_positions(population))
+
+    def score_positions(self, positions: np.ndarray, lengths: np.ndarray) -> PopulationScores:
+        """Score individuals given as the row positions of their genes (see ``gene_positions``)"""
+        n_individuals = len(lengths)
+        valid = positions >= 0
+        invalid = lengths - valid.sum(axis=1)
+
+        # Row-major flattening keeps each individual's genes in order
+        rows = np.nonzero(valid)[0]
+        listing = positions[valid]
+        usable = self.usable[listing]
+        filtered = np.bincount(rows[~usable], minlength=n_individuals)
+        rows, listing = rows[usable], listing[usable]
+
+        # Rank of each gene among the earlier genes of the same card in the same individual
+        keys = rows * self.n_cards + self.card_ids[listing]
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        group_start = np.ones(len(keys), dtype=bool)
+        group_start[1:] = sorted_keys[1:] != sorted_keys[:-1]
+        first = np.maximum.accumulate(np.where(group_start, np.arange(len(keys)), 0))
+        rank = np.empty(len(keys), dtype=np.int64)
+        rank[order] = np.arange(len(keys)) - first
+        kept = rank < self.required[self.card_ids[listing]]
+
+        duplicates = np.bincount(rows[~kept], minlength=n_individuals)
+        rows, listing = rows[kept], listing[kept]
+        cards_found = np.bincount(rows, minlength=n_individuals)
+        cost = np.bincount(rows, weights=self.unit_cost[listing], minlength=n_individuals)
+        quality_total = np.bincount(rows, weights=self.quality_score[listing], minlength=n_individuals)
+        quality = np.divide(quality_total, cards_found, out=np.zeros(n_individuals), where=cards_found > 0)
+        store_pairs = np.unique(rows * self.n_stores + self.store_ids[listing])
+        store_count = np.bincount(store_pairs // self.n_stores, minlength=n_individuals)
+        completeness = cards_found / self.required_total if self.required_total > 0 else np.zeros(n_individuals)
+
+        return PopulationScores(
+            cost=cost,
+            quality=quality,
+            cards_found=cards_found,
+            completeness=completeness,
+            store_count=store_count,
+            invalid=invalid,
+            filtered=filtered,
+            duplicates=duplicates,
+        )
@@ -0,0 +1,177 @@
+# backend/app/optimization/core/solution_state.py
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .population_evaluator import DEFAULT_QUALITY_SCORE, map_distinct, quality_language_score
+
+logger = logging.getLogger(__name__)
+
+# Card fields identifying the listing a solution card was bought from
+LISTING_MATCH_COLUMNS = ("name", "site_name", "price", "quality", "language", "foil", "set_code", "version")
+
+
+class SolutionState:
+    """
+    Running totals of a purchase plan, for local search.
+
+    The plan is a list of slots, one per card copy bought, each holding the row position of its
+    listing. Cost, quality sum, copies bought per store and per listing, and the number of stores
+    used are kept up to date, so the objective change of moving a slot to another listing of the
+    same card is known in O(1) before committing to the move.
+
+    Listings are charged their ``weighted_price`` when the frame was penalized, so that a cheaper
+    listing of another version, foil or set doesn't look like an improvement. Listings not
+    ``usable`` (rejected by strict preferences) are never moved to.
+    """
+
+    def __init__(
+        self,
+        listings_df: pd.DataFrame,
+        wishlist_df: pd.DataFrame,
+        slots: Sequence[int],
+        usable: Optional[np.ndarray] = None,
+    ):
+        self.listings_df = listings_df
+        self.required_total = int(wishlist_df["quantity"].sum())
+
+        listed_price = listings_df["price"].to_numpy(dtype=np.float64)
+        if "weighted_price" in listings_df.columns:
+            weighted_price = listings_df["weighted_price"].to_numpy(dtype=np.float64)
+            self.price = np.where(np.isfinite(weighted_price), weighted_price, listed_price)
+        else:
+            self.price = listed_price
+        self.usable = np.ones(len(listings_df), dtype=bool) if usable is None else np.asarray(usable, dtype=bool)
+        store_ids, self.store_names = pd.factorize(listings_df["site_name"])
+        self.store_ids = store_ids.astype(np.int64)
+        self.card_ids = pd.Index(pd.unique(wishlist_df["name"])).get_indexer(listings_df["name"]).astype(np.int64)
+
+        def quality(combination):
+            try:
+                return quality_language_score(combination.get("quality", "DMG"), combination.get("language", "Unknown"))
+            except Exception:
+                return DEFAULT_QUALITY_SCORE
+
+        self.quality_score = map_distinct(listings_df, ("quality", "language"), quality).astype(np.float64)
+        self.stock = (
+            listings_df["quantity"].fillna(0).to_numpy(dtype=np.int64)
+            if "quantity" in listings_df.columns
+            else np.full(len(listings_df), np.iinfo(np.int64).max)
+        )
+
+        # Usable listings of every card, cheapest first
+        listed = np.flatnonzero((self.card_ids >= 0) & self.usable)
+        self._card_listings = listed[np.lexsort((self.price[listed], self.card_ids[listed]))]
+        counts = np.bincount(self.card_ids[listed], minlength=len(pd.unique(wishlist_df["name"])))
+        self._card_offsets = np.concatenate(([0], np.cumsum(counts)))
+
+        self.slots = np.asarray(slots, dtype=np.int64)
+        self.cost = float(self.price[self.slots].sum())
+        self.quality_sum = float(self.quality_score[self.slots].sum())
+        self.store_units = np.bincount(self.store_ids[self.slots], minlength=len(self.store_names))
+        self.store_count = int((self.store_units > 0).sum())
+        self.usage = np.bincount(self.slots, minlength=len(listings_df))
+        self.moves = 0
+
+    @classmethod
+    def from_solution(
+        cls,
+        solution: Dict[str, Any],
+        listings_df: pd.DataFrame,
+        wishlist_df: pd.DataFrame,
+        usable: Optional[np.ndarray] = None,
+    ) -> Optional["SolutionState"]:
+        """
+        State of a formatted solution, its cards matched back to their listings. None when a card
+        can't be matched, as moves would then be charged against the wrong totals.
+        """
+        cards = [card for store in solution.get("stores", []) for card in store.get("cards", [])]
+        if not cards or listings_df.empty or "price" not in listings_df.columns:
+            return None
+        columns = [c for c in LISTING_MATCH_COLUMNS if c in listings_df.columns and all(c in card for card in cards)]
+
+        rows_by_key = defaultdict(list)
+        for row, key in enumerate(zip(*(listings_df[column].tolist() for column in columns))):
+            rows_by_key[key].append(row)
+
+        slots = []
+        for card in cards:
+            rows = rows_by_key.get(tuple(card[column] for column in columns))
+            if not rows:
+                logger.info(f"Card {card.get('name')} from {card.get('site_name')} not found in listings")
+                return None
+            slots.extend([rows[0]] * int(card.get("quantity", 1)))
+        return cls(listings_df, wishlist_df, slots, usable)
+
+    @property
+    def completeness(self) -> float:
+        return len(self.slots) / self.required_total if self.required_total > 0 else 0.0
+
+    @property
+    def quality(self) -> float:
+        return self.quality_sum / len(self.slots) if len(self.slots) else 0.0
+
+    def card_of(self, slot: int) -> int:
+        return int(self.card_ids[self.slots[slot]])
+
+    def listings_of(self, card: int) -> np.ndarray:
+        """Row positions of the usable listings of ``card``, cheapest first"""
+        if card < 0:
+            return self._card_listings[:0]
+        return self._card_listings[self._card_offsets[card] : self._card_offsets[card + 1]]
+
+    def slots_in_store(self, store: int) -> np.ndarray:
+        return np.flatnonzero(self.store_ids[self.slots] == store)
+
+    def can_move(self, slot: int, position: int) -> bool:
+        """Whether ``position`` is a usable listing of the slot's card with a copy still in stock"""
+        if position == self.slots[slot]:
+            return True
+        return (
+            self.usable[position]
+            and self.card_ids[position] == self.card_of(slot)
+            and self.usage[position] < self.stock[position]
+        )
+
+    def move_delta(self, slot: int, position: int) -> Tuple[float, int, float]:
+        """Change in (cost, store count, quality sum) if ``slot`` bought from ``position`` instead"""
+        current = self.slots[slot]
+        if position == current:
+            return 0.0, 0, 0.0
+        old_store, new_store = self.store_ids[current], self.store_ids[position]
+        stores = 0
+        if old_store != new_store:
+            stores = int(self.store_units[new_store] == 0) - int(self.store_units[old_store] == 1)
+        return (
+            float(self.price[position] - self.price[current]),
+            stores,
+            float(self.quality_score[position] - self.quality_score[current]),
+        )
+
+    def move(self, slot: int, position: int) -> int:
+        """Buy ``slot`` from ``position`` and return the listing it was bought from before"""
+        current = int(self.slots[slot])
+        if position == current:
+            return current
+        cost, stores, quality = self.move_delta(slot, position)
+        self.cost += cost
+        self.store_count += stores
+        self.quality_sum += quality
+        self.store_units[self.store_ids[current]] -= 1
+        self.store_units[self.store_ids[position]] += 1
+        self.usage[current] -= 1
+        self.usage[position] += 1
+        self.slots[slot] = position
+        self.moves += 1
+        return current
+
+    def to_cards(self) -> List[Dict[str, Any]]:
+        """Cards of the plan in the listings' record format, one per listing with its quantity"""
+        positions, quantities = np.unique(self.slots, return_counts=True)
+        cards = self.listings_df.iloc[positions].to_dict("records")
+        for card, quantity in zip(cards, quantities.tolist()):
+            card["quantity"] = quantity
+        return cards
@@ -0,0 +1,134 @@
+# backend/app/optimization/core/stopping.py
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from .pareto import hypervolume, inverted_generational_distance
+
+# Generations the stagnation check looks back over
+DEFAULT_STAGNATION_WINDOW = 10
+# Points of the Monte Carlo hypervolume estimate, drawn once per run so estimates are comparable
+HYPERVOLUME_SAMPLES = 4096
+# Box the hypervolume is measured in, once the first front is scaled to [0, 1] on every objective
+HYPERVOLUME_BOX = (-0.5, 1.1)
+
+# CBC time limit: seconds per thousand binary variables, within these bounds
+MILP_SECONDS_PER_1000_VARIABLES = 2.0
+MILP_MIN_TIME_LIMIT = 5.0
+MILP_MAX_TIME_LIMIT = 120.0
+# Shortest solve worth starting when the deadline is close
+MILP_MIN_SOLVE_TIME = 1.0
+# Relative gap by model size: (largest variable count, gap), larger models use MILP_LARGE_GAP
+MILP_GAPS = ((2_000, 0.0), (20_000, 0.01))
+MILP_LARGE_GAP = 0.02
+
+
+class StoppingPolicy:
+    """
+    When an optimization run stops: a wall-clock deadline, stagnation of the Pareto front for
+    evolutionary runs and CBC limits sized to the model for MILP runs.
+
+    The front stagnates when neither its hypervolume nor its position (IGD of the current front
+    against the one ``window`` generations back) changed by more than ``tolerance``, measured in
+    the objective ranges of the first front. The first reason to stop is kept in ``reason``.
+    """
+
+    def __init__(
+        self,
+        time_limit: Optional[float] = None,
+        early_stopping: bool = True,
+        tolerance: float = 0.001,
+        window: int = DEFAULT_STAGNATION_WINDOW,
+    ):
+        self.time_limit = time_limit
+        self.early_stopping = early_stopping
+        self.tolerance = tolerance
+        self.window = max(1, int(window))
+        self.start()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "StoppingPolicy":
+        return cls(
+            time_limit=config.get("time_limit"),
+            early_stopping=config.get("early_stopping", True),
+            tolerance=config.get("convergence_threshold", 0.001),
+            window=config.get("stagnation_window", DEFAULT_STAGNATION_WINDOW),
+        )
+
+    def start(self):
+        """Start the clock and forget any previous run"""
+        self.deadline = time.time() + self.time_limit if self.time_limit is not None else None
+        self.reason: Optional[str] = None
+        self.generations = 0
+        self.hypervolume: Optional[float] = None
+        self._history: deque = deque(maxlen=self.window + 1)
+        self._ideal = self._scale = self._samples = None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, None without one"""
+        return None if self.deadline is None else max(0.0, self.deadline - time.time())
+
+    def expired(self) -> bool:
+        return self.deadline is not None and time.time() >= self.deadline
+
+    def stop(self, reason: str) -> bool:
+        """Record ``reason`` unless the run already has one"""
+        if self.reason is None:
+            self.reason = reason
+        return True
+
+    def should_stop(self, front: Optional[np.ndarray] = None) -> bool:
+        """
+        Called once per generation with the objectives (minimized) of the current front, e.g. a
+        ParetoArchive's; without a front only the deadline is checked.
+        """
+        self.generations += 1
+        if self.expired():
+            return self.stop("deadline")
+        if front is None or len(front) == 0 or not self.early_stopping:
+            return False
+
+        normalized = self._normalize(np.asarray(front, dtype=np.float64))
+        self.hypervolume = hypervolume(normalized, self._samples)
+        self._history.append((self.hypervolume, normalized))
+        if len(self._history) <= self.window:
+            return False
+
+        previous_hypervolume, previous_front = self._history[0]
+        hypervolume_gain = self.hypervolume - previous_hypervolume
+        movement = inverted_generational_distance(previous_front, normalized)
+        if hypervolume_gain <= self.tolerance * max(self.hypervolume, 1e-12) and movement <= self.tolerance:
+            return self.stop("front_stagnation")
+        return False
+
+    def milp_limits(self, n_variables: int) -> Tuple[float, float]:
+        """CBC time limit (within the deadline) and relative gap for a model of ``n_variables``"""
+        time_limit = MILP_SECONDS_PER_1000_VARIABLES * n_variables / 1000
+        time_limit = min(MILP_MAX_TIME_LIMIT, max(MILP_MIN_TIME_LIMIT, time_limit))
+        remaining = self.remaining()
+        if remaining is not None:
+            time_limit = max(MILP_MIN_SOLVE_TIME, min(time_limit, remaining))
+        gap = next((gap for size, gap in MILP_GAPS if n_variables <= size), MILP_LARGE_GAP)
+        return time_limit, gap
+
+    def stats(self) -> Dict[str, Any]:
+        """Stopping details for ``performance_stats``"""
+        stats = {"stop_reason": self.reason or "completed"}
+        if self.generations:
+            stats["generations_run"] = self.generations
+        if self.hypervolume is not None:
+            stats["final_hypervolume"] = round(self.hypervolume, 6)
+        return stats
+
+    def _normalize(self, front: np.ndarray) -> np.ndarray:
+        # The scale is fixed on the first front, later fronts are measured against it
+        if self._ideal is None or self._ideal.shape != front.shape[1:]:
+            self._ideal = front.min(axis=0)
+            span = front.max(axis=0) - self._ideal
+            self._scale = np.where(span > 0, span, 1.0)
+            rng = np.random.default_rng(0)
+            self._samples = rng.uniform(*HYPERVOLUME_BOX, size=(HYPERVOLUME_SAMPLES, front.shape[1]))
+            self._history.clear()
+        return (front - self._ideal) / self._scale
@@ -1,6 +1,6 @@
 # backend/app/optimization/postprocessing/result_formatter.py
 import logging
-from typing import Dict, Any, List, Tuple, Optional, Union
+from typing import Dict, Any, List, Tuple, Optional, Sequence, Union
 import pandas as pd
 import numpy as np
 from collections import defaultdict
@@ -445,7 +445,10 @@ class ResultFormatter:
         }
 
     def add_penalty_info_to_results(
-        self, results: List[Dict[str, Any]], listings_df: pd.DataFrame
+        self,
+        results: List[Dict[str, Any]],
+        listings_df: pd.DataFrame,
+        listing_rows: Optional[Sequence[int]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Add penalty information to results (legacy compatibility).
@@ -453,6 +456,7 @@ class ResultFormatter:
         Args:
             results: List of card results
             listings_df: DataFrame with listings including penalty info
+            listing_rows: Row position in listings_df of each result's listing, when known
 
         Returns:
             Enhanced results with penalty information
@@ -461,9 +465,18 @@ class ResultFormatter:
             return results
 
         try:
-            enhanced_results = []
             penalty_columns = ["penalty_multiplier", "penalty_explanation", "weighted_price"]
 
+            if listing_rows is not None:
+                # Direct row lookup, one take for all results
+                columns = [col for col in penalty_columns if col in listings_df.columns]
+                penalties = listings_df.iloc[np.asarray(listing_rows, dtype=np.int64)][columns].to_dict("records")
+                return [
+                    {**result, **{f"penalty_{col}": value for col, value in penalty_info.items()}}
+                    for result, penalty_info in zip(results, penalties)
+                ]
+
+            enhanced_results = []
             for result in results:
                 enhanced_result = result.copy()
 
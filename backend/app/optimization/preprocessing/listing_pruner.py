@@ -0,0 +1,214 @@
+# backend/app/optimization/preprocessing/listing_pruner.py
+import logging
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.constants import CardQuality
+
+from ..core.population_evaluator import map_distinct, quality_language_score
+from .penalty_calculator import PenaltyCalculator
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PruningReport:
+    """How much a buylist problem shrank"""
+
+    listings_before: int
+    listings_after: int
+    stores_before: int
+    stores_after: int
+    elapsed_time: float = 0.0
+
+    @property
+    def listing_reduction(self) -> float:
+        """Share of the listings removed"""
+        return 1 - self.listings_after / self.listings_before if self.listings_before else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "listing_reduction": round(self.listing_reduction, 4)}
+
+
+def undominated_listings(
+    card_ids: np.ndarray,
+    store_codes: np.ndarray,
+    price: np.ndarray,
+    quality: np.ndarray,
+    quantity: np.ndarray,
+    needed: np.ndarray,
+) -> np.ndarray:
+    """
+    Listings not dominated within their (card, store) pair: the listings at most as expensive and
+    at least as good as them hold less than the ``needed`` quantity of the card. Infinite quality
+    scores mark unscorable listings, which are kept and dominate nothing.
+    """
+    # Inside a (card, store) pair, a listing can only be dominated by one sorted before it
+    order = np.lexsort((-quality, price, store_codes, card_ids))
+    group = pd.Series(card_ids[order].astype(np.int64) * (store_codes.max() + 1) + store_codes[order])
+    sorted_quality = quality[order]
+
+    # Unscorable listings don't dominate anything
+    sorted_quantity = np.where(np.isinf(sorted_quality), 0.0, quantity[order])
+
+    dominating = np.zeros(len(order))
+    # Quality scores take a few distinct values, each gets one running sum per pair
+    for level in np.unique(sorted_quality):
+        at_least = np.where(sorted_quality >= level, sorted_quantity, 0.0)
+        earlier = pd.Series(at_least).groupby(group).cumsum().to_numpy() - at_least
+        at_level = sorted_quality == level
+        dominating[at_level] = earlier[at_level]
+
+    keep = np.zeros(len(order), dtype=bool)
+    keep[order] = dominating < needed[order]
+    return keep
+
+
+class ListingPruner:
+    """
+    Remove listings that cannot appear in an optimal purchase, before any optimizer runs.
+
+    A listing is dominated by another of the same card in the same store when it costs at least as
+    much after penalties and its quality score is no better. It is dropped once the listings
+    dominating it hold the card's required quantity, as buying from them is never worse. A store
+    is dropped when another store dominates all of its remaining listings that way, for every card
+    of the buylist. Optimizers score quality differently, so listings and stores are only dropped
+    when dominated under every quality score. Optimizers re-apply penalties to the pruned listings,
+    which keep their columns.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.penalty_calculator = PenaltyCalculator(config)
+        self.min_store = config.get("min_store", 1)
+
+    def prune(
+        self,
+        listings_df: pd.DataFrame,
+        user_wishlist_df: pd.DataFrame,
+        card_preferences: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> Tuple[pd.DataFrame, PruningReport]:
+        """Pruned listings and the report of what was removed"""
+        start = time.time()
+        report = PruningReport(
+            listings_before=len(listings_df),
+            listings_after=len(listings_df),
+            stores_before=listings_df["site_name"].nunique(),
+            stores_after=listings_df["site_name"].nunique(),
+        )
+        required = user_wishlist_df.groupby("name", sort=False)["quantity"].sum()
+        wanted = listings_df["name"].isin(required.index).to_numpy()
+        if not wanted.any():
+            return listings_df, report
+
+        if card_preferences is None:
+            card_preferences = self._card_preferences(user_wishlist_df)
+        candidates = listings_df[wanted]
+        penalized = self.penalty_calculator.apply_penalties(candidates, card_preferences)
+
+        card_ids = pd.Categorical(candidates["name"], categories=required.index).codes
+        store_codes, stores = pd.factorize(candidates["site_name"].astype(str))
+        price = penalized["weighted_price"].to_numpy(dtype=np.float64)
+        qualities = self._quality_scores(candidates)
+        quantity = (
+            candidates["quantity"].fillna(1).to_numpy(dtype=np.float64)
+            if "quantity" in candidates.columns
+            else np.ones(len(candidates))
+        )
+        needed = required.to_numpy(dtype=np.float64)[card_ids]
+
+        keep = np.zeros(len(candidates), dtype=bool)
+        for quality in qualities:
+            keep |= undominated_listings(card_ids, store_codes, price, quality, quantity, needed)
+        dropped_stores = np.ones(len(stores), dtype=bool)
+        for quality in qualities:
+            dropped_stores &= self._dominated_stores(
+                card_ids[keep], store_codes[keep], price[keep], quality[keep], quantity[keep], needed[keep], len(stores)
+            )
+        if len(stores) - dropped_stores.sum() >= self.min_store:
+            keep &= ~dropped_stores[store_codes]
+
+        rows = np.flatnonzero(wanted)[keep]
+        pruned = listings_df.iloc[rows]
+        report.listings_after = len(pruned)
+        report.stores_after = pruned["site_name"].nunique()
+        report.elapsed_time = time.time() - start
+        logger.info(
+            f"Pruned listings: {report.listings_before} -> {report.listings_after} "
+            f"({report.listing_reduction:.0%} removed), stores: {report.stores_before} -> {report.stores_after}"
+        )
+        return pruned, report
+
+    @staticmethod
+    def _card_preferences(user_wishlist_df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+        return {
+            row["name"]: {
+                "language": row.get("language", "English"),
+                "quality": row.get("quality", "NM"),
+                "version": row.get("version", "Standard"),
+                "set_name": row.get("set_name", ""),
+                "foil": row.get("foil", False),
+            }
+            for _, row in user_wishlist_df.iterrows()
+        }
+
+    @staticmethod
+    def _quality_scores(listings_df: pd.DataFrame) -> List[np.ndarray]:
+        """
+        Quality scores the optimizers maximize: condition and language together for NSGA-II and
+        NSGA-III, condition alone for MILP and MOEA/D
+        """
+        max_weight = max(CardQuality.get_weight(q.value) for q in CardQuality)
+
+        def combined(combination):
+            try:
+                return quality_language_score(combination.get("quality", "DMG"), combination.get("language", "Unknown"))
+            except Exception:
+                return np.nan
+
+        def condition(combination):
+            try:
+                weight = CardQuality.get_weight(CardQuality.normalize(combination.get("quality", "DMG")))
+                return 1 - (weight - 1) / (max_weight - 1)
+            except Exception:
+                return np.nan
+
+        scores = [
+            map_distinct(listings_df, ("quality", "language"), combined).astype(np.float64),
+            map_distinct(listings_df, ("quality",), condition).astype(np.float64),
+        ]
+        # Unscorable listings can't be shown to be dominated, nor dominate anything
+        return [np.where(np.isnan(score), np.inf, score) for score in scores]
+
+    @staticmethod
+    def _dominated_stores(
+        card_ids: np.ndarray,
+        store_codes: np.ndarray,
+        price: np.ndarray,
+        quality: np.ndarray,
+        quantity: np.ndarray,
+        needed: np.ndarray,
+        n_stores: int,
+    ) -> np.ndarray:
+        """Stores another store beats on every listing of every card; of equivalent stores the first stays"""
+        # dominated[s, t]: store t covers every listing of store s so far
+        dominated = np.ones((n_stores, n_stores), dtype=bool)
+        order = np.argsort(card_ids, kind="stable")
+        boundaries = np.flatnonzero(np.diff(card_ids[order])) + 1
+        for rows in np.split(order, boundaries):
+            p, q, s = price[rows], quality[rows], store_codes[rows]
+            in_store = np.zeros((len(rows), n_stores))
+            in_store[np.arange(len(rows)), s] = 1.0
+            # covers[l, r]: listing r is no worse than listing l
+            covers = (p[None, :] <= p[:, None]) & (q[None, :] >= q[:, None]) & ~np.isinf(q)[None, :]
+            covered = (covers * quantity[rows][None, :]) @ in_store
+            uncovered = in_store.T @ (covered < needed[rows][:, None])
+            dominated &= uncovered == 0
+        np.fill_diagonal(dominated, False)
+
+        index = np.arange(n_stores)
+        strictly = dominated & (~dominated.T | (index[None, :] < index[:, None]))
+        return strictly.any(axis=1)
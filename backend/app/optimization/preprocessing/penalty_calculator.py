@@ -8,6 +8,10 @@ from app.constants import CardQuality, CardLanguage, CardVersion
 
 logger = logging.getLogger(__name__)
 
+# Listing attributes compared with the card preferences, in the order their penalties apply
+PREFERENCE_ATTRIBUTES = ("language", "version", "quality", "foil", "set_name")
+NO_PENALTY_EXPLANATION = "No penalties applied"
+
 
 @dataclass(frozen=True)
 class PenaltyConfig:
@@ -26,7 +30,10 @@ class PenaltyCalculator:
     """
     Efficiently calculate penalties for cards based on user preferences.
 
-    This class provides true vectorized operations using pandas for optimal performance.
+    Attribute values are encoded as small integer codes and every attribute penalty is looked up in
+    an (actual x expected) table computed once per distinct pair, so the multiplier of all listings
+    is applied with array indexing. Explanations are only built on demand, by explain_penalties,
+    for the few listings that end up in a solution.
     All methods are thread-safe and use immutable configurations.
     """
 
@@ -68,7 +75,8 @@ class PenaltyCalculator:
             DataFrame with added penalty columns:
             - weighted_price: Price after applying all penalties
             - penalty_multiplier: Total penalty multiplier applied
-            - penalty_explanation: Human-readable explanation of penalties
+            - preference_applied: Whether the card has preferences
+            Explanations are built separately with explain_penalties.
 
         Raises:
             ValueError: If DataFrame is invalid or missing required columns
@@ -91,7 +99,6 @@ class PenaltyCalculator:
 
         # Initialize penalty columns
         result_df["penalty_multiplier"] = 1.0
-        result_df["penalty_explanation"] = "No penalties applied"
         result_df["preference_applied"] = False
 
         try:
@@ -106,7 +113,7 @@ class PenaltyCalculator:
             result_df["weighted_price"] = result_df["price"] * result_df["penalty_multiplier"]
 
             # Log performance statistics
-            self._log_penalty_statistics(result_df, bool(preferences))
+            self._log_penalty_statistics(result_df, bool(preferences), config)
 
             return result_df
 
@@ -160,116 +167,118 @@ class PenaltyCalculator:
 
         return final_price, total_multiplier, explanation
 
+    def explain_penalties(
+        self,
+        df: pd.DataFrame,
+        card_preferences: Optional[Dict[str, Dict[str, Any]]] = None,
+        config_override: Optional[PenaltyConfig] = None,
+    ) -> pd.Series:
+        """
+        Human-readable explanation of the penalties apply_penalties gives each listing of ``df``.
+
+        Built row by row, meant for the listings of a solution rather than for all the listings.
+        """
+        config = config_override or self.config
+        preferences = card_preferences or {}
+        explanations = []
+        for listing in df.to_dict("records"):
+            explanation = NO_PENALTY_EXPLANATION
+            quality = self._filled(listing.get("quality"), "DMG")
+            quality_multiplier = self._quality_weights.get(quality, 1.5)
+            if quality_multiplier > 1.0:
+                explanation = f"Quality: {quality} (penalty: {round(quality_multiplier, 1)}x)"
+
+            for attribute in PREFERENCE_ATTRIBUTES:
+                expected = preferences.get(listing["name"], {}).get(attribute)
+                actual = self._filled(listing.get(attribute), "")
+                if expected is None or expected == "" or actual == expected:
+                    continue
+                if config.strict_preferences:
+                    explanation = f"{attribute} mismatch (strict filter)"
+                    continue
+                penalty = self._calculate_attribute_penalty(attribute, actual, expected)
+                detail = f"{attribute}: {actual} vs wanted {expected} (penalty: {round(penalty, 1)}x)"
+                explanation = detail if explanation == NO_PENALTY_EXPLANATION else f"{explanation}; {detail}"
+            explanations.append(explanation)
+        return pd.Series(explanations, index=df.index, dtype=object)
+
     def _apply_quality_penalties_vectorized(self, df: pd.DataFrame) -> pd.DataFrame:
         """Apply quality penalties using vectorized operations."""
-        # Map quality values to penalty multipliers
-        quality_series = df["quality"].fillna("DMG")
-        quality_multipliers = quality_series.map(self._quality_weights).fillna(1.5)
+        # One lookup per distinct quality
+        codes, qualities = pd.factorize(df["quality"].fillna("DMG"))
+        weights = np.array([self._quality_weights.get(quality, 1.5) for quality in qualities], dtype=np.float64)
 
         # Update penalty multiplier
-        df["penalty_multiplier"] *= quality_multipliers
-
-        # Add explanations for quality penalties
-        quality_mask = quality_multipliers > 1.0
-        if quality_mask.any():
-            df.loc[quality_mask, "penalty_explanation"] = (
-                "Quality: " + quality_series + " (penalty: " + quality_multipliers.round(1).astype(str) + "x)"
-            )
-
+        df["penalty_multiplier"] *= weights[codes]
         return df
 
     def _apply_preference_penalties_vectorized(
         self, df: pd.DataFrame, preferences: Dict[str, Dict[str, Any]], config: PenaltyConfig
     ) -> pd.DataFrame:
-        """Apply user preference penalties using vectorized operations where possible."""
+        """Apply user preference penalties, one table lookup per attribute."""
 
         # Get cards with preferences
-        cards_with_prefs = set(preferences.keys())
-        pref_mask = df["name"].isin(cards_with_prefs)
+        pref_mask = df["name"].isin(set(preferences.keys())).to_numpy()
 
         if not pref_mask.any():
             return df
 
-        # Process cards with preferences
-        pref_df = df[pref_mask].copy()
-
-        # Vectorized preference processing by attribute
-        for attr in ["language", "version", "quality", "foil", "set_name"]:
-            pref_df = self._apply_attribute_penalties_vectorized(pref_df, preferences, attr, config)
-
-        # Update original DataFrame
-        df.loc[pref_mask, "penalty_multiplier"] = pref_df["penalty_multiplier"]
-        df.loc[pref_mask, "penalty_explanation"] = pref_df["penalty_explanation"]
-        df.loc[pref_mask, "preference_applied"] = True
-
-        return df
-
-    def _apply_attribute_penalties_vectorized(
-        self, df: pd.DataFrame, preferences: Dict[str, Dict[str, Any]], attribute: str, config: PenaltyConfig
-    ) -> pd.DataFrame:
-        """Apply penalties for a specific attribute using vectorization."""
-
-        # Create preference lookup for this attribute
-        attr_prefs = {}
-        for card_name, card_prefs in preferences.items():
-            expected_value = card_prefs.get(attribute)
-            if expected_value is not None and expected_value != "":
-                attr_prefs[card_name] = expected_value
-
-        if not attr_prefs:
-            return df
-
-        # Filter to cards with this attribute preference
-        cards_with_attr_pref = set(attr_prefs.keys())
-        attr_mask = df["name"].isin(cards_with_attr_pref)
+        strict = config.strict_preferences
+        card_codes, cards = pd.factorize(df["name"].to_numpy()[pref_mask])
+        multipliers = df["penalty_multiplier"].to_numpy(dtype=np.float64, copy=True)
+        pref_multipliers = multipliers[pref_mask]
+        mismatched = np.zeros(len(card_codes), dtype=bool)
+
+        for attribute in PREFERENCE_ATTRIBUTES:
+            # Expected value code of each card, -1 without a preference on the attribute
+            expected_by_card = [preferences[card].get(attribute) for card in cards]
+            has_preference = np.array([value is not None and value != "" for value in expected_by_card])
+            if not has_preference[card_codes].any():
+                continue
+            expected_codes, expected_values = pd.factorize(
+                pd.Series(expected_by_card, dtype=object).where(has_preference)
+            )
+            expected_codes = expected_codes[card_codes]
 
-        if not attr_mask.any():
-            return df
+            actual_codes, actual_values = pd.factorize(df[attribute].fillna("").to_numpy()[pref_mask])
+            penalty_table, mismatch_table = self._penalty_table(attribute, actual_values, expected_values, config)
 
-        # Get expected and actual values
-        attr_df = df[attr_mask].copy()
-        attr_df["expected_value"] = attr_df["name"].map(attr_prefs)
-        attr_df["actual_value"] = attr_df[attribute].fillna("")
+            rows = np.flatnonzero(expected_codes >= 0)
+            pairs = (actual_codes[rows], expected_codes[rows])
+            mismatched[rows] |= mismatch_table[pairs]
+            if not strict:
+                pref_multipliers[rows] *= penalty_table[pairs]
 
-        # Check for mismatches
-        mismatch_mask = attr_df["expected_value"] != attr_df["actual_value"]
+        if strict:
+            # Mismatching listings are priced at high_cost
+            prices = df["price"].to_numpy(dtype=np.float64)[pref_mask]
+            pref_multipliers[mismatched] = config.high_cost / prices[mismatched]
 
-        if config.strict_preferences and mismatch_mask.any():
-            # Apply strict filtering
-            df.loc[attr_mask & mismatch_mask, "penalty_multiplier"] = (
-                config.high_cost / df.loc[attr_mask & mismatch_mask, "price"]
-            )
-            df.loc[attr_mask & mismatch_mask, "penalty_explanation"] = f"{attribute} mismatch (strict filter)"
-        elif mismatch_mask.any():
-            # Apply flexible penalties
-            penalties = attr_df.loc[mismatch_mask].apply(
-                lambda row: self._calculate_attribute_penalty(attribute, row["actual_value"], row["expected_value"]),
-                axis=1,
-            )
+        # Update original DataFrame
+        multipliers[pref_mask] = pref_multipliers
+        df["penalty_multiplier"] = multipliers
+        df["preference_applied"] = pref_mask
 
-            # Update penalties
-            mismatch_indices = attr_df.loc[mismatch_mask].index
-            df.loc[mismatch_indices, "penalty_multiplier"] *= penalties
-
-            # Update explanations
-            explanations = (
-                attr_df.loc[mismatch_mask, "actual_value"].astype(str)
-                + " vs wanted "
-                + attr_df.loc[mismatch_mask, "expected_value"].astype(str)
-                + " (penalty: "
-                + penalties.round(1).astype(str)
-                + "x)"
-            )
+        return df
 
-            current_explanations = df.loc[mismatch_indices, "penalty_explanation"]
-            new_explanations = np.where(
-                current_explanations == "No penalties applied",
-                f"{attribute}: " + explanations,
-                current_explanations + f"; {attribute}: " + explanations,
-            )
-            df.loc[mismatch_indices, "penalty_explanation"] = new_explanations
+    def _penalty_table(
+        self, attribute: str, actual_values: Any, expected_values: Any, config: PenaltyConfig
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Penalty and mismatch flag of every (actual, expected) pair of values"""
+        penalties = np.ones((len(actual_values), len(expected_values)), dtype=np.float64)
+        mismatches = np.zeros(penalties.shape, dtype=bool)
+        for a, actual in enumerate(actual_values):
+            for e, expected in enumerate(expected_values):
+                if actual != expected:
+                    mismatches[a, e] = True
+                    if not config.strict_preferences:
+                        penalties[a, e] = self._calculate_attribute_penalty(attribute, actual, expected)
+        return penalties, mismatches
 
-        return df
+    @staticmethod
+    def _filled(value: Any, default: Any) -> Any:
+        """``value``, ``default`` when missing"""
+        return default if value is None or (isinstance(value, float) and np.isnan(value)) else value
 
     def _calculate_preference_penalties(
         self, card_dict: Dict[str, Any], preferences: Dict[str, Any], config: PenaltyConfig
@@ -380,7 +389,18 @@ class PenaltyCalculator:
             logger.warning(f"Error building language lookup: {e}")
             return {"English": 1.0, "Unknown": 1.5}
 
-    def _log_penalty_statistics(self, df: pd.DataFrame, has_preferences: bool):
+    def strict_rejections(
+        self, penalized_df: pd.DataFrame, config_override: Optional[PenaltyConfig] = None
+    ) -> np.ndarray:
+        """Listings of a penalized frame that strict preferences reject, priced at high_cost"""
+        config = config_override or self.config
+        if not config.strict_preferences:
+            return np.zeros(len(penalized_df), dtype=bool)
+        weighted_price = penalized_df["weighted_price"].to_numpy(dtype=np.float64)
+        # A mismatch on a free listing has no finite price
+        return np.isclose(weighted_price, config.high_cost) | ~np.isfinite(weighted_price)
+
+    def _log_penalty_statistics(self, df: pd.DataFrame, has_preferences: bool, config: PenaltyConfig):
         """Log statistics about applied penalties."""
         if not has_preferences:
             return
@@ -401,7 +421,7 @@ class PenaltyCalculator:
             logger.warning(f"⚠️  {high_penalty_count} listings with high penalties (>2x)")
 
         # Log strict filter rejections
-        strict_rejections = (pref_df["penalty_explanation"] == "strict_filter").sum()
+        strict_rejections = self.strict_rejections(pref_df, config).sum()
         if strict_rejections > 0:
             logger.warning(f"❌ {strict_rejections} listings rejected by strict preferences")
 
@@ -1,6 +1,6 @@
 import json
-import re
 import logging
+import time
 from datetime import datetime
 from typing import List, Dict, Any, Optional, Tuple
 
@@ -13,8 +13,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import redis_host
 from app.services.async_base_service import AsyncBaseService
+from app.utils.set_name_index import (
+    PROMO_SET_MAPPINGS,
+    SetNameIndex,
+    clean_set_name_for_matching,
+    normalize_set_name,
+)
+from app.utils.set_resolution_cache import SetResolution, SetResolutionCache
 
-from thefuzz import fuzz, process
 import contextvars
 from redis.asyncio import Redis
 
@@ -31,6 +37,10 @@ CARDCONDUIT_URL = "https://cardconduit.com/buylist"
 REDIS_PORT = 6379
 CACHE_EXPIRATION = 86400  # 24 hours (same as card names)
 REDIS_SETS_KEY = "scryfall_set_codes"
+REDIS_SETS_VERSION_KEY = "scryfall_set_codes:version"
+SET_INDEX_VERSION_CHECK_INTERVAL = 60  # seconds between Redis version checks of the in-process set index
+REDIS_SET_RESOLUTION_KEY = "scryfall_set_resolution"
+SET_RESOLUTION_CACHE_SIZE = 4096
 REDIS_CARDNAME_KEY = "scryfall_card_names"
 SCRYFALL_CACHE = {}
 SCRYFALL_CACHE_LOCK = asyncio.Lock()
@@ -39,28 +49,15 @@ SCRYFALL_CACHE_LOCK = asyncio.Lock()
 class CardService(AsyncBaseService):
 
     # Promo mappings for known catalog references or special sets
-    promo_mappings = {
-        "dmu extras": "Dominaria United",
-        "ikoria: extras": "Ikoria: Lair of Behemoths",
-        "znr extras": "zendikar rising",
-        "znr: extras": "Zendikar Rising",
-        "bro extras": "The Brothers' War",
-        "brothers' war extras": "The Brothers' War",
-        "brothers war extras": "The Brothers' War",
-        "mkm singles": "Murders at Karlov Manor",
-        "mkm": "Murders at Karlov Manor",
-        "afr extras": "Adventures in the Forgotten Realms",
-        "#045 - duel decks m14/m63/m64": "Duel Decks: Zendikar vs. Eldrazi",
-        "#045 - duel decks m14/63/64/67": "Duel Decks: Zendikar vs. Eldrazi",
-        "duel decks m14/m63/m64": "Duel Decks: Zendikar vs. Eldrazi",
-        "cbl bundle promo": "Commander Legends: Battle for Baldur's Gate",
-        "treasure chest promo": "Treasure Chest",
-        "promos: miscellaneous": "Judge Gift Cards",
-        "brawl deck exclusive": "Commander Collection",
-        "brawl": "Commander Collection",
-        "the list": "Mystery Booster: The List",
-        "set boosters reserved list": "Mystery Booster: The List",
-    }
+    promo_mappings = PROMO_SET_MAPPINGS
+
+    # Per-process compiled set index, rebuilt when the cached sets version changes
+    _set_index: Optional[SetNameIndex] = None
+    _set_index_checked_at: float = 0.0
+    # Memo of raw set strings -> (set_name, set_code), local LRU backed by a shared Redis hash
+    _set_resolution_cache = SetResolutionCache(
+        REDIS_SET_RESOLUTION_KEY, max_size=SET_RESOLUTION_CACHE_SIZE, expiration=CACHE_EXPIRATION
+    )
 
     ##################
     # Redis Operations
@@ -176,11 +173,17 @@ class CardService(AsyncBaseService):
             return {}
 
         try:
-            return json.loads(cached_sets_json)
+            sets_data = json.loads(cached_sets_json)
         except json.JSONDecodeError:
             logger.error("Failed to parse cached sets")
             return {}
 
+        # Sets cached before they were versioned get their version here, so set indexes built from them are reused
+        await redis_client.set(
+            REDIS_SETS_VERSION_KEY, SetNameIndex.fingerprint(cached_sets_json), ex=CACHE_EXPIRATION, nx=True
+        )
+        return sets_data
+
     ##################
     # Fetch Operations
     ##################
@@ -258,8 +261,15 @@ class CardService(AsyncBaseService):
                         "set_type": set_data.get("set_type"),
                     }
 
-            # Cache in Redis
-            await redis_client.set(REDIS_SETS_KEY, json.dumps(sets_dict), ex=CACHE_EXPIRATION)
+            # Cache in Redis, with a content version so worker set indexes know when to rebuild
+            sets_json = json.dumps(sets_dict)
+            previous_version = await redis_client.get(REDIS_SETS_VERSION_KEY)
+            await redis_client.set(REDIS_SETS_KEY, sets_json, ex=CACHE_EXPIRATION)
+            await redis_client.set(REDIS_SETS_VERSION_KEY, SetNameIndex.fingerprint(sets_json), ex=CACHE_EXPIRATION)
+
+            # Resolutions memoized against the previous sets are no longer valid
+            await redis_client.delete(f"{REDIS_SET_RESOLUTION_KEY}:{previous_version or 'unversioned'}")
+            CardService.reset_set_index()
             logger.info(f"Cached {len(sets_dict)} Scryfall sets.")
             return sets_dict
 
@@ -690,40 +700,11 @@ class CardService(AsyncBaseService):
     async def extract_magic_set_from_href(url):
         try:
 
-            # Ensure cache exists before getting data
-            if not await CardService.ensure_sets_cache():
-                logger.error("Could not initialize sets cache")
+            set_index = await CardService.get_set_index()
+            if not set_index:
                 return None
 
-            sets_data = await CardService.get_cached_sets()
-            if not sets_data:
-                return None
-
-            known_sets = sets_data.keys()
-
-            # Normalize URL for robust matching
-            normalized_url = url.lower().replace("_", " ").replace("-", " ").replace("/", " ")
-
-            # Check against known sets directly (robust extraction)
-            for known_set in known_sets:
-                normalized_known_set = known_set.lower()
-                if normalized_known_set in normalized_url:
-                    return known_set  # Immediately return the matched known set
-
-            # Fallback logic based on "singles-" if no direct matches found
-            if "singles-" in url:
-                part = url.split("singles-")[-1].split("/")[0]
-                potential_set_name = part.replace("-brawl", "").replace("_", " ").replace("-", " ").strip()
-
-                # Validate the extracted potential set name with fuzzy matching
-                best_match = process.extractOne(
-                    potential_set_name, known_sets, scorer=fuzz.token_set_ratio, score_cutoff=70
-                )
-                if best_match:
-                    return best_match[0]  # Return validated fuzzy matched set
-
-            logger.warning(f"No magic set extracted reliably from URL: {url}")
-            return None
+            return set_index.set_from_href(url)
 
         except Exception as e:
             logger.error(f"Fatal error in extract_magic_set: {str(e)}", exc_info=True)
@@ -768,147 +749,11 @@ class CardService(AsyncBaseService):
     @classmethod
     async def _normalize_set_name(cls, name: str) -> List[str]:
         """Robustly normalize set name to ensure accurate matching."""
-        if not name:
-            return []
-
-        results = set()
-
-        name_lower = name.lower().strip()
-        results.add(name_lower)
-
-        patterns_to_clean = [
-            (r"#\d+\s*-\s*", ""),
-            (r"\(\d+\)", ""),
-            (r"[/:,-]", " "),
-            (r"\s+m\d+\s*$", ""),
-            (r"\s+", " "),
-        ]
-
-        cleaned_name = name_lower
-        for pattern, replacement in patterns_to_clean:
-            cleaned_name = re.sub(pattern, replacement, cleaned_name).strip()
-        results.add(cleaned_name)
-
-        prefixes = [
-            "promo pack",
-            "promotional",
-            "promo packs",
-            "commander",
-            "token",
-            "tokens",
-            "minigame",
-            "minigames",
-            "art series",
-            "art cards",
-            "promos",
-            "extras",
-            "extra",
-            "box set",
-            "game day",
-            "prerelease",
-            "release",
-            "buy a box",
-            "bundle",
-            "media insert",
-            "universes beyond",
-            "universe beyond",
-            "non foil",
-            "foil",
-            "mps",
-            "judge rewards",
-            "unique & misc",
-            "modern event deck",
-            "extended art",
-            "commander universes beyond",
-        ]
-        prefix_found = True
-        while prefix_found:
-            prefix_found = False
-            for prefix in prefixes:
-                if cleaned_name.startswith(prefix):
-                    cleaned_name = cleaned_name[len(prefix) :].strip()
-                    prefix_found = True
-        results.add(cleaned_name)
-
-        simplified_variants = [
-            cleaned_name.replace(" ", ""),
-            cleaned_name.replace("'", ""),
-            cleaned_name.replace(":", ""),
-            cleaned_name.replace(",", ""),
-            cleaned_name.replace("-", ""),
-        ]
-        results.update(simplified_variants)
-
-        set_mappings = {
-            "festival foil etched": "30th Anniversary Misc Promos",
-            "launch weekend foil": "Wizards Play Network 2022",
-            "bring a friend": "Love Your LGS 2022",
-            "magicfest foil": "MagicFest 2019",
-            "warhammer 40,000 commander": [
-                "universes beyond warhammer 40000",
-                "universes beyond warhammer 40k",
-                "warhammer 40000 commander",
-                "warhammer 40k commander",
-                "cmdr - warhammer 40,000: universes beyond",
-                "warhammer 40k singles",
-                "universe beyond 40,000",
-            ],
-            "the lord of the rings: tales of middle-earth commander": [
-                "commander lord of the rings",
-                "universes beyond lord of the rings commander",
-                "universes beyond: lord of the rings - commander",
-                "lotr commander",
-            ],
-            "commander 2024": ["cmdr - 2024"],
-            "commander 2023": ["cmdr - 2023"],
-            "commander 2022": ["cmdr - 2022"],
-            "commander 2021": ["cmdr - 2021"],
-            "commander 2020": ["cmdr - 2020"],
-            "commander 2019": ["cmdr - 2019"],
-            "commander 2018": ["cmdr - 2018"],
-            "commander 2017": ["cmdr - 2017"],
-            "commander 2016": ["cmdr - 2016"],
-            "commander 2015": ["cmdr - 2015"],
-            "commander 2014": ["cmdr - 2014"],
-            "commander 2013": ["cmdr - 2013"],
-            "commander 2012": ["cmdr - 2012"],
-            "commander 2011": ["cmdr - 2011"],
-            "commander anthology volume ii": ["cmdr - anthology vol. ii", "commander anthology 2"],
-            "duel decks: zendikar vs. eldrazi": ["zendikar vs eldrazi duel decks"],
-            "the brothers' war retro artifacts": [
-                "magic's history: retro or schematic artifact",
-                "retro or schematic artifact",
-                "retro artifacts",
-                "brr",
-            ],
-            "secret lair drop": [
-                "secret lair: heads i win, tails you lose",
-                "secret lair",
-                "sld",
-            ],
-            "friday night magic 2022": ["fnm promos", "friday night magic", "fnm promo", "fnm cards"],
-            "mystery booster": ["the list", "mystery booster the list"],
-            "kamigawa: neon dynasty": ["kamigawa neon destiny"],
-            "jurassic world collection": ["universes beyond: jurassic world"],
-            "doctor who": ["dr. who (who)", "doctor who (who)" "Dr. Who (WHO)"],
-            "from the vault: twenty": ["ftv: twenty"],
-            "the brothers' war commander": ["commander brother's war"],
-        }
-
-        for candidate in list(results):
-            for official_name, variants in set_mappings.items():
-                if candidate in variants or candidate == official_name.lower():
-                    results.add(official_name.lower())
-                    results.update(variants)
-
-        return list(filter(None, results))
+        return normalize_set_name(name)
 
     @staticmethod
     async def clean_set_name_for_matching(name: str) -> str:
-        # Remove descriptors like "Alternate Art", "Extended Art", punctuation, multiple spaces
-        name = re.sub(r"[^a-zA-Z0-9\s]", " ", name)  # remove special chars
-        name = re.sub(r"\b(alternate|extended|art|showcase|borderless)\b", "", name, flags=re.IGNORECASE)
-        return re.sub(r"\s+", " ", name).strip().lower()
+        return clean_set_name_for_matching(name)
 
     @classmethod
     async def get_sets_data(cls, force_refresh=False):
@@ -925,83 +770,73 @@ class CardService(AsyncBaseService):
         return await cls.get_cached_sets()
 
     @classmethod
-    async def get_set_code(cls, set_name: str) -> Optional[str]:
-        """Get set code from set name using exact match first, then fuzzy matching"""
-        if not set_name:
-            logger.warning("Empty set name provided")
+    def reset_set_index(cls):
+        """Drop the in-process set index so the next lookup rebuilds it."""
+        CardService._set_index = None
+        CardService._set_index_checked_at = 0.0
+        CardService._set_resolution_cache.reset()
+
+    @classmethod
+    async def _get_sets_version(cls) -> Optional[str]:
+        try:
+            redis_client = await cls.get_redis_client()
+            return await redis_client.get(REDIS_SETS_VERSION_KEY)
+        except Exception as e:
+            logger.warning(f"Could not read sets cache version: {str(e)}")
             return None
 
-        logger.debug(f"Getting set code for: {set_name}")
+    @classmethod
+    async def get_set_index(cls) -> Optional[SetNameIndex]:
+        """
+        Get the per-process set index, compiled once from the cached sets.
+        The Redis version key is checked at most every SET_INDEX_VERSION_CHECK_INTERVAL seconds,
+        so lookups in the scrape hot path are in-memory only.
+        """
+        set_index = CardService._set_index
+        now = time.monotonic()
+        if set_index is not None and now - CardService._set_index_checked_at < SET_INDEX_VERSION_CHECK_INTERVAL:
+            return set_index
+
+        version = await cls._get_sets_version()
+        # Without a version (unreadable, or not written yet) there is nothing to say the sets changed
+        if set_index is not None and (version is None or version == set_index.version):
+            CardService._set_index_checked_at = now
+            return set_index
 
         sets_data = await cls.get_sets_data()
         if not sets_data:
-            logger.error("No sets data available")
+            logger.error("No sets data available to build set index")
             return None
+        if version is None:
+            version = await cls._get_sets_version()
+
+        build_start = time.perf_counter()
+        set_index = SetNameIndex(sets_data, version=version)
+        CardService._set_index = set_index
+        CardService._set_index_checked_at = now
+        if CardService._set_resolution_cache.version != version:
+            CardService._set_resolution_cache.reset(version)
+        logger.info(
+            f"Built set index with {len(set_index)} sets (version {version}) "
+            f"in {(time.perf_counter() - build_start) * 1000:.1f} ms"
+        )
+        return set_index
 
-        # Get all possible normalized forms of the set name
-        normalized_names = await cls._normalize_set_name(set_name)
-        logger.debug(f"Normalized forms: {normalized_names}")
-
-        # Try exact matches using keys and code fields
-        for norm_name in normalized_names:
-            # Direct match against cache keys (outer keys are set names)
-            if norm_name in sets_data:
-                logger.debug(f"Exact match found for '{set_name}' using outer key '{norm_name}'")
-                return sets_data[norm_name].get("code")
-
-            # Match against values' "code" fields
-            for outer_name, set_info in sets_data.items():
-                if not isinstance(set_info, dict):
-                    continue  # Malformed cache entry
-                if norm_name == set_info.get("code", "").lower():
-                    logger.debug(f"Exact match found against code for '{set_name}' -> {set_info.get('code')}")
-                    return set_info.get("code")
-
-        # Try partial matching using cleaned names
-        for norm_name in normalized_names:
-            cleaned_norm_name = await CardService.clean_set_name_for_matching(norm_name)
-            for outer_name, set_info in sets_data.items():
-                cleaned_outer = await CardService.clean_set_name_for_matching(outer_name)
-
-                if cleaned_norm_name in cleaned_outer or cleaned_outer in cleaned_norm_name:
-                    logger.debug(f"Partial match: '{set_name}' -> '{outer_name}'")
-                    return set_info.get("code")
-
-                if fuzz.partial_ratio(cleaned_norm_name, cleaned_outer) > 85:
-                    logger.debug(f"Fuzzy partial match: '{set_name}' -> '{outer_name}'")
-                    return set_info.get("code")
-
-        # Final fuzzy fallback
-        try:
-            best_score = 0
-            best_code = None
-
-            for norm_name in normalized_names:
-                matches = process.extractBests(
-                    norm_name,
-                    list(sets_data.keys()),
-                    scorer=fuzz.token_set_ratio,
-                    score_cutoff=70,
-                    limit=1,
-                )
-
-                if matches:
-                    match_name, score = matches[0]
-                    if score > best_score:
-                        best_score = score
-                        best_code = sets_data[match_name].get("code")
+    @classmethod
+    async def get_set_code(cls, set_name: str) -> Optional[str]:
+        """Get set code from set name using exact match first, then fuzzy matching"""
+        if not set_name:
+            logger.warning("Empty set name provided")
+            return None
 
-            if best_code:
-                logger.debug(f"Fuzzy matched '{set_name}' with score {best_score}")
-                return best_code
+        logger.debug(f"Getting set code for: {set_name}")
 
-        except Exception as e:
-            logger.error(f"Error during fuzzy matching: {str(e)}")
+        set_index = await cls.get_set_index()
+        if not set_index:
+            logger.error("No sets data available")
             return None
 
-        logger.debug(f"No match found for set: {set_name}")
-        logger.debug(f"Normalized names tried: {normalized_names}")
-        return None
+        return set_index.set_code(set_name)
 
     @classmethod
     async def get_closest_set_name(cls, unclean_set_name: str) -> Optional[str]:
@@ -1010,65 +845,73 @@ class CardService(AsyncBaseService):
             logger.warning(f"[SET CODE] Empty set name received")
             return None
 
-        sets_data = await cls.get_sets_data()
-        if not sets_data:
-            return unclean_set_name
-
-        normalized_names = await cls._normalize_set_name(unclean_set_name)
+        set_name, _ = await cls.resolve_set(unclean_set_name)
+        return set_name
 
-        # Attempt direct exact match first
-        for name_normalized in normalized_names:
-            if name_normalized in sets_data:
-                logger.debug(f"Exact match found for set name: {name_normalized}")
-                return name_normalized
+    @classmethod
+    async def resolve_set(cls, unclean_set_name: str) -> SetResolution:
+        """
+        Resolve an unclean set name to its (official set name, set code), memoized per raw input.
+        The set code is None when the input could not be resolved.
+        """
+        if not unclean_set_name:
+            return None, None
 
-            # Check in promo mappings
-            if name_normalized in cls.promo_mappings:
-                mapped_name = cls.promo_mappings[name_normalized].lower()
-                if mapped_name in sets_data:
-                    logger.debug(f"Promo mapping matched: {name_normalized} -> {mapped_name}")
-                    return mapped_name
+        # Cheap when recent: also resets the memo if the cached sets changed
+        set_index = await cls.get_set_index()
+        if not set_index:
+            # Nothing to resolve against, don't memoize the failure
+            return unclean_set_name, None
 
-        # Fuzzy match using keys only (since 'name' is not in set_info)
-        best_match = None
-        best_score = 0
+        resolution_cache = CardService._set_resolution_cache
+        resolution = resolution_cache.get_local(unclean_set_name)
+        if resolution is not None:
+            return resolution
 
-        try:
-            set_names_lower = list(sets_data.keys())
-            filtered_candidates = [candidate for candidate in normalized_names if candidate.strip()]
+        redis_client = await cls.get_redis_client()
+        resolution = await resolution_cache.get_shared(redis_client, unclean_set_name)
+        if resolution is not None:
+            return resolution
 
-            for candidate in filtered_candidates:
-                match = process.extractOne(candidate, set_names_lower, scorer=fuzz.token_set_ratio, score_cutoff=65)
-                if match and match[1] > best_score:
-                    best_match = match
-                    best_score = match[1]
+        resolution_cache.misses += 1
+        resolution = set_index.resolve(unclean_set_name)
 
-            if best_match:
-                matched_name = best_match[0]
-                logger.debug(f"Fuzzy matched '{unclean_set_name}' to '{matched_name}' with score {best_score}")
-                return matched_name
+        resolution_cache.put_local(unclean_set_name, resolution)
+        await resolution_cache.put_shared(redis_client, unclean_set_name, resolution)
+        return resolution
 
-        except Exception as e:
-            logger.error(f"[SET NAME] Error during fuzzy matching: {str(e)}")
+    @classmethod
+    async def get_set_resolution_snapshot(cls) -> Dict[str, SetResolution]:
+        """Every known resolution for the current sets version, shared entries first then local ones."""
+        resolution_cache = CardService._set_resolution_cache
+        redis_client = await cls.get_redis_client()
+        resolutions = await resolution_cache.get_all_shared(redis_client)
+        resolutions.update(resolution_cache.snapshot())
+        return resolutions
 
-        # Fallback: try to match against set codes
-        input_lower = unclean_set_name.lower()
-        for outer_name, set_info in sets_data.items():
-            if set_info.get("code", "").lower() == input_lower or input_lower in set_info.get("code", "").lower():
-                logger.debug(f"Matched '{unclean_set_name}' directly to set code '{set_info['code']}'")
-                return outer_name  # The outer_name *is* the set name
+    @classmethod
+    async def remember_set_resolutions(cls, resolutions: Dict[str, SetResolution]):
+        """Publish resolutions computed outside the memo (e.g. by extraction workers)."""
+        if not resolutions:
+            return
+        resolution_cache = CardService._set_resolution_cache
+        resolution_cache.misses += len(resolutions)
+        for raw_set_name, resolution in resolutions.items():
+            resolution_cache.put_local(raw_set_name, resolution)
+        redis_client = await cls.get_redis_client()
+        await resolution_cache.put_many_shared(redis_client, resolutions)
 
-        logger.debug(f"[SET NAME] No match found for '{unclean_set_name}', returning original.")
-        return unclean_set_name
+    @classmethod
+    def get_set_resolution_stats(cls) -> Dict[str, Any]:
+        """Hit/miss counters of the set resolution memo for this process."""
+        return CardService._set_resolution_cache.get_stats()
 
     @classmethod
     async def get_clean_set_code_from_set_name(cls, unclean_set_name: str) -> Optional[str]:
         """Get the official set code from an unclean set name input."""
-        # First get the proper set name
-        clean_set_name = await cls.get_closest_set_name(unclean_set_name)
+        clean_set_name, set_code = await cls.resolve_set(unclean_set_name)
         if not clean_set_name:
             logger.warning(f"[SET CODE] No clean set name found for: {unclean_set_name}")
             return None
 
-        # Then get the set code using the existing method
-        return await cls.get_set_code(clean_set_name)
+        return set_code
@@ -5,8 +5,13 @@ import asyncio
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..optimization.algorithms.factory import OptimizerFactory
+from ..optimization.algorithms.portfolio import PortfolioRace
 from ..optimization.config.algorithm_configs import AlgorithmConfig
+from ..optimization.core.algorithm_selector import AlgorithmSelector
 from ..optimization.core.metrics import OptimizationMetrics
+from ..optimization.preprocessing.listing_pruner import ListingPruner
+from ..utils.optimization_result_cache import OptimizationResultCache
+from .optimization_metrics_service import OptimizationMetricsService
 
 logger = logging.getLogger(__name__)
 
@@ -16,18 +21,19 @@ class OptimizationEngine:
     Enhanced optimization service using the new modular architecture.
 
     Features:
-    - Algorithm auto-selection based on problem characteristics
+    - Algorithm auto-selection learned from past runs, with fixed rules as fallback
+    - Racing a portfolio of algorithms in parallel, the first good result wins
     - NSGA-III support for complex multi-objective problems
     - Performance tracking and metrics
-    - Caching of optimization results
+    - Caching of optimization results in Redis, shared across workers and requests
     - Progress tracking for long-running optimizations
     """
 
-    def __init__(self):
+    def __init__(self, redis_client=None):
         self.optimizer_factory = OptimizerFactory()
         self.metrics_tracker = OptimizationMetrics()
-        self._result_cache = {}
-        self._cache_max_size = 100
+        # Without a Redis client results are not cached
+        self.result_cache = OptimizationResultCache(redis_client)
 
     async def optimize_card_purchase(
         self, session: AsyncSession, listings_df, user_wishlist_df, config, celery_task_updater=None
@@ -46,14 +52,6 @@ class OptimizationEngine:
             Optimization result in standardized format
         """
         try:
-            # Generate cache key
-            cache_key = self._generate_cache_key(user_wishlist_df, config)
-
-            # Check cache first
-            if cache_key in self._result_cache:
-                logger.info("Returning cached optimization result")
-                return self._result_cache[cache_key]
-
             # Convert config to AlgorithmConfig
             if hasattr(config, "to_dict"):
                 # It's a DTO
@@ -62,10 +60,31 @@ class OptimizationEngine:
                 # It's a dict from frontend
                 algorithm_config = self._create_algorithm_config_from_frontend(config)
 
+            # Check cache first: same wishlist, same listings and same settings
+            cache_key = self.result_cache.make_key(user_wishlist_df, listings_df, algorithm_config.to_dict())
+            cached_result = await self.result_cache.get(cache_key)
+            if cached_result is not None:
+                logger.info("Returning cached optimization result")
+                cached_result["performance_stats"] = {
+                    **(cached_result.get("performance_stats") or {}),
+                    "cache_hit": True,
+                }
+                return cached_result
+
+            # Shrink the problem before choosing and running an algorithm
+            listings_df, pruning_report = self._prune_listings(listings_df, user_wishlist_df, algorithm_config)
+
+            # Add problem characteristics for metrics and algorithm selection
+            problem_characteristics = self._analyze_problem_characteristics(listings_df, user_wishlist_df)
+
             # Auto-select algorithm if requested
-            if algorithm_config.primary_algorithm == "auto":
-                algorithm_config.primary_algorithm = self._select_best_algorithm(listings_df, user_wishlist_df, config)
-                logger.info(f"Auto-selected algorithm: {algorithm_config.primary_algorithm}")
+            auto_selected = algorithm_config.primary_algorithm == "auto"
+            selection_method = None
+            if auto_selected:
+                algorithm_config.primary_algorithm, selection_method = await self._auto_select_algorithm(
+                    session, listings_df, user_wishlist_df, config, problem_characteristics, algorithm_config.time_limit
+                )
+                logger.info(f"Auto-selected algorithm: {algorithm_config.primary_algorithm} ({selection_method})")
 
             # Prepare problem data
             problem_data = {
@@ -74,38 +93,58 @@ class OptimizationEngine:
                 "num_stores": listings_df["site_name"].nunique(),
             }
 
-            # Add problem characteristics for metrics
-            problem_characteristics = self._analyze_problem_characteristics(listings_df, user_wishlist_df)
-
-            # Create and configure optimizer
-            optimizer = self.optimizer_factory.create_optimizer(
-                algorithm_config.primary_algorithm, problem_data, algorithm_config.to_dict()
+            if algorithm_config.primary_algorithm == "race":
+                # Run the portfolio at once, the first good result wins
+                race_outcome = await self._race_portfolio(problem_data, algorithm_config, problem_characteristics)
+                algorithm = race_outcome.winner
+                result = race_outcome.result
+                result.performance_stats = {**(result.performance_stats or {}), "race": race_outcome.to_dict()}
+            else:
+                # Create and configure optimizer
+                algorithm = algorithm_config.primary_algorithm
+                optimizer = self.optimizer_factory.create_optimizer(algorithm, problem_data, algorithm_config.to_dict())
+
+                # Set up progress tracking
+                if celery_task_updater:
+                    self._setup_progress_tracking(optimizer, celery_task_updater)
+
+                # Run optimization
+                logger.info(f"Starting {optimizer.get_algorithm_name()} optimization")
+                logger.info(f"Configuration: {algorithm_config.to_dict()}")
+
+                result = await self._run_optimization_async(optimizer)
+            if pruning_report and result.performance_stats is not None:
+                result.performance_stats["problem_reduction"] = pruning_report.to_dict()
+            if selection_method and result.performance_stats is not None:
+                result.performance_stats["algorithm_selection"] = selection_method
+
+            # Record metrics, durably when there is a session
+            solution_quality = self._calculate_solution_quality(result)
+            run = OptimizationMetrics.build_run(
+                algorithm,
+                result,
+                problem_characteristics,
+                solution_quality,
+                time_limit=algorithm_config.time_limit,
+                auto_selected=auto_selected,
             )
-
-            # Set up progress tracking
-            if celery_task_updater:
-                self._setup_progress_tracking(optimizer, celery_task_updater)
-
-            # Run optimization
-            logger.info(f"Starting {optimizer.get_algorithm_name()} optimization")
-            logger.info(f"Configuration: {algorithm_config.to_dict()}")
-
-            result = await self._run_optimization_async(optimizer)
-
-            # Record metrics
             self.metrics_tracker.record_optimization(
                 algorithm=result.algorithm_used,
                 execution_time=result.execution_time,
-                solution_quality=self._calculate_solution_quality(result),
+                solution_quality=solution_quality,
                 problem_size=len(user_wishlist_df),
                 problem_characteristics=problem_characteristics,
+                run=run,
             )
+            if session is not None:
+                await OptimizationMetricsService.record_run(session, run)
 
             # Convert to expected format for backward compatibility
             formatted_result = self._format_for_existing_system(result)
 
             # Cache result
-            self._add_to_cache(cache_key, formatted_result)
+            if formatted_result["status"] == "success":
+                await self.result_cache.put(cache_key, formatted_result)
 
             # Log performance summary
             self._log_optimization_summary(result, problem_characteristics)
@@ -134,12 +173,25 @@ class OptimizationEngine:
             max_iterations=config.get("max_iterations", 1000),
             early_stopping=config.get("early_stopping", True),
             convergence_threshold=config.get("convergence_threshold", 0.001),
+            prune_listings=config.get("prune_listings", True),
         )
 
         # Add algorithm-specific parameters
-        if primary_algorithm in ["nsga2", "moead", "nsga3"]:
+        # Racers of the portfolio take the parameters of their own algorithm
+        racing = primary_algorithm == "race"
+        if racing:
+            algorithm_config.race_portfolio = config.get("race_portfolio", algorithm_config.race_portfolio)
+            algorithm_config.race_good_enough_gap = config.get("race_good_enough_gap", 0.05)
+
+        if primary_algorithm in ["nsga2", "moead", "nsga3"] or racing:
             algorithm_config.population_size = config.get("population_size", 200)
 
+        if primary_algorithm in ["nsga2", "moead", "nsga3"] or primary_algorithm.startswith("hybrid") or racing:
+            algorithm_config.evaluation_backend = config.get("evaluation_backend", "serial")
+            algorithm_config.n_jobs = config.get("n_jobs", -1)
+            algorithm_config.fitness_cache_size = config.get("fitness_cache_size", 0)
+            algorithm_config.stagnation_window = config.get("stagnation_window", 10)
+
         if primary_algorithm == "nsga3":
             algorithm_config.reference_point_divisions = config.get("reference_point_divisions", 12)
 
@@ -147,16 +199,45 @@ class OptimizationEngine:
             algorithm_config.neighborhood_size = config.get("neighborhood_size", 20)
             algorithm_config.decomposition_method = config.get("decomposition_method", "tchebycheff")
 
-        if primary_algorithm == "milp":
+        if primary_algorithm == "milp" or racing:
             algorithm_config.milp_gap_tolerance = config.get("milp_gap_tolerance", 0.01)
 
-        if primary_algorithm.startswith("hybrid"):
+        if primary_algorithm.startswith("hybrid") or racing:
             algorithm_config.hybrid_milp_time_fraction = config.get("hybrid_milp_time_fraction", 0.3)
             if primary_algorithm == "hybrid_milp_nsga3":
                 algorithm_config.reference_point_divisions = config.get("reference_point_divisions", 12)
 
         return algorithm_config
 
+    def _prune_listings(self, listings_df, user_wishlist_df, algorithm_config: AlgorithmConfig):
+        """Listings without the dominated ones, and the pruning report (None when pruning is off or fails)"""
+        if not algorithm_config.prune_listings:
+            return listings_df, None
+        try:
+            return ListingPruner(algorithm_config.to_dict()).prune(listings_df, user_wishlist_df)
+        except Exception as e:
+            logger.warning(f"Listing pruning failed, optimizing all listings: {str(e)}")
+            return listings_df, None
+
+    async def _auto_select_algorithm(
+        self, session, listings_df, user_wishlist_df, config, problem_characteristics, time_limit
+    ) -> tuple:
+        """
+        Algorithm for an "auto" request and how it was chosen: learned from past runs on similar
+        problems when there are enough of them, by the fixed rules otherwise.
+        """
+        try:
+            if session is not None:
+                history = await OptimizationMetricsService.get_recent_runs(session)
+            else:
+                history = self.metrics_tracker.get_runs()
+            selected = AlgorithmSelector(history).select(problem_characteristics, time_limit)
+            if selected in self.optimizer_factory.get_available_algorithms():
+                return selected, "learned"
+        except Exception as e:
+            logger.warning(f"Learned algorithm selection failed, using rules: {str(e)}")
+        return self._select_best_algorithm(listings_df, user_wishlist_df, config), "rules"
+
     def _select_best_algorithm(self, listings_df, user_wishlist_df, config) -> str:
         """
         Automatically select the best algorithm based on problem characteristics with NSGA-III support.
@@ -239,6 +320,7 @@ class OptimizationEngine:
             "card_coverage": len(listings_df["name"].unique()) / len(user_wishlist_df),
             "price_variance": listings_df.groupby("name")["price"].std().mean(),
             "quality_distribution": listings_df["quality"].value_counts().to_dict(),
+            "cost_lower_bound": self._cost_lower_bound(listings_df, user_wishlist_df),
         }
 
         # Enhanced complexity score with diversity factors
@@ -266,6 +348,29 @@ class OptimizationEngine:
 
         return characteristics
 
+    @staticmethod
+    def _cost_lower_bound(listings_df, user_wishlist_df) -> float:
+        """Cost of buying every card at its cheapest price, ignoring stock and store count"""
+        cheapest = listings_df.groupby("name")["price"].min()
+        quantities = user_wishlist_df.groupby("name")["quantity"].sum()
+        return float((cheapest.reindex(quantities.index) * quantities).sum())
+
+    async def _race_portfolio(self, problem_data, algorithm_config: AlgorithmConfig, problem_characteristics):
+        """Race the configured portfolio against the request's deadline and return the outcome"""
+        race = PortfolioRace(
+            algorithm_config.race_portfolio,
+            problem_data,
+            algorithm_config.to_dict(),
+            cost_lower_bound=problem_characteristics.get("cost_lower_bound"),
+            good_enough_gap=algorithm_config.race_good_enough_gap,
+        )
+        logger.info(f"Starting portfolio race: {race.algorithms}")
+        loop = asyncio.get_event_loop()
+        outcome = await loop.run_in_executor(None, race.run)
+        if outcome.result is None:
+            raise ValueError(f"No algorithm of the race portfolio returned a result: {outcome.failed}")
+        return outcome
+
     async def _run_optimization_async(self, optimizer):
         """Run optimization in async context"""
         # Run in thread pool to avoid blocking
@@ -354,6 +459,7 @@ class OptimizationEngine:
             "status": "success" if result.best_solution else "failed",
             "best_solution": result.best_solution,
             "iterations": result.all_solutions,
+            "pareto_front": result.pareto_front or [],
             "algorithm_used": result.algorithm_used,
             "execution_time": result.execution_time,
             "type": result.algorithm_used.lower().replace("-", "_"),
@@ -383,35 +489,6 @@ class OptimizationEngine:
                 "unknown_qualities": [],
             }
 
-    def _generate_cache_key(self, user_wishlist_df, config) -> str:
-        """Generate a deterministic cache key for the optimization request"""
-        import hashlib, json
-
-        # Sort wishlist JSON for consistent key ordering
-        wishlist_str = json.dumps(json.loads(user_wishlist_df.to_json(orient="records")), sort_keys=True)
-
-        # Convert config to dict if needed
-        if hasattr(config, "to_dict"):
-            config_dict = config.to_dict()
-        else:
-            config_dict = config
-
-        # Extract and sort relevant config params
-        config_relevant = {k: config_dict.get(k) for k in ["min_store", "max_store", "strict_preferences"]}
-        config_str = json.dumps(config_relevant, sort_keys=True)
-
-        cache_string = f"{wishlist_str}_{config_str}"
-        return hashlib.md5(cache_string.encode()).hexdigest()
-
-    def _add_to_cache(self, key: str, result: Dict):
-        """Add result to cache with size limit"""
-        if len(self._result_cache) >= self._cache_max_size:
-            # Remove oldest entry (simple FIFO)
-            oldest_key = next(iter(self._result_cache))
-            del self._result_cache[oldest_key]
-
-        self._result_cache[key] = result
-
     def _log_optimization_summary(self, result, characteristics: Dict):
         """Log a summary of the optimization results with NSGA-III insights"""
         logger.info("=" * 60)
@@ -456,7 +533,11 @@ class OptimizationEngine:
                 stats[algorithm] = perf
         return stats
 
-    def clear_cache(self):
+    def get_cache_statistics(self) -> Dict[str, Any]:
+        """Hit statistics of the result cache for this engine"""
+        return self.result_cache.get_stats()
+
+    async def clear_cache(self):
         """Clear the result cache"""
-        self._result_cache.clear()
+        await self.result_cache.clear()
         logger.info("Optimization result cache cleared")
\ No newline at end of file
@@ -0,0 +1,43 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.optimization_run_metrics import OptimizationRunMetrics
+from app.services.async_base_service import AsyncBaseService
+
+logger = logging.getLogger(__name__)
+
+# Past runs loaded for algorithm selection, most recent first
+RUN_HISTORY_LIMIT = 2000
+
+
+class OptimizationMetricsService(AsyncBaseService[OptimizationRunMetrics]):
+    """Async service persisting optimization run metrics"""
+
+    model_class = OptimizationRunMetrics
+
+    @classmethod
+    async def record_run(cls, session: AsyncSession, run: Dict[str, Any]) -> Optional[OptimizationRunMetrics]:
+        """
+        Store a run. Done in a savepoint: failing to record metrics must not fail the optimization
+        nor spoil the caller's transaction.
+        """
+        try:
+            async with session.begin_nested():
+                return await cls.create(session, **run)
+        except Exception as e:
+            logger.warning(f"Could not record optimization run metrics: {str(e)}")
+            return None
+
+    @classmethod
+    async def get_recent_runs(cls, session: AsyncSession, limit: int = RUN_HISTORY_LIMIT) -> List[Dict[str, Any]]:
+        """Most recent runs as dicts, empty when they can't be read"""
+        try:
+            stmt = select(OptimizationRunMetrics).order_by(OptimizationRunMetrics.created_at.desc()).limit(limit)
+            result = await session.execute(stmt)
+            return [run.to_dict() for run in result.scalars().all()]
+        except Exception as e:
+            logger.warning(f"Could not load optimization run metrics: {str(e)}")
+            return []
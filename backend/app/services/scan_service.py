@@ -2,17 +2,50 @@ import logging
 from datetime import datetime, timezone
 from typing import List, Optional, Dict, Any, Tuple
 
-from sqlalchemy import select, distinct, and_, func
+import pandas as pd
+from sqlalchemy import select, distinct, and_, func, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.constants.card_mappings import CardLanguage, CardQuality, CardVersion
 from app.models.scan import Scan, ScanResult, ScanAttempt
 from app.models.site import Site
+from app.optimization.core.listings_table import ListingsTable
 from app.services.async_base_service import AsyncBaseService
 from app.utils.helpers import normalize_string
 
 logger = logging.getLogger(__name__)
 
+# Rows per multi-row INSERT when saving a site's results
+BULK_INSERT_CHUNK_SIZE = 1000
+
+SCAN_RESULT_DEFAULTS = {
+    "set_name": None,
+    "set_code": None,
+    "version": None,
+    "foil": False,
+    "quality": None,
+    "language": "English",
+    "quantity": 0,
+    "variant_id": None,
+}
+SET_CODE_PATTERN = r"[a-zA-Z0-9]{3,5}"
+
+# Selected in the order ListingsTable.from_rows expects
+LISTING_QUERY_COLUMNS = (
+    ScanResult.name,
+    ScanResult.site_id,
+    ScanResult.set_name,
+    ScanResult.set_code,
+    ScanResult.price,
+    ScanResult.quality,
+    ScanResult.quantity,
+    ScanResult.version,
+    ScanResult.foil,
+    ScanResult.language,
+    ScanResult.variant_id,
+)
+
 
 class ScanService(AsyncBaseService[Scan]):
     """Async service for scan operations"""
@@ -82,6 +115,131 @@ class ScanService(AsyncBaseService[Scan]):
             logger.error(f"Error creating scan result: {str(e)}")
             raise
 
+    @classmethod
+    async def bulk_create_scan_attempts(
+        cls, session: AsyncSession, scan_id: int, site_id: int, attempts: Dict[str, bool]
+    ) -> int:
+        """Record every scanned card of a site, mapping card name to whether it was found"""
+        attempted_at = datetime.now(timezone.utc)
+        rows = [
+            {
+                "scan_id": scan_id,
+                "site_id": site_id,
+                "card_name": normalize_string(card_name),
+                "found": found,
+                "attempted_at": attempted_at,
+            }
+            for card_name, found in attempts.items()
+        ]
+        await cls._insert_in_chunks(session, ScanAttempt, rows)
+        return len(rows)
+
+    @classmethod
+    async def bulk_create_scan_results(
+        cls, session: AsyncSession, scan_id: int, card_results: List[Dict[str, Any]]
+    ) -> int:
+        """
+        Save all results of a site at once.
+
+        The scan is checked once and the rows are validated column-wise with the same rules as the
+        ScanResult validators; invalid rows are logged and skipped instead of failing the whole batch.
+        Returns the number of rows inserted.
+        """
+        try:
+            if not await session.scalar(select(Scan.id).where(Scan.id == scan_id)):
+                raise ValueError(f"No scan found with id {scan_id}")
+
+            rows = cls._build_scan_result_rows(scan_id, card_results)
+            await cls._insert_in_chunks(session, ScanResult, rows)
+            return len(rows)
+        except Exception as e:
+            await session.rollback()
+            logger.error(f"Error bulk creating scan results: {str(e)}")
+            raise
+
+    @staticmethod
+    def _build_scan_result_rows(scan_id: int, card_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Normalize and validate scan results as a DataFrame, returning the valid rows as insert parameters"""
+        if not card_results:
+            return []
+
+        df = pd.DataFrame(card_results)
+        for column, default in SCAN_RESULT_DEFAULTS.items():
+            if column not in df.columns:
+                df[column] = default
+        invalid = pd.Series(False, index=df.index)
+
+        # Normalizers only run once per distinct value
+        def normalize_unique(series: pd.Series, normalize) -> pd.Series:
+            mapping = {}
+            for value in series.dropna().unique():
+                try:
+                    mapping[value] = normalize(value)
+                except ValueError:
+                    mapping[value] = None
+            return series.map(mapping)
+
+        df["name"] = normalize_unique(df["name"].astype("string"), lambda name: normalize_string(name).strip())
+        invalid |= df["name"].isna() | (df["name"] == "")
+
+        site_ids = pd.to_numeric(df["site_id"], errors="coerce")
+        invalid |= site_ids.isna() | (site_ids == 0)
+
+        price = pd.to_numeric(df["price"], errors="coerce")
+        invalid |= (price.isna() & df["price"].notna()) | (price < 0)
+
+        quantity = pd.to_numeric(df["quantity"], errors="coerce")
+        invalid |= (quantity.isna() & df["quantity"].notna()) | (quantity < 0)
+
+        set_code = df["set_code"].astype("string").replace("", pd.NA)
+        invalid |= set_code.notna() & ~set_code.str.fullmatch(SET_CODE_PATTERN).fillna(False)
+
+        quality = normalize_unique(df["quality"].replace("", None), CardQuality.validate_and_normalize)
+        invalid |= quality.isna() & df["quality"].notna() & (df["quality"] != "")
+
+        versions = {v.value for v in CardVersion}
+        version = df["version"].replace("", None).fillna(CardVersion.STANDARD.value)
+        invalid |= ~version.isin(versions)
+
+        if invalid.any():
+            logger.warning(
+                f"Skipping {int(invalid.sum())} invalid scan results for scan {scan_id}: "
+                f"{df.loc[invalid, 'name'].dropna().head(5).tolist()}"
+            )
+
+        valid = ~invalid
+        rows = pd.DataFrame(
+            {
+                "scan_id": scan_id,
+                "name": df["name"],
+                "price": price,
+                "site_id": site_ids,
+                "set_name": df["set_name"],
+                "set_code": set_code.str.upper(),
+                "version": version,
+                "foil": df["foil"].astype("boolean").fillna(False).astype(bool),
+                "quality": quality.fillna(CardQuality.NM.value),
+                "language": normalize_unique(df["language"], CardLanguage.normalize),
+                "quantity": quantity.fillna(0),
+                "variant_id": df["variant_id"],
+            }
+        )[valid]
+        rows["site_id"] = rows["site_id"].astype(int)
+        rows["quantity"] = rows["quantity"].astype(int)
+        rows = rows.astype(object)
+
+        updated_at = datetime.now(timezone.utc)
+        records = rows.where(rows.notna(), None).to_dict("records")
+        for record in records:
+            record["updated_at"] = updated_at
+        return records
+
+    @staticmethod
+    async def _insert_in_chunks(session: AsyncSession, model, rows: List[Dict[str, Any]]):
+        """Write rows with one executemany per chunk, bypassing per-object ORM flushes"""
+        for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+            await session.execute(insert(model), rows[start : start + BULK_INSERT_CHUNK_SIZE])
+
     @classmethod
     async def delete_scans(cls, session: AsyncSession, scan_ids: List[int]) -> Tuple[List[int], List[Dict]]:
         """
@@ -226,6 +384,44 @@ class ScanService(AsyncBaseService[Scan]):
             logger.error(f"Error getting latest scan results: {str(e)}")
             return None, None
 
+    @classmethod
+    async def get_scan_listings(cls, session: AsyncSession, scan_id: int, card_names: List[str]) -> ListingsTable:
+        """Listings of a scan for the given cards, loaded as columns without building ORM objects"""
+        result = await session.execute(
+            select(*LISTING_QUERY_COLUMNS).filter(
+                ScanResult.scan_id == scan_id, ScanResult.name.in_([normalize_string(n) for n in card_names])
+            )
+        )
+        return ListingsTable.from_rows(result.all())
+
+    @classmethod
+    async def get_latest_listings_by_site_and_cards(
+        cls, session: AsyncSession, card_names: List[str], site_ids: List[int]
+    ) -> ListingsTable:
+        """Columnar counterpart of get_latest_scan_results_by_site_and_cards"""
+        try:
+            normalized_cards = [normalize_string(n) for n in card_names]
+            latest_scans_cte = (
+                select(ScanResult.name, ScanResult.site_id, func.max(ScanResult.scan_id).label("latest_scan_id"))
+                .filter(and_(ScanResult.name.in_(normalized_cards), ScanResult.site_id.in_(site_ids)))
+                .group_by(ScanResult.name, ScanResult.site_id)
+                .cte("latest_scans")
+            )
+            result = await session.execute(
+                select(*LISTING_QUERY_COLUMNS).join(
+                    latest_scans_cte,
+                    and_(
+                        ScanResult.name == latest_scans_cte.c.name,
+                        ScanResult.site_id == latest_scans_cte.c.site_id,
+                        ScanResult.scan_id == latest_scans_cte.c.latest_scan_id,
+                    ),
+                )
+            )
+            return ListingsTable.from_rows(result.all())
+        except Exception as e:
+            logger.error(f"Error getting latest listings by site and cards: {str(e)}")
+            return ListingsTable()
+
     @classmethod
     async def get_latest_scan_results_by_site_and_cards(
         cls, session: AsyncSession, fresh_cards: List[str], site_ids: List[int]
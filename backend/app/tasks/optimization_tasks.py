@@ -11,8 +11,6 @@ from app import create_app
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from app.utils.async_context_manager import celery_session_scope
-from app.constants.card_mappings import CardQuality
-from app.constants.currency_constants import apply_currency_conversion_to_listings
 from app.dto.optimization_dto import (
     CardInSolution,
     OptimizationConfigDTO,
@@ -21,6 +19,7 @@ from app.dto.optimization_dto import (
     StoreInSolution,
 )
 from ..services.optimization_engine import OptimizationEngine
+from app.optimization.core.listings_table import ListingsTable
 
 from app.models.site import Site
 from app.models.site_statistics import SiteStatistics
@@ -108,31 +107,24 @@ class OptimizationTaskManager:
             for site in self.sites
         }
 
-    async def prepare_optimization_data(self, scraping_results):
-        """Prepare optimization data from scraping results or database"""
+    async def prepare_optimization_data(self, listings):
+        """Prepare optimization data from a scan's ListingsTable (or scraped card dicts)"""
         try:
-            card_listings = []
+            if not isinstance(listings, ListingsTable):
+                listings = ListingsTable.from_records(listings)
 
             start_time = time.time()
-            logger.info(f"Processing {len(scraping_results)} scraping results")
-            card_listings = self._process_scraping_results(scraping_results)
+            logger.info(f"Processing {len(listings)} listings ({listings.nbytes / 1024:.0f} KiB)")
+            site_names = {site_id: site_info["name"] for site_id, site_info in self.site_data.items()}
+            prepared = listings.prepare(site_names, self.site_currency_map)
             elapsed_time = round(time.time() - start_time, 2)
+            logger.info(f"Processed {len(prepared)} card listings results in {elapsed_time} seconds")
 
-            logger.info(f"Processed {len(card_listings)} card listings results in {elapsed_time} seconds")
-
-            for result in scraping_results:
-                if "variant_id" not in result or result["variant_id"] is None:
-                    logger.warning(
-                        f"Scraped card missing variant_id: {result.get('name')} from site_id: {result.get('site_id')}"
-                    )
-
-            if not card_listings:
+            if prepared.empty:
                 logger.error("No card listings created")
                 return None, None
 
-            card_listings_df = pd.DataFrame(card_listings)
-            card_listings_df = apply_currency_conversion_to_listings(card_listings_df, self.site_currency_map)
-            filtered_listings_df = self._normalize_and_filter_dataframe(card_listings_df)
+            filtered_listings_df = prepared.to_frame()
             logger.info(f"[FILTER] Listings after processing: {len(filtered_listings_df)}")
             logger.info(f"[FILTER] Unique cards after filtering: {filtered_listings_df['name'].nunique()}")
             logger.info(f"[FILTER] Unique sites after filtering: {filtered_listings_df['site_name'].nunique()}")
@@ -146,7 +138,7 @@ class OptimizationTaskManager:
             else:
                 user_wishlist_df["min_quality"] = "NM"  # Default to 'NM' if not provided
 
-            logger.info(f"[DATA] Raw card_listings_df: {len(card_listings_df)} rows")
+            logger.info(f"[DATA] Raw card listings: {len(listings)} rows")
             logger.info(f"[DATA] Raw buylist_df: {len(user_wishlist_df)} rows")
             return filtered_listings_df, user_wishlist_df
 
@@ -154,39 +146,6 @@ class OptimizationTaskManager:
             logger.exception(f"Error in prepare_optimization_data: {str(e)}")
             return None, None
 
-    def _process_scraping_results(self, scraping_results):
-        """Process scraping results into card listings"""
-        card_listings = []
-        for r in scraping_results:
-            site_info = self.site_data.get(r["site_id"])
-            if not site_info:
-                logger.warning(f"[SITE INFO] No site info found for site_id: {r['site_id']}, skipping result.")
-                continue
-
-            if not r["set_code"] or r["set_code"] == "unknown":
-                logger.warning(
-                    f"[SET CODE] Unknown set code for '{r['set_name']}' at final processing stage, skipping."
-                )
-                continue
-
-            card_listings.append(
-                {
-                    "site_name": site_info["name"],
-                    "name": r["name"],
-                    "set_name": r["set_name"],
-                    "set_code": r["set_code"],
-                    "price": round(float(r["price"]), 2),
-                    "quality": r["quality"],
-                    "quantity": int(r["quantity"]),
-                    "version": r.get("version", "Standard"),
-                    "foil": bool(r.get("foil", False)),
-                    "language": r.get("language", "English"),
-                    "site_id": r["site_id"],
-                    "variant_id": r.get("variant_id"),
-                }
-            )
-        return card_listings
-
     def _get_scan_id(self):
         """Get current or latest scan ID"""
         if self.current_scan_id:
@@ -199,21 +158,6 @@ class OptimizationTaskManager:
         scan_results = ScanService.get_scan_results_by_id_and_sites(scan_id, site_ids=self.site_ids)
         return scan_results
 
-    def _normalize_and_filter_dataframe(self, df):
-        """Normalize and filter card listings"""
-        if df.empty:
-            return None
-
-        # Step 1: Normalize all quality values
-        df["quality"] = df["quality"].astype(str)
-        df = CardQuality.validate_and_update_qualities(df, quality_column="quality")
-
-        # Step 2: Filter cards with quantity > 0
-        df = df[df["quantity"] > 0].copy()
-
-        # Step 3: Sort by name and original price
-        return df.sort_values(["name", "price"])
-
     @staticmethod
     def display_statistics(filtered_listings_df):
         sites_stats = {}
@@ -386,6 +330,8 @@ async def _async_scrape_site(task_updater, site_id, card_names, scan_id, result)
                 "method": site.method,
                 "url": site.url,
                 "api_url": site.api_url,
+                "rate_limit": site.rate_limit,
+                "max_concurrency": site.max_concurrency,
             }
 
             result["site_name"] = site.name
@@ -450,7 +396,6 @@ async def _async_scrape_site(task_updater, site_id, card_names, scan_id, result)
             async with celery_session_scope() as session:
                 for card_result in scraping_results:
                     name_norm = normalize_string(card_result["name"])
-                    await ScanService.create_scan_result(session, scan_id, card_result)
                     unique_cards_found.add(name_norm)
                     attempt_status[name_norm] = True
 
@@ -459,8 +404,8 @@ async def _async_scrape_site(task_updater, site_id, card_names, scan_id, result)
                     name_norm = normalize_string(card_name)
                     attempt_status[name_norm] = False
 
-                for name_norm, found in attempt_status.items():
-                    await ScanService.create_scan_attempt(session, scan_id, site_id, name_norm, found=found)
+                await ScanService.bulk_create_scan_results(session, scan_id, scraping_results)
+                await ScanService.bulk_create_scan_attempts(session, scan_id, site_id, attempt_status)
 
                 await stats.persist_to_db(session, scan_id)
                 await session.commit()
@@ -625,16 +570,14 @@ async def _async_start_scraping_task(
 
         # Load fresh results from DB
         task_updater.update_progress(8.0, "Loading fresh results from database")
-        all_results = []
+        fresh_listings = ListingsTable()
         if fresh_by_card:
             all_card_names = list(fresh_by_card.keys())
             async with celery_session_scope() as session:
-                fresh_results = await ScanService.get_latest_scan_results_by_site_and_cards(
+                latest_listings = await ScanService.get_latest_listings_by_site_and_cards(
                     session, all_card_names, site_ids
                 )
-                for r in fresh_results:
-                    if r.name.strip() in fresh_by_card and r.site_id in fresh_by_card[r.name.strip()]:
-                        all_results.append(r.to_dict())
+            fresh_listings = latest_listings.filter_pairs(fresh_by_card)
 
         # Prepare scrape targets
         outdated_by_site = {}
@@ -653,13 +596,13 @@ async def _async_start_scraping_task(
 
         # Build final scan result set
         outdated_cards = list({name for name, _ in outdated_pairs})
-        new_results = await _build_final_results(scan_id, outdated_cards)
-        fetched_card_names = {r["name"] for r in new_results}
+        new_listings = await _build_final_results(scan_id, outdated_cards)
+        fetched_card_names = set(new_listings.frame["name"].astype(str))
         still_missing = [c for c in outdated_cards if c not in fetched_card_names]
         if still_missing:
             logger.warning(f"[Post-Scrape] Missing listings for {len(still_missing)} cards: {still_missing}")
 
-        all_results.extend(new_results)
+        all_listings = ListingsTable.concat([fresh_listings, new_listings])
 
         # Log scrape statistics
         await _log_scrape_statistics(scan_id)
@@ -667,7 +610,7 @@ async def _async_start_scraping_task(
         # Run optimization using the enhanced service
         task_updater.update_progress(60, "Starting optimization")
         result = await _optimize_and_return_result(
-            task_updater, optimizationConfig, card_list_from_frontend, all_results, site_ids, scan_id, total_start_time
+            task_updater, optimizationConfig, card_list_from_frontend, all_listings, site_ids, scan_id, total_start_time
         )
         return result
 
@@ -873,41 +816,19 @@ async def _launch_and_track_scraping_tasks(task_updater, outdated_by_site: Dict[
     return failed
 
 
-async def _build_final_results(scan_id, outdated_cards):
+async def _build_final_results(scan_id, outdated_cards) -> ListingsTable:
     """
-    Fetches and prepares scan results safely within the session context.
+    Loads the listings scraped for this scan as a ListingsTable.
     """
     async with celery_session_scope() as session:
-        scan = await ScanService.get_scan_results_by_scan_id(session, scan_id)
+        scan = await ScanService.get_by_id(session, scan_id)
         if not scan:
             logger.error(f"Scan ID {scan_id} not found in DB.")
             raise ValueError(f"Could not fetch scan with ID {scan_id}")
 
-        filtered_results = []
-        for r in scan.scan_results:
-            if r.name not in outdated_cards:
-                continue
-            try:
-                filtered_results.append(
-                    {
-                        "name": r.name,
-                        "price": float(r.price),
-                        "site_id": r.site_id,
-                        "set_name": r.set_name,
-                        "set_code": r.set_code,
-                        "version": r.version,
-                        "foil": r.foil,
-                        "quality": r.quality,
-                        "language": r.language,
-                        "quantity": r.quantity,
-                        "variant_id": r.variant_id,
-                        "updated_at": r.updated_at.isoformat(),
-                    }
-                )
-            except Exception as e:
-                logger.warning(f"Skipping result due to error: {e} for card {r.name}")
-
-    return filtered_results
+        if not outdated_cards:
+            return ListingsTable()
+        return await ScanService.get_scan_listings(session, scan_id, outdated_cards)
 
 
 async def _log_scrape_statistics(scan_id):
@@ -920,7 +841,7 @@ async def _log_scrape_statistics(scan_id):
 
 
 async def _optimize_and_return_result(
-    task_updater, optimizationConfig, cards, all_results, site_ids, scan_id, start_time
+    task_updater, optimizationConfig, cards, all_listings, site_ids, scan_id, start_time
 ):
     """Use only the enhanced optimization service"""
     async with celery_session_scope() as session:
@@ -932,7 +853,7 @@ async def _optimize_and_return_result(
         # Prepare data for enhanced service
         task_mgr = OptimizationTaskManager(site_ids, sites, cards, optimizationConfig)
         await task_mgr.initialize(session)
-        listings_df, user_wishlist_df = await task_mgr.prepare_optimization_data(all_results)
+        listings_df, user_wishlist_df = await task_mgr.prepare_optimization_data(all_listings)
 
         if listings_df is None or listings_df.empty:
             fail_result = await handle_failure(
@@ -941,8 +862,8 @@ async def _optimize_and_return_result(
             await session.commit()
             return fail_result
 
-        # Use enhanced service
-        enhanced_service = OptimizationEngine()
+        # Use enhanced service, sharing results across requests through Redis
+        enhanced_service = OptimizationEngine(redis_client=await CardService.get_redis_client())
 
         # Update progress
         task_updater.update_progress(65, "Running enhanced optimization", step="optimization_start")
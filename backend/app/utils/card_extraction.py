@@ -0,0 +1,744 @@
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from app.constants import CardQuality, CardVersion
+from app.utils.crystal_parser import iter_crystal_forms, is_magic_singles_href
+from app.utils.helpers import (
+    clean_card_name,
+    detect_foil,
+    extract_price,
+    extract_quantity,
+    extract_quality_language,
+    find_name_version_foil,
+    normalize_price,
+    normalize_variant_description,
+    parse_card_string,
+)
+from app.utils.set_name_index import SetNameIndex
+from app.utils.set_resolution_cache import SetResolution, SetResolver
+
+logger = logging.getLogger(__name__)
+
+EXCLUDED_CATEGORIES = {
+    "playmats",
+    "booster packs",
+    "booster box",
+    "cb consignment",
+    "mtg booster boxes",
+    "art series",
+    "fat packs and bundles",
+    "mtg booster packs",
+    "magic commander deck",
+    "world championship deck singles",
+    "the crimson moon's fairy tale",
+    "rpg accessories",
+    "scan other",
+    "intro packs and planeswalker decks",
+    "wall scrolls",
+    "lots of keycards",
+    "board games",
+    "token colorless",
+    "scan other",
+    "books",
+    "pbook",
+    "dice",
+    "pathfinder",
+    "oversized cards",
+    "promos: miscellaneous",
+    "prerelease cards",
+    "brawl",
+}
+
+CRYSTAL_PROMO_SET_MAPPINGS = {
+    "CBL Bundle Promo": "Commander Legends: Battle for Baldur's Gate",
+    "Treasure Chest Promo": "ixalan promos",
+    "Bundle Promo": "Promo Pack",  # Generic bundle promos
+}
+
+# Fields identifying a duplicate offer for each CrystalCommerce strategy
+CRYSTAL_FORM_VARIANT_KEY = ("name", "set_name", "set_code", "version", "language", "foil", "quality", "price")
+CRYSTAL_SCRAPPER_VARIANT_KEY = (
+    "name",
+    "set_name",
+    "set_code",
+    "language",
+    "version",
+    "foil",
+    "quality",
+    "price",
+    "variant_id",
+)
+
+# Set resolution state of an extraction worker process, shipped once by the pool initializer
+_worker_set_index: Optional[SetNameIndex] = None
+_worker_resolutions: Dict[str, SetResolution] = {}
+
+
+def init_extraction_worker(
+    set_index: Optional[SetNameIndex], resolutions: Dict[str, SetResolution], log_level: int = logging.INFO
+):
+    global _worker_set_index, _worker_resolutions
+    logging.basicConfig(level=log_level)
+    _worker_set_index = set_index
+    _worker_resolutions = dict(resolutions)
+
+
+def run_extraction(extract, *args):
+    """Run ``extract`` in a worker with its set resolver, returning the result and the new set resolutions"""
+    resolver = SetResolver(_worker_set_index, _worker_resolutions)
+    return extract(*args, resolver), resolver.new_resolutions
+
+
+def unique_cards(cards: List[dict], key_fields: Sequence[str]) -> List[dict]:
+    """Keep the first card of every variant key, in order"""
+    seen_variants = set()
+    unique = []
+    for card_info in cards:
+        variant_key = tuple(card_info[field] for field in key_fields)
+        if variant_key not in seen_variants:
+            unique.append(card_info)
+            seen_variants.add(variant_key)
+    return unique
+
+
+def extract_crystal_form_cards(page: str, site, card_names, resolver: SetResolver) -> Tuple[List[dict], int]:
+    """Cards of the add-to-cart forms of one CrystalCommerce page, with the number of forms seen."""
+    cards = []
+    seen_variants = set()
+    total_variant = 0
+
+    forms = iter_crystal_forms(page)
+    for form in forms:
+        total_variant += 1
+        try:
+            if not form.in_product:
+                # self.skip_tracker.add(
+                #     site.get("name"), locals().get("name", "<unknown>"), "Product could not be found", data
+                # )
+                continue
+
+            # Check if it's a Magic card
+            if not form.is_magic:
+                # self.skip_tracker.add(
+                #     site.get("name"), locals().get("name", "<unknown>"), "Non Magic card", data
+                # )
+                continue
+            # Extract data from form attributes
+            data = form.attrs
+
+            # Skip if required attributes are missing
+            required_attrs = [
+                "data-name",
+                "data-price",
+                "data-category",
+                "data-variant",
+            ]
+            if not all(attr in data for attr in required_attrs):
+                # self.skip_tracker.add(
+                #     site.get("name"), locals().get("name", "<unknown>"), "Attributes could not be found", data
+                # )
+                continue
+
+            current_card = parse_card_string(data["data-name"])
+            if not current_card:
+                # self.skip_tracker.add(
+                #     site.get("name"), locals().get("name", "<unknown>"), "current_card could not be found", data
+                # )
+                continue
+
+            # Clean and validate card name
+            name = clean_card_name(current_card["Name"], card_names)
+            name_variants = [name, name.split(" // ")[0].strip()]
+            # logger.info(f"after clean_card_name form: {name} ")
+            # Check if any variant is in card_names directly
+            if not any(variant in card_names for variant in name_variants):
+                # If not, check case-insensitive match
+                lower_card_names = [c.lower() for c in card_names]
+                if not any(variant.lower() in lower_card_names for variant in name_variants):
+                    # self.skip_tracker.add(
+                    #     site.get("name"), locals().get("name", "<unknown>"), "Card not in requested list", data
+                    # )
+                    # logger.info(f"[CRYSTAL][SKIP] No match for: '{name}' → variants: {name_variants}")
+                    continue
+
+            category = data.get("data-category")
+            set_name = category
+            # logger.info(f"after data.get('data-category') form: {set_name} ")
+
+            if any(test in category.lower() for test in EXCLUDED_CATEGORIES):
+                if category == "Brawl":
+                    product_url = form.product_url
+                    # logger.info(f"product_url: {product_url} for site: {site.name}\n {category}")
+
+                    if product_url is not None:
+                        set_name = resolver.extract_magic_set_from_href(product_url)
+                        # logger.info(f"product_url: {product_url} for site: {site.name}\n {set_name}")
+                elif category == "Promos: Miscellaneous":
+                    card_name = data.get("data-name", "")
+                    name_parts = card_name.split(" - ")
+                    promo_suffix = name_parts[-1] if len(name_parts) > 1 else None
+                    if promo_suffix and promo_suffix in CRYSTAL_PROMO_SET_MAPPINGS:
+                        set_name = CRYSTAL_PROMO_SET_MAPPINGS[promo_suffix]
+                # self.skip_tracker.add(
+                #     site.get("name"), locals().get("name", "<unknown>"), f"Excluded category: {category}", data
+                # )
+                continue
+
+            # Try to match with closest set name using CardService
+            set_name = resolver.get_closest_set_name(set_name)
+
+            if not set_name or set_name.lower() == "unknown":
+                original_set_name = set_name
+                # Fallback to extracting from URL (new logic)
+                product_url = form.product_url
+                if product_url is not None:
+                    fallback_set = resolver.extract_magic_set_from_href(product_url)
+                    if fallback_set:
+                        set_name = fallback_set
+                        logger.info(
+                            f"[SET CODE] Fallback used for set '{original_set_name}' -> '{set_name}' using URL: {product_url}"
+                        )
+                    else:
+                        # self.skip_tracker.add(
+                        #     site.get("name"), name, f"Fallback used for set for: {set_name}", data
+                        # )
+                        continue  # Skip if still no valid set found
+                else:
+                    logger.warning(f"No product URL found for '{original_set_name}'")
+                    # self.skip_tracker.add(
+                    #     site.get("name"),
+                    #     locals().get("name", "<unknown>"),
+                    #     f"No product URL found for: {set_name}",
+                    #     data,
+                    # )
+                    continue
+
+            # logger.info(f"after get_closest_set_name form: {set_name} ")
+            set_code = resolver.get_clean_set_code_from_set_name(set_name)
+            if not set_code:
+                # Attempt fallback using parts of data-name
+                name_parts = data.get("data-name", "").split(" - ")
+                for part in reversed(name_parts):  # Start from the most specific suffix
+                    fallback_set_name = resolver.get_closest_set_name(part.strip())
+                    fallback_set_code = resolver.get_clean_set_code_from_set_name(fallback_set_name)
+                    if fallback_set_code:
+                        logger.debug(
+                            f"Fallback set code found from data-name part '{part}': {fallback_set_name} ({fallback_set_code})"
+                        )
+                        set_code = fallback_set_code
+                        set_name = fallback_set_name
+                        break
+                if not set_code:
+                    # logger.info(
+                    #     f"[SET CODE] Skipping card after fallback {name} unknown set: {set_code} for site: {site.get('name')}\n {data}"
+                    # )
+                    # self.skip_tracker.add(
+                    #     site.get("name"), name, f"Failed to resolve set code for: {set_name}", data
+                    # )
+                    continue
+            if set_code.lower() == "pbook":
+                # logger.info(
+                #     f"after pbook: {set_code} name:{set_name} for site: {site.get('name')}\n data: {data}\n {data}"
+                # )
+                # self.skip_tracker.add(
+                #     site.get("name"), name, f"Failed to resolve set code for: {set_name}", data
+                # )
+                continue
+            # logger.info(f"after get_clean_set_code form: {set_code} ")
+
+            test = data.get("data-variant", "").strip()
+            if not test:
+                # self.skip_tracker.add(
+                #     site.get("name"), locals().get("name", "<unknown>"), "Missing variant ID", data
+                # )
+                continue
+
+            quality, language = extract_quality_language(test)
+            # logger.info(f"after extract_quality_language form: {quality} ")
+
+            # Parse name, version, and foil status
+            unclean_name, version, foil = find_name_version_foil(data["data-name"])
+            is_foil = detect_foil(product_foil=foil, product_version=version, variant_data=test)
+            version = CardVersion.normalize(version or "Standard")
+
+            # Extract and validate quantity
+            quantity = form.quantity
+            if not quantity or quantity <= 0:
+                quantity = 1
+
+            variant_id = data.get("data-vid")
+            if not variant_id:
+                # self.skip_tracker.add(
+                #     site.get("name"), locals().get("name", "<unknown>"), "Missing variant ID", data
+                # )
+                continue
+            # Create card info dictionary
+            card_info = {
+                "name": name,
+                "set_name": set_name,
+                "set_code": set_code,
+                "version": version,
+                "language": language,
+                "foil": is_foil,
+                "quality": quality,
+                "quantity": quantity,
+                "price": normalize_price(data["data-price"]),
+                "variant_id": variant_id,
+            }
+
+            # Create variant key for deduplication
+            variant_key = (
+                card_info["name"],
+                card_info["set_name"],
+                card_info["set_code"],
+                card_info["version"],
+                card_info["language"],
+                card_info["foil"],
+                card_info["quality"],
+                card_info["price"],
+            )
+
+            if variant_key not in seen_variants:
+                cards.append(card_info)
+                seen_variants.add(variant_key)
+
+        except Exception as e:
+            logger.error(f"Error processing form in {site.get('name')}: {str(e)}", exc_info=True)
+            continue
+    return cards, total_variant
+
+
+def extract_crystal_scrapper_cards(page: str, site, card_names, resolver: SetResolver) -> Tuple[List[dict], int]:
+    """Cards of the product variant rows of one CrystalCommerce page, with the number of rows seen."""
+    cards = []
+    seen_variants = set()
+    total_variant = 0
+
+    products_containers = crystal_products_containers(page, site)
+    for container in products_containers:
+        products = container.find_all("li", {"class": "product"})
+        for product in products:
+            if not is_magic_card(product):
+                # self.skip_tracker.add(
+                #     site.get("name"), locals().get("name", "<unknown>"), "Non Magic card", data
+                # )
+                continue
+            variants_section = product.find("div", {"class": "variants"})
+            if not variants_section:
+                # self.skip_tracker.add(
+                #     site.get("name"), locals().get("name", "<unknown>"), "No variant could be found", data
+                # )
+                continue
+
+            for variant in variants_section.find_all("div", {"class": "variant-row"}):
+                if "no-stock" in variant.get("class", []):
+                    # self.skip_tracker.add(
+                    #     site.get("name"), locals().get("name", "<unknown>"), "No stocks found", data
+                    # )
+                    continue
+                try:
+                    # Extract and validate quality and language
+                    variant_data = variant.find(
+                        "span",
+                        {"class": "variant-short-info variant-description"},
+                    ) or variant.find("span", {"class": "variant-short-info"})
+
+                    if not variant_data:
+                        # self.skip_tracker.add(
+                        #     site.get("name"),
+                        #     locals().get("name", "<unknown>"),
+                        #     "No variant_data could be found",
+                        #     data,
+                        # )
+                        continue
+                    form_tag = variant.find("form", {"class": "add-to-cart-form"})
+                    if not form_tag:
+                        # self.skip_tracker.add(
+                        #     site.get("name"),
+                        #     locals().get("name", "<unknown>"),
+                        #     "No form_Tag could be found",
+                        #     data,
+                        # )
+                        continue
+                    variant_id = form_tag.get("data-vid")
+                    if not variant_id:
+                        # self.skip_tracker.add(
+                        #     site.get("name"),
+                        #     locals().get("name", "<unknown>"),
+                        #     "No variant_id could be found",
+                        #     data,
+                        # )
+                        continue
+
+                    # Get set name
+                    meta_div = product.find("div", {"class": "meta"})
+                    if not meta_div:
+                        # self.skip_tracker.add(
+                        #     site.get("name"),
+                        #     locals().get("name", "<unknown>"),
+                        #     "No meta_div could be found",
+                        #     data,
+                        # )
+                        continue
+
+                    # Get and validate name
+                    name_header = meta_div.find("h4", {"class": "name"}) if meta_div else None
+                    if not name_header:
+                        # self.skip_tracker.add(
+                        #     site.get("name"),
+                        #     locals().get("name", "<unknown>"),
+                        #     "No name header could be found",
+                        #     data,
+                        # )
+                        continue
+
+                    parsed_card = parse_card_string(name_header.text)
+                    if not parsed_card:
+                        # self.skip_tracker.add(
+                        #     site.get("name"),
+                        #     locals().get("name", "<unknown>"),
+                        #     "Failed to parse card name",
+                        #     data,
+                        # )
+                        continue
+
+                    clean_name = clean_card_name(parsed_card.get("Name", name_header.text), card_names)
+                    if not clean_name or (
+                        clean_name not in card_names and clean_name.split(" // ")[0].strip() not in card_names
+                    ):
+                        # self.skip_tracker.add(
+                        #     site.get("name"), locals().get("name", "<unknown>"), "Invalid card name", data
+                        # )
+                        continue
+
+                    # Extract and validate quality and language
+                    quality_language = normalize_variant_description(variant_data.text)
+                    # logger.info(f"after normalize_variant_description: {quality_language}")
+                    quality, language = extract_quality_language(quality_language)
+
+                    if not quality or not language:
+                        # self.skip_tracker.add(
+                        #     site.get("name"), name, "Quality or language not found for variant", data
+                        # )
+                        continue
+
+                    # Extract and validate quantity
+                    quantity = extract_quantity(variant)
+                    if quantity is None or quantity <= 0:
+                        # self.skip_tracker.add(
+                        #     site.get("name"),
+                        #     locals().get("name", "<unknown>"),
+                        #     "Invalid quantity for variant",
+                        #     data,
+                        # )
+                        continue
+
+                    # Extract and validate price
+                    price = extract_price(variant)
+                    if price is None or price <= 0:
+                        # self.skip_tracker.add(
+                        #     site.get("name"),
+                        #     locals().get("name", "<unknown>"),
+                        #     "Invalid price for variant",
+                        #     data,
+                        # )
+                        continue
+
+                    set_elem = meta_div.find("span", {"class": "category"}) if meta_div else None
+                    if not set_elem:
+                        # self.skip_tracker.add(
+                        #     site.get("name"),
+                        #     locals().get("name", "<unknown>"),
+                        #     "Set element not found for variant",
+                        #     data,
+                        # )
+                        continue
+
+                    if any(cat in set_elem.text.lower() for cat in EXCLUDED_CATEGORIES):
+                        # self.skip_tracker.add(
+                        #     site.get("name"), locals().get("name", "<unknown>"), "Excluded category found", data
+                        # )
+                        continue
+
+                    set_name = resolver.get_closest_set_name(set_elem.text.lower())
+                    if not set_name:
+                        # self.skip_tracker.add(
+                        #     site.get("name"), name, "Failed to get set name for variant", data
+                        # )
+                        continue
+                    set_code = resolver.get_clean_set_code_from_set_name(set_name)
+                    if not set_code:
+                        # Attempt fallback using parts of data-name
+                        name_parts = name_header.split(" - ")
+                        for part in reversed(name_parts):  # Start from the most specific suffix
+                            fallback_set_name = resolver.get_closest_set_name(part.strip())
+                            fallback_set_code = resolver.get_clean_set_code_from_set_name(fallback_set_name)
+                            if fallback_set_code:
+                                logger.debug(
+                                    f"Fallback set code found from data-name part '{part}': {fallback_set_name} ({fallback_set_code})"
+                                )
+                                set_code = fallback_set_code
+                                set_name = fallback_set_name
+                                break
+                        if not set_code:
+                            # self.skip_tracker.add(
+                            #     site.get("name"), name, "Failed to get set code for variant", data
+                            # )
+                            continue
+
+                    # Determine foil status and version
+                    is_foil = parsed_card.get("Foil", False)
+                    version = CardVersion.normalize(parsed_card.get("Version", "Standard"))
+                    if not version:
+                        # self.skip_tracker.add(
+                        #     site.get("name"),
+                        #     locals().get("name", "<unknown>"),
+                        #     "Failed to get version for variant",
+                        #     data,
+                        # )
+                        continue
+
+                    card_info = {
+                        "name": clean_name,
+                        "set_name": set_name,
+                        "set_code": set_code,
+                        "language": language,
+                        "version": version,
+                        "foil": is_foil,
+                        "quality": quality,
+                        "quantity": quantity,
+                        "price": price,
+                        "variant_id": variant_id,
+                    }
+
+                    # Deduplicate variants
+                    variant_key = (
+                        card_info["name"],
+                        card_info["set_name"],
+                        card_info["set_code"],
+                        card_info["language"],
+                        card_info["version"],
+                        card_info["foil"],
+                        card_info["quality"],
+                        card_info["price"],
+                        card_info["variant_id"],
+                    )
+                    if variant_key not in seen_variants:
+                        cards.append(card_info)
+                        seen_variants.add(variant_key)
+
+                except Exception as e:
+                    logger.error(f"Error processing variant: {str(e)}", exc_info=True)
+                    continue
+    return cards, total_variant
+
+
+def crystal_products_containers(page: str, site):
+    """Products containers of one CrystalCommerce page, for the scrapper strategy"""
+    soup = BeautifulSoup(page, "lxml")
+    content = soup.find(
+        "div",
+        {"class": ["content", "content clearfix", "content inner clearfix"]},
+    )
+    if content is None:
+        logger.error(f"Content div not found for site {site.get('name')}")
+        return []
+
+    products_containers = content.find_all("div", {"class": "products-container browse"})
+    if not products_containers:
+        logger.warning(f"No variants container found for site {site.get('name')}")
+    return products_containers
+
+
+def extract_f2f_dataframe(json_data, site, card_names, resolver: SetResolver) -> pd.DataFrame:
+    """Extract card information from F2F Shopify API response."""
+    if not json_data or "Cards" not in json_data:
+        logger.warning(f"No results in F2F response for {site.get('name')}")
+        return pd.DataFrame()
+
+    cards = []
+    processed_variants = set()
+
+    try:
+        for card_name, products in json_data["Cards"].items():
+            if card_name not in card_names:
+                continue
+
+            for product in products:
+                product_source = product["_source"]
+                set_name = product_source.get("MTG_Set_Name")
+                variants = product_source.get("variants", [])
+
+                for variant in variants:
+                    inventory = variant.get("inventoryQuantity", 0)
+                    if inventory <= 0:
+                        continue
+
+                    price = float(variant.get("price", 0))
+                    condition = variant.get("selectedOptions", [{}])[0].get("value", "NM")
+                    foil = "Foil" in product_source.get("MTG_Foil_Option", "")
+                    set_code = resolver.get_clean_set_code_from_set_name(set_name)
+
+                    variant_key = (card_name, set_name, condition, foil, price)
+                    if variant_key in processed_variants:
+                        continue
+                    processed_variants.add(variant_key)
+                    variant_id = variant["id"].split("/")[-1]
+                    card_info = {
+                        "name": card_name,
+                        "set_name": set_name,
+                        "set_code": set_code,
+                        "language": product_source.get("General_Card_Language", "English"),
+                        "version": "Standard",
+                        "foil": foil,
+                        "quality": CardQuality.normalize(condition),
+                        "quantity": inventory,
+                        "price": price,
+                        "variant_id": variant_id,
+                    }
+                    cards.append(card_info)
+
+        if not cards:
+            logger.warning(f"No valid cards found in F2F response for {site.get('name')}")
+            return pd.DataFrame()
+
+        df = standardize_card_dataframe(cards)
+        logger.info(f"[F2F] Processed {len(df)} unique variants for {len(df['name'].unique())} distinct cards.")
+        return df
+
+    except Exception as e:
+        logger.error(f"Error processing F2F JSON for {site.get('name')}: {str(e)}", exc_info=True)
+        return pd.DataFrame()
+
+
+def extract_shopify_dataframe(json_data, site, card_names, resolver: SetResolver) -> pd.DataFrame:
+    """Extract card information from Shopify API response"""
+    cards = []
+
+    try:
+        for result in json_data:
+            searched_card = result.get("searchName")
+            if not searched_card or searched_card not in card_names:
+                continue
+
+            products = result.get("products", [])
+            for product in products:
+                # Basic product info
+                name = product.get("name")
+                set_name = product.get("setName")
+                collector_number = product.get("collectorNumber")
+
+                # Process variants
+                variants = product.get("variants", [])
+                for variant in variants:
+                    # Skip if no quantity available
+                    quantity = variant.get("quantity", 0)
+                    if quantity <= 0:
+                        continue
+
+                    # Get variant details
+                    title = variant.get("title", "").lower()
+                    price = float(variant.get("price", 0.0))
+                    variant_id = variant.get("shopifyId")
+
+                    # Determine foil status
+                    is_foil = "foil" in title
+
+                    # Extract quality
+                    extracted_quality = "Near Mint"  # Default
+                    if "near mint" in title or "nm" in title:
+                        extracted_quality = "Near Mint"
+                    elif "lightly played" in title or "lp" in title:
+                        extracted_quality = "Lightly Played"
+                    elif "moderately played" in title or "mp" in title:
+                        extracted_quality = "Moderately Played"
+                    elif "heavily played" in title or "hp" in title:
+                        extracted_quality = "Heavily Played"
+                    elif "damaged" in title or "dmg" in title:
+                        extracted_quality = "Damaged"
+                    # TODO quality = CardQuality.normalize(quality)
+                    quality = CardQuality.normalize(extracted_quality)
+
+                    set_code = product.get("setCode", "")
+                    if not set_code or set_code == "":
+                        test_code = resolver.get_clean_set_code_from_set_name(set_name)
+                        if not test_code:
+                            logger.warning(
+                                f"[SET CODE] [SHOPIFY] Skipping card {name} unknown set: {test_code} for site: {site.get('name')}"
+                            )
+                            continue
+                        logger.debug(f"[SHOPIFY] set_code was empty for {name} setting to -> {test_code}")
+                        set_code = test_code
+
+                    card_info = {
+                        "name": name,
+                        "set_name": set_name,
+                        "set_code": set_code,
+                        "language": "English",  # Default for Shopify stores
+                        "version": "Standard",
+                        "foil": is_foil,
+                        "quality": quality,
+                        "quantity": quantity,
+                        "price": price,
+                        "variant_id": variant_id,
+                        # "collector_number": collector_number,
+                    }
+                    cards.append(card_info)
+
+        if not cards:
+            logger.warning(f"No valid cards found in Shopify response for {site.get('name')}")
+            return pd.DataFrame()
+
+        df = standardize_card_dataframe(cards)
+        logger.info(f"[SHOPIFY] Processed {len(df)} unique variants for {len(df['name'].unique())} distinct cards")
+        return df
+    except Exception as e:
+        logger.error(
+            f"Error processing Shopify JSON for {site.get('name')}: {str(e)}",
+            exc_info=True,
+        )
+        return pd.DataFrame()
+
+
+def standardize_card_dataframe(cards) -> pd.DataFrame:
+    df = pd.DataFrame(cards)
+    # # Ensure standard column names and data types
+    standard_columns = {
+        "name": str,
+        "set_name": str,
+        "set_code": str,
+        "price": float,
+        "version": str,
+        "foil": bool,
+        "quality": str,
+        "language": str,
+        "quantity": int,
+    }
+
+    # Add missing columns with default values
+    for col, dtype in standard_columns.items():
+        if col not in df.columns:
+            df[col] = dtype()
+        df[col] = df[col].astype(dtype)
+
+    df = df.drop_duplicates(subset=["name", "set_name", "quality", "foil", "price"])
+    return df
+
+
+def is_magic_card(product) -> bool:
+    """Check if the product is a Magic card by inspecting href path"""
+    try:
+        # Look for the meta div which contains category and name
+        meta_div = product.find("div", {"class": "meta"})
+        if meta_div:
+            # Find category link
+            category_link = meta_div.find("a", href=True)
+            if category_link:
+                return is_magic_singles_href(category_link.get("href", ""))
+        return False
+    except Exception as e:
+        logger.error(f"Error checking if product is Magic card: {str(e)}", exc_info=True)
+        return False
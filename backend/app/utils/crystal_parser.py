@@ -0,0 +1,151 @@
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional
+
+import lxml.html
+from lxml import etree
+
+from app.utils.helpers import extract_numbers
+
+logger = logging.getLogger(__name__)
+
+MAGIC_SINGLES_HREF_MARKERS = (
+    "magic_singles",
+    "magic_mtg_singles",
+    "cartes_individuelles_magic",
+    "magic_the_gathering_singles",
+    "unfinity",
+    "commander_fallout",
+)
+
+
+# Same lookup order as helpers.extract_quantity
+QUANTITY_SELECTORS = (
+    ("span", "variant-short-info variant-qty", {}),
+    ("span", "variant-short-info", {}),
+    ("span", "variant-qty", {}),
+    ("input", "qty", {"type": "number"}),
+)
+
+
+def is_magic_singles_href(href: str) -> bool:
+    """True when a CrystalCommerce category link points to Magic singles"""
+    href = href.lower()
+    return any(marker in href for marker in MAGIC_SINGLES_HREF_MARKERS)
+
+
+@dataclass
+class CrystalForm:
+    """One add-to-cart form of a CrystalCommerce search page and the context extraction needs"""
+
+    attrs: Dict[str, str]
+    in_product: bool
+    is_magic: bool
+    product_url: Optional[str]
+    quantity: Optional[int]
+
+
+def _has_class(element, class_name: str) -> bool:
+    """Same class matching as BeautifulSoup: one of the classes, or the whole class attribute"""
+    classes = (element.get("class") or "").split()
+    return class_name in classes or " ".join(classes) == class_name
+
+
+def _find(element, tag: str, class_name: str, **attrs):
+    for child in element.iter(tag):
+        if child is element:
+            continue
+        if _has_class(child, class_name) and all(child.get(key) == value for key, value in attrs.items()):
+            return child
+    return None
+
+
+def _product_of(form):
+    for ancestor in form.iterancestors("li"):
+        if _has_class(ancestor, "product"):
+            return ancestor
+    return None
+
+
+def _is_magic_product(product) -> bool:
+    meta_div = _find(product, "div", "meta")
+    if meta_div is None:
+        return False
+    for link in meta_div.iter("a"):
+        href = link.get("href")
+        if href is not None:
+            return is_magic_singles_href(href)
+    return False
+
+
+def _form_quantity(form) -> Optional[int]:
+    """lxml counterpart of helpers.extract_quantity for an add-to-cart form"""
+    try:
+        qty_elem = None
+        for tag, class_name, attrs in QUANTITY_SELECTORS:
+            qty_elem = _find(form, tag, class_name, **attrs)
+            if qty_elem is not None:
+                break
+        if qty_elem is None:
+            return None
+        if qty_elem.tag == "input":
+            qty = qty_elem.get("max") or qty_elem.get("value")
+            return int(qty) if qty and int(qty) > 0 else None
+        return extract_numbers(qty_elem.text_content().strip()) or None
+    except Exception as e:
+        logger.error(f"Error in extract_quantity: {str(e)}")
+        return None
+
+
+def _parse_document(html: str):
+    try:
+        return lxml.html.document_fromstring(html)
+    except ValueError:
+        # Unicode input declaring its own encoding
+        return lxml.html.document_fromstring(html.encode("utf-8"))
+
+
+def iter_crystal_forms(html: str) -> Iterator[CrystalForm]:
+    """
+    Parse one CrystalCommerce search response and yield its add-to-cart forms in document order.
+
+    The page is parsed once with lxml; the product link preceding each form is tracked while
+    walking the tree, so nothing searches backwards and batches never need to be merged.
+    """
+    if not html or html.isspace():
+        return
+    try:
+        root = _parse_document(html)
+    except (etree.ParserError, ValueError) as e:
+        logger.warning(f"Could not parse CrystalCommerce response: {str(e)}")
+        return
+
+    product_url = None
+    magic_products = {}
+    forms_found = 0
+    for element in root.iter("a", "form"):
+        if element.tag == "a":
+            if element.get("itemprop") == "url":
+                product_url = element.get("href", "")
+            continue
+        if not _has_class(element, "add-to-cart-form"):
+            continue
+
+        product = _product_of(element)
+        if product is not None and product not in magic_products:
+            magic_products[product] = _is_magic_product(product)
+
+        forms_found += 1
+        yield CrystalForm(
+            attrs=dict(element.attrib),
+            in_product=product is not None,
+            is_magic=product is not None and magic_products[product],
+            product_url=product_url,
+            quantity=_form_quantity(element),
+        )
+
+    if not forms_found:
+        # Surface the error messages a site returns instead of results
+        for element in root.iter("div", "p"):
+            if any(_has_class(element, class_name) for class_name in ("error", "alert", "notice")):
+                logger.warning(f"Error in CrystalCommerce response: {element.text_content().strip()}")
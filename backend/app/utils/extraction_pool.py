@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+
+import billiard
+from billiard.exceptions import WorkerLostError
+
+from app.config import Config
+from app.utils.card_extraction import init_extraction_worker, run_extraction
+from app.utils.set_name_index import SetNameIndex
+from app.utils.set_resolution_cache import SetResolution, SetResolver
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionPool:
+    """
+    Process pool running the CPU-bound card extraction off the event loop.
+
+    Workers are spawned once per process and receive the set index and the known set resolutions
+    through their initializer, so each task only ships the page or JSON payload to extract.
+    Inside a daemonic process, such as the Celery prefork worker scraping a site, the standard
+    library refuses to start children, so the workers are started with billiard instead. With no
+    workers configured, or when processes cannot be started, extraction falls back to the default
+    thread executor.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._daemonic_pool = None
+        # Extractions submitted to the billiard pool, cancelled when it is terminated
+        self._pending = set()
+        self._set_index: Optional[SetNameIndex] = None
+        self._resolutions: Dict[str, SetResolution] = {}
+        self._started = False
+
+    def needs_start(self, set_index: Optional[SetNameIndex]) -> bool:
+        """The workers hold a copy of the set index, restart them when a different version was built"""
+        if not self._started:
+            return True
+        if set_index is None or self._set_index is None:
+            return set_index is not self._set_index
+        return set_index.version != self._set_index.version
+
+    def start(self, set_index: Optional[SetNameIndex], resolutions: Dict[str, SetResolution]):
+        # Extractions already queued by other coroutines finish on the old workers
+        self.shutdown(cancel_futures=False)
+        self._set_index = set_index
+        self._resolutions = dict(resolutions)
+        self._started = True
+        if self.max_workers <= 0:
+            return
+        try:
+            initargs = (set_index, self._resolutions, logging.getLogger().getEffectiveLevel())
+            if multiprocessing.current_process().daemon:
+                self._daemonic_pool = billiard.get_context("spawn").Pool(
+                    processes=self.max_workers, initializer=init_extraction_worker, initargs=initargs
+                )
+            else:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=init_extraction_worker,
+                    initargs=initargs,
+                )
+            logger.info(
+                f"[EXTRACT] Started {self.max_workers} extraction workers with {len(self._resolutions)} set resolutions"
+            )
+        except Exception as e:
+            logger.warning(f"[EXTRACT] Process pool unavailable, extracting in threads: {str(e)}")
+            self._stop_workers()
+
+    async def run(self, extract, *args):
+        """Run ``extract(*args, resolver)``, returning its result and the set resolutions it computed"""
+        loop = asyncio.get_running_loop()
+        if self._executor is not None or self._daemonic_pool is not None:
+            try:
+                if self._daemonic_pool is not None:
+                    return await self._run_in_daemonic_pool(loop, extract, *args)
+                return await loop.run_in_executor(self._executor, run_extraction, extract, *args)
+            except (BrokenProcessPool, WorkerLostError, AssertionError, OSError) as e:
+                logger.warning(f"[EXTRACT] Process pool failed, extracting in threads: {str(e)}")
+                self._stop_workers()
+
+        resolver = SetResolver(self._set_index, self._resolutions)
+        result = await loop.run_in_executor(None, extract, *args, resolver)
+        return result, resolver.new_resolutions
+
+    def _run_in_daemonic_pool(self, loop: asyncio.AbstractEventLoop, extract, *args) -> asyncio.Future:
+        """Submit to the billiard pool, whose result handler thread settles an asyncio future"""
+        future = loop.create_future()
+        self._pending.add(future)
+
+        def settle(result=None, error=None):
+            self._pending.discard(future)
+            if future.done():
+                return
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+        def notify(**outcome):
+            try:
+                loop.call_soon_threadsafe(lambda: settle(**outcome))
+            except RuntimeError:
+                # The loop that submitted the extraction is closed, nobody waits for it anymore
+                pass
+
+        self._daemonic_pool.apply_async(
+            run_extraction,
+            (extract, *args),
+            callback=lambda result: notify(result=result),
+            # Errors come wrapped in a billiard ExceptionInfo
+            error_callback=lambda error: notify(error=getattr(error, "exception", error)),
+        )
+        return future
+
+    def shutdown(self, cancel_futures: bool = True):
+        self._stop_workers(cancel_futures)
+        self._started = False
+
+    def _stop_workers(self, cancel_futures: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=cancel_futures)
+            self._executor = None
+        if self._daemonic_pool is not None:
+            if cancel_futures:
+                self._daemonic_pool.terminate()
+                for future in self._pending:
+                    if not future.get_loop().is_closed():
+                        future.get_loop().call_soon_threadsafe(future.cancel)
+                self._pending.clear()
+            else:
+                # Queued extractions still run, the pool is joined once they are done
+                self._daemonic_pool.close()
+                threading.Thread(target=self._daemonic_pool.join, daemon=True).start()
+            self._daemonic_pool = None
+
+
+_extraction_pool: Optional[ExtractionPool] = None
+
+
+def get_extraction_pool() -> ExtractionPool:
+    """Process-wide extraction pool, sized by EXTRACTION_WORKERS"""
+    global _extraction_pool
+    if _extraction_pool is None:
+        _extraction_pool = ExtractionPool(Config.EXTRACTION_WORKERS)
+    return _extraction_pool
@@ -0,0 +1,183 @@
+import hashlib
+import json
+import logging
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+REDIS_RESULT_CACHE_PREFIX = "optimization_result"
+# Results older than this are recomputed even if nothing changed
+RESULT_CACHE_EXPIRATION = 6 * 3600
+# Entries kept across all workers, least recently used first out
+RESULT_CACHE_MAX_ENTRIES = 500
+
+
+def _to_json(value: Any) -> Any:
+    """json.dumps fallback for the pandas and numpy values found in optimization results"""
+    if isinstance(value, pd.DataFrame):
+        return value.to_dict("records")
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+class OptimizationResultCache:
+    """
+    Optimization results shared by every worker through Redis.
+
+    An entry is keyed on the content of the wishlist, a fingerprint of the listings it was optimized
+    against and the normalized algorithm configuration, so a change in any of them is a miss. Entries
+    expire after ``expiration`` seconds, and beyond ``max_entries`` the least recently used ones are
+    evicted, tracked in a sorted set of last access times. Without a Redis client nothing is cached.
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        prefix: str = REDIS_RESULT_CACHE_PREFIX,
+        max_entries: int = RESULT_CACHE_MAX_ENTRIES,
+        expiration: int = RESULT_CACHE_EXPIRATION,
+    ):
+        self.redis_client = redis_client
+        self.prefix = prefix
+        self.max_entries = max_entries
+        self.expiration = expiration
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.errors = 0
+
+    @property
+    def lru_key(self) -> str:
+        return f"{self.prefix}:lru"
+
+    @property
+    def stats_key(self) -> str:
+        return f"{self.prefix}:stats"
+
+    def entry_key(self, key: str) -> str:
+        return f"{self.prefix}:entry:{key}"
+
+    @staticmethod
+    def frame_fingerprint(df: pd.DataFrame) -> str:
+        """Content hash of a frame, independent of its index, row and column order"""
+        columns = sorted(str(column) for column in df.columns)
+        frame = df.set_axis([str(column) for column in df.columns], axis=1)[columns]
+        # Scans concatenate listings in no particular order, the same rows give the same fingerprint
+        row_hashes = np.sort(pd.util.hash_pandas_object(frame, index=False).to_numpy())
+        digest = hashlib.sha256(json.dumps(columns).encode())
+        digest.update(row_hashes.tobytes())
+        return digest.hexdigest()
+
+    @classmethod
+    def make_key(
+        cls, user_wishlist_df: pd.DataFrame, listings_df: pd.DataFrame, config: Dict[str, Any]
+    ) -> Optional[str]:
+        """Cache key of a request, None when its data can't be fingerprinted"""
+        try:
+            config_str = json.dumps(config, sort_keys=True, default=_to_json)
+            parts = (cls.frame_fingerprint(user_wishlist_df), cls.frame_fingerprint(listings_df), config_str)
+            return hashlib.sha256("|".join(parts).encode()).hexdigest()
+        except Exception as e:
+            logger.warning(f"Could not build optimization cache key: {str(e)}")
+            return None
+
+    async def get(self, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        if self.redis_client is None or key is None:
+            return None
+        try:
+            cached = await self.redis_client.get(self.entry_key(key))
+            pipe = self.redis_client.pipeline()
+            if cached is None:
+                pipe.hincrby(self.stats_key, "misses", 1)
+            else:
+                pipe.zadd(self.lru_key, {key: time.time()})
+                pipe.hincrby(self.stats_key, "hits", 1)
+            await pipe.execute()
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Could not read optimization result cache: {str(e)}")
+            return None
+
+        if cached is None:
+            self.misses += 1
+            return None
+        try:
+            result = json.loads(cached)
+        except (json.JSONDecodeError, TypeError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    async def put(self, key: Optional[str], result: Dict[str, Any]):
+        if self.redis_client is None or key is None:
+            return
+        try:
+            now = time.time()
+            pipe = self.redis_client.pipeline()
+            pipe.set(self.entry_key(key), json.dumps(result, default=_to_json), ex=self.expiration)
+            pipe.zadd(self.lru_key, {key: now})
+            # Expired entries only leave the index here
+            pipe.zremrangebyscore(self.lru_key, "-inf", now - self.expiration)
+            pipe.zcard(self.lru_key)
+            *_, size = await pipe.execute()
+
+            if size > self.max_entries:
+                evicted = await self.redis_client.zpopmin(self.lru_key, size - self.max_entries)
+                if evicted:
+                    await self.redis_client.delete(*(self.entry_key(self._decoded(k)) for k, _ in evicted))
+            self.stores += 1
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Could not write optimization result cache: {str(e)}")
+
+    async def clear(self):
+        if self.redis_client is None:
+            return
+        try:
+            keys = await self.redis_client.zrange(self.lru_key, 0, -1)
+            pipe = self.redis_client.pipeline()
+            if keys:
+                pipe.delete(*(self.entry_key(self._decoded(key)) for key in keys))
+            pipe.delete(self.lru_key, self.stats_key)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Could not clear optimization result cache: {str(e)}")
+
+    async def get_shared_stats(self) -> Dict[str, int]:
+        """Hits and misses of every worker"""
+        if self.redis_client is None:
+            return {}
+        try:
+            stats = await self.redis_client.hgetall(self.stats_key)
+            size = await self.redis_client.zcard(self.lru_key)
+        except Exception as e:
+            logger.warning(f"Could not read optimization result cache stats: {str(e)}")
+            return {}
+        counts = {self._decoded(name): int(value) for name, value in stats.items()}
+        return {"hits": counts.get("hits", 0), "misses": counts.get("misses", 0), "size": size}
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.redis_client is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    @staticmethod
+    def _decoded(value: Any) -> str:
+        return value.decode() if isinstance(value, bytes) else value
@@ -0,0 +1,259 @@
+import asyncio
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Defaults used when a site does not configure its own limits
+DEFAULT_MAX_RATE = 10.0  # requests per second for one host, across all workers
+DEFAULT_MAX_CONCURRENCY = 8  # in-flight requests for one host, per driver
+INITIAL_RATE = 2.0
+INITIAL_CONCURRENCY = 2
+MIN_RATE = 0.2
+
+# AIMD tuning
+FAST_RESPONSE_SECONDS = 2.0  # successes faster than this grow the limits
+RATE_INCREASE = 0.25  # requests per second added per fast success
+DECREASE_FACTOR = 0.5
+DECREASE_COOLDOWN = 1.0  # a burst of failures from one congestion event only backs off once
+THROTTLE_STATUSES = {429, 500, 502, 503, 504}
+DEFAULT_RETRY_AFTER = 60
+
+# Shared state between Celery workers
+REDIS_RATE_LIMIT_KEY = "scrape_rate_limit"
+SHARED_STATE_EXPIRATION = 3600
+
+
+class RequestOutcome:
+    """Filled in by the caller while a rate limited request is in flight"""
+
+    def __init__(self):
+        self.status: Optional[int] = None
+        self.retry_after: Optional[str] = None
+
+
+def parse_retry_after(value: Optional[str], default: int = DEFAULT_RETRY_AFTER) -> float:
+    """Retry-After header in seconds, falling back to ``default`` for missing or HTTP-date values"""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return float(default)
+
+
+class HostRateLimiter:
+    """
+    Token bucket plus AIMD concurrency window for a single host.
+
+    Every request waits for a free slot in the window and a token from the bucket. Fast successes
+    grow both the rate and the window additively, 429/5xx responses and timeouts halve them, and a
+    Retry-After pauses the whole host instead of the single request that received it.
+
+    When a Redis client is given, the pause, a per-window request counter enforcing ``max_rate``
+    and the learned rate are shared, so every Celery worker scraping the same site stays under
+    one budget and starts from what the others already learned.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        max_rate: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        redis_client=None,
+    ):
+        self.host = host
+        self.max_rate = max(MIN_RATE, float(max_rate or DEFAULT_MAX_RATE))
+        self.max_concurrency = max(1, int(max_concurrency or DEFAULT_MAX_CONCURRENCY))
+        self.rate = min(INITIAL_RATE, self.max_rate)
+        self.concurrency = float(min(INITIAL_CONCURRENCY, self.max_concurrency))
+        self.redis_client = redis_client
+
+        self._tokens = 1.0
+        self._tokens_updated_at = time.monotonic()
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+        self._paused_until = 0.0
+        self._last_decrease_at = 0.0
+        self._shared_state_loaded = False
+
+        self.stats = {"requests": 0, "throttled": 0, "wait_time": 0.0}
+
+    @property
+    def _redis_prefix(self) -> str:
+        return f"{REDIS_RATE_LIMIT_KEY}:{self.host}"
+
+    @property
+    def window(self) -> int:
+        """Length in seconds of the shared counting window, long enough to allow one request"""
+        return max(1, math.ceil(1 / self.max_rate))
+
+    @property
+    def requests_per_window(self) -> int:
+        return max(1, int(self.max_rate * self.window))
+
+    @asynccontextmanager
+    async def request(self):
+        """Hold a slot for one request and feed its outcome back into the limits"""
+        await self.acquire()
+        outcome = RequestOutcome()
+        start_time = time.monotonic()
+        try:
+            yield outcome
+        except (asyncio.TimeoutError, aiohttp.ClientConnectionError):
+            await self.release(None, time.monotonic() - start_time, failed=True)
+            raise
+        except BaseException:
+            await self.release(outcome.status, time.monotonic() - start_time)
+            raise
+        else:
+            await self.release(outcome.status, time.monotonic() - start_time, outcome.retry_after)
+
+    async def acquire(self):
+        wait_start = time.monotonic()
+        if not self._shared_state_loaded:
+            await self._load_shared_state()
+
+        await self._wait_for_pause()
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < int(self.concurrency))
+            self._in_flight += 1
+
+        try:
+            await self._take_token()
+            await self._take_shared_slot()
+        except BaseException:
+            await self._free_slot()
+            raise
+
+        self.stats["requests"] += 1
+        self.stats["wait_time"] += time.monotonic() - wait_start
+
+    async def release(
+        self, status: Optional[int], elapsed: float, retry_after: Optional[str] = None, failed: bool = False
+    ):
+        await self._free_slot()
+
+        if failed or status in THROTTLE_STATUSES:
+            self.stats["throttled"] += 1
+            if status == 429:
+                await self.pause(parse_retry_after(retry_after))
+            await self._decrease()
+        elif status == 200 and elapsed <= FAST_RESPONSE_SECONDS:
+            await self._increase()
+
+    async def pause(self, seconds: float):
+        """Stop sending to this host for ``seconds``, on every worker when Redis is available"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        logger.warning(f"[RATE] Pausing {self.host} for {seconds:.0f}s")
+        if self.redis_client and seconds > 0:
+            try:
+                await self.redis_client.set(f"{self._redis_prefix}:paused", "1", px=int(seconds * 1000))
+            except Exception as e:
+                self._disable_shared_state(e)
+
+    async def _free_slot(self):
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    async def _wait_for_pause(self):
+        remaining = self._paused_until - time.monotonic()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+
+    async def _take_token(self):
+        burst = max(1.0, self.concurrency)
+        while True:
+            now = time.monotonic()
+            self._tokens = min(burst, self._tokens + (now - self._tokens_updated_at) * self.rate)
+            self._tokens_updated_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    async def _take_shared_slot(self):
+        """Count the request in the shared window, waiting for the next window when it is full"""
+        while self.redis_client:
+            now = time.time()
+            window_start = int(now // self.window) * self.window
+            counter_key = f"{self._redis_prefix}:{window_start}"
+            try:
+                pipe = self.redis_client.pipeline()
+                pipe.incr(counter_key)
+                pipe.expire(counter_key, self.window * 2)
+                pipe.pttl(f"{self._redis_prefix}:paused")
+                count, _, paused_ms = await pipe.execute()
+            except Exception as e:
+                self._disable_shared_state(e)
+                return
+
+            if paused_ms and paused_ms > 0:
+                self._paused_until = max(self._paused_until, time.monotonic() + paused_ms / 1000)
+                await self._wait_for_pause()
+                continue
+            if count <= self.requests_per_window:
+                return
+            await asyncio.sleep(window_start + self.window - now)
+
+    async def _increase(self):
+        previous_window = int(self.concurrency)
+        self.rate = min(self.max_rate, self.rate + RATE_INCREASE)
+        self.concurrency = min(float(self.max_concurrency), self.concurrency + 1 / self.concurrency)
+        if int(self.concurrency) != previous_window:
+            async with self._condition:
+                self._condition.notify_all()
+            await self._save_shared_state()
+
+    async def _decrease(self):
+        now = time.monotonic()
+        if now - self._last_decrease_at < DECREASE_COOLDOWN:
+            return
+        self._last_decrease_at = now
+        self.rate = max(MIN_RATE, self.rate * DECREASE_FACTOR)
+        self.concurrency = max(1.0, self.concurrency * DECREASE_FACTOR)
+        logger.info(f"[RATE] Backing off {self.host}: {self.rate:.2f} req/s, {int(self.concurrency)} concurrent")
+        await self._save_shared_state()
+
+    async def _load_shared_state(self):
+        self._shared_state_loaded = True
+        if not self.redis_client:
+            return
+        try:
+            state = await self.redis_client.hgetall(self._redis_prefix)
+        except Exception as e:
+            self._disable_shared_state(e)
+            return
+        if state:
+            try:
+                self.rate = min(self.max_rate, max(MIN_RATE, float(state["rate"])))
+                self.concurrency = min(float(self.max_concurrency), max(1.0, float(state["concurrency"])))
+            except (KeyError, TypeError, ValueError):
+                pass
+
+    async def _save_shared_state(self):
+        if not self.redis_client:
+            return
+        try:
+            await self.redis_client.hset(
+                self._redis_prefix, mapping={"rate": self.rate, "concurrency": self.concurrency}
+            )
+            await self.redis_client.expire(self._redis_prefix, SHARED_STATE_EXPIRATION)
+        except Exception as e:
+            self._disable_shared_state(e)
+
+    def _disable_shared_state(self, error: Exception):
+        logger.warning(f"[RATE] Shared limits unavailable for {self.host}, limiting locally: {str(error)}")
+        self.redis_client = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "wait_time": round(self.stats["wait_time"], 2),
+            "rate": round(self.rate, 2),
+            "concurrency": int(self.concurrency),
+        }
@@ -3,12 +3,14 @@ import logging
 import json
 import re
 import time
-from typing import Optional, Union
+from collections import defaultdict
+from typing import Dict, Optional, Union
 from urllib.parse import urlparse
 
 import aiohttp
 from aiohttp import ClientTimeout, TCPConnector
-from app.utils.async_context_manager import managed_aiohttp_session
+
+from app.utils.rate_limiter import HostRateLimiter
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +18,13 @@ logger = logging.getLogger(__name__)
 class NetworkDriver:
     """Enhanced base class for network operations with connection pooling"""
 
-    def __init__(self, max_connections: int = 100, keepalive_timeout: int = 30):
+    def __init__(
+        self,
+        max_connections: int = 100,
+        keepalive_timeout: int = 30,
+        max_connections_per_host: int = 10,
+        redis_client=None,
+    ):
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
@@ -26,8 +34,15 @@ class NetworkDriver:
         self.session = None
         self.connector = None
         self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
         self.keepalive_timeout = keepalive_timeout
-        self._default_rate_limit = asyncio.Semaphore(10)
+        # Per-host request / connection counters fed by the session trace hooks
+        self.host_stats: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"requests": 0, "new_connections": 0, "reused_connections": 0}
+        )
+        # Adaptive per-host limiters, shared across Celery workers when a Redis client is given
+        self.redis_client = redis_client
+        self.rate_limiters: Dict[str, HostRateLimiter] = {}
         # Store the event loop that created this driver
         self._loop = None
         # Track active sessions for cleanup
@@ -48,6 +63,7 @@ class NetworkDriver:
         if self.connector is None:
             self.connector = TCPConnector(
                 limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
                 ttl_dns_cache=300,
                 keepalive_timeout=self.keepalive_timeout,
                 force_close=False,
@@ -59,10 +75,78 @@ class NetworkDriver:
         await self._init_connector()  # This will handle event loop checking
 
         if not self.session or self.session.closed:
-            self.session = aiohttp.ClientSession(connector=self.connector, headers=self.headers, trust_env=True)
+            # Keep-alive session reused by every request of this driver. Cookies are not kept between
+            # requests: callers send the site cookies explicitly, as a fresh session per request did.
+            # No default headers either, requests only send their own: aiohttp can't decode the br
+            # and zstd encodings self.headers accepts.
+            self.session = aiohttp.ClientSession(
+                connector=self.connector,
+                trust_env=True,
+                cookie_jar=aiohttp.DummyCookieJar(),
+                trace_configs=[self._build_trace_config()],
+            )
+
+    def _build_trace_config(self) -> aiohttp.TraceConfig:
+        """Trace hooks counting requests and new vs reused pooled connections per host"""
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, trace_config_ctx, params):
+            trace_config_ctx.host = params.url.host or "unknown"
+            self.host_stats[trace_config_ctx.host]["requests"] += 1
+
+        async def on_connection_create_end(session, trace_config_ctx, params):
+            self.host_stats[getattr(trace_config_ctx, "host", "unknown")]["new_connections"] += 1
+
+        async def on_connection_reuseconn(session, trace_config_ctx, params):
+            self.host_stats[getattr(trace_config_ctx, "host", "unknown")]["reused_connections"] += 1
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    def get_connection_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-host connection reuse metrics for the requests made through this driver"""
+        stats = {}
+        for host, counters in self.host_stats.items():
+            connections = counters["new_connections"] + counters["reused_connections"]
+            stats[host] = {
+                **counters,
+                "reuse_ratio": round(counters["reused_connections"] / connections, 2) if connections else 0.0,
+            }
+        return stats
+
+    def get_rate_limiter(self, url: str, site: Optional[dict] = None) -> HostRateLimiter:
+        """Limiter for the host of ``url``, created with the site's configured limits on first use"""
+        host = urlparse(url).netloc or url
+        limiter = self.rate_limiters.get(host)
+        if limiter is None:
+            site = site or {}
+            limiter = HostRateLimiter(
+                host,
+                max_rate=site.get("rate_limit"),
+                max_concurrency=site.get("max_concurrency"),
+                redis_client=self.redis_client,
+            )
+            self.rate_limiters[host] = limiter
+        return limiter
+
+    def log_connection_stats(self):
+        for host, stats in self.get_connection_stats().items():
+            logger.info(
+                f"[POOL] {host}: {stats['requests']} requests, {stats['new_connections']} new connections, "
+                f"{stats['reused_connections']} reused ({stats['reuse_ratio']:.0%})"
+            )
 
     async def close(self):
         """Explicitly close session and connector"""
+        if self.host_stats:
+            self.log_connection_stats()
+            self.host_stats.clear()
+        for host, limiter in self.rate_limiters.items():
+            logger.info(f"[RATE] {host}: {limiter.get_stats()}")
+        self.rate_limiters.clear()
+
         # Close any tracked sessions
         for session in list(self._active_sessions):
             try:
@@ -103,6 +187,7 @@ class NetworkDriver:
     ) -> Optional[str]:
         """Enhanced POST request with detailed error tracking and Selenium fallback"""
         await self._ensure_session()
+        limiter = self.get_rate_limiter(url, site)
 
         max_retries = 3
         retry_count = 0
@@ -126,27 +211,16 @@ class NetworkDriver:
                 timeout = aiohttp.ClientTimeout(total=100, connect=30, sock_read=60, sock_connect=15)
                 connection_info["timeout"] = str(timeout)
 
-                # Create session factory function for the context manager
-                def create_session():
-                    return aiohttp.ClientSession(
-                        connector=TCPConnector(limit=10, force_close=True, enable_cleanup_closed=True),
-                        timeout=timeout,
-                        headers=headers,
-                    )
-
-                # Use the managed_aiohttp_session context manager
-                async with managed_aiohttp_session(create_session, name=f"{site['name']}-request") as session:
-                    # Make the request
-                    if use_json:
-                        async with session.post(url, json=payload, headers=headers, timeout=timeout) as response:
-                            return await self._handle_response(
-                                response, retry_count, connection_info, url, site, start_time
-                            )
-                    else:
-                        async with session.post(url, data=payload, headers=headers, timeout=timeout) as response:
-                            return await self._handle_response(
-                                response, retry_count, connection_info, url, site, start_time
-                            )
+                # Reuse the driver's pooled keep-alive session, timeout and headers are per request
+                body = {"json": payload} if use_json else {"data": payload}
+                async with limiter.request() as outcome:
+                    start_time = time.time()  # Time the request itself, not the wait for the limiter
+                    async with self.session.post(url, headers=headers, timeout=timeout, **body) as response:
+                        outcome.status = response.status
+                        outcome.retry_after = response.headers.get("Retry-After")
+                        return await self._handle_response(
+                            response, retry_count, connection_info, url, site, start_time
+                        )
 
             except asyncio.TimeoutError:
                 elapsed_time = round(time.time() - start_time, 2)
@@ -222,9 +296,8 @@ class NetworkDriver:
             return None
 
         elif response.status == 429:
-            wait_time = int(response.headers.get("Retry-After", 60))
-            logger.warning(f"Rate limited on {site['name']}, waiting {wait_time}s (Took {elapsed_time} seconds)")
-            await asyncio.sleep(wait_time)
+            # The host limiter pauses every request to this site for Retry-After
+            logger.warning(f"Rate limited on {site['name']} (Took {elapsed_time} seconds)")
             return None
 
         else:
@@ -234,6 +307,7 @@ class NetworkDriver:
     async def fetch_url(self, url: str) -> Optional[str]:
         """Enhanced fetch URL with managed session handling"""
         await self._ensure_session()
+        limiter = self.get_rate_limiter(url)
 
         max_retries = 5
         retry_count = 0
@@ -253,53 +327,45 @@ class NetworkDriver:
                 # Set timeout and connector configuration
                 timeout = aiohttp.ClientTimeout(total=30, connect=10, sock_read=25, sock_connect=10)
 
-                # Create session factory function
-                def create_session():
-                    return aiohttp.ClientSession(
-                        connector=TCPConnector(limit=10, force_close=True, enable_cleanup_closed=True),
-                        timeout=timeout,
-                    )
-
-                # Use the managed_aiohttp_session context manager
-                async with managed_aiohttp_session(create_session, name=f"fetch-{url[:30]}") as session:
-                    async with session.get(url) as response:
-                        elapsed_time = asyncio.get_event_loop().time() - start_time
-
-                        # Collect site-specific details
-                        site_details = {
-                            "status": response.status,
-                            "headers": response.headers,
-                            "elapsed_time": elapsed_time,
-                        }
+                # Reuse the driver's pooled keep-alive session
+                async with limiter.request() as outcome, self.session.get(url, timeout=timeout) as response:
+                    outcome.status = response.status
+                    outcome.retry_after = response.headers.get("Retry-After")
+                    elapsed_time = asyncio.get_event_loop().time() - start_time
+
+                    # Collect site-specific details
+                    site_details = {
+                        "status": response.status,
+                        "headers": response.headers,
+                        "elapsed_time": elapsed_time,
+                    }
 
-                        if response.status == 200:
-                            content = await response.text()
-                            if retry_count > 1:
-                                logger.info(f"Successfully fetched {url} after {retry_count} attempts")
+                    if response.status == 200:
+                        content = await response.text()
+                        if retry_count > 1:
+                            logger.info(f"Successfully fetched {url} after {retry_count} attempts")
 
-                            # Check if content is valid
-                            if not content or content.isspace():
-                                logger.warning(f"Empty response from {url}")
+                        # Check if content is valid
+                        if not content or content.isspace():
+                            logger.warning(f"Empty response from {url}")
 
-                            return {
-                                "content": content,
-                                "site_details": site_details,
-                            }
+                        return {
+                            "content": content,
+                            "site_details": site_details,
+                        }
 
-                        elif response.status == 404:
-                            logger.error(f"URL not found: {url}")
-                            return None
+                    elif response.status == 404:
+                        logger.error(f"URL not found: {url}")
+                        return None
 
-                        elif response.status == 429:  # Rate limit
-                            wait_time = int(response.headers.get("Retry-After", 60))
-                            logger.warning(f"Rate limited on {url}, waiting {wait_time}s")
-                            await asyncio.sleep(wait_time)
-                            continue
+                    elif response.status == 429:  # Rate limit, the next attempt waits for the host limiter
+                        logger.warning(f"Rate limited on {url}")
+                        continue
 
-                        else:
-                            logger.error(f"Error response from {url} (attempt {retry_count}/{max_retries})")
-                            await asyncio.sleep(wait_time)
-                            continue
+                    else:
+                        logger.error(f"Error response from {url} (attempt {retry_count}/{max_retries})")
+                        await asyncio.sleep(wait_time)
+                        continue
 
             except asyncio.TimeoutError:
                 elapsed = asyncio.get_event_loop().time() - start_time
@@ -436,6 +502,6 @@ class NetworkDriver:
 
 
 # Instead of a global instance, provide a factory function
-def get_network_driver():
+def get_network_driver(redis_client=None):
     """Factory function to create a new NetworkDriver instance"""
-    return NetworkDriver()
+    return NetworkDriver(redis_client=redis_client)
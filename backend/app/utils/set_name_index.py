@@ -0,0 +1,411 @@
+import hashlib
+import logging
+import re
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from thefuzz import fuzz, process, utils
+
+logger = logging.getLogger(__name__)
+
+SET_NAME_CLEAN_PATTERNS = [
+    (re.compile(r"#\d+\s*-\s*"), ""),
+    (re.compile(r"\(\d+\)"), ""),
+    (re.compile(r"[/:,-]"), " "),
+    (re.compile(r"\s+m\d+\s*$"), ""),
+    (re.compile(r"\s+"), " "),
+]
+
+SET_NAME_PREFIXES = [
+    "promo pack",
+    "promotional",
+    "promo packs",
+    "commander",
+    "token",
+    "tokens",
+    "minigame",
+    "minigames",
+    "art series",
+    "art cards",
+    "promos",
+    "extras",
+    "extra",
+    "box set",
+    "game day",
+    "prerelease",
+    "release",
+    "buy a box",
+    "bundle",
+    "media insert",
+    "universes beyond",
+    "universe beyond",
+    "non foil",
+    "foil",
+    "mps",
+    "judge rewards",
+    "unique & misc",
+    "modern event deck",
+    "extended art",
+    "commander universes beyond",
+]
+
+SET_NAME_MAPPINGS = {
+    "festival foil etched": "30th Anniversary Misc Promos",
+    "launch weekend foil": "Wizards Play Network 2022",
+    "bring a friend": "Love Your LGS 2022",
+    "magicfest foil": "MagicFest 2019",
+    "warhammer 40,000 commander": [
+        "universes beyond warhammer 40000",
+        "universes beyond warhammer 40k",
+        "warhammer 40000 commander",
+        "warhammer 40k commander",
+        "cmdr - warhammer 40,000: universes beyond",
+        "warhammer 40k singles",
+        "universe beyond 40,000",
+    ],
+    "the lord of the rings: tales of middle-earth commander": [
+        "commander lord of the rings",
+        "universes beyond lord of the rings commander",
+        "universes beyond: lord of the rings - commander",
+        "lotr commander",
+    ],
+    "commander 2024": ["cmdr - 2024"],
+    "commander 2023": ["cmdr - 2023"],
+    "commander 2022": ["cmdr - 2022"],
+    "commander 2021": ["cmdr - 2021"],
+    "commander 2020": ["cmdr - 2020"],
+    "commander 2019": ["cmdr - 2019"],
+    "commander 2018": ["cmdr - 2018"],
+    "commander 2017": ["cmdr - 2017"],
+    "commander 2016": ["cmdr - 2016"],
+    "commander 2015": ["cmdr - 2015"],
+    "commander 2014": ["cmdr - 2014"],
+    "commander 2013": ["cmdr - 2013"],
+    "commander 2012": ["cmdr - 2012"],
+    "commander 2011": ["cmdr - 2011"],
+    "commander anthology volume ii": ["cmdr - anthology vol. ii", "commander anthology 2"],
+    "duel decks: zendikar vs. eldrazi": ["zendikar vs eldrazi duel decks"],
+    "the brothers' war retro artifacts": [
+        "magic's history: retro or schematic artifact",
+        "retro or schematic artifact",
+        "retro artifacts",
+        "brr",
+    ],
+    "secret lair drop": [
+        "secret lair: heads i win, tails you lose",
+        "secret lair",
+        "sld",
+    ],
+    "friday night magic 2022": ["fnm promos", "friday night magic", "fnm promo", "fnm cards"],
+    "mystery booster": ["the list", "mystery booster the list"],
+    "kamigawa: neon dynasty": ["kamigawa neon destiny"],
+    "jurassic world collection": ["universes beyond: jurassic world"],
+    "doctor who": ["dr. who (who)", "doctor who (who)" "Dr. Who (WHO)"],
+    "from the vault: twenty": ["ftv: twenty"],
+    "the brothers' war commander": ["commander brother's war"],
+}
+
+# Promo mappings for known catalog references or special sets
+PROMO_SET_MAPPINGS = {
+    "dmu extras": "Dominaria United",
+    "ikoria: extras": "Ikoria: Lair of Behemoths",
+    "znr extras": "zendikar rising",
+    "znr: extras": "Zendikar Rising",
+    "bro extras": "The Brothers' War",
+    "brothers' war extras": "The Brothers' War",
+    "brothers war extras": "The Brothers' War",
+    "mkm singles": "Murders at Karlov Manor",
+    "mkm": "Murders at Karlov Manor",
+    "afr extras": "Adventures in the Forgotten Realms",
+    "#045 - duel decks m14/m63/m64": "Duel Decks: Zendikar vs. Eldrazi",
+    "#045 - duel decks m14/63/64/67": "Duel Decks: Zendikar vs. Eldrazi",
+    "duel decks m14/m63/m64": "Duel Decks: Zendikar vs. Eldrazi",
+    "cbl bundle promo": "Commander Legends: Battle for Baldur's Gate",
+    "treasure chest promo": "Treasure Chest",
+    "promos: miscellaneous": "Judge Gift Cards",
+    "brawl deck exclusive": "Commander Collection",
+    "brawl": "Commander Collection",
+    "the list": "Mystery Booster: The List",
+    "set boosters reserved list": "Mystery Booster: The List",
+}
+
+_MATCHING_SPECIAL_CHARS = re.compile(r"[^a-zA-Z0-9\s]")
+_MATCHING_DESCRIPTORS = re.compile(r"\b(alternate|extended|art|showcase|borderless)\b", flags=re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def _normalize_set_name_cached(name: str) -> Tuple[str, ...]:
+    results = set()
+
+    name_lower = name.lower().strip()
+    results.add(name_lower)
+
+    cleaned_name = name_lower
+    for pattern, replacement in SET_NAME_CLEAN_PATTERNS:
+        cleaned_name = pattern.sub(replacement, cleaned_name).strip()
+    results.add(cleaned_name)
+
+    prefix_found = True
+    while prefix_found:
+        prefix_found = False
+        for prefix in SET_NAME_PREFIXES:
+            if cleaned_name.startswith(prefix):
+                cleaned_name = cleaned_name[len(prefix) :].strip()
+                prefix_found = True
+    results.add(cleaned_name)
+
+    results.update(
+        [
+            cleaned_name.replace(" ", ""),
+            cleaned_name.replace("'", ""),
+            cleaned_name.replace(":", ""),
+            cleaned_name.replace(",", ""),
+            cleaned_name.replace("-", ""),
+        ]
+    )
+
+    for candidate in list(results):
+        for official_name, variants in SET_NAME_MAPPINGS.items():
+            if candidate in variants or candidate == official_name.lower():
+                results.add(official_name.lower())
+                results.update(variants)
+
+    return tuple(filter(None, results))
+
+
+def normalize_set_name(name: str) -> List[str]:
+    """Robustly normalize set name to ensure accurate matching."""
+    if not name:
+        return []
+    return list(_normalize_set_name_cached(name))
+
+
+def clean_set_name_for_matching(name: str) -> str:
+    # Remove descriptors like "Alternate Art", "Extended Art", punctuation, multiple spaces
+    name = _MATCHING_SPECIAL_CHARS.sub(" ", name)
+    name = _MATCHING_DESCRIPTORS.sub("", name)
+    return _WHITESPACE.sub(" ", name).strip().lower()
+
+
+def _trigrams(text: str) -> Set[str]:
+    """Character trigrams of every whitespace token, padded so short tokens still index."""
+    grams = set()
+    for token in text.split():
+        padded = f" {token} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class SetNameIndex:
+    """
+    Read-only lookup structures compiled once from the cached Scryfall sets.
+
+    Exact lookups (set name, set code) are plain dictionary hits. The fuzzy fallbacks
+    only score the sets sharing at least one token trigram with the query instead of
+    every known set, and keep the original set order so tie-breaking is unchanged.
+    """
+
+    def __init__(self, sets_data: Dict[str, Dict[str, Any]], version: Optional[str] = None):
+        self.version = version
+        self.names: List[str] = []
+        self.code_by_name: Dict[str, Optional[str]] = {}
+        self.code_by_lower_code: Dict[str, str] = {}
+        self.lower_codes: List[Tuple[str, str]] = []
+        self.cleaned_names: List[str] = []
+        self._name_grams: Dict[str, Set[int]] = defaultdict(set)
+        self._cleaned_grams: Dict[str, Set[int]] = defaultdict(set)
+        self._max_code_length = 0
+
+        for position, (name, set_info) in enumerate(sets_data.items()):
+            self.names.append(name)
+            code = set_info.get("code") if isinstance(set_info, dict) else None
+            self.code_by_name[name] = code
+
+            code_lower = (code or "").lower()
+            self.lower_codes.append((name, code_lower))
+            if code and code_lower not in self.code_by_lower_code:
+                self.code_by_lower_code[code_lower] = code
+            self._max_code_length = max(self._max_code_length, len(code_lower))
+
+            cleaned = clean_set_name_for_matching(name)
+            self.cleaned_names.append(cleaned)
+
+            for gram in _trigrams(utils.full_process(name, force_ascii=True)):
+                self._name_grams[gram].add(position)
+            for gram in _trigrams(cleaned):
+                self._cleaned_grams[gram].add(position)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @staticmethod
+    def fingerprint(raw_sets_json: str) -> str:
+        """Content hash used as the version of a cached sets payload."""
+        return hashlib.sha1(raw_sets_json.encode("utf-8")).hexdigest()[:16]
+
+    def has_name(self, name: str) -> bool:
+        return name in self.code_by_name
+
+    def code_for_name(self, name: str) -> Optional[str]:
+        return self.code_by_name.get(name)
+
+    def code_for_code(self, code: str) -> Optional[str]:
+        """Return the official code when ``code`` is a (case-insensitive) set code."""
+        return self.code_by_lower_code.get(code)
+
+    def name_for_code_fragment(self, text: str) -> Optional[str]:
+        """First set whose code equals or contains ``text`` (in set order)."""
+        if len(text) > self._max_code_length:
+            return None
+        for name, code_lower in self.lower_codes:
+            if code_lower == text or text in code_lower:
+                return name
+        return None
+
+    def _candidate_positions(self, grams_index: Dict[str, Set[int]], text: str) -> List[int]:
+        positions: Set[int] = set()
+        for gram in _trigrams(text):
+            positions.update(grams_index.get(gram, ()))
+        return sorted(positions)
+
+    def partial_match_code(self, cleaned_query: str, threshold: int = 85) -> Optional[Tuple[str, Optional[str]]]:
+        """
+        Substring or partial-ratio match of an already cleaned name against cleaned set names.
+        Returns (set_name, set_code) of the first matching set in set order.
+        """
+        candidates = set(self._candidate_positions(self._cleaned_grams, cleaned_query))
+        for position, cleaned_outer in enumerate(self.cleaned_names):
+            if cleaned_query in cleaned_outer or cleaned_outer in cleaned_query:
+                name = self.names[position]
+                return name, self.code_by_name[name]
+            if position in candidates and fuzz.partial_ratio(cleaned_query, cleaned_outer) > threshold:
+                name = self.names[position]
+                return name, self.code_by_name[name]
+        return None
+
+    def best_fuzzy_match(self, queries: Iterable[str], score_cutoff: int) -> Optional[Tuple[str, int]]:
+        """Best token_set_ratio match over all queries, scoring only trigram-sharing candidates."""
+        best_match = None
+        best_score = 0
+        for query in queries:
+            if not query.strip():
+                continue
+            positions = self._candidate_positions(self._name_grams, utils.full_process(query, force_ascii=True))
+            if not positions:
+                continue
+            choices = [self.names[position] for position in positions]
+            match = process.extractOne(query, choices, scorer=fuzz.token_set_ratio, score_cutoff=score_cutoff)
+            if match and match[1] > best_score:
+                best_match = match
+                best_score = match[1]
+        return best_match
+
+    def closest_set_name(self, unclean_set_name: str) -> str:
+        """Official set name for an unclean set name, or the input itself when nothing matches."""
+        normalized_names = normalize_set_name(unclean_set_name)
+
+        # Attempt direct exact match first
+        for name_normalized in normalized_names:
+            if self.has_name(name_normalized):
+                logger.debug(f"Exact match found for set name: {name_normalized}")
+                return name_normalized
+
+            # Check in promo mappings
+            if name_normalized in PROMO_SET_MAPPINGS:
+                mapped_name = PROMO_SET_MAPPINGS[name_normalized].lower()
+                if self.has_name(mapped_name):
+                    logger.debug(f"Promo mapping matched: {name_normalized} -> {mapped_name}")
+                    return mapped_name
+
+        # Fuzzy match against set names
+        try:
+            best_match = self.best_fuzzy_match(normalized_names, score_cutoff=65)
+            if best_match:
+                matched_name, best_score = best_match
+                logger.debug(f"Fuzzy matched '{unclean_set_name}' to '{matched_name}' with score {best_score}")
+                return matched_name
+
+        except Exception as e:
+            logger.error(f"[SET NAME] Error during fuzzy matching: {str(e)}")
+
+        # Fallback: try to match against set codes
+        outer_name = self.name_for_code_fragment(unclean_set_name.lower())
+        if outer_name:
+            logger.debug(f"Matched '{unclean_set_name}' directly to set code '{self.code_for_name(outer_name)}'")
+            return outer_name  # The outer_name *is* the set name
+
+        logger.debug(f"[SET NAME] No match found for '{unclean_set_name}', returning original.")
+        return unclean_set_name
+
+    def set_code(self, set_name: str) -> Optional[str]:
+        """Set code for a set name using exact match first, then partial and fuzzy matching."""
+        normalized_names = normalize_set_name(set_name)
+        logger.debug(f"Normalized forms: {normalized_names}")
+
+        # Try exact matches using set names and codes
+        for norm_name in normalized_names:
+            if self.has_name(norm_name):
+                logger.debug(f"Exact match found for '{set_name}' using outer key '{norm_name}'")
+                return self.code_for_name(norm_name)
+
+            set_code = self.code_for_code(norm_name)
+            if set_code:
+                logger.debug(f"Exact match found against code for '{set_name}' -> {set_code}")
+                return set_code
+
+        # Try partial matching using cleaned names
+        for norm_name in normalized_names:
+            partial_match = self.partial_match_code(clean_set_name_for_matching(norm_name))
+            if partial_match:
+                outer_name, set_code = partial_match
+                logger.debug(f"Partial match: '{set_name}' -> '{outer_name}'")
+                return set_code
+
+        # Final fuzzy fallback
+        try:
+            best_match = self.best_fuzzy_match(normalized_names, score_cutoff=70)
+            if best_match:
+                match_name, best_score = best_match
+                logger.debug(f"Fuzzy matched '{set_name}' with score {best_score}")
+                return self.code_for_name(match_name)
+
+        except Exception as e:
+            logger.error(f"Error during fuzzy matching: {str(e)}")
+            return None
+
+        logger.debug(f"No match found for set: {set_name}")
+        logger.debug(f"Normalized names tried: {normalized_names}")
+        return None
+
+    def resolve(self, unclean_set_name: str) -> Tuple[Optional[str], Optional[str]]:
+        """(official set name, set code) of an unclean set name, without any memoization."""
+        clean_set_name = self.closest_set_name(unclean_set_name)
+        set_code = self.set_code(clean_set_name) if clean_set_name else None
+        return clean_set_name, set_code
+
+    def set_from_href(self, url: str) -> Optional[str]:
+        """Known set name found in a product URL, fuzzy matched from its "singles-" segment as a fallback."""
+        # Normalize URL for robust matching
+        normalized_url = url.lower().replace("_", " ").replace("-", " ").replace("/", " ")
+
+        # Check against known sets directly (robust extraction)
+        for known_set in self.names:
+            if known_set.lower() in normalized_url:
+                return known_set  # Immediately return the matched known set
+
+        # Fallback logic based on "singles-" if no direct matches found
+        if "singles-" in url:
+            part = url.split("singles-")[-1].split("/")[0]
+            potential_set_name = part.replace("-brawl", "").replace("_", " ").replace("-", " ").strip()
+
+            # Validate the extracted potential set name with fuzzy matching
+            best_match = process.extractOne(
+                potential_set_name, self.names, scorer=fuzz.token_set_ratio, score_cutoff=70
+            )
+            if best_match:
+                return best_match[0]  # Return validated fuzzy matched set
+
+        logger.warning(f"No magic set extracted reliably from URL: {url}")
+        return None
@@ -0,0 +1,171 @@
+import json
+import logging
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from app.utils.set_name_index import SetNameIndex
+
+logger = logging.getLogger(__name__)
+
+# (set_name, set_code) - set_code is None for inputs that could not be resolved
+SetResolution = Tuple[Optional[str], Optional[str]]
+
+
+class SetResolutionCache:
+    """
+    Two-tier memo of raw set strings (store categories, product suffixes...) to their resolution.
+
+    Tier one is a bounded in-process LRU. Tier two is a Redis hash shared by every worker,
+    keyed on the version of the cached Scryfall sets so a sets refresh starts from a clean slate.
+    Negative results are cached too, so unknown categories are only resolved once.
+    """
+
+    def __init__(self, redis_key_prefix: str, max_size: int = 4096, expiration: int = 86400):
+        self.redis_key_prefix = redis_key_prefix
+        self.max_size = max_size
+        self.expiration = expiration
+        self.version: Optional[str] = None
+        self._entries: "OrderedDict[str, SetResolution]" = OrderedDict()
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    @property
+    def redis_key(self) -> str:
+        return f"{self.redis_key_prefix}:{self.version or 'unversioned'}"
+
+    def reset(self, version: Optional[str] = None):
+        """Drop local entries and start caching against a new sets version."""
+        self._entries.clear()
+        self.version = version
+
+    def get_local(self, raw_set_name: str) -> Optional[SetResolution]:
+        resolution = self._entries.get(raw_set_name)
+        if resolution is not None:
+            self._entries.move_to_end(raw_set_name)
+            self.local_hits += 1
+        return resolution
+
+    def put_local(self, raw_set_name: str, resolution: SetResolution):
+        self._entries[raw_set_name] = resolution
+        self._entries.move_to_end(raw_set_name)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get_shared(self, redis_client, raw_set_name: str) -> Optional[SetResolution]:
+        try:
+            cached = await redis_client.hget(self.redis_key, raw_set_name)
+        except Exception as e:
+            logger.warning(f"Could not read set resolution cache: {str(e)}")
+            return None
+        if cached is None:
+            return None
+        try:
+            set_name, set_code = json.loads(cached)
+        except (json.JSONDecodeError, TypeError, ValueError):
+            return None
+        self.shared_hits += 1
+        resolution = (set_name, set_code)
+        self.put_local(raw_set_name, resolution)
+        return resolution
+
+    async def put_shared(self, redis_client, raw_set_name: str, resolution: SetResolution):
+        try:
+            redis_key = self.redis_key
+            await redis_client.hset(redis_key, raw_set_name, json.dumps(list(resolution)))
+            await redis_client.expire(redis_key, self.expiration)
+        except Exception as e:
+            logger.warning(f"Could not write set resolution cache: {str(e)}")
+
+    def snapshot(self) -> Dict[str, SetResolution]:
+        """Copy of the local entries, to seed resolvers running outside this process."""
+        return dict(self._entries)
+
+    async def get_all_shared(self, redis_client) -> Dict[str, SetResolution]:
+        try:
+            cached = await redis_client.hgetall(self.redis_key)
+        except Exception as e:
+            logger.warning(f"Could not read set resolution cache: {str(e)}")
+            return {}
+        resolutions = {}
+        for raw_set_name, value in cached.items():
+            try:
+                set_name, set_code = json.loads(value)
+            except (json.JSONDecodeError, TypeError, ValueError):
+                continue
+            resolutions[raw_set_name] = (set_name, set_code)
+        return resolutions
+
+    async def put_many_shared(self, redis_client, resolutions: Dict[str, SetResolution]):
+        if not resolutions:
+            return
+        try:
+            redis_key = self.redis_key
+            await redis_client.hset(
+                redis_key, mapping={name: json.dumps(list(resolution)) for name, resolution in resolutions.items()}
+            )
+            await redis_client.expire(redis_key, self.expiration)
+        except Exception as e:
+            logger.warning(f"Could not write set resolution cache: {str(e)}")
+
+    def get_stats(self) -> Dict[str, float]:
+        lookups = self.local_hits + self.shared_hits + self.misses
+        return {
+            "version": self.version,
+            "size": len(self._entries),
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.local_hits + self.shared_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+class SetResolver:
+    """
+    Synchronous set resolution against a SetNameIndex, for extraction running off the event loop.
+
+    ``resolutions`` is used as the memo and may be shared between resolvers of the same process.
+    Entries computed by this resolver are also kept in ``new_resolutions`` so the caller can
+    publish them to the SetResolutionCache afterwards.
+    """
+
+    def __init__(self, set_index: Optional["SetNameIndex"], resolutions: Optional[Dict[str, SetResolution]] = None):
+        self.set_index = set_index
+        self.resolutions = resolutions if resolutions is not None else {}
+        self.new_resolutions: Dict[str, SetResolution] = {}
+
+    def resolve(self, unclean_set_name: str) -> SetResolution:
+        if not unclean_set_name:
+            return None, None
+        if not self.set_index:
+            return unclean_set_name, None
+
+        resolution = self.resolutions.get(unclean_set_name)
+        if resolution is None:
+            resolution = self.set_index.resolve(unclean_set_name)
+            self.resolutions[unclean_set_name] = resolution
+            self.new_resolutions[unclean_set_name] = resolution
+        return resolution
+
+    def get_closest_set_name(self, unclean_set_name: str) -> Optional[str]:
+        if not unclean_set_name:
+            logger.warning(f"[SET CODE] Empty set name received")
+            return None
+        return self.resolve(unclean_set_name)[0]
+
+    def get_clean_set_code_from_set_name(self, unclean_set_name: str) -> Optional[str]:
+        clean_set_name, set_code = self.resolve(unclean_set_name)
+        if not clean_set_name:
+            logger.warning(f"[SET CODE] No clean set name found for: {unclean_set_name}")
+            return None
+        return set_code
+
+    def extract_magic_set_from_href(self, url: str) -> Optional[str]:
+        if not self.set_index:
+            return None
+        try:
+            return self.set_index.set_from_href(url)
+        except Exception as e:
+            logger.error(f"Fatal error in extract_magic_set: {str(e)}", exc_info=True)
+            return None
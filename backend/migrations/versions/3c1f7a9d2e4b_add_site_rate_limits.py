@@ -0,0 +1,28 @@
+"""add site rate limits
+
+Revision ID: 3c1f7a9d2e4b
+Revises: 8a9ffe301bf5
+Create Date: 2026-10-16 10:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1f7a9d2e4b'
+down_revision = '8a9ffe301bf5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('site', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rate_limit', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('max_concurrency', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('site', schema=None) as batch_op:
+        batch_op.drop_column('max_concurrency')
+        batch_op.drop_column('rate_limit')
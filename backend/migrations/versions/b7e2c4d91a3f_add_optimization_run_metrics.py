@@ -0,0 +1,52 @@
+"""add optimization run metrics
+
+Revision ID: b7e2c4d91a3f
+Revises: 3c1f7a9d2e4b
+Create Date: 2026-10-16 14:02:17.530912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2c4d91a3f'
+down_revision = '3c1f7a9d2e4b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('optimization_run_metrics',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('algorithm', sa.String(length=50), nullable=False),
+    sa.Column('auto_selected', sa.Boolean(), nullable=False),
+    sa.Column('num_cards', sa.Integer(), nullable=False),
+    sa.Column('num_stores', sa.Integer(), nullable=False),
+    sa.Column('total_listings', sa.Integer(), nullable=False),
+    sa.Column('avg_stores_per_card', sa.Float(), nullable=True),
+    sa.Column('card_coverage', sa.Float(), nullable=True),
+    sa.Column('price_variance', sa.Float(), nullable=True),
+    sa.Column('complexity_score', sa.Float(), nullable=True),
+    sa.Column('cost_lower_bound', sa.Float(), nullable=True),
+    sa.Column('time_limit', sa.Float(), nullable=True),
+    sa.Column('execution_time', sa.Float(), nullable=False),
+    sa.Column('phase_timings', sa.JSON(), nullable=True),
+    sa.Column('total_cost', sa.Float(), nullable=True),
+    sa.Column('completeness', sa.Float(), nullable=True),
+    sa.Column('number_store', sa.Integer(), nullable=True),
+    sa.Column('solution_quality', sa.Float(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('optimization_run_metrics', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_optimization_run_metrics_algorithm'), ['algorithm'], unique=False)
+        batch_op.create_index(batch_op.f('ix_optimization_run_metrics_created_at'), ['created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('optimization_run_metrics', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_optimization_run_metrics_created_at'))
+        batch_op.drop_index(batch_op.f('ix_optimization_run_metrics_algorithm'))
+
+    op.drop_table('optimization_run_metrics')
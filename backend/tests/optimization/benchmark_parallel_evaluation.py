@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the fitness evaluation backends on a large synthetic buylist.
+
+Scores the same populations serially and through ParallelPopulationEvaluator with an increasing
+number of workers, and prints the time per generation and the speedup over the serial backend.
+
+Usage:
+    PYTHONPATH=. python tests/optimization/benchmark_parallel_evaluation.py [cards] [population] [generations]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.optimization.core.parallel_evaluator import ParallelPopulationEvaluator
+from app.optimization.core.population_evaluator import PopulationEvaluator
+
+
+def build_problem(n_cards: int, listings_per_card: int = 40, n_stores: int = 60):
+    rng = np.random.default_rng(0)
+    names = [f"Card {i}" for i in range(n_cards)]
+    listings = pd.DataFrame(
+        {
+            "name": np.repeat(names, listings_per_card),
+            "site_name": rng.integers(0, n_stores, n_cards * listings_per_card).astype(str),
+            "price": rng.uniform(0.1, 50.0, n_cards * listings_per_card).round(2),
+        }
+    )
+    wishlist = pd.DataFrame({"name": names, "quantity": rng.integers(1, 5, n_cards)})
+    evaluator = PopulationEvaluator(listings, wishlist, listings["price"], rng.uniform(0.2, 1.0, len(listings)))
+    return listings, wishlist, evaluator
+
+
+def random_population(listings: pd.DataFrame, wishlist: pd.DataFrame, size: int, rng) -> list:
+    offsets = {name: i * (len(listings) // len(wishlist)) for i, name in enumerate(wishlist["name"])}
+    per_card = len(listings) // len(wishlist)
+    genes = np.concatenate([np.full(q, offsets[n]) for n, q in zip(wishlist["name"], wishlist["quantity"])])
+    return [(genes + rng.integers(0, per_card, len(genes))).tolist() for _ in range(size)]
+
+
+def time_generations(score, populations) -> float:
+    start = time.perf_counter()
+    for population in populations:
+        score(population)
+    return (time.perf_counter() - start) / len(populations)
+
+
+def main():
+    n_cards = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    population_size = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+    generations = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+    listings, wishlist, evaluator = build_problem(n_cards)
+    rng = np.random.default_rng(1)
+    populations = [random_population(listings, wishlist, population_size, rng) for _ in range(generations)]
+    print(
+        f"{n_cards} cards, {int(wishlist['quantity'].sum())} genes, {len(listings)} listings, "
+        f"population {population_size}, {generations} generations, {os.cpu_count()} cores"
+    )
+
+    serial = time_generations(evaluator.evaluate, populations)
+    print(f"  serial      {serial * 1000:9.1f} ms/generation")
+
+    n_jobs = 2
+    while n_jobs <= (os.cpu_count() or 1):
+        with ParallelPopulationEvaluator(evaluator, n_jobs) as pool:
+            pool.evaluate(populations[0])  # Warm up the workers
+            parallel = time_generations(pool.evaluate, populations)
+        print(f"  {n_jobs:2d} workers  {parallel * 1000:9.1f} ms/generation  x{serial / parallel:.2f}")
+        n_jobs *= 2
+
+    if (os.cpu_count() or 1) < 2:
+        print("  Only one core available, no process pool to compare against")
+
+
+if __name__ == "__main__":
+    main()
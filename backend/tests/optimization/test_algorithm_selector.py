@@ -0,0 +1,49 @@
+from app.optimization.core.algorithm_selector import AlgorithmSelector
+
+
+def _run(algorithm, num_cards, cost_ratio, execution_time, completeness=1.0):
+    return {
+        "algorithm": algorithm,
+        "num_cards": num_cards,
+        "num_stores": 20,
+        "total_listings": num_cards * 40,
+        "avg_stores_per_card": 8.0,
+        "card_coverage": 1.0,
+        "cost_lower_bound": 100.0,
+        "total_cost": 100.0 * cost_ratio,
+        "completeness": completeness,
+        "execution_time": execution_time,
+    }
+
+
+HISTORY = (
+    # Small buylists: MILP is optimal and fast
+    [_run("milp", n, 1.05, 2.0) for n in (10, 12, 15)]
+    + [_run("nsga2", n, 1.20, 8.0) for n in (10, 12, 15)]
+    # Large buylists: MILP is as good but slow, the hybrid is close and faster
+    + [_run("milp", n, 1.10, 200.0) for n in (150, 160, 180)]
+    + [_run("hybrid_milp_moead", n, 1.11, 40.0) for n in (150, 160, 180)]
+    + [_run("nsga2", n, 1.40, 20.0, completeness=0.8) for n in (150, 160, 180)]
+)
+
+
+def test_picks_the_fastest_algorithm_close_to_the_best_cost():
+    selector = AlgorithmSelector(HISTORY, n_neighbours=9)
+
+    assert selector.select(_run("auto", 12, 0, 0)) == "milp"
+    assert selector.select(_run("auto", 170, 0, 0)) == "hybrid_milp_moead"
+
+
+def test_time_limit_and_completion_filter_candidates():
+    selector = AlgorithmSelector(HISTORY, n_neighbours=9)
+
+    # Incomplete NSGA-II runs disqualify it even though it is the fastest
+    assert selector.select(_run("auto", 170, 0, 0), time_limit=30) is None
+    assert selector.select(_run("auto", 170, 0, 0), time_limit=300) == "hybrid_milp_moead"
+
+
+def test_falls_back_without_history():
+    unusable = [dict(_run("milp", 10, 1.0, 1.0), cost_lower_bound=0.0)]
+
+    assert AlgorithmSelector([]).select(_run("auto", 10, 0, 0)) is None
+    assert len(AlgorithmSelector(unusable)) == 0
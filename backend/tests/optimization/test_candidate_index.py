@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from app.optimization.core.candidate_index import CandidateIndex
+
+
+def _listings():
+    return pd.DataFrame(
+        {
+            "name": ["Opt", "Sol Ring", "Opt", "Opt"],
+            "site_name": ["A", "B", "B", "A"],
+            "price": [1.0, 2.0, 3.0, 0.5],
+            "quality": ["NM", "LP", "LP", "NM"],
+        },
+        index=[5, 7, 9, 11],
+    )
+
+
+def test_genes_draw_from_the_listings_of_their_card():
+    np.random.seed(0)
+    wishlist = pd.DataFrame({"name": ["Opt", "Sol Ring", "Missing"], "quantity": [2, 1, 1]})
+    candidate_index = CandidateIndex.by_quality_price(_listings(), wishlist)
+
+    np.testing.assert_array_equal(candidate_index.gene_cards, [0, 0, 1, 2])
+    assert not candidate_index.covers_all_cards
+    for _ in range(50):
+        individual = candidate_index.draw_individual()
+        assert individual[0] in (5, 9, 11) and individual[1] in (5, 9, 11)
+        assert individual[2] == 7
+        assert 0 <= individual[3] < 4
+
+
+def test_draws_follow_the_sampling_weights():
+    np.random.seed(1)
+    wishlist = pd.DataFrame({"name": ["Opt"], "quantity": [1]})
+    candidate_index = CandidateIndex(_listings(), wishlist, np.array([1.0, 1.0, 0.0, 3.0]))
+
+    draws = np.array(candidate_index.draw(np.zeros(4000, dtype=int)))
+
+    assert not (draws == 9).any()
+    assert abs((draws == 11).mean() - 0.75) < 0.03
+
+
+def test_preferred_stores_restrict_cards_they_sell():
+    wishlist = pd.DataFrame({"name": ["Opt", "Sol Ring"], "quantity": [1, 1]})
+    candidate_index = CandidateIndex.by_price(_listings(), wishlist, preferred_stores={"A"})
+
+    for _ in range(20):
+        opt, sol_ring = candidate_index.draw_individual()
+        assert opt in (5, 11)
+        assert sol_ring == 7
+
+
+def test_mutate_redraws_genes_in_place():
+    wishlist = pd.DataFrame({"name": ["Sol Ring"], "quantity": [2]})
+    candidate_index = CandidateIndex.by_price(_listings(), wishlist)
+    individual = [5, 9, 11]
+
+    assert candidate_index.mutate(individual, indpb=1.0) is individual
+    assert individual == [7, 7, 11]
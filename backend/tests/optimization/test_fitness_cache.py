@@ -0,0 +1,66 @@
+import pandas as pd
+
+from app.optimization.core.fitness_cache import FitnessCache
+from app.optimization.core.population_evaluator import PopulationEvaluator
+
+
+def _evaluator(wishlist):
+    listings = pd.DataFrame(
+        {
+            "name": ["Opt", "Opt", "Opt", "Sol Ring", "Sol Ring"],
+            "site_name": ["A", "B", "C", "A", "B"],
+            "price": [1.0, 2.0, 3.0, 4.0, 5.0],
+        },
+        index=[10, 11, 12, 20, 21],
+    )
+    return PopulationEvaluator(listings, wishlist, listings["price"], [1.0, 0.5, 1.0, 1.0, 0.5])
+
+
+def _scoring(evaluator, batches):
+    def evaluate_population(population):
+        batches.append([list(individual) for individual in population])
+        scores = evaluator.evaluate(population)
+        return list(zip(scores.cost.tolist(), scores.quality.tolist()))
+
+    return evaluate_population
+
+
+def test_repeated_and_reordered_genotypes_are_scored_once():
+    evaluator = _evaluator(pd.DataFrame({"name": ["Opt", "Sol Ring"], "quantity": [2, 1]}))
+    cache = FitnessCache(evaluator)
+    batches = []
+    evaluate_population = cache.wrap(_scoring(evaluator, batches))
+
+    first = evaluate_population([[10, 11, 20], [11, 10, 20], [10, 11, 20]])
+    second = evaluate_population([[10, 11, 20], [12, 11, 21]])
+
+    assert batches == [[[10, 11, 20]], [[12, 11, 21]]]
+    assert first == [(7.0, 2.5 / 3)] * 3
+    assert second[0] == first[0]
+    assert (cache.hits, cache.misses) == (3, 2)
+    assert cache.hit_rate == 0.6
+
+
+def test_genes_outside_their_card_slots_keep_their_order():
+    evaluator = _evaluator(pd.DataFrame({"name": ["Opt", "Sol Ring"], "quantity": [1, 1]}))
+    cache = FitnessCache(evaluator)
+    batches = []
+    evaluate_population = cache.wrap(_scoring(evaluator, batches))
+
+    # Sol Ring in the Opt slot: order decides which listing of a card counts
+    fitnesses = evaluate_population([[20, 21], [21, 20]])
+
+    assert len(batches[0]) == 2
+    assert fitnesses == [(4.0, 1.0), (5.0, 0.5)]
+
+
+def test_cache_is_bounded():
+    evaluator = _evaluator(pd.DataFrame({"name": ["Opt"], "quantity": [1]}))
+    cache = FitnessCache(evaluator, max_size=2)
+    evaluate_population = cache.wrap(_scoring(evaluator, []))
+
+    evaluate_population([[10], [11], [12]])
+    evaluate_population([[10]])
+
+    assert len(cache) == 2
+    assert cache.misses == 4
@@ -0,0 +1,79 @@
+import pandas as pd
+
+from app.optimization.preprocessing.listing_pruner import ListingPruner
+
+
+def _listings(rows):
+    frame = pd.DataFrame(rows, columns=["name", "site_name", "price", "quality", "quantity"])
+    return frame.assign(language="English", version="Standard", foil=False, set_name="Alpha")
+
+
+def _wishlist(**quantities):
+    return pd.DataFrame({"name": list(quantities), "quantity": list(quantities.values())})
+
+
+def test_keeps_the_pareto_set_of_each_card_and_store_up_to_the_quantity():
+    listings = _listings(
+        [
+            ("Opt", "A", 1.0, "NM", 1),
+            ("Opt", "A", 2.0, "NM", 4),  # Needed for the second copy
+            ("Opt", "A", 3.0, "LP", 4),  # Two NM copies are cheaper
+            ("Opt", "A", 1.1, "LP", 4),  # Cheaper than the second NM copy, even penalized
+            ("Other", "A", 9.0, "NM", 1),  # Not in the buylist
+        ]
+    )
+
+    pruned, report = ListingPruner({}).prune(listings, _wishlist(Opt=2))
+
+    assert pruned["price"].tolist() == [1.0, 2.0, 1.1]
+    assert pruned.index.tolist() == [0, 1, 3]
+    assert (report.listings_before, report.listings_after) == (5, 3)
+    assert report.listing_reduction == 0.4
+
+
+def test_drops_stores_dominated_on_the_whole_buylist():
+    listings = _listings(
+        [
+            ("Opt", "A", 1.0, "NM", 4),
+            ("Sol Ring", "A", 2.0, "NM", 4),
+            ("Opt", "B", 1.5, "NM", 4),
+            ("Opt", "C", 0.5, "NM", 4),
+            ("Sol Ring", "C", 9.0, "NM", 4),
+        ]
+    )
+
+    pruned, report = ListingPruner({}).prune(listings, _wishlist(Opt=1, **{"Sol Ring": 1}))
+
+    # A beats B on Opt, C is cheaper for Opt but not for Sol Ring
+    assert sorted(pruned["site_name"].unique()) == ["A", "C"]
+    assert (report.stores_before, report.stores_after) == (3, 2)
+
+
+def test_one_store_can_supply_every_copy():
+    listings = _listings([("Opt", "A", 1.0, "NM", 4), ("Opt", "B", 1.5, "NM", 4), ("Opt", "C", 2.0, "NM", 1)])
+
+    pruned, _ = ListingPruner({}).prune(listings, _wishlist(Opt=2))
+
+    # C only has one copy, but A alone covers both
+    assert pruned["site_name"].tolist() == ["A"]
+
+
+def test_a_card_listed_twice_needs_both_quantities():
+    listings = _listings([("Opt", "A", 1.0, "NM", 2), ("Opt", "A", 2.0, "NM", 2), ("Opt", "B", 1.5, "NM", 2)])
+    wishlist = pd.concat([_wishlist(Opt=2), _wishlist(Opt=2)], ignore_index=True)
+
+    pruned, _ = ListingPruner({}).prune(listings, wishlist)
+
+    # Four copies are wanted: the first listing of A covers only two
+    assert pruned["price"].tolist() == [1.0, 2.0, 1.5]
+
+
+def test_keeps_listings_any_optimizer_could_prefer():
+    listings = _listings([("Opt", "A", 1.0, "LP", 4), ("Opt", "A", 0.3, "NM", 4), ("Opt", "A", 2.0, "LP", 4)])
+    listings["language"] = ["English", "Japanese", "English"]
+
+    pruned, _ = ListingPruner({}).prune(listings, _wishlist(Opt=1))
+
+    # The Japanese NM copy costs more after penalties and scores lower with its language, but
+    # MILP and MOEA/D only score the condition
+    assert pruned["price"].tolist() == [1.0, 0.3]
@@ -0,0 +1,61 @@
+import pandas as pd
+
+from app.optimization.core.listings_table import ListingsTable
+
+
+def listing(**overrides):
+    result = {
+        "name": "Lightning Bolt",
+        "site_id": 1,
+        "set_name": "Modern Horizons 3",
+        "set_code": "MH3",
+        "price": 1.99,
+        "quality": "Near Mint",
+        "quantity": 2,
+        "version": "Standard",
+        "foil": False,
+        "language": "English",
+        "variant_id": "11",
+    }
+    result.update(overrides)
+    return result
+
+
+def test_listings_table_is_typed():
+    table = ListingsTable.from_rows([tuple(listing().values()), tuple(listing(name="Opt", price=0.25).values())])
+
+    assert isinstance(table.frame["name"].dtype, pd.CategoricalDtype)
+    assert table.frame["price"].dtype == "float32"
+    assert table.frame["site_id"].dtype == "int32"
+
+
+def test_prepare_filters_normalizes_and_converts_prices():
+    table = ListingsTable.from_records(
+        [
+            listing(),
+            listing(site_id=2, variant_id="21"),
+            listing(site_id=9, variant_id="91"),
+            listing(set_code="unknown", variant_id="12"),
+            listing(quantity=0, variant_id="13"),
+        ]
+    )
+
+    frame = table.prepare({1: "Local", 2: "US Store"}, {1: "CAD", 2: "USD"}).to_frame()
+
+    assert frame["variant_id"].tolist() == ["11", "21"]
+    assert frame["quality"].tolist() == ["NM", "NM"]
+    assert frame["original_price"].tolist() == [1.99, 1.99]
+    assert frame["price"].tolist() == [1.99, 1.99 * 1.35]
+    assert frame["site_name"].tolist() == ["Local", "US Store"]
+
+
+def test_concat_and_filter_pairs():
+    first = ListingsTable.from_records([listing(), listing(name="Opt", site_id=2)])
+    second = ListingsTable.from_records([listing(name="Sol Ring", site_id=3, quality="LP")])
+
+    combined = ListingsTable.concat([first, ListingsTable(), second])
+    assert len(combined) == 3
+    assert isinstance(combined.frame["name"].dtype, pd.CategoricalDtype)
+
+    fresh = combined.filter_pairs({"Opt": {2}, "Sol Ring": {1}})
+    assert fresh.frame["name"].astype(str).tolist() == ["Opt"]
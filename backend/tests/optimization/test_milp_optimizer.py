@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+from app.optimization.algorithms.milp.milp_optimizer import QUALITY_SCORES, MILPModel, MILPOptimizer
+from app.optimization.postprocessing.result_formatter import ResultFormatter
+from app.optimization.preprocessing.penalty_calculator import PenaltyCalculator
+
+
+def test_create_enriched_costs_picks_cheapest_listing_per_card_and_store():
+    listings = pd.DataFrame(
+        {
+            "name": ["Opt", "Opt", "Opt", "Sol Ring"],
+            "site_name": ["A", "A", "B", "B"],
+            "price": [1.0, 0.5, 0.75, 2.0],
+            "weighted_price": [1.0, 0.65, 0.75, 2.0],
+            "quality": ["NM", "LP", "NM", "Near Mint"],
+            "quantity": [4, 1, 2, 1],
+        },
+        index=[10, 11, 12, 13],
+    )
+    optimizer = MILPOptimizer.__new__(MILPOptimizer)
+
+    costs = optimizer._create_enriched_costs(listings, ["Opt", "Sol Ring", "Opt Missing"], ["A", "B"])
+
+    assert costs["Opt"]["A"]["weighted_price"] == 0.65
+    assert costs["Opt"]["A"]["listing_index"] == 11
+    assert costs["Opt"]["A"]["available_quantity"] == 1
+    assert costs["Opt"]["A"]["quality_score"] == QUALITY_SCORES["LP"]
+    assert costs["Sol Ring"]["B"]["quality_score"] == QUALITY_SCORES["NM"] == 1
+    assert "A" not in costs["Sol Ring"]
+    np.testing.assert_array_equal(optimizer.cost_matrix, [[0.65, 0.75], [np.inf, 2.0], [np.inf, np.inf]])
+    np.testing.assert_array_equal(optimizer.listing_index_matrix, [[1, 2], [-1, 3], [-1, -1]])
+
+
+def test_milp_model_is_resolved_with_a_new_store_cap():
+    costs = {
+        "Opt": {"A": {"weighted_price": 1.0, "quality_score": 1}, "B": {"weighted_price": 0.5, "quality_score": 1}},
+        "Sol Ring": {
+            "A": {"weighted_price": 2.0, "quality_score": 1},
+            "C": {"weighted_price": 1.0, "quality_score": 1},
+        },
+    }
+    model = MILPModel(costs, ["Opt", "Sol Ring"], ["A", "B", "C"], {"Opt": 1, "Sol Ring": 1}, 1, 3, True)
+
+    model.set_weights({"cost": 1.0})
+    assert model.solve() == "Optimal"
+    assert model.buy_vars["Opt"]["B"].value() == 1 and model.buy_vars["Sol Ring"]["C"].value() == 1
+
+    model.set_store_cap(1)
+    assert model.solve() == "Optimal"
+    assert model.buy_vars["Opt"]["A"].value() == 1 and model.buy_vars["Sol Ring"]["A"].value() == 1
+    assert model.solve_count == 2
+
+
+def test_milp_model_buys_several_copies_from_one_store_within_stock():
+    offers = {
+        "Opt": {
+            "A": [
+                {"weighted_price": 1.0, "quality_score": 1, "available_quantity": 2},
+                {"weighted_price": 1.5, "quality_score": 1, "available_quantity": 4},
+            ],
+            "B": [{"weighted_price": 1.2, "quality_score": 1, "available_quantity": 4}],
+        }
+    }
+    costs = {"Opt": {store: pair[0] for store, pair in offers["Opt"].items()}}
+    model = MILPModel(costs, ["Opt"], ["A", "B"], {"Opt": 3}, 1, 1, offers=offers)
+
+    model.set_weights({"cost": 1.0})
+    assert model.solve() == "Optimal"
+
+    # One store allowed: both listings of A, the cheap one up to its stock
+    assert [variable.value() for _, variable in model.offer_vars["Opt"]["A"]] == [2, 1]
+    assert model.buy_vars["Opt"]["B"].value() == 0
+
+
+def test_solution_decodes_to_the_listing_rows_of_its_variables():
+    listings = pd.DataFrame(
+        {
+            "name": ["Opt", "Opt", "Opt"],
+            "site_name": ["A", "A", "B"],
+            "price": [1.0, 1.0, 3.0],
+            "weighted_price": [1.0, 1.0, 3.0],
+            "penalty_multiplier": [1.0, 1.0, 1.0],
+            "quality": ["NM", "NM", "NM"],
+            "quantity": [1, 1, 2],
+            "set_name": ["Alpha", "Beta", "Alpha"],
+            "set_code": ["LEA", "LEB", "LEA"],
+        },
+        index=[7, 3, 5],
+    )
+    optimizer = MILPOptimizer.__new__(MILPOptimizer)
+    optimizer.result_formatter = ResultFormatter()
+    optimizer.penalty_calculator = PenaltyCalculator({})
+    optimizer.card_preferences = {"Opt": {"set_name": "Alpha"}}
+    costs = optimizer._create_enriched_costs(listings, ["Opt"], ["A", "B"], {"Opt": 2})
+    model = MILPModel(costs, ["Opt"], ["A", "B"], {"Opt": 2}, 1, 2, offers=optimizer.offers)
+    model.set_weights({"cost": 1.0})
+    model.solve()
+
+    result = optimizer._process_milp_result(model, listings, 2, 1)
+
+    # Same name, store and price: only the listing rows tell the two copies apart
+    assert sorted(result["sorted_results_df"]["set_name"]) == ["Alpha", "Beta"]
+    assert result["total_price"] == 2.0 and result["cards_found_total"] == 2
@@ -0,0 +1,41 @@
+import numpy as np
+
+from app.optimization.algorithms.evolutionary.nsga3_selection import associate, niche_select, normalize_objectives
+from app.optimization.core.pareto import non_dominated_ranks
+
+
+def test_non_dominated_ranks_peel_fronts():
+    objectives = np.array([[1.0, 4.0], [2.0, 2.0], [4.0, 1.0], [3.0, 3.0], [5.0, 5.0], [2.0, 2.0]])
+
+    np.testing.assert_array_equal(non_dominated_ranks(objectives), [0, 0, 0, 1, 2, 0])
+    np.testing.assert_array_equal(non_dominated_ranks(objectives, k=4), [0, 0, 0, -1, -1, 0])
+
+
+def test_normalization_maps_extreme_points_to_unit_intercepts():
+    objectives = np.array([[10.0, 0.0, 1.0], [0.0, 20.0, 1.0], [0.0, 0.0, 5.0], [5.0, 5.0, 2.0]])
+
+    normalized = normalize_objectives(objectives)
+
+    np.testing.assert_allclose(normalized[:3], np.eye(3))
+    np.testing.assert_allclose(normalized[3], [0.5, 0.25, 0.25])
+
+
+def test_associate_uses_perpendicular_distance():
+    ref_points = np.array([[1.0, 0.0], [0.5, 0.5], [0.0, 1.0]])
+
+    niches, distances = associate(np.array([[0.9, 0.1], [0.4, 0.5], [0.0, 2.0]]), ref_points)
+
+    np.testing.assert_array_equal(niches, [0, 1, 2])
+    np.testing.assert_allclose(distances, [0.1, np.sqrt(0.005), 0.0])
+
+
+def test_niche_select_fills_least_crowded_niches_first():
+    rng = np.random.default_rng(0)
+    niches = np.array([0, 0, 1, 2, 2])
+    distances = np.array([0.3, 0.1, 0.5, 0.2, 0.4])
+
+    picks = niche_select(niches, distances, np.array([0, 1, 5]), 3, rng)
+
+    # Niche 0 is empty so its closest candidate goes first, then niche 0 and 1 tie on one each
+    assert picks[0] == 1
+    assert sorted(picks[1:].tolist()) == [0, 2]
@@ -0,0 +1,92 @@
+import multiprocessing
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from deap import base
+
+from app.optimization.core.parallel_evaluator import ParallelPopulationEvaluator, register_population_evaluation
+from app.optimization.core.population_evaluator import PopulationEvaluator
+
+
+def _evaluator(n_cards=50):
+    names = [f"Card {i}" for i in range(n_cards)]
+    listings = pd.DataFrame(
+        {
+            "name": np.repeat(names, 3),
+            "site_name": np.tile(["A", "B", "C"], n_cards),
+            "price": np.arange(3 * n_cards, dtype=float),
+        }
+    )
+    wishlist = pd.DataFrame({"name": names, "quantity": 1})
+    return PopulationEvaluator(listings, wishlist, listings["price"], np.ones(len(listings)))
+
+
+def _population(size, n_cards=50):
+    rng = np.random.default_rng(0)
+    return [(np.arange(n_cards) * 3 + rng.integers(0, 3, n_cards)).tolist() for _ in range(size)]
+
+
+def test_single_job_scores_in_place():
+    evaluator = _evaluator()
+    population = _population(100)
+
+    with ParallelPopulationEvaluator(evaluator, n_jobs=1) as pool:
+        assert not pool.started
+        scores = pool.evaluate(population)
+
+    np.testing.assert_array_equal(scores.cost, evaluator.evaluate(population).cost)
+
+
+@pytest.mark.skipif((os.cpu_count() or 1) < 2, reason="needs at least two cores")
+def test_process_pool_matches_serial_scores():
+    evaluator = _evaluator()
+    population = _population(200)
+
+    with ParallelPopulationEvaluator(evaluator, n_jobs=2) as pool:
+        assert pool.started
+        scores = pool.evaluate(population)
+
+    expected = evaluator.evaluate(population)
+    np.testing.assert_array_equal(scores.cost, expected.cost)
+    np.testing.assert_array_equal(scores.store_count, expected.store_count)
+
+
+def _score_in_daemonic_process(results):
+    evaluator = _evaluator()
+    population = _population(200)
+    with ParallelPopulationEvaluator(evaluator, n_jobs=2) as pool:
+        started = pool.started
+        cost = pool.evaluate(population).cost
+    results.put((started, cost.tolist(), evaluator.evaluate(population).cost.tolist()))
+
+
+def test_process_pool_starts_inside_daemonic_processes(monkeypatch):
+    # Like a Celery prefork worker, which the standard library won't give children
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    worker = context.Process(target=_score_in_daemonic_process, args=(results,), daemon=True)
+    worker.start()
+
+    started, cost, expected = results.get(timeout=120)
+    worker.join()
+    assert started
+    assert cost == expected
+
+
+def test_toolbox_map_scores_evaluate_as_one_batch():
+    batches = []
+
+    def evaluate_population(population):
+        batches.append(len(population))
+        return [(float(sum(individual)),) for individual in population]
+
+    toolbox = base.Toolbox()
+    register_population_evaluation(toolbox, evaluate_population)
+
+    assert toolbox.map(toolbox.evaluate, [[1, 2], [3]]) == [(3.0,), (3.0,)]
+    assert toolbox.evaluate([4]) == (4.0,)
+    assert toolbox.map(len, [[1, 2], [3]]) == [2, 1]
+    assert batches == [2, 1]
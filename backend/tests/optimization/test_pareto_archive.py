@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from app.optimization.core.pareto import (
+    ParetoArchive,
+    hypervolume_contributions,
+    non_dominated_mask,
+    non_dominated_ranks,
+    solution_objectives,
+)
+
+
+@pytest.mark.parametrize("n_objectives", [2, 3, 4])
+def test_non_dominated_mask_matches_first_front(n_objectives):
+    rng = np.random.default_rng(n_objectives)
+    # Rounded so that ties and duplicates show up
+    objectives = rng.random((200, n_objectives)).round(1)
+
+    np.testing.assert_array_equal(non_dominated_mask(objectives), non_dominated_ranks(objectives) == 0)
+
+
+def test_hypervolume_contributions_of_a_2d_front():
+    front = np.array([[3.0, 1.0], [1.0, 3.0], [2.0, 2.0], [2.5, 1.2]])
+
+    np.testing.assert_allclose(hypervolume_contributions(front), [np.inf, np.inf, 0.5 * 1.0, 0.5 * 0.8])
+
+
+def test_archive_keeps_non_dominated_items_incrementally():
+    archive = ParetoArchive()
+
+    assert archive.update(["a", "b"], [[1.0, 4.0], [3.0, 3.0]]) == 2
+    # "c" dominates "b", "d" is dominated by "a"
+    assert archive.update(["c", "d"], [[2.0, 2.0], [1.0, 5.0]]) == 1
+    assert list(archive) == ["a", "c"]
+    # Same objectives as "a": the archived one stays
+    assert archive.update(["e"], [[1.0, 4.0]]) == 0
+    assert list(archive) == ["a", "c"]
+
+
+def test_archive_prunes_the_most_crowded_member():
+    archive = ParetoArchive(max_size=3)
+
+    archive.update(["a", "b", "c", "d"], [[0.0, 4.0], [1.9, 2.1], [2.0, 2.0], [4.0, 0.0]])
+
+    # Extremes stay; "b" and "c" are nearly the same trade-off and the smaller contribution goes
+    assert len(archive) == 3
+    assert archive[0] == "a" and archive[-1] == "d"
+
+
+def test_solution_objectives_minimize_price_stores_and_incompleteness():
+    solution = {"total_price": 12.5, "number_store": 2, "completeness_by_quantity": 0.75}
+
+    assert solution_objectives(solution) == (12.5, 2.0, -0.75)
@@ -0,0 +1,52 @@
+import pandas as pd
+import pytest
+
+from app.optimization.preprocessing.penalty_calculator import PenaltyCalculator
+
+PREFERENCES = {"Opt": {"language": "English", "quality": "NM", "version": "Standard", "foil": False, "set_name": ""}}
+
+
+def _listings():
+    return pd.DataFrame(
+        {
+            "name": ["Opt", "Opt", "Opt", "Sol Ring"],
+            "site_name": ["A", "A", "B", "B"],
+            "price": [1.0, 2.0, 3.0, 4.0],
+            "quality": ["NM", "LP", "HP", "LP"],
+            "language": ["English", "French", "Japanese", "French"],
+            "version": ["Standard", "Standard", "Borderless", "Standard"],
+            "foil": [False, True, False, False],
+            "set_name": ["Alpha", "Beta", "Alpha", "Beta"],
+        }
+    )
+
+
+def test_table_lookups_match_the_single_listing_penalty():
+    calculator = PenaltyCalculator({})
+    listings = _listings()
+
+    penalized = calculator.apply_penalties(listings, PREFERENCES)
+
+    for (_, listing), weighted_price in zip(listings.iterrows(), penalized["weighted_price"]):
+        expected_price, _, _ = calculator.compute_single_penalty(listing, PREFERENCES.get(listing["name"], {}))
+        assert weighted_price == pytest.approx(expected_price)
+    assert penalized["preference_applied"].tolist() == [True, True, True, False]
+    assert "penalty_explanation" not in penalized.columns
+
+
+def test_strict_preferences_price_mismatches_at_high_cost():
+    penalized = PenaltyCalculator({"strict_preferences": True}).apply_penalties(_listings(), PREFERENCES)
+
+    assert penalized["weighted_price"].tolist()[:3] == pytest.approx([1.0, 10000.0, 10000.0])
+
+
+def test_explanations_are_built_on_demand():
+    listings = _listings()
+
+    explanations = PenaltyCalculator({}).explain_penalties(listings.iloc[[0, 1, 3]], PREFERENCES)
+
+    assert explanations.index.tolist() == [0, 1, 3]
+    assert explanations[0] == "No penalties applied"
+    assert explanations[1].startswith("Quality: LP (penalty: 1.1x); language: French vs wanted English")
+    assert "foil: True vs wanted False (penalty: 1.3x)" in explanations[1]
+    assert explanations[3] == "Quality: LP (penalty: 1.1x)"
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from app.optimization.core.population_evaluator import PopulationEvaluator, map_distinct
+from app.optimization.preprocessing.penalty_calculator import PenaltyCalculator, PenaltyConfig
+
+
+def _listings():
+    return pd.DataFrame(
+        {
+            "name": ["Opt", "Opt", "Sol Ring", "Sol Ring", "Island"],
+            "site_name": ["A", "B", "A", "B", "A"],
+            "price": [1.0, 2.0, 3.0, 4.0, 0.25],
+            "quality": ["NM", "LP", "NM", "NM", "NM"],
+            "language": ["English", "English", "English", "Japanese", "English"],
+        },
+        index=[20, 21, 30, 31, 40],
+    )
+
+
+def test_evaluate_counts_cards_up_to_the_wishlist_quantity_in_gene_order():
+    wishlist = pd.DataFrame({"name": ["Opt", "Sol Ring"], "quantity": [2, 1]})
+    evaluator = PopulationEvaluator(_listings(), wishlist, [1.0, 2.0, 3.0, 4.0, 0.25], [1.0, 0.5, 1.0, 1.0, 1.0])
+
+    scores = evaluator.evaluate([[20, 21, 31], [20, 20, 20, 30, 31], [40, 99, 30], []])
+
+    np.testing.assert_array_equal(scores.cost, [7.0, 5.0, 3.0, 0.0])
+    np.testing.assert_array_equal(scores.cards_found, [3, 3, 1, 0])
+    np.testing.assert_allclose(scores.completeness, [1.0, 1.0, 1 / 3, 0.0])
+    np.testing.assert_allclose(scores.quality, [2.5 / 3, 1.0, 1.0, 0.0])
+    np.testing.assert_array_equal(scores.store_count, [2, 1, 1, 0])
+    np.testing.assert_array_equal(scores.duplicates, [0, 2, 1, 0])
+    np.testing.assert_array_equal(scores.invalid, [0, 0, 1, 0])
+
+
+def test_from_penalties_skips_strict_mismatches_without_using_up_the_card():
+    listings = _listings()
+    wishlist = pd.DataFrame({"name": ["Opt", "Sol Ring"], "quantity": [1, 1]})
+    preferences = {"Sol Ring": {"language": "English"}}
+    evaluator = PopulationEvaluator.from_penalties(
+        listings, wishlist, PenaltyCalculator({}), preferences, PenaltyConfig(strict_preferences=True)
+    )
+
+    scores = evaluator.evaluate([[31, 30, 20]])
+
+    assert scores.filtered[0] == 1
+    assert scores.cards_found[0] == 2
+    assert scores.cost[0] == 4.0
+
+
+def test_map_distinct_calls_once_per_combination():
+    calls = []
+    frame = pd.DataFrame({"quality": ["NM", "LP", "NM", None], "other": [1, 2, 3, 4]})
+
+    result = map_distinct(frame, ("quality", "missing"), lambda combination: calls.append(combination) or len(calls))
+
+    assert list(result) == [1, 2, 1, 3]
+    assert len(calls) == 3
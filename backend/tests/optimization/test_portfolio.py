@@ -0,0 +1,140 @@
+import multiprocessing
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from app.optimization.algorithms import portfolio
+from app.optimization.algorithms.factory import OptimizerFactory
+from app.optimization.algorithms.portfolio import PortfolioRace
+from app.optimization.core.base_optimizer import BaseOptimizer, OptimizationResult
+
+
+def _optimizer(total_price, cards_found, stop_reason="completed", milp_gap=0.0):
+    class CannedOptimizer(BaseOptimizer):
+        runs = 0
+
+        def optimize(self):
+            CannedOptimizer.runs += 1
+            solution = {"total_price": total_price, "nbr_card_in_solution": cards_found, "cards_required_total": 4}
+            return OptimizationResult(
+                solution, [solution], "Canned", 0.1, 1, 0.0, {"stop_reason": stop_reason, "milp_gap": milp_gap}
+            )
+
+        def get_algorithm_name(self):
+            return "Canned"
+
+    return CannedOptimizer
+
+
+def _unstartable(*args, **kwargs):
+    raise OSError("No processes here")
+
+
+@pytest.fixture
+def racers(monkeypatch):
+    # When racers can't be started the race runs in portfolio order, in this process
+    context = SimpleNamespace(Queue=lambda: SimpleNamespace(close=lambda: None), Process=_unstartable)
+    monkeypatch.setattr(portfolio.multiprocessing, "get_context", lambda method: context)
+
+    def register(**optimizers):
+        for name, optimizer in optimizers.items():
+            monkeypatch.setitem(OptimizerFactory._optimizers, name, optimizer)
+        return optimizers
+
+    return register
+
+
+def _race(algorithms, **kwargs):
+    return PortfolioRace(
+        algorithms, {"filtered_listings_df": None, "user_wishlist_df": None}, {"time_limit": 60}, **kwargs
+    )
+
+
+def test_a_proven_optimum_ends_the_race(racers):
+    optimizers = racers(cheap=_optimizer(5.0, 3), milp=_optimizer(8.0, 4), late=_optimizer(7.0, 4))
+
+    outcome = _race(["cheap", "milp", "late"]).run()
+
+    # The cheaper result is incomplete, MILP ran to completion
+    assert (outcome.winner, outcome.reason, outcome.mode) == ("milp", "proven_optimal", "serial")
+    assert outcome.finished == ["cheap", "milp"] and outcome.cancelled == ["late"]
+    assert optimizers["late"].runs == 0
+    assert outcome.to_dict()["won_at"] >= 0 and "result" not in outcome.to_dict()
+
+
+def test_best_complete_result_wins_when_none_is_good_enough(racers):
+    racers(
+        first=_optimizer(9.0, 4),
+        milp=_optimizer(8.0, 4, stop_reason="solver_time_limit"),
+        last=_optimizer(7.5, 4),
+        broken=None,
+    )
+
+    outcome = _race(["first", "milp", "broken", "last"], cost_lower_bound=5.0).run()
+
+    assert (outcome.winner, outcome.reason) == ("last", "best_of_portfolio")
+    assert outcome.result.best_solution["total_price"] == 7.5
+    assert list(outcome.failed) == ["broken"]
+
+    # Within 5% of the lower bound is good enough
+    assert _race(["first", "last"], cost_lower_bound=7.2).run().reason == "good_enough"
+
+
+def test_a_milp_solved_to_a_gap_is_not_proven_optimal(racers):
+    racers(milp=_optimizer(8.0, 4, milp_gap=0.01), late=_optimizer(7.0, 4))
+
+    outcome = _race(["milp", "late"]).run()
+
+    assert (outcome.winner, outcome.reason, outcome.cancelled) == ("late", "best_of_portfolio", [])
+    assert _race(["milp", "late"], cost_lower_bound=7.9).run().reason == "good_enough"
+
+
+def _problem_data():
+    listings = pd.DataFrame(
+        {
+            "name": ["Opt", "Opt", "Sol Ring", "Sol Ring"],
+            "site_name": ["A", "B", "A", "B"],
+            "price": [1.0, 0.5, 2.0, 3.0],
+            "quality": ["NM"] * 4,
+            "quantity": [4] * 4,
+        }
+    ).assign(language="English", version="Standard", foil=False, set_name="Alpha", set_code="lea")
+    return {
+        "filtered_listings_df": listings,
+        "user_wishlist_df": pd.DataFrame({"name": ["Opt", "Sol Ring"], "quantity": [1, 1]}),
+        "num_stores": 2,
+    }
+
+
+def _race_real_algorithms():
+    config = {"time_limit": 60, "min_store": 1, "max_store": 2, "weights": {"cost": 1.0}}
+    # Racers are spawned, so they only see algorithms the factory registers on import
+    outcome = PortfolioRace(["unknown", "milp"], _problem_data(), config).run()
+    return {**outcome.to_dict(), "total_price": outcome.result.best_solution["total_price"]}
+
+
+def _assert_raced_in_processes(outcome):
+    assert (outcome["winner"], outcome["reason"], outcome["mode"]) == ("milp", "proven_optimal", "process")
+    assert outcome["total_price"] == 2.5
+    assert list(outcome["failed"]) == ["unknown"] and outcome["finished"] == ["milp"]
+
+
+def test_racers_run_in_their_own_processes():
+    _assert_raced_in_processes(_race_real_algorithms())
+
+
+def _race_in_daemonic_process(results):
+    results.put(_race_real_algorithms())
+
+
+def test_racers_start_inside_daemonic_processes():
+    # Like a Celery prefork worker, which the standard library won't give children
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    worker = context.Process(target=_race_in_daemonic_process, args=(results,), daemon=True)
+    worker.start()
+
+    outcome = results.get(timeout=120)
+    worker.join()
+    _assert_raced_in_processes(outcome)
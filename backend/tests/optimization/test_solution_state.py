@@ -0,0 +1,120 @@
+import pandas as pd
+import pytest
+
+from app.optimization.algorithms.hybrid.local_search import (
+    consolidate_stores,
+    improve_prices,
+    search_listings,
+    upgrade_quality,
+)
+from app.optimization.core.solution_state import SolutionState
+
+
+def _listings():
+    return pd.DataFrame(
+        {
+            "name": ["Opt", "Opt", "Opt", "Sol Ring", "Sol Ring"],
+            "site_name": ["A", "B", "C", "A", "C"],
+            "price": [3.0, 1.0, 2.5, 4.0, 4.1],
+            "quality": ["NM", "NM", "NM", "LP", "NM"],
+            "quantity": [4, 1, 4, 4, 4],
+        }
+    )
+
+
+def _wishlist():
+    return pd.DataFrame({"name": ["Opt", "Sol Ring"], "quantity": [2, 1]})
+
+
+def _solution(cards):
+    stores = {}
+    for card in cards:
+        stores.setdefault(card["site_name"], []).append(card)
+    return {"total_price": 0.0, "stores": [{"site_name": name, "cards": cards} for name, cards in stores.items()]}
+
+
+def test_from_solution_matches_cards_to_listings():
+    listings = _listings()
+    opt = {**listings.iloc[0].to_dict(), "quantity": 2}
+    sol_ring = {**listings.iloc[4].to_dict(), "quantity": 1}
+
+    state = SolutionState.from_solution(_solution([opt, sol_ring]), listings, _wishlist())
+
+    assert state.slots.tolist() == [0, 0, 4]
+    assert state.cost == pytest.approx(10.1)
+    assert state.store_count == 2
+    assert state.completeness == 1.0
+
+    unknown = {**sol_ring, "price": 9.99}
+    assert SolutionState.from_solution(_solution([opt, unknown]), listings, _wishlist()) is None
+
+
+def test_move_delta_matches_the_committed_move():
+    state = SolutionState(_listings(), _wishlist(), [0, 0, 3])
+
+    # Second copy of Opt from C opens a store
+    assert state.move_delta(1, 2) == (pytest.approx(-0.5), 1, 0.0)
+    state.move(1, 2)
+    assert state.cost == pytest.approx(9.5)
+    assert state.store_count == 2
+
+    # Moving the Sol Ring to C as well keeps two stores
+    cost, stores, quality = state.move_delta(2, 4)
+    state.move(2, 4)
+    assert (state.cost, state.store_count) == (pytest.approx(9.6), 2)
+    assert (cost, stores) == (pytest.approx(0.1), 0) and quality > 0
+
+
+def test_local_search_moves():
+    listings = _listings()
+    state = SolutionState(listings, _wishlist(), [2, 2, 3])
+
+    # B is cheaper for Opt but would add a store
+    assert improve_prices(state) == 0
+
+    # A holds one copy and C two: dropping A is a 0.1 increase
+    assert consolidate_stores(state) == 1
+    assert state.slots.tolist() == [2, 2, 4]
+    assert state.store_count == 1
+
+    # Everything left is either worse, too expensive or in another store
+    assert upgrade_quality(state) == 0
+
+
+@pytest.mark.parametrize("strict_preferences", [False, True])
+def test_local_search_keeps_preferred_variants(strict_preferences):
+    listings = pd.DataFrame(
+        {
+            "name": ["Opt"] * 5,
+            "site_name": ["A"] * 5,
+            "price": [3.0, 2.5, 2.4, 2.8, 2.9],
+            "quality": ["NM"] * 5,
+            "language": ["English"] * 5,
+            "quantity": [4] * 5,
+            "version": ["Standard", "Extended Art", "Standard", "Standard", "Standard"],
+            "foil": [False, False, True, False, False],
+            "set_name": ["Alpha", "Alpha", "Alpha", "Beta", "Alpha"],
+        }
+    )
+    wishlist = pd.DataFrame(
+        {
+            "name": ["Opt"],
+            "quantity": [2],
+            "language": ["English"],
+            "quality": ["NM"],
+            "version": ["Standard"],
+            "foil": [False],
+            "set_name": ["Alpha"],
+        }
+    )
+    solution = _solution([{**listings.iloc[0].to_dict(), "quantity": 2}])
+
+    # Raw prices favor the other version, the foil and the other set
+    raw = SolutionState.from_solution(solution, listings, wishlist)
+    assert improve_prices(raw) == 2 and raw.slots.tolist() == [2, 2]
+
+    penalized, usable = search_listings(listings, wishlist, {"strict_preferences": strict_preferences})
+    assert usable.tolist() == [True, not strict_preferences, not strict_preferences, not strict_preferences, True]
+    state = SolutionState.from_solution(solution, penalized, wishlist, usable)
+    assert improve_prices(state) == 2
+    assert state.slots.tolist() == [4, 4]
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from app.optimization.core.pareto import hypervolume, inverted_generational_distance
+from app.optimization.core.stopping import MILP_MAX_TIME_LIMIT, MILP_MIN_TIME_LIMIT, StoppingPolicy
+
+
+def test_indicators():
+    samples = np.array([[0.5, 0.5], [0.1, 0.9], [0.9, 0.1], [0.05, 0.05]])
+    front = np.array([[0.0, 0.6], [0.6, 0.0]])
+
+    assert hypervolume(front, samples) == 0.5
+    assert inverted_generational_distance(front, front) == 0.0
+    assert inverted_generational_distance(front, front + [0.3, 0.4]) == pytest.approx(0.5)
+
+
+def test_deadline():
+    policy = StoppingPolicy(time_limit=0)
+
+    assert policy.should_stop()
+    assert policy.stats()["stop_reason"] == "deadline"
+    assert StoppingPolicy(time_limit=None).remaining() is None
+
+
+def test_stops_once_the_front_stagnates():
+    policy = StoppingPolicy(window=3)
+    fronts = [np.array([[10.0 - g, 1.0], [1.0, 10.0 - g]]) for g in range(5)]
+
+    # Improving fronts keep the run going, then the window fills with the same front
+    assert not any(policy.should_stop(front) for front in fronts)
+    assert [policy.should_stop(fronts[-1]) for _ in range(3)] == [False, False, True]
+
+    stats = policy.stats()
+    assert stats["stop_reason"] == "front_stagnation"
+    assert stats["generations_run"] == 8
+
+
+def test_first_reason_is_kept():
+    policy = StoppingPolicy()
+
+    policy.stop("no_improvement")
+    policy.stop("max_generations")
+
+    assert policy.reason == "no_improvement"
+
+
+def test_milp_limits_follow_model_size():
+    small_time, small_gap = StoppingPolicy().milp_limits(500)
+    large_time, large_gap = StoppingPolicy().milp_limits(500_000)
+
+    assert (small_time, small_gap) == (MILP_MIN_TIME_LIMIT, 0.0)
+    assert large_time == MILP_MAX_TIME_LIMIT and large_gap > 0
+    # Capped by the deadline
+    assert StoppingPolicy(time_limit=2).milp_limits(500_000)[0] <= 2
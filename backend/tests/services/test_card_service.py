@@ -3,6 +3,8 @@ import json
 from unittest.mock import AsyncMock, patch, MagicMock
 
 from app.services.card_service import CardService
+from app.utils.set_name_index import SetNameIndex
+from app.utils.set_resolution_cache import SetResolutionCache
 from app.models.buylist import UserBuylist
 from app.models.user_buylist_card import UserBuylistCard
 
@@ -72,3 +74,72 @@ async def test_get_set_code_fuzzy_match(mock_sets_data):
 
     set_code = await CardService.get_set_code("Bro Extras")
     assert set_code == "bro"
+
+
+def test_set_name_index_lookups():
+    sets_data = {
+        "the brothers' war": {"code": "bro"},
+        "the brothers' war retro artifacts": {"code": "brr"},
+        "dominaria united": {"code": "dmu"},
+    }
+    index = SetNameIndex(sets_data, version="v1")
+
+    assert index.has_name("dominaria united")
+    assert index.code_for_name("the brothers' war") == "bro"
+    assert index.code_for_code("dmu") == "dmu"
+    assert index.name_for_code_fragment("brr") == "the brothers' war retro artifacts"
+    assert index.best_fuzzy_match(["brothers war"], score_cutoff=65)[0] == "the brothers' war"
+    assert index.best_fuzzy_match(["zzzz"], score_cutoff=65) is None
+
+
+@pytest.mark.asyncio
+@patch("app.services.card_service.CardService._get_sets_version")
+@patch("app.services.card_service.CardService.get_sets_data")
+async def test_set_index_rebuilds_on_version_change(mock_sets_data, mock_version):
+    CardService.reset_set_index()
+    mock_sets_data.return_value = {"dominaria united": {"code": "dmu"}}
+    mock_version.return_value = "v1"
+
+    first = await CardService.get_set_index()
+    CardService._set_index_checked_at = 0.0
+    assert await CardService.get_set_index() is first
+    assert mock_sets_data.call_count == 1
+
+    mock_version.return_value = "v2"
+    CardService._set_index_checked_at = 0.0
+    rebuilt = await CardService.get_set_index()
+    assert rebuilt is not first
+    assert rebuilt.version == "v2"
+
+    # An unreadable version keeps the current index
+    mock_version.return_value = None
+    CardService._set_index_checked_at = 0.0
+    assert await CardService.get_set_index() is rebuilt
+    assert mock_sets_data.call_count == 2
+    CardService.reset_set_index()
+
+
+@pytest.mark.asyncio
+@patch("app.services.card_service.CardService.get_redis_client")
+async def test_cached_sets_without_version_get_one(mock_redis):
+    redis_mock = AsyncMock()
+    mock_redis.return_value = redis_mock
+    sets_json = json.dumps({"dominaria united": {"code": "dmu"}})
+    redis_mock.get.return_value = sets_json
+
+    assert await CardService.get_cached_sets() == {"dominaria united": {"code": "dmu"}}
+    redis_mock.set.assert_awaited_once_with(
+        "scryfall_set_codes:version", SetNameIndex.fingerprint(sets_json), ex=86400, nx=True
+    )
+
+
+def test_set_resolution_cache_is_bounded_lru():
+    cache = SetResolutionCache("test_set_resolution", max_size=2)
+    cache.put_local("MKM Singles", ("murders at karlov manor", "mkm"))
+    cache.put_local("Unknown Category", ("Unknown Category", None))
+    assert cache.get_local("MKM Singles") == ("murders at karlov manor", "mkm")
+
+    cache.put_local("Secret Lair Drop", ("secret lair drop", "sld"))
+    assert cache.get_local("Unknown Category") is None
+    assert cache.get_local("Secret Lair Drop") == ("secret lair drop", "sld")
+    assert cache.get_stats()["local_hits"] == 2
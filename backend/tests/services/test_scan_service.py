@@ -0,0 +1,72 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.services import scan_service
+from app.services.scan_service import ScanService
+
+
+def card_result(**overrides):
+    result = {
+        "name": "Lightning Bolt",
+        "price": 1.5,
+        "site_id": 3,
+        "set_name": "Modern Horizons 3",
+        "set_code": "mh3",
+        "version": "Standard",
+        "foil": False,
+        "quality": "Near Mint",
+        "language": "English",
+        "quantity": 2,
+        "variant_id": "11",
+    }
+    result.update(overrides)
+    return result
+
+
+def test_build_scan_result_rows_normalizes_and_skips_invalid_rows():
+    rows = ScanService._build_scan_result_rows(
+        7,
+        [
+            card_result(),
+            card_result(name="Negative", price=-1),
+            card_result(name="Bad Code", set_code="toolong"),
+            card_result(name="Bad Version", version="Misprint"),
+            card_result(name="Sol Ring ", set_code="", quality=None, language="french", quantity=None, version=None),
+        ],
+    )
+
+    assert [row["name"] for row in rows] == ["Lightning Bolt", "Sol Ring"]
+    assert rows[0]["set_code"] == "MH3"
+    assert rows[0]["quality"] == "NM"
+    assert rows[1]["set_code"] is None
+    assert rows[1]["quality"] == "NM"
+    assert rows[1]["language"] == "French"
+    assert rows[1]["quantity"] == 0
+    assert rows[1]["version"] == "Standard"
+    assert all(row["scan_id"] == 7 and row["site_id"] == 3 for row in rows)
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_scan_results_checks_scan_once_and_chunks_inserts(monkeypatch):
+    monkeypatch.setattr(scan_service, "BULK_INSERT_CHUNK_SIZE", 2)
+    session = MagicMock()
+    session.scalar = AsyncMock(return_value=7)
+    session.execute = AsyncMock()
+
+    count = await ScanService.bulk_create_scan_results(session, 7, [card_result(variant_id=str(i)) for i in range(5)])
+
+    assert count == 5
+    session.scalar.assert_awaited_once()
+    assert [len(call.args[1]) for call in session.execute.await_args_list] == [2, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_scan_results_requires_existing_scan():
+    session = MagicMock()
+    session.scalar = AsyncMock(return_value=None)
+    session.execute = AsyncMock()
+    session.rollback = AsyncMock()
+
+    with pytest.raises(ValueError):
+        await ScanService.bulk_create_scan_results(session, 7, [card_result()])
+    session.execute.assert_not_awaited()
@@ -0,0 +1,44 @@
+from app.utils.crystal_parser import is_magic_singles_href, iter_crystal_forms
+
+PAGE = """
+<html><body><div class="content"><ul>
+  <li class="product">
+    <a itemprop="url" href="/catalog/magic_singles-modern_horizons/lightning_bolt/1">Lightning Bolt</a>
+    <div class="meta"><a href="/catalog/magic_singles-modern_horizons/1">Modern Horizons</a></div>
+    <form class="add-to-cart-form" data-name="Lightning Bolt" data-price="CAD$ 2.50"
+          data-category="Modern Horizons" data-variant="NM, English" data-vid="11">
+      <span class="variant-short-info variant-qty">3 In Stock</span>
+    </form>
+    <form class="add-to-cart-form" data-name="Lightning Bolt - Foil" data-price="CAD$ 9.00"
+          data-category="Modern Horizons" data-variant="NM, English" data-vid="12">
+      <input class="qty" type="number" max="2" value="1">
+    </form>
+  </li>
+  <li class="product">
+    <div class="meta"><a href="/catalog/board_games/7">Board Games</a></div>
+    <form class="add-to-cart-form" data-name="Catan" data-vid="21"></form>
+  </li>
+</ul></div></body></html>
+"""
+
+
+def test_iter_crystal_forms_yields_forms_with_context():
+    forms = list(iter_crystal_forms(PAGE))
+
+    assert [form.attrs["data-vid"] for form in forms] == ["11", "12", "21"]
+    assert [form.quantity for form in forms] == [3, 2, None]
+    assert [form.is_magic for form in forms] == [True, True, False]
+    assert all(form.in_product for form in forms)
+    # The product link precedes the forms of the first product only
+    assert forms[0].product_url == "/catalog/magic_singles-modern_horizons/lightning_bolt/1"
+    assert forms[2].product_url == forms[0].product_url
+
+
+def test_iter_crystal_forms_handles_empty_pages():
+    assert list(iter_crystal_forms("")) == []
+    assert list(iter_crystal_forms("<html><body><p class='error'>Too many requests</p></body></html>")) == []
+
+
+def test_is_magic_singles_href():
+    assert is_magic_singles_href("/catalog/Magic_Singles-Alpha/1")
+    assert not is_magic_singles_href("/catalog/pokemon_singles/1")
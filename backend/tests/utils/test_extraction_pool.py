@@ -0,0 +1,117 @@
+import asyncio
+import multiprocessing
+import time
+
+import pytest
+
+from app.utils.card_extraction import unique_cards
+from app.utils.extraction_pool import ExtractionPool
+from app.utils.set_name_index import SetNameIndex
+from app.utils.set_resolution_cache import SetResolver
+
+SETS_DATA = {
+    "Modern Horizons 3": {"code": "mh3"},
+    "Dominaria United": {"code": "dmu"},
+}
+
+
+def resolve_all(names, resolver):
+    return [resolver.get_clean_set_code_from_set_name(name) for name in names]
+
+
+def slow_resolve_all(names, resolver):
+    time.sleep(0.2)
+    return resolve_all(names, resolver)
+
+
+def fail_to_resolve(names, resolver):
+    raise ValueError(f"Can't resolve {names}")
+
+
+async def _extract_with_workers(max_workers):
+    pool = ExtractionPool(max_workers)
+    pool.start(SetNameIndex(SETS_DATA, version="v1"), {})
+    try:
+        in_workers = pool._daemonic_pool is not None
+        pending = [asyncio.ensure_future(pool.run(slow_resolve_all, [name])) for name in SETS_DATA]
+        await asyncio.sleep(0)
+        # Extractions queued on the old workers still finish
+        pool.start(SetNameIndex({**SETS_DATA, "Bloomburrow": {"code": "blb"}}, version="v2"), {})
+        results = await asyncio.gather(*pending, pool.run(resolve_all, ["Bloomburrow"]))
+        try:
+            await pool.run(fail_to_resolve, ["Unknown"])
+        except ValueError as e:
+            error = str(e)
+        return in_workers, [codes for codes, _ in results], error
+    finally:
+        pool.shutdown()
+
+
+def _extract_in_daemonic_process(results):
+    results.put(asyncio.run(_extract_with_workers(max_workers=1)))
+
+
+def test_set_resolver_memoizes_and_reports_new_resolutions():
+    index = SetNameIndex(SETS_DATA, version="v1")
+    resolver = SetResolver(index, {"Known Set": ("Dominaria United", "dmu")})
+
+    assert resolver.get_clean_set_code_from_set_name("Known Set") == "dmu"
+    assert resolver.get_clean_set_code_from_set_name("Modern Horizons 3") == "mh3"
+    assert resolver.get_clean_set_code_from_set_name("Modern Horizons 3") == "mh3"
+    assert resolver.new_resolutions == {"Modern Horizons 3": ("Modern Horizons 3", "mh3")}
+
+
+def test_unique_cards_keeps_first_occurrence():
+    cards = [{"name": "Opt", "set_code": "dmu"}, {"name": "Opt", "set_code": "dmu"}, {"name": "Opt", "set_code": "mh3"}]
+    assert unique_cards(cards, ("name", "set_code")) == [cards[0], cards[2]]
+
+
+@pytest.mark.asyncio
+async def test_extraction_pool_runs_in_threads_without_workers():
+    pool = ExtractionPool(max_workers=0)
+    index = SetNameIndex(SETS_DATA, version="v1")
+    assert pool.needs_start(index)
+    pool.start(index, {})
+
+    codes, new_resolutions = await pool.run(resolve_all, ["Dominaria United"])
+
+    assert codes == ["dmu"]
+    assert new_resolutions == {"Dominaria United": ("Dominaria United", "dmu")}
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_extraction_pool_restart_lets_pending_extractions_finish():
+    pool = ExtractionPool(max_workers=1)
+    pool.start(SetNameIndex(SETS_DATA, version="v1"), {})
+    pending = [asyncio.ensure_future(pool.run(slow_resolve_all, ["Dominaria United"])) for _ in range(4)]
+    await asyncio.sleep(0)
+
+    # A rebuild of the same sets keeps the workers, new sets restart them
+    assert not pool.needs_start(SetNameIndex(SETS_DATA, version="v1"))
+    new_index = SetNameIndex({**SETS_DATA, "Bloomburrow": {"code": "blb"}}, version="v2")
+    assert pool.needs_start(new_index)
+    # Still referenced, as by the coroutines waiting on it
+    old_workers = pool._executor
+    pool.start(new_index, {})
+
+    results = await asyncio.gather(*pending)
+    assert [codes for codes, _ in results] == [["dmu"]] * 4
+    assert pool._executor is not old_workers
+    codes, _ = await pool.run(resolve_all, ["Bloomburrow"])
+    assert codes == ["blb"]
+    pool.shutdown()
+
+
+def test_extraction_pool_starts_inside_daemonic_processes():
+    # Like the Celery prefork worker scraping a site, which the standard library won't give children
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    worker = context.Process(target=_extract_in_daemonic_process, args=(results,), daemon=True)
+    worker.start()
+
+    in_workers, codes, error = results.get(timeout=120)
+    worker.join()
+    assert in_workers
+    assert codes == [["mh3"], ["dmu"], ["blb"]]
+    assert error == "Can't resolve ['Unknown']"
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.optimization.config.algorithm_configs import AlgorithmConfig
+from app.utils.optimization_result_cache import OptimizationResultCache
+
+
+def _listings():
+    return pd.DataFrame(
+        {
+            "site_name": pd.Categorical(["A", "B", "A"]),
+            "name": ["Opt", "Opt", "Sol Ring"],
+            "price": np.array([1.0, 1.5, 2.0], dtype=np.float32),
+            "quantity": [1, 4, 2],
+        }
+    )
+
+
+def _key(listings, **config):
+    wishlist = pd.DataFrame({"name": ["Opt", "Sol Ring"], "quantity": [1, 1]})
+    return OptimizationResultCache.make_key(wishlist, listings, AlgorithmConfig(**config).to_dict())
+
+
+def test_key_follows_listings_content_and_config():
+    listings = _listings()
+
+    # Row order, index and column order of the listings don't matter
+    shuffled = listings.iloc[[2, 0, 1]][["price", "quantity", "name", "site_name"]]
+    assert _key(listings) == _key(shuffled.set_axis([7, 8, 9]))
+
+    repriced = listings.assign(price=np.array([1.0, 1.4, 2.0], dtype=np.float32))
+    assert _key(repriced) != _key(listings)
+    assert _key(listings, weights={"cost": 1.0}) != _key(listings, weights={"cost": 0.5})
+    assert _key(listings, primary_algorithm="milp") != _key(listings, primary_algorithm="nsga3")
+
+
+@pytest.mark.asyncio
+async def test_cache_is_disabled_without_redis():
+    cache = OptimizationResultCache()
+    key = _key(_listings())
+
+    await cache.put(key, {"status": "success"})
+
+    assert await cache.get(key) is None
+    assert cache.get_stats()["enabled"] is False
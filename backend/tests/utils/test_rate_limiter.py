@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from app.utils.rate_limiter import HostRateLimiter, parse_retry_after
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_ramps_up_on_fast_responses():
+    limiter = HostRateLimiter("example.com", max_rate=50, max_concurrency=4)
+    start_rate = limiter.rate
+
+    for _ in range(8):
+        async with limiter.request() as outcome:
+            outcome.status = 200
+
+    assert limiter.rate > start_rate
+    assert int(limiter.concurrency) > 2
+    assert limiter.get_stats()["requests"] == 8
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_backs_off_and_pauses_on_429():
+    limiter = HostRateLimiter("example.com", max_rate=8, max_concurrency=4)
+    limiter.rate, limiter.concurrency = 8.0, 4.0
+
+    async with limiter.request() as outcome:
+        outcome.status = 429
+        outcome.retry_after = "0.2"
+
+    assert limiter.rate == 4.0
+    assert int(limiter.concurrency) == 2
+    assert limiter.get_stats()["throttled"] == 1
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await limiter.acquire()
+    assert loop.time() - start >= 0.15
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_caps_in_flight_requests():
+    limiter = HostRateLimiter("example.com", max_rate=100, max_concurrency=2)
+    limiter.rate = 100.0
+    in_flight = 0
+    peak = 0
+
+    async def request():
+        nonlocal in_flight, peak
+        async with limiter.request() as outcome:
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            outcome.status = 200
+
+    await asyncio.gather(*(request() for _ in range(10)))
+    assert peak <= 2
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("5") == 5.0
+    assert parse_retry_after(None) == 60.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 60.0